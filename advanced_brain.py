@@ -8,6 +8,8 @@ import time
 import random
 from datetime import datetime
 from config import Config
+from metrics_exporter import llm_call
+from state_store import get_state_store
 from rich.console import Console
 import asyncio
 import aiohttp
@@ -160,11 +162,14 @@ class AdvancedAIBrain:
                 }
             }
             
-            response = requests.post(
-                f"{ollama_host}/api/generate",
-                json=payload,
-                timeout=30
-            )
+            with llm_call("ollama") as call:
+                response = requests.post(
+                    f"{ollama_host}/api/generate",
+                    json=payload,
+                    timeout=30
+                )
+                if response.status_code != 200:
+                    call.error(f"http_{response.status_code}")
             
             if response.status_code == 200:
                 data = response.json()
@@ -247,7 +252,8 @@ class AdvancedAIBrain:
             full_prompt = self.build_prompt_with_context(prompt, context)
             
             # Generate response
-            response = self.model.generate_content(full_prompt)
+            with llm_call("gemini"):
+                response = self.model.generate_content(full_prompt)
             
             if response and response.text:
                 return response.text.strip()
@@ -386,27 +392,19 @@ class AdvancedAIBrain:
         return "Conversation history cleared. All systems reset."
     
     def load_memory(self):
-        """Load user preferences and memory from file"""
+        """Load user preferences and memory from the state store"""
         try:
-            memory_file = Config.MEMORY_DIR / "advanced_memory.json"
-            if memory_file.exists():
-                with open(memory_file, 'r') as f:
-                    data = json.load(f)
-                    self.context_memory = data.get('context', {})
-                    self.user_preferences = data.get('preferences', {})
+            store = get_state_store()
+            self.context_memory = store.items('context')
+            self.user_preferences = store.items('preferences')
         except Exception as e:
             console.print(f"[yellow]Could not load memory: {e}[/yellow]")
     
     def save_memory(self):
-        """Save user preferences and memory to file"""
+        """Save user preferences and memory (only changed keys are written)"""
         try:
-            memory_file = Config.MEMORY_DIR / "advanced_memory.json"
-            data = {
-                'context': self.context_memory,
-                'preferences': self.user_preferences,
-                'last_updated': datetime.now().isoformat()
-            }
-            with open(memory_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            store = get_state_store()
+            store.sync('context', self.context_memory)
+            store.sync('preferences', self.user_preferences)
         except Exception as e:
             console.print(f"[yellow]Could not save memory: {e}[/yellow]")
@@ -1,20 +1,28 @@
-from langchain.agents import initialize_agent, Tool, AgentType
-from langchain_core.language_models.llms import LLM
-from typing import Optional, List, Mapping, Any
+"""
+Agent Orchestrator for JARVIS
+Tool-using agent on OpenAI-compatible function calling: JSON-schema tools, parallel tool calls in one turn,
+and tools whose output already answers the user finish the task without another model call
+"""
+
+import json
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as ToolTimeout
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
 import requests
 from config import Config
+from metrics_exporter import llm_call
+from tool_router import ToolRouter
+
+class OpenRouterLLM:
+    """Plain-completion wrapper for Multi-Model Brain (intent classification and the no-tools fallback)"""
 
-class OpenRouterLLM(LLM):
-    """Custom LangChain LLM wrapper for Multi-Model Brain"""
-    
     def __init__(self, multi_brain=None):
-        super().__init__()
         self._multi_brain = multi_brain
-    
+
     @property
     def _llm_type(self) -> str:
         return "multi_model"
-    
+
     def _call(self, prompt: str, stop: Optional[List[str]] = None) -> str:
         """Call the Multi-Model Brain"""
         try:
@@ -26,39 +34,127 @@ class OpenRouterLLM(LLM):
                     "Authorization": f"Bearer {Config.OPENROUTER_API_KEY}",
                     "Content-Type": "application/json"
                 }
-                
+
                 data = {
                     "model": "qwen/qwen-2.5-72b-instruct",  # Use working model
                     "messages": [{"role": "user", "content": prompt}],
                     "max_tokens": 500,
                     "temperature": 0
                 }
-                
-                response = requests.post(
-                    f"{Config.OPENROUTER_BASE_URL}/chat/completions",
-                    headers=headers,
-                    json=data
-                )
-                
+
+                with llm_call("openrouter") as call:
+                    response = requests.post(
+                        f"{Config.OPENROUTER_BASE_URL}/chat/completions",
+                        headers=headers,
+                        json=data
+                    )
+                    if response.status_code != 200:
+                        call.error(f"http_{response.status_code}")
+
                 if response.status_code == 200:
                     result = response.json()
                     return result["choices"][0]["message"]["content"]
                 else:
                     return f"Error: {response.status_code} - {response.text}"
-                    
+
         except Exception as e:
             return f"Error calling AI model: {e}"
-    
+
     @property
     def _identifying_params(self) -> Mapping[str, Any]:
         """Get the identifying parameters."""
         return {"model": "multi_model_brain"}
 
+
+class OpenRouterProvider:
+    """Chat completions with tools on an OpenAI-compatible endpoint; complete() returns the assistant message"""
+
+    def __init__(self, api_key: str, model: str, base_url: str = "https://openrouter.ai/api/v1",
+                 timeout: float = 30, max_tokens: int = 800):
+        self.api_key = api_key
+        self.model = model
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_tokens = max_tokens
+
+    def complete(self, messages: List[Dict], tools: List[Dict], tool_choice: str = "auto") -> Dict:
+        data = {
+            "model": self.model,
+            "messages": messages,
+            "max_tokens": self.max_tokens,
+            "temperature": 0
+        }
+        if tools:
+            data["tools"] = tools
+            data["tool_choice"] = tool_choice
+            data["parallel_tool_calls"] = True
+
+        with llm_call("openrouter") as call:
+            response = requests.post(
+                f"{self.base_url}/chat/completions",
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json",
+                    "HTTP-Referer": "https://github.com/RaghavVijayanand/jarvis",
+                    "X-Title": "JARVIS AI Assistant"
+                },
+                json=data,
+                timeout=self.timeout
+            )
+            if response.status_code != 200:
+                call.error(f"http_{response.status_code}")
+                raise RuntimeError(f"OpenRouter API error: {response.status_code} - {response.text[:200]}")
+
+        return response.json()["choices"][0]["message"]
+
+
+class AgentTool:
+    """A callable exposed to the model; params are JSON-schema properties, passed to func as keyword arguments"""
+
+    def __init__(self, name: str, description: str, func: Callable, params: Optional[Dict[str, Dict]] = None,
+                 required: Optional[List[str]] = None, direct: bool = False, keywords: str = "",
+                 sequential: bool = False):
+        self.name = name
+        self.description = description
+        self.func = func
+        self.params = params or {}
+        self.required = list(self.params) if required is None else required
+        self.direct = direct  # Output is already a user-facing answer
+        self.keywords = keywords  # Extra words users say for this tool; only the router sees them
+        self.sequential = sequential  # Drives the UI (focus, keyboard, mouse), so never runs alongside other calls
+
+    def schema(self) -> Dict:
+        return {
+            "type": "function",
+            "function": {
+                "name": self.name,
+                "description": self.description,
+                "parameters": {"type": "object", "properties": self.params, "required": self.required}
+            }
+        }
+
+    def routing_text(self) -> str:
+        params = " ".join(p.get("description", "") for p in self.params.values())
+        return f"{self.name} {self.description} {params} {self.keywords}"
+
+
+def _string(description: str) -> Dict:
+    return {"type": "string", "description": description}
+
+
+def _integer(description: str) -> Dict:
+    return {"type": "integer", "description": description}
+
+
+SYSTEM_PROMPT = """You are JARVIS, an advanced AI assistant. Provide direct, helpful responses.
+For simple questions, answer directly without tools.
+When a request needs several independent tools, call them all in the same turn.
+When tool results arrive, answer the user concisely from them."""
+
 from skills.weather import WeatherSkill
 from skills.web_search import WebSearchSkill
 from skills.utility import UtilitySkill
 from skills.file_manager import FileManagerSkill
-from skills.automation import AutomationSkill
 from skills.app_control import ApplicationControl
 from system_control import SystemControl
 
@@ -71,283 +167,445 @@ class AgentOrchestrator:
                  web_skill: WebSearchSkill,
                  utility_skill: UtilitySkill,
                  file_skill: FileManagerSkill,
-                 multi_brain=None):
-        # Initialize language model with Multi-Model Brain
+                 multi_brain=None,
+                 system_monitor=None,
+                 provider=None,
+                 app_control=None,
+                 automation_skill=None):
+        try:
+            settings = getattr(Config, "AGENT", {})
+        except Exception:
+            settings = {}
+        self.max_turns = settings.get("max_turns", 4)
+        self.tool_timeout = settings.get("tool_timeout_seconds", 60)
+        self.max_tool_output = settings.get("max_tool_output_chars", 4000)
+        self.route_tools = settings.get("route_tools", True)
+
+        # Plain completions (classification, fallback) keep going through the Multi-Model Brain
         self.llm = OpenRouterLLM(multi_brain=multi_brain)
         self._multi_brain = multi_brain
 
+        # Tool calling needs an OpenAI-compatible endpoint; without a key the agent answers without tools
+        if provider is None and Config.OPENROUTER_API_KEY:
+            provider = OpenRouterProvider(Config.OPENROUTER_API_KEY,
+                                          settings.get("model") or Config.OPENROUTER_MODEL,
+                                          Config.OPENROUTER_BASE_URL,
+                                          timeout=settings.get("timeout_seconds", 30),
+                                          max_tokens=settings.get("max_tokens", 800))
+        self.provider = provider
+        self._pool = ThreadPoolExecutor(max_workers=settings.get("parallel_tools", 4),
+                                        thread_name_prefix="jarvis-agent")
+        self.stats = {'tasks': 0, 'model_calls': 0, 'tool_calls': 0, 'full_tool_sets': 0}
+
         # Bind provided tool instances
         self.system_control = system_control
         self.weather_skill = weather_skill
         self.web_skill = web_skill
         self.utility_skill = utility_skill
         self.file_skill = file_skill
-        
-        # Initialize new advanced skills
-        self.automation_skill = AutomationSkill()
-        self.app_control = ApplicationControl()
+        self.system_monitor = system_monitor
+
+        # Initialize new advanced skills (desktop automation is Windows-only)
+        self.app_control = app_control or ApplicationControl()
+        self.automation_skill = automation_skill
+        if self.automation_skill is None:
+            try:
+                from skills.automation import AutomationSkill
+                self.automation_skill = AutomationSkill()
+            except Exception:
+                self.automation_skill = None
 
         # Define tools for the agent
         tools = [
             # System Control Tools
-            Tool(
+            AgentTool(
                 name="get_system_status",
-                func=lambda _: self.system_control.get_system_status(),
-                description="Get comprehensive system status including CPU, memory, disk, network info."
+                func=self.system_control.get_system_status,
+                description="Get comprehensive system status including CPU, memory, disk, network info.",
+                keywords="computer pc health overview doing"
             ),
-            Tool(
+            AgentTool(
                 name="get_running_processes",
-                func=lambda limit="10": self.system_control.get_running_processes(int(limit) if limit.isdigit() else 10),
-                description="List currently running processes sorted by CPU usage."
+                func=lambda limit=10: self.system_control.get_running_processes(int(limit)),
+                description="List currently running processes sorted by CPU usage.",
+                params={"limit": _integer("How many processes to list (default 10)")},
+                required=[],
+                keywords="tasks programs top"
             ),
-            Tool(
+            AgentTool(
                 name="get_disk_usage",
-                func=lambda _: self.system_control.get_disk_usage(),
-                description="Get disk usage information for all drives."
+                func=self.system_control.get_disk_usage,
+                description="Get disk usage information for all drives.",
+                keywords="space storage free drive"
             ),
-            Tool(
+            AgentTool(
                 name="kill_process",
                 func=self.system_control.kill_process,
-                description="Kill a process by name. Use with caution."
+                description="Kill a process by name. Use with caution.",
+                params={"process_name": _string("Process name, e.g. 'notepad.exe'")},
+                direct=True,
+                keywords="terminate force quit end task"
             ),
-            Tool(
+            AgentTool(
                 name="get_network_info",
-                func=lambda _: self.system_control.get_network_info(),
-                description="Get network interface information and IP addresses."
+                func=self.system_control.get_network_info,
+                description="Get network interface information and IP addresses.",
+                keywords="ip address wifi internet connection"
             ),
-            Tool(
+            AgentTool(
                 name="set_volume",
                 func=self.system_control.set_volume,
-                description="Set system volume (0-100). Windows only."
+                description="Set system volume (0-100). Windows only.",
+                params={"level": _integer("Volume level from 0 to 100")},
+                direct=True,
+                keywords="sound louder quieter mute turn"
             ),
-            Tool(
+            AgentTool(
                 name="take_screenshot",
-                func=lambda filename="": self.system_control.take_screenshot(filename if filename else None),
-                description="Take a full screenshot and save it."
-            ),
-            Tool(
+                func=lambda filename="": self.system_control.take_screenshot(filename or None),
+                description="Take a full screenshot and save it.",
+                params={"filename": _string("Optional file name for the screenshot")},
+                required=[],
+                direct=True,
+                keywords="capture screen"
+            ),
+            AgentTool(
                 name="get_battery_info",
-                func=lambda _: self.system_control.get_battery_info(),
-                description="Get battery information for laptops."
+                func=self.system_control.get_battery_info,
+                description="Get battery information for laptops.",
+                keywords="charge power laptop"
             ),
-            Tool(
+            AgentTool(
                 name="run_command",
                 func=self.system_control.run_command,
-                description="Run a system command and return output. Use carefully."
+                description="Run a system command and return output. Use carefully.",
+                params={"command": _string("Shell command to run")},
+                keywords="terminal shell execute cmd"
             ),
-            
+
             # Time and Date Tools
-            Tool(
+            AgentTool(
                 name="get_current_time",
-                func=lambda _: self._get_local_time(),
-                description="Get the current local time with timezone information."
+                func=self._get_local_time,
+                description="Get the current local time with timezone information.",
+                direct=True,
+                keywords="clock hour now"
             ),
-            Tool(
+            AgentTool(
                 name="get_current_date",
-                func=lambda _: self._get_local_date(),
-                description="Get the current local date."
+                func=self._get_local_date,
+                description="Get the current local date.",
+                direct=True,
+                keywords="today day month year"
             ),
-            
+
             # Application Control Tools
-            Tool(
+            AgentTool(
                 name="list_installed_apps",
                 func=self.app_control.list_installed_apps,
-                description="List installed applications, optionally filtered by name."
+                description="List installed applications, optionally filtered by name.",
+                params={"filter_text": _string("Only list apps whose name contains this text")},
+                required=[],
+                keywords="programs software browsers"
             ),
-            Tool(
+            AgentTool(
                 name="launch_app",
                 func=self.app_control.launch_app_by_name,
-                description="Launch an application by name."
+                description="Launch an application by name.",
+                params={"app_name": _string("Application name, e.g. 'chrome'")},
+                direct=True,
+                sequential=True,
+                keywords="open start program"
             ),
-            Tool(
+            AgentTool(
                 name="close_app",
                 func=self.app_control.close_app_by_name,
-                description="Close an application by name."
+                description="Close an application by name.",
+                params={"app_name": _string("Application name")},
+                direct=True,
+                sequential=True,
+                keywords="quit exit program"
             ),
-            Tool(
+            AgentTool(
                 name="get_app_info",
                 func=self.app_control.get_app_info,
-                description="Get detailed information about an installed application."
-            ),
-            
-            # Automation Tools
-            Tool(
-                name="move_mouse",
-                func=lambda coords: self.automation_skill.move_mouse(*map(int, coords.split(','))),
-                description="Move mouse to specific coordinates. Format: 'x,y'"
-            ),
-            Tool(
-                name="click_at",
-                func=lambda coords: self.automation_skill.click_at(*map(int, coords.split(','))),
-                description="Click at specific coordinates. Format: 'x,y'"
-            ),
-            Tool(
-                name="type_text",
-                func=self.automation_skill.type_text,
-                description="Type text on the keyboard."
+                description="Get detailed information about an installed application.",
+                params={"app_name": _string("Application name")}
             ),
-            Tool(
-                name="press_key",
-                func=self.automation_skill.press_key,
-                description="Press a specific key (e.g., 'enter', 'tab', 'ctrl')."
-            ),
-            Tool(
-                name="hotkey",
-                func=lambda keys: self.automation_skill.hotkey(*keys.split('+')),
-                description="Press multiple keys simultaneously. Format: 'ctrl+c' or 'alt+tab'"
-            ),
-            Tool(
-                name="get_mouse_position",
-                func=self.automation_skill.get_mouse_position,
-                description="Get current mouse position."
-            ),
-            Tool(
-                name="get_window_list",
-                func=self.automation_skill.get_window_list,
-                description="Get list of all open windows."
-            ),
-            Tool(
-                name="focus_window",
-                func=self.automation_skill.focus_window,
-                description="Focus on a specific window by title."
-            ),
-            Tool(
-                name="minimize_window",
-                func=self.automation_skill.minimize_window,
-                description="Minimize a specific window by title."
-            ),
-            Tool(
-                name="maximize_window",
-                func=self.automation_skill.maximize_window,
-                description="Maximize a specific window by title."
-            ),
-            Tool(
-                name="close_window",
-                func=self.automation_skill.close_window,
-                description="Close a specific window by title."
-            ),
-            
+
             # Weather Tool
-            Tool(
+            AgentTool(
                 name="get_weather",
                 func=self.weather_skill.get_weather,
-                description="Get current weather information."
+                description="Get current weather information.",
+                params={"query": _string("City or place; empty for the default location")},
+                required=[],
+                direct=True,
+                keywords="rain forecast temperature sunny snow cold hot"
             ),
-            
+
             # Web Search Tools
-            Tool(
+            AgentTool(
                 name="search_web",
-                func=lambda q: self.web_skill.search_web(q, open_browser=False),
-                description="Search the web for a query and return results."
+                func=lambda query: self.web_skill.search_web(query, open_browser=False),
+                description="Search the web for a query and return results.",
+                params={"query": _string("Search query")},
+                keywords="google online find look"
             ),
-            Tool(
+            AgentTool(
                 name="search_wikipedia",
                 func=self.web_skill.search_wikipedia,
-                description="Search Wikipedia for a topic."
+                description="Search Wikipedia for a topic.",
+                params={"query": _string("Topic to look up")}
             ),
-            Tool(
+            AgentTool(
                 name="get_news",
                 func=self.web_skill.get_news_headlines,
-                description="Get latest news headlines."
+                description="Get latest news headlines.",
+                params={"source": _string("News category, e.g. 'general', 'technology', 'sports'")},
+                required=[],
+                direct=True,
+                keywords="headlines today"
             ),
-            
+
             # Utility Tools
-            Tool(
+            AgentTool(
                 name="tell_joke",
                 func=self.utility_skill.tell_joke,
-                description="Tell a random joke."
+                description="Tell a random joke.",
+                direct=True,
+                keywords="funny laugh"
             ),
-            Tool(
+            AgentTool(
                 name="calculate",
                 func=self.utility_skill.calculate,
-                description="Calculate a mathematical expression."
+                description="Calculate a mathematical expression.",
+                params={"expression": _string("Expression such as '15 * (3 + 2)'")},
+                direct=True,
+                keywords="math percent plus minus times divided"
             ),
-            Tool(
+            AgentTool(
                 name="convert_units",
                 func=lambda query: self.utility_skill.convert_units_with_llm(query, self._multi_brain),
-                description="Convert between units using natural language. Examples: '2 tablespoons butter in grams', '5 km to miles', '100 fahrenheit to celsius'"
+                description="Convert between units using natural language. Examples: '2 tablespoons butter in grams', '5 km to miles', '100 fahrenheit to celsius'",
+                params={"query": _string("The conversion request")},
+                direct=True,
+                keywords="how many"
             ),
-            Tool(
+            AgentTool(
                 name="convert_cooking_measurement",
                 func=self.utility_skill.convert_cooking_measurement,
-                description="Convert cooking measurements like tablespoons, teaspoons, cups to grams. Works with natural language queries."
+                description="Convert cooking measurements like tablespoons, teaspoons, cups to grams. Works with natural language queries.",
+                params={"query": _string("The conversion request")},
+                direct=True
             ),
-            Tool(
+            AgentTool(
                 name="generate_password",
                 func=self.utility_skill.generate_password,
-                description="Generate a secure password."
+                description="Generate a secure password.",
+                params={"length": _integer("Password length (default 12)")},
+                required=[],
+                direct=True,
+                keywords="random secure"
             ),
-            Tool(
+            AgentTool(
                 name="flip_coin",
                 func=self.utility_skill.flip_coin,
-                description="Flip a coin."
+                description="Flip a coin.",
+                direct=True
             ),
-            Tool(
+            AgentTool(
                 name="roll_dice",
                 func=self.utility_skill.roll_dice,
-                description="Roll a dice."
+                description="Roll a dice.",
+                params={"sides": _integer("Sides per die (default 6)"), "count": _integer("Number of dice (default 1)")},
+                required=[],
+                direct=True
             ),
-            
+
             # File Management Tools
-            Tool(
+            AgentTool(
                 name="create_file",
                 func=self.file_skill.create_file_at_location,
-                description="Create a file with filename, content, and location (like 'desktop')."
-            ),
-            Tool(
+                description="Create a file with filename, content, and location (like 'desktop').",
+                params={"filename": _string("File name"), "content": _string("Text to write"),
+                        "location": _string("Folder or place such as 'desktop'; empty for the current folder")},
+                required=["filename"],
+                direct=True,
+                keywords="new write save"
+            ),
+            AgentTool(
                 name="read_file",
                 func=self.file_skill.read_file,
-                description="Read the contents of a file."
+                description="Read the contents of a file.",
+                params={"filename": _string("File name or path")},
+                keywords="open show contents"
             ),
-            Tool(
+            AgentTool(
                 name="delete_file",
                 func=self.file_skill.delete_file,
-                description="Delete a specified file."
+                description="Delete a specified file.",
+                params={"filename": _string("File name or path")},
+                direct=True,
+                keywords="remove erase"
             ),
-            Tool(
+            AgentTool(
                 name="list_files",
                 func=self.file_skill.list_files,
-                description="List files in current directory."
+                description="List files in current directory.",
+                params={"directory": _string("Folder to list; empty for the current one")},
+                required=[],
+                keywords="show folder directory"
             ),
-            Tool(
+            AgentTool(
                 name="create_folder",
                 func=self.file_skill.create_folder,
-                description="Create a new folder."
+                description="Create a new folder.",
+                params={"foldername": _string("Folder name")},
+                direct=True,
+                keywords="new make directory"
             ),
-            Tool(
+            AgentTool(
                 name="rename_file",
                 func=self.file_skill.rename_file,
-                description="Rename a file or folder."
+                description="Rename a file or folder.",
+                params={"old_name": _string("Current name"), "new_name": _string("New name")},
+                direct=True,
+                keywords="move"
             )
         ]
 
-        # Initialize the agent with zero-shot react style
-        self.agent = initialize_agent(
-            tools,
-            self.llm,
-            agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
-            verbose=False,  # Reduce verbose output
-            max_iterations=5,  # Reduce iterations to prevent loops
-            handle_parsing_errors=True,
-            early_stopping_method="generate",  # Stop early if reasonable
-            agent_kwargs={
-                "prefix": """You are JARVIS, an advanced AI assistant. Provide direct, helpful responses.
-For simple questions, give direct answers without using tools.
-For complex tasks requiring tools, use them efficiently.
-Always provide a final answer to the user's question.""",
-                "format_instructions": """To use a tool, use the following format:
-
-Thought: Do I need to use a tool? Let me think about this step by step.
-Action: the action to take, should be one of [{tool_names}]
-Action Input: the input to the action
-Observation: the result of the action
-... (this Thought/Action/Action Input/Observation can repeat N times)
-Thought: I now know the final answer
-Final Answer: the final answer to the original input question
-
-If you cannot use tools or get an error, provide a direct response to help the user."""
-            }
-        )
+        # Automation Tools
+        if self.automation_skill is not None:
+            window = {"window_title": _string("Window title (or part of it)")}
+            point = {"x": _integer("Screen x coordinate"), "y": _integer("Screen y coordinate")}
+            tools.extend([
+                AgentTool(
+                    name="move_mouse",
+                    func=lambda x, y: self.automation_skill.move_mouse(int(x), int(y)),
+                    description="Move mouse to specific screen coordinates.",
+                    params=point,
+                    direct=True,
+                    sequential=True
+                ),
+                AgentTool(
+                    name="click_at",
+                    func=lambda x, y: self.automation_skill.click_at(int(x), int(y)),
+                    description="Click at specific screen coordinates.",
+                    params=point,
+                    direct=True,
+                    sequential=True
+                ),
+                AgentTool(
+                    name="type_text",
+                    func=self.automation_skill.type_text,
+                    description="Type text on the keyboard.",
+                    params={"text": _string("Text to type")},
+                    direct=True,
+                    sequential=True
+                ),
+                AgentTool(
+                    name="press_key",
+                    func=self.automation_skill.press_key,
+                    description="Press a specific key (e.g., 'enter', 'tab', 'ctrl').",
+                    params={"key": _string("Key name")},
+                    direct=True,
+                    sequential=True
+                ),
+                AgentTool(
+                    name="hotkey",
+                    func=lambda keys: self.automation_skill.hotkey(*keys),
+                    description="Press multiple keys simultaneously, e.g. ['ctrl', 'c'] or ['alt', 'tab'].",
+                    params={"keys": {"type": "array", "items": {"type": "string"}, "description": "Keys in press order"}},
+                    direct=True,
+                    sequential=True
+                ),
+                AgentTool(
+                    name="get_mouse_position",
+                    func=self.automation_skill.get_mouse_position,
+                    description="Get current mouse position."
+                ),
+                AgentTool(
+                    name="get_window_list",
+                    func=self.automation_skill.get_window_list,
+                    description="Get list of all open windows."
+                ),
+                AgentTool(
+                    name="focus_window",
+                    func=self.automation_skill.focus_window,
+                    description="Focus on a specific window by title.",
+                    params=window,
+                    direct=True,
+                    sequential=True
+                ),
+                AgentTool(
+                    name="minimize_window",
+                    func=self.automation_skill.minimize_window,
+                    description="Minimize a specific window by title.",
+                    params=window,
+                    direct=True,
+                    sequential=True
+                ),
+                AgentTool(
+                    name="maximize_window",
+                    func=self.automation_skill.maximize_window,
+                    description="Maximize a specific window by title.",
+                    params=window,
+                    direct=True,
+                    sequential=True
+                ),
+                AgentTool(
+                    name="close_window",
+                    func=self.automation_skill.close_window,
+                    description="Close a specific window by title.",
+                    params=window,
+                    direct=True,
+                    sequential=True
+                ),
+            ])
+
+        # Performance monitoring runs as a background job; tools return immediately with a job ID
+        if self.system_monitor is not None:
+            job = {"job_id": _string("Job ID; empty for the latest job")}
+            tools.extend([
+                AgentTool(
+                    name="start_performance_monitoring",
+                    func=lambda minutes=5: self.system_monitor.monitor_performance(float(minutes)),
+                    description="Start monitoring CPU/memory/disk/network in the background for N minutes. Returns a job ID immediately.",
+                    params={"minutes": {"type": "number", "description": "Duration in minutes (default 5)"}},
+                    required=[],
+                    direct=True
+                ),
+                AgentTool(
+                    name="get_monitoring_status",
+                    func=lambda job_id="": self.system_monitor.get_monitoring_status(job_id.strip() or None),
+                    description="Get progress or the final report of a performance monitoring job.",
+                    params=job,
+                    required=[]
+                ),
+                AgentTool(
+                    name="cancel_performance_monitoring",
+                    func=lambda job_id="": self.system_monitor.cancel_monitoring(job_id.strip() or None),
+                    description="Stop a running performance monitoring job.",
+                    params=job,
+                    required=[],
+                    direct=True
+                ),
+                AgentTool(
+                    name="get_performance_history",
+                    func=self.system_monitor.get_metric_history,
+                    description="Recorded CPU/memory/disk/network statistics for a time range, e.g. 'average CPU yesterday afternoon' or 'memory last 2 hours'.",
+                    params={"query": _string("Statistic and time range in plain words")}
+                ),
+            ])
+
+        self.tools: Dict[str, AgentTool] = {tool.name: tool for tool in tools}
+        self._schemas = [tool.schema() for tool in tools]
+        self._schema_by_name = {tool.name: schema for tool, schema in zip(tools, self._schemas)}
+        # Only the tools relevant to a query go into its prompt
+        self.router = ToolRouter({tool.name: tool.routing_text() for tool in tools},
+                                 k=settings.get("router_top_k", 6),
+                                 min_score=settings.get("router_min_score", 1.5))
 
     def _get_local_time(self) -> str:
         """Get current local time with timezone"""
@@ -355,78 +613,132 @@ If you cannot use tools or get an error, provide a direct response to help the u
             import pytz
             from datetime import datetime
             import time
-            
+
             # Try to get local timezone
             try:
                 local_tz = pytz.timezone(time.tzname[0])
             except:
                 # Fallback to IST if timezone detection fails
                 local_tz = pytz.timezone('Asia/Kolkata')
-            
+
             now = datetime.now(local_tz)
             time_str = now.strftime("%I:%M %p")
             timezone_name = now.strftime("%Z")
-            
+
             return f"The current time is {time_str} {timezone_name}"
         except ImportError:
             from datetime import datetime
             time_str = datetime.now().strftime("%I:%M %p")
             return f"The current time is {time_str} (local time)"
-    
+
     def _get_local_date(self) -> str:
         """Get current local date"""
         try:
             import pytz
             from datetime import datetime
             import time
-            
+
             # Try to get local timezone
             try:
                 local_tz = pytz.timezone(time.tzname[0])
             except:
                 # Fallback to IST
                 local_tz = pytz.timezone('Asia/Kolkata')
-            
+
             now = datetime.now(local_tz)
             return f"Today is {now.strftime('%A, %B %d, %Y')}"
         except ImportError:
             from datetime import datetime
             return f"Today is {datetime.now().strftime('%A, %B %d, %Y')}"
-    
+
+    def _tool_schemas(self, query: str) -> List[Dict]:
+        """Tool definitions sent with a query: the router's top-k, or all of them when it is unsure"""
+        selected = self.router.select(query) if self.route_tools else None
+        if selected is None:
+            self.stats['full_tool_sets'] += 1
+            return self._schemas
+        return [self._schema_by_name[name] for name in selected]
+
+    def _invoke(self, call: Dict) -> Dict:
+        """Run one tool call; failures become the tool's output so the model can correct itself"""
+        function = call.get("function", {})
+        name = function.get("name", "")
+        tool = self.tools.get(name)
+        result = {"id": call.get("id", ""), "name": name, "direct": False}
+        if tool is None:
+            result["output"] = f"Error: unknown tool '{name}'"
+            return result
+        try:
+            arguments = json.loads(function.get("arguments") or "{}")
+            if not isinstance(arguments, dict):
+                raise ValueError("arguments must be a JSON object")
+        except ValueError as e:
+            result["output"] = f"Error: invalid arguments for {name}: {e}"
+            return result
+        try:
+            output = tool.func(**arguments)
+            result["output"] = str(output) if output is not None else "Done."
+            result["direct"] = tool.direct
+        except Exception as e:
+            result["output"] = f"Error: {name} failed: {e}"
+        return result
+
+    def _invoke_all(self, calls: List[Dict]) -> List[Dict]:
+        """Independent tool calls run concurrently; UI tools then run one at a time in call order.
+
+        Results keep the order of the calls, and every call (a single one included) is bounded by tool_timeout.
+        """
+        parallel, sequential = [], []
+        for index, call in enumerate(calls):
+            tool = self.tools.get(call.get("function", {}).get("name", ""))
+            (sequential if tool is not None and tool.sequential else parallel).append(index)
+        results: List[Optional[Dict]] = [None] * len(calls)
+        futures = {index: self._pool.submit(self._invoke, calls[index]) for index in parallel}
+        for index in parallel:
+            results[index] = self._await(calls[index], futures[index])
+        for index in sequential:
+            results[index] = self._await(calls[index], self._pool.submit(self._invoke, calls[index]))
+        return results
+
+    def _await(self, call: Dict, future) -> Dict:
+        try:
+            return future.result(timeout=self.tool_timeout)
+        except ToolTimeout:
+            name = call.get("function", {}).get("name", "")
+            return {"id": call.get("id", ""), "name": name, "direct": False,
+                    "output": f"Error: {name} timed out after {self.tool_timeout}s"}
+
     def run(self, query: str) -> str:
         """Run the agent on a query and return the response."""
+        self.stats['tasks'] += 1
+        if self.provider is None:
+            return self.llm._call(query)
+
+        messages = [{"role": "system", "content": SYSTEM_PROMPT}, {"role": "user", "content": query}]
+        tools = self._tool_schemas(query)
         try:
-            # First check if this is a unit conversion query and use LLM
-            conversion_keywords = ['tablespoon', 'teaspoon', 'cup', 'gram', 'ounce', 'pound', 'celsius', 'fahrenheit', 'meter', 'feet', 'inch', 'mile', 'kilometer']
-            if any(keyword in query.lower() for keyword in conversion_keywords) and any(num_word in query for num_word in ['0','1','2','3','4','5','6','7','8','9']):
-                llm_result = self.utility_skill.convert_units_with_llm(query, self._multi_brain)
-                if llm_result and "Error" not in llm_result:
-                    return llm_result
-            
-            # Otherwise, use the agent
-            result = self.agent.run(query)
-            return result
+            for turn in range(self.max_turns):
+                # The last turn must produce an answer rather than more tool calls
+                choice = "none" if turn == self.max_turns - 1 else "auto"
+                self.stats['model_calls'] += 1
+                message = self.provider.complete(messages, tools, tool_choice=choice)
+                calls = message.get("tool_calls") or []
+                if not calls or choice == "none":
+                    return (message.get("content") or "").strip() or "Task completed."
+
+                messages.append({"role": "assistant", "content": message.get("content"), "tool_calls": calls})
+                self.stats['tool_calls'] += len(calls)
+                results = self._invoke_all(calls)
+
+                # Outputs of action/answer tools go straight back to the user
+                if all(result["direct"] for result in results):
+                    return "\n".join(result["output"] for result in results)
+                for result in results:
+                    messages.append({"role": "tool", "tool_call_id": result["id"], "name": result["name"],
+                                     "content": result["output"][:self.max_tool_output]})
+        except requests.exceptions.Timeout:
+            return "The request took too long to process. Please try a simpler version of your request."
         except Exception as e:
-            error_msg = str(e).lower()
-            # Check for parsing errors and provide helpful responses
-            if "parsing" in error_msg or "format" in error_msg:
-                # Try LLM conversion as fallback
-                llm_result = self.utility_skill.convert_units_with_llm(query, self._multi_brain)
-                if llm_result and "Error" not in llm_result:
-                    return llm_result
-                # Try cooking conversion as final fallback
-                cooking_result = self.utility_skill.convert_cooking_measurement(query)
-                if cooking_result:
-                    return cooking_result
-                return f"I understand you want help with: {query}. Let me provide a direct response instead of using complex tools."
-            elif "timeout" in error_msg:
-                return "The request took too long to process. Please try a simpler version of your request."
-            else:
-                # Try LLM conversion as fallback for any error
-                llm_result = self.utility_skill.convert_units_with_llm(query, self._multi_brain)
-                if llm_result and "Error" not in llm_result:
-                    return llm_result
-                cooking_result = self.utility_skill.convert_cooking_measurement(query)
-                if cooking_result:
-                    return cooking_result
-                return f"I encountered an issue processing your request: {query}. Please try rephrasing your question."
+            print(f"Agent error: {e}")
+            return self.llm._call(query)
+        return "Task completed."
@@ -0,0 +1,290 @@
+"""
+Streaming Anomaly Detection for JARVIS
+EWMA baselines, rolling z-scores and a memory-growth slope test over the metric stream, with deduplicated alerts
+"""
+
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+SEVERITY_RANK = {'info': 0, 'warning': 1, 'critical': 2}
+
+
+class Alert:
+    """One detected condition; key identifies it for deduplication"""
+
+    __slots__ = ('series', 'kind', 'severity', 'value', 'baseline', 'score', 'message', 'timestamp')
+
+    def __init__(self, series: str, kind: str, severity: str, value: float, baseline: float, score: float,
+                 message: str, timestamp: float):
+        self.series = series
+        self.kind = kind
+        self.severity = severity
+        self.value = value
+        self.baseline = baseline
+        self.score = score
+        self.message = message
+        self.timestamp = timestamp
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        return self.series, self.kind
+
+    def to_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return f"Alert({self.severity} {self.kind} {self.series}: {self.message})"
+
+
+class AnomalyDetector:
+    def __init__(self, series: Sequence[str], alpha: float = 0.05, window: int = 120, z_threshold: float = 4.0,
+                 sustain: int = 5, warmup: int = 30, thresholds: Optional[Dict[str, Tuple[float, float]]] = None,
+                 leak_series: Sequence[str] = ('memory_percent',), leak_window: int = 600,
+                 leak_min_rise: float = 5.0, leak_every: int = 10, cooldown: float = 600.0,
+                 labels: Optional[Dict[str, str]] = None):
+        """Online detector over a fixed set of series, updated with one vector of values per sample.
+
+        - threshold: the EWMA (not the raw sample) crosses a warning/critical level, so short spikes pass
+        - anomaly: |rolling z-score| above z_threshold for `sustain` consecutive samples
+        - leak: a leak series rose by at least leak_min_rise over leak_window samples, near-monotonically
+        Alerts are deduplicated per (series, kind): repeated only after cooldown seconds or on escalation.
+        """
+        self.series = list(series)
+        self.index = {name: i for i, name in enumerate(self.series)}
+        self.labels = labels or {}
+        n = len(self.series)
+        self.alpha = alpha
+        self.window = window
+        self.z_threshold = z_threshold
+        self.sustain = sustain
+        self.warmup = max(warmup, 2)
+        self.cooldown = cooldown
+
+        self.count = 0
+        self.ewma = np.zeros(n)
+        self.ewm_var = np.zeros(n)
+        self._ring = np.zeros((window, n))
+        self._sum = np.zeros(n)
+        self._sumsq = np.zeros(n)
+        self._streak = np.zeros(n, dtype=np.int64)
+        self.last_z = np.zeros(n)
+
+        thresholds = thresholds or {}
+        self._threshold_rows = np.array([self.index[s] for s in thresholds if s in self.index], dtype=np.int64)
+        self._warning = np.array([thresholds[s][0] for s in thresholds if s in self.index], dtype=np.float64)
+        self._critical = np.array([thresholds[s][1] for s in thresholds if s in self.index], dtype=np.float64)
+
+        self._leak_rows = np.array([self.index[s] for s in leak_series if s in self.index], dtype=np.int64)
+        self.leak_window = leak_window
+        self.leak_min_rise = leak_min_rise
+        self.leak_every = leak_every
+        self._leak_ring = np.zeros((leak_window, len(self._leak_rows)))
+
+        self._active: Dict[Tuple[str, str], Alert] = {}
+        self._last_emitted: Dict[Tuple[str, str], Tuple[float, int]] = {}
+        self._subscribers: List[Callable[[Alert], None]] = []
+        self.events: "queue.Queue[Alert]" = queue.Queue(maxsize=1000)
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------ events
+
+    def subscribe(self, callback: Callable[[Alert], None]) -> Callable[[], None]:
+        """Call callback(alert) for every emitted alert; returns a function that unsubscribes"""
+        self._subscribers.append(callback)
+        return lambda: self._subscribers.remove(callback) if callback in self._subscribers else None
+
+    def get_alert(self, timeout: Optional[float] = None) -> Optional[Alert]:
+        """Next alert from the event queue, for consumers that poll instead of subscribing"""
+        try:
+            return self.events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def active_alerts(self) -> List[Alert]:
+        """Conditions that are currently true, most severe first"""
+        with self._lock:
+            alerts = list(self._active.values())
+        return sorted(alerts, key=lambda a: -SEVERITY_RANK[a.severity])
+
+    def baseline(self, series: str) -> float:
+        return float(self.ewma[self.index[series]])
+
+    # ------------------------------------------------------------------ updates
+
+    def update_sample(self, sample: Dict) -> List[Alert]:
+        """MetricsCollector listener; per-core CPU fills series named core_0, core_1, ..."""
+        values = np.fromiter((sample.get(name, 0.0) for name in self.series), dtype=np.float64, count=len(self.series))
+        per_core = sample.get('per_core') or ()
+        for core, value in enumerate(per_core):
+            row = self.index.get(f'core_{core}')
+            if row is not None:
+                values[row] = value
+        return self.update(values, sample.get('timestamp'))
+
+    def update(self, values, timestamp: Optional[float] = None) -> List[Alert]:
+        """Fold one vector of values (one per series) into the model; returns newly emitted alerts"""
+        x = np.asarray(values, dtype=np.float64)
+        now = time.time() if timestamp is None else timestamp
+        with self._lock:
+            slot = self.count % self.window
+            filled = min(self.count, self.window)
+
+            # Rolling z-score against the previous window (the current value is not part of its own baseline)
+            baseline_x = x
+            if filled >= 2:
+                mean = self._sum / filled
+                var = np.maximum(self._sumsq / filled - mean * mean, 0.0)
+                # Floor the spread so perfectly flat series do not turn tiny blips into huge scores
+                std = np.sqrt(var) + 1e-3 * (np.abs(mean) + 1.0)
+                self.last_z = (x - mean) / std
+                # Winsorize what enters the window so a level shift is not absorbed before it can be confirmed
+                limit = self.z_threshold * std
+                baseline_x = np.clip(x, mean - limit, mean + limit)
+            if self.count >= self.window:
+                old = self._ring[slot]
+                self._sum -= old
+                self._sumsq -= old * old
+            self._ring[slot] = baseline_x
+            self._sum += baseline_x
+            self._sumsq += baseline_x * baseline_x
+            if slot == self.window - 1:
+                # Re-sum once per window so incremental updates never drift
+                self._sum = self._ring.sum(axis=0)
+                self._sumsq = (self._ring * self._ring).sum(axis=0)
+
+            # EWMA baseline and variance
+            if self.count == 0:
+                self.ewma[:] = x
+            else:
+                diff = x - self.ewma
+                self.ewma += self.alpha * diff
+                self.ewm_var = (1 - self.alpha) * (self.ewm_var + self.alpha * diff * diff)
+
+            if len(self._leak_rows):
+                self._leak_ring[self.count % self.leak_window] = x[self._leak_rows]
+            self.count += 1
+
+            if self.count < self.warmup:
+                return []
+            anomalous = np.abs(self.last_z) > self.z_threshold
+            self._streak = np.where(anomalous, self._streak + 1, 0)
+
+            found: Dict[Tuple[str, str], Alert] = {}
+            self._check_anomalies(x, now, found)
+            self._check_thresholds(x, now, found)
+            if len(self._leak_rows) and self.count % self.leak_every == 0:
+                self._check_leaks(now, found)
+            else:
+                # The slope test runs every leak_every samples; keep its verdict in between
+                found.update({key: alert for key, alert in self._active.items() if key[1] == 'leak'})
+            return self._reconcile(found, now)
+
+    def _label(self, series: str) -> str:
+        return self.labels.get(series, series.replace('_', ' '))
+
+    def _check_anomalies(self, x: np.ndarray, now: float, found: Dict):
+        for row in np.flatnonzero(self._streak >= self.sustain):
+            name = self.series[row]
+            z = float(self.last_z[row])
+            direction = "above" if z > 0 else "below"
+            severity = 'critical' if abs(z) > 2 * self.z_threshold else 'warning'
+            alert = Alert(name, 'anomaly', severity, float(x[row]), float(self.ewma[row]), z,
+                          f"{self._label(name)} is unusually {direction} normal "
+                          f"({x[row]:.1f} vs baseline {self.ewma[row]:.1f}, z={z:.1f})", now)
+            found[alert.key] = alert
+
+    def _check_thresholds(self, x: np.ndarray, now: float, found: Dict):
+        if not len(self._threshold_rows):
+            return
+        smoothed = self.ewma[self._threshold_rows]
+        for i in np.flatnonzero(smoothed > self._warning):
+            row = self._threshold_rows[i]
+            name = self.series[row]
+            critical = smoothed[i] > self._critical[i]
+            level = self._critical[i] if critical else self._warning[i]
+            alert = Alert(name, 'threshold', 'critical' if critical else 'warning', float(x[row]),
+                          float(smoothed[i]), float(smoothed[i] - level),
+                          f"{self._label(name)} has stayed high (average {smoothed[i]:.1f}, limit {level:g})", now)
+            found[alert.key] = alert
+
+    def _check_leaks(self, now: float, found: Dict):
+        """Least-squares slope over the leak window plus a monotonicity check on segment means"""
+        if self.count < self.leak_window:
+            return
+        start = self.count % self.leak_window
+        ordered = np.roll(self._leak_ring, -start, axis=0)
+        t = np.arange(self.leak_window, dtype=np.float64)
+        t -= t.mean()
+        slopes = (t @ (ordered - ordered.mean(axis=0))) / (t @ t)
+        rise = slopes * (self.leak_window - 1)
+
+        segments = ordered[: self.leak_window // 10 * 10].reshape(10, -1, ordered.shape[1]).mean(axis=1)
+        monotonic = (np.diff(segments, axis=0) > 0).sum(axis=0) >= 8
+        for i in np.flatnonzero((rise >= self.leak_min_rise) & monotonic):
+            name = self.series[self._leak_rows[i]]
+            alert = Alert(name, 'leak', 'warning', float(ordered[-1, i]), float(ordered[0, i]), float(rise[i]),
+                          f"{self._label(name)} has been climbing steadily "
+                          f"(+{rise[i]:.1f} over the last {self.leak_window} samples) - possible memory leak", now)
+            found[alert.key] = alert
+
+    def _reconcile(self, found: Dict[Tuple[str, str], Alert], now: float) -> List[Alert]:
+        """Update active conditions and emit only new, escalated or cooled-down alerts"""
+        emitted = []
+        for key, alert in found.items():
+            rank = SEVERITY_RANK[alert.severity]
+            last = self._last_emitted.get(key)
+            if last is None or rank > last[1] or now - last[0] >= self.cooldown:
+                self._last_emitted[key] = (now, rank)
+                emitted.append(alert)
+        self._active = found
+
+        for alert in emitted:
+            try:
+                self.events.put_nowait(alert)
+            except queue.Full:
+                # Consumers that never poll must not block detection
+                self.events.get_nowait()
+                self.events.put_nowait(alert)
+            for callback in list(self._subscribers):
+                try:
+                    callback(alert)
+                except Exception:
+                    pass
+        return emitted
+
+
+_detector: Optional[AnomalyDetector] = None
+_detector_lock = threading.Lock()
+
+
+def get_anomaly_detector() -> AnomalyDetector:
+    """Shared detector attached to the shared metrics collector"""
+    global _detector
+    with _detector_lock:
+        if _detector is None:
+            from config import Config
+            from metrics_collector import FIELDS, get_collector
+            settings = getattr(Config, "ANOMALY_DETECTION", {})
+            collector = get_collector()
+            interval = collector.interval or 1.0
+            series = list(FIELDS) + [f'core_{core}' for core in range(collector.cores)]
+            _detector = AnomalyDetector(
+                series,
+                z_threshold=settings.get("z_threshold", 4.0),
+                sustain=max(1, int(settings.get("sustain_seconds", 10) / interval)),
+                window=max(10, int(settings.get("window_seconds", 120) / interval)),
+                thresholds=settings.get("thresholds", {}),
+                leak_window=max(20, int(settings.get("leak_window_minutes", 10) * 60 / interval)),
+                leak_min_rise=settings.get("leak_min_rise_percent", 5.0),
+                cooldown=settings.get("cooldown_seconds", 600),
+                labels={'cpu_percent': "CPU usage", 'memory_percent': "Memory usage", 'swap_percent': "Swap usage",
+                        'disk_read_bps': "Disk reads", 'disk_write_bps': "Disk writes",
+                        'net_sent_bps': "Network upload", 'net_recv_bps': "Network download"},
+            )
+            if settings.get("enabled", True):
+                collector.add_listener(_detector.update_sample)
+        return _detector
@@ -0,0 +1,388 @@
+"""
+Audio Capture Pipeline for JARVIS
+A persistent capture thread writes PCM into a ring buffer and a frame-level VAD emits utterances
+"""
+
+import queue
+import threading
+import time
+import wave
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Union
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+FRAME_MS = 20
+
+
+class MicrophoneSource:
+    def __init__(self, device_index: Optional[int] = None, sample_rate: int = SAMPLE_RATE, frame_ms: int = FRAME_MS):
+        """Read 16-bit mono frames from a PyAudio input device"""
+        self.device_index = device_index
+        self.sample_rate = sample_rate
+        self.frame_length = sample_rate * frame_ms // 1000
+        self._audio = None
+        self._stream = None
+
+    def open(self):
+        import pyaudio
+        self._audio = pyaudio.PyAudio()
+        self._stream = self._audio.open(
+            format=pyaudio.paInt16,
+            channels=1,
+            rate=self.sample_rate,
+            input=True,
+            input_device_index=self.device_index,
+            frames_per_buffer=self.frame_length
+        )
+
+    def read_frame(self) -> Optional[np.ndarray]:
+        data = self._stream.read(self.frame_length, exception_on_overflow=False)
+        return np.frombuffer(data, dtype=np.int16)
+
+    def close(self):
+        try:
+            if self._stream is not None:
+                self._stream.stop_stream()
+                self._stream.close()
+        finally:
+            if self._audio is not None:
+                self._audio.terminate()
+            self._stream = None
+            self._audio = None
+
+
+class WavFileSource:
+    def __init__(self, paths: Union[str, Path, Iterable[Union[str, Path]]], frame_ms: int = FRAME_MS,
+                 realtime: bool = False, trailing_silence: float = 1.0):
+        """Feed one or more 16-bit mono WAV files to the pipeline in place of a microphone.
+
+        With realtime=True frames are paced at the speed a microphone would deliver them.
+        """
+        if isinstance(paths, (str, Path)):
+            paths = [paths]
+        self.paths = [Path(p) for p in paths]
+        self.frame_ms = frame_ms
+        self.realtime = realtime
+        self.trailing_silence = trailing_silence
+        self.sample_rate = SAMPLE_RATE
+        self.frame_length = 0
+        self._samples = None
+        self._position = 0
+
+    def open(self):
+        chunks = []
+        for path in self.paths:
+            with wave.open(str(path), 'rb') as wav:
+                if wav.getsampwidth() != 2 or wav.getnchannels() != 1:
+                    raise ValueError(f"{path}: expected 16-bit mono PCM")
+                self.sample_rate = wav.getframerate()
+                chunks.append(np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16))
+        # Trailing silence lets the endpointer close the last utterance
+        chunks.append(np.zeros(int(self.sample_rate * self.trailing_silence), dtype=np.int16))
+        self._samples = np.concatenate(chunks)
+        self.frame_length = self.sample_rate * self.frame_ms // 1000
+        self._position = 0
+
+    def read_frame(self) -> Optional[np.ndarray]:
+        if self._position + self.frame_length > len(self._samples):
+            return None
+        frame = self._samples[self._position:self._position + self.frame_length]
+        self._position += self.frame_length
+        if self.realtime:
+            time.sleep(self.frame_ms / 1000)
+        return frame
+
+    def close(self):
+        self._samples = None
+
+
+class RingBuffer:
+    def __init__(self, capacity: int):
+        """Preallocated int16 sample ring addressed by absolute sample position"""
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype=np.int16)
+        self._lock = threading.Lock()
+        self.total_written = 0
+
+    def write(self, samples: np.ndarray):
+        with self._lock:
+            count = len(samples)
+            if count >= self.capacity:
+                samples = samples[-self.capacity:]
+                self.total_written += count - self.capacity
+                count = self.capacity
+            start = self.total_written % self.capacity
+            first = min(count, self.capacity - start)
+            self._data[start:start + first] = samples[:first]
+            if first < count:
+                self._data[:count - first] = samples[first:]
+            self.total_written += count
+
+    def read(self, start: int, end: int) -> np.ndarray:
+        """Copy samples [start, end) by absolute position; the oldest available sample bounds start"""
+        with self._lock:
+            start = max(start, self.total_written - self.capacity, 0)
+            end = min(end, self.total_written)
+            if end <= start:
+                return np.zeros(0, dtype=np.int16)
+            indices = np.arange(start, end) % self.capacity
+            return self._data[indices]
+
+    def latest(self, count: int) -> np.ndarray:
+        total = self.total_written
+        return self.read(total - count, total)
+
+
+class Utterance:
+    """A speech segment cut from the capture stream, including pre-roll before the detected onset"""
+
+    def __init__(self, pcm: np.ndarray, sample_rate: int, started_at: float, ended_at: float, truncated: bool = False,
+                 start_position: int = 0, end_position: int = 0, during_playback: bool = False):
+        self.pcm = pcm
+        self.sample_rate = sample_rate
+        self.started_at = started_at
+        self.ended_at = ended_at
+        self.truncated = truncated
+        # Absolute sample positions in the capture stream, shared with 'speech_end' events
+        self.start_position = start_position
+        self.end_position = end_position
+        # Started while JARVIS was talking, i.e. the user barged in
+        self.during_playback = during_playback
+
+    @property
+    def duration(self) -> float:
+        return len(self.pcm) / self.sample_rate
+
+    def to_bytes(self) -> bytes:
+        return self.pcm.tobytes()
+
+    def to_audio_data(self):
+        """Wrap as speech_recognition.AudioData for the recognizers"""
+        import speech_recognition as sr
+        return sr.AudioData(self.to_bytes(), self.sample_rate, 2)
+
+
+class AudioCapture:
+    def __init__(self, source, buffer_seconds: float = 30.0, pre_roll_ms: int = 300, hangover_ms: int = 500,
+                 onset_ms: int = 60, min_speech_ms: int = 150, max_utterance_seconds: float = 15.0,
+                 noise_ratio: float = 3.0, min_rms: float = 150.0, calibration_ms: int = 300,
+                 suppress: Optional[Callable[[], bool]] = None, playback: Optional[Callable[[], bool]] = None,
+                 playback_ratio: float = 3.0):
+        """Initialize the pipeline over a frame source (MicrophoneSource or WavFileSource).
+
+        suppress, when given, is polled per frame; while it returns True no new utterance is started.
+        playback is polled the same way and reports that JARVIS is talking: speech is still detected
+        (for barge-in) but must be playback_ratio times louder than usual to rise above the echo.
+        """
+        self.source = source
+        self.buffer_seconds = buffer_seconds
+        self.pre_roll_ms = pre_roll_ms
+        self.hangover_ms = hangover_ms
+        self.onset_ms = onset_ms
+        self.min_speech_ms = min_speech_ms
+        self.max_utterance_seconds = max_utterance_seconds
+        self.noise_ratio = noise_ratio
+        self.min_rms = min_rms
+        self.calibration_ms = calibration_ms
+        self.suppress = suppress
+        self.playback = playback
+        self.playback_ratio = playback_ratio
+
+        self.utterances: "queue.Queue[Utterance]" = queue.Queue(maxsize=32)
+        self.ring: Optional[RingBuffer] = None
+        self.noise_floor = min_rms / noise_ratio
+        self.in_speech = False
+        self._onset_during_playback = False
+
+        self._listeners: List[Callable] = []
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._finished = threading.Event()
+        self.error: Optional[Exception] = None
+        self.stats = {'frames': 0, 'utterances': 0, 'dropped': 0, 'discarded_short': 0}
+
+    @property
+    def sample_rate(self) -> int:
+        return self.source.sample_rate
+
+    @property
+    def is_running(self) -> bool:
+        return self._running and self._thread is not None and self._thread.is_alive()
+
+    @property
+    def threshold(self) -> float:
+        return max(self.min_rms, self.noise_floor * self.noise_ratio)
+
+    def add_listener(self, callback: Callable[[str, dict], None]):
+        """Subscribe to 'speech_start' / 'speech_audio' / 'speech_end' events (called on the capture thread)"""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def start(self):
+        """Open the source and start the capture thread"""
+        if self.is_running:
+            return
+        self.source.open()
+        self.ring = RingBuffer(int(self.source.sample_rate * self.buffer_seconds))
+        self._running = True
+        self._finished.clear()
+        self._thread = threading.Thread(target=self._run, name="jarvis-capture", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        self._running = False
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def wait_until_finished(self, timeout: Optional[float] = None) -> bool:
+        """Block until the source is exhausted (WAV sources) or capture stops"""
+        return self._finished.wait(timeout)
+
+    def get_utterance(self, timeout: Optional[float] = None, max_age: Optional[float] = None) -> Optional[Utterance]:
+        """Next complete utterance, or None on timeout; utterances that ended more than max_age seconds ago are skipped"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                utterance = self.utterances.get(timeout=remaining)
+            except queue.Empty:
+                return None
+            if max_age is None or time.monotonic() - utterance.ended_at <= max_age:
+                return utterance
+
+    def clear(self) -> int:
+        """Drop queued utterances"""
+        dropped = 0
+        while True:
+            try:
+                self.utterances.get_nowait()
+                dropped += 1
+            except queue.Empty:
+                return dropped
+
+    def _emit(self, event: str, info: dict):
+        for callback in list(self._listeners):
+            try:
+                callback(event, info)
+            except Exception:
+                pass
+
+    def _run(self):
+        try:
+            self._capture_loop()
+        except Exception as e:
+            self.error = e
+        finally:
+            self._running = False
+            try:
+                self.source.close()
+            except Exception:
+                pass
+            self._finished.set()
+
+    def _capture_loop(self):
+        rate = self.source.sample_rate
+        frame_length = rate * FRAME_MS // 1000
+        onset_frames = max(1, self.onset_ms // FRAME_MS)
+        hangover_frames = max(1, self.hangover_ms // FRAME_MS)
+        pre_roll = rate * self.pre_roll_ms // 1000
+        max_samples = int(rate * self.max_utterance_seconds)
+        min_samples = rate * self.min_speech_ms // 1000
+
+        calibration_frames = max(1, self.calibration_ms // FRAME_MS)
+        voiced_run = 0
+        silent_run = 0
+        speech_start = 0
+        speech_onset = 0
+        last_voiced_end = 0
+
+        while self._running:
+            frame = self.source.read_frame()
+            if frame is None:
+                break
+            self.ring.write(frame)
+            self.stats['frames'] += 1
+            position = self.ring.total_written
+            rms = float(np.sqrt(np.mean(frame.astype(np.float32) ** 2))) if len(frame) else 0.0
+
+            if self.stats['frames'] <= calibration_frames:
+                # One-time ambient calibration when the stream opens, never repeated per turn
+                self.noise_floor += (rms - self.noise_floor) / self.stats['frames']
+                continue
+            voiced = rms > self.threshold
+
+            if not self.in_speech:
+                playing = self.playback is not None and self.playback()
+                if playing:
+                    # Our own voice is not background noise: hold the floor and demand a louder onset
+                    voiced = rms > self.threshold * self.playback_ratio
+                else:
+                    # Track the noise floor only outside speech: fall fast, rise slowly
+                    alpha = 0.3 if rms < self.noise_floor else 0.02
+                    self.noise_floor += alpha * (rms - self.noise_floor)
+
+                suppressed = self.suppress is not None and self.suppress()
+                voiced_run = voiced_run + 1 if voiced and not suppressed else 0
+                if voiced_run >= onset_frames:
+                    self.in_speech = True
+                    self._onset_during_playback = playing
+                    silent_run = 0
+                    speech_onset = position - voiced_run * len(frame)
+                    speech_start = max(0, speech_onset - pre_roll)
+                    last_voiced_end = position
+                    if self._listeners:
+                        self._emit('speech_start', {
+                            'position': speech_onset, 'rms': rms, 'sample_rate': rate, 'during_playback': playing,
+                            # Everything from the start of the pre-roll up to now, for streaming consumers
+                            'pre_roll': self.ring.read(speech_start, position)
+                        })
+                continue
+
+            if self._listeners:
+                self._emit('speech_audio', {'position': position, 'samples': frame.copy()})
+
+            if voiced:
+                silent_run = 0
+                last_voiced_end = position
+            else:
+                silent_run += 1
+            # Creep toward the current level so a step up in background noise cannot hold speech open forever
+            self.noise_floor += 0.002 * (rms - self.noise_floor)
+
+            too_long = position - speech_start >= max_samples
+            if silent_run >= hangover_frames or too_long:
+                self._finish_utterance(speech_start, position, last_voiced_end - speech_onset, min_samples, rate,
+                                       too_long)
+                voiced_run = 0
+
+        if self.in_speech:
+            self._finish_utterance(speech_start, self.ring.total_written, last_voiced_end - speech_onset,
+                                   min_samples, rate, False)
+
+    def _finish_utterance(self, start: int, end: int, voiced_samples: int, min_samples: int, rate: int,
+                          truncated: bool):
+        self.in_speech = False
+        self._emit('speech_end', {'position': end, 'truncated': truncated})
+        if voiced_samples < min_samples:
+            self.stats['discarded_short'] += 1
+            return
+        pcm = self.ring.read(start, end)
+        now = time.monotonic()
+        utterance = Utterance(pcm, rate, now - len(pcm) / rate, now, truncated, start_position=start,
+                              end_position=end, during_playback=self._onset_during_playback)
+        try:
+            self.utterances.put_nowait(utterance)
+        except queue.Full:
+            # Keep the newest speech: drop the oldest queued utterance
+            try:
+                self.utterances.get_nowait()
+                self.stats['dropped'] += 1
+            except queue.Empty:
+                pass
+            self.utterances.put_nowait(utterance)
+        self.stats['utterances'] += 1
@@ -0,0 +1,191 @@
+"""
+Backup Store for JARVIS
+Deduplicating backups: files are split into BLAKE2-addressed chunks, and each backup is a small manifest
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+DIGEST_SIZE = 20
+
+
+def _write_temp(path: Path, data: bytes) -> str:
+    """Write data to a fresh temp file next to path (unique per call, so concurrent writers never share one)"""
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return tmp
+
+
+def _write_atomic(path: Path, data: bytes):
+    os.replace(_write_temp(path, data), path)
+
+
+class BackupStore:
+    def __init__(self, root, chunk_size: int = 1 << 20, large_file: int = 8 << 20, workers: int = 4):
+        """Chunks live in root/chunks/<2 hex>/<digest>, manifests in root/manifests/<id>.json.
+
+        Files of at least large_file bytes are hashed on a thread pool (hashlib releases the GIL on big buffers).
+        """
+        self.root = Path(root)
+        self.chunk_dir = self.root / "chunks"
+        self.manifest_dir = self.root / "manifests"
+        self.chunk_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest_dir.mkdir(parents=True, exist_ok=True)
+        self.chunk_size = chunk_size
+        self.large_file = large_file
+        self.workers = workers
+        self._chunk_lock = threading.Lock()  # Makes "store the chunk unless it exists" atomic across pool threads
+
+    # ------------------------------------------------------------------ chunks
+
+    def _chunk_path(self, digest: str) -> Path:
+        return self.chunk_dir / digest[:2] / digest
+
+    def _store_file(self, path: Path) -> Dict:
+        """Chunk, hash and store one file; returns its chunk list and how much was new"""
+        chunks, new_chunks, new_bytes = [], 0, 0
+        with open(path, 'rb') as f:
+            while True:
+                data = f.read(self.chunk_size)
+                if not data:
+                    break
+                digest = hashlib.blake2b(data, digest_size=DIGEST_SIZE).hexdigest()
+                chunks.append(digest)
+                target = self._chunk_path(digest)
+                if not target.exists():
+                    target.parent.mkdir(exist_ok=True)
+                    tmp = _write_temp(target, data)
+                    # Another thread may have stored the same chunk meanwhile; only the first one counts it
+                    with self._chunk_lock:
+                        created = not target.exists()
+                        if created:
+                            os.replace(tmp, target)
+                    if created:
+                        new_chunks += 1
+                        new_bytes += len(data)
+                    else:
+                        os.unlink(tmp)
+        return {'chunks': chunks, 'new_chunks': new_chunks, 'new_bytes': new_bytes}
+
+    # ------------------------------------------------------------------ backups
+
+    def backup(self, files: Iterable[Path], base: Path = Path("."),
+               cancelled: Optional[Callable[[], bool]] = None) -> Dict:
+        """Back up files (stored relative to base); unchanged (size, mtime) files reuse the previous chunk lists"""
+        started = time.perf_counter()
+        base = Path(base)
+        previous = self.latest()
+        known = previous['files'] if previous else {}
+        entries: Dict[str, Dict] = {}
+        stats = {'files': 0, 'unchanged': 0, 'new_chunks': 0, 'new_bytes': 0, 'total_bytes': 0}
+        pending = {}
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for path in files:
+                if cancelled and cancelled():
+                    for future in pending.values():
+                        future.cancel()
+                    raise InterruptedError("backup cancelled")
+                path = Path(path)
+                try:
+                    info = path.stat()
+                except OSError:
+                    continue
+                relative = os.path.relpath(path, base).replace(os.sep, '/')
+                entry = {'size': info.st_size, 'mtime_ns': info.st_mtime_ns, 'mode': info.st_mode & 0o777}
+                stats['files'] += 1
+                stats['total_bytes'] += info.st_size
+
+                old = known.get(relative)
+                if old and old['size'] == entry['size'] and old['mtime_ns'] == entry['mtime_ns']:
+                    entry['chunks'] = old['chunks']
+                    stats['unchanged'] += 1
+                elif info.st_size >= self.large_file:
+                    pending[relative] = pool.submit(self._store_file, path)
+                else:
+                    result = self._store_file(path)
+                    entry['chunks'] = result['chunks']
+                    stats['new_chunks'] += result['new_chunks']
+                    stats['new_bytes'] += result['new_bytes']
+                entries[relative] = entry
+
+            for relative, future in pending.items():
+                result = future.result()
+                entries[relative]['chunks'] = result['chunks']
+                stats['new_chunks'] += result['new_chunks']
+                stats['new_bytes'] += result['new_bytes']
+
+        backup_id = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        stats['seconds'] = time.perf_counter() - started
+        manifest = {'id': backup_id, 'created': datetime.now().isoformat(), 'base': str(base.resolve()),
+                    'files': entries, 'stats': stats}
+        _write_atomic(self.manifest_dir / f"{backup_id}.json", json.dumps(manifest).encode())
+        return manifest
+
+    def list_backups(self) -> List[str]:
+        """Backup IDs, oldest first"""
+        return sorted(path.stem for path in self.manifest_dir.glob("*.json"))
+
+    def manifest(self, backup_id: str) -> Dict:
+        with open(self.manifest_dir / f"{backup_id}.json", 'r') as f:
+            return json.load(f)
+
+    def latest(self) -> Optional[Dict]:
+        backups = self.list_backups()
+        return self.manifest(backups[-1]) if backups else None
+
+    def restore(self, backup_id: str, destination: Path, only: Optional[Iterable[str]] = None) -> int:
+        """Rebuild files from a backup under destination; returns the number of files written"""
+        manifest = self.manifest(backup_id)
+        wanted = set(only) if only is not None else None
+        restored = 0
+        for relative, entry in manifest['files'].items():
+            if wanted is not None and relative not in wanted:
+                continue
+            target = Path(destination) / relative
+            target.parent.mkdir(parents=True, exist_ok=True)
+            with open(target, 'wb') as out:
+                for digest in entry['chunks']:
+                    with open(self._chunk_path(digest), 'rb') as chunk:
+                        shutil.copyfileobj(chunk, out)
+            os.chmod(target, entry.get('mode', 0o644))
+            os.utime(target, ns=(entry['mtime_ns'], entry['mtime_ns']))
+            restored += 1
+        return restored
+
+    def prune(self, keep_last: int) -> Dict:
+        """Drop all but the newest keep_last manifests, then delete chunks no remaining manifest references"""
+        backups = self.list_backups()
+        removed = backups[:-keep_last] if keep_last > 0 else backups
+        for backup_id in removed:
+            (self.manifest_dir / f"{backup_id}.json").unlink(missing_ok=True)
+
+        referenced = set()
+        for backup_id in self.list_backups():
+            for entry in self.manifest(backup_id)['files'].values():
+                referenced.update(entry['chunks'])
+
+        deleted = freed = 0
+        for bucket in self.chunk_dir.iterdir():
+            if not bucket.is_dir():
+                continue
+            for chunk in bucket.iterdir():
+                if chunk.name not in referenced:
+                    freed += chunk.stat().st_size
+                    chunk.unlink()
+                    deleted += 1
+        return {'manifests_removed': len(removed), 'chunks_deleted': deleted, 'bytes_freed': freed}
@@ -0,0 +1,200 @@
+"""
+Collector Backends for JARVIS
+Platform-specific sources of raw host counters for the metrics collector: psutil everywhere, /proc on Linux
+"""
+
+import os
+import platform
+from typing import Dict, List, Optional
+
+import psutil
+
+
+class CollectorBackend:
+    """Source of raw counters; sample() returns the dict shape MetricsCollector.sample_once expects"""
+
+    name = "base"
+
+    def sample(self) -> Dict:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __call__(self) -> Dict:
+        return self.sample()
+
+
+class PsutilBackend(CollectorBackend):
+    """Portable backend (Windows, macOS, and Linux without /proc); cpu_percent is measured since the previous call"""
+
+    name = "psutil"
+
+    def sample(self) -> Dict:
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_io_counters()
+        net = psutil.net_io_counters()
+        return {
+            'per_core': psutil.cpu_percent(interval=None, percpu=True),
+            'memory_percent': memory.percent,
+            'memory_used': memory.used,
+            'memory_available': memory.available,
+            'memory_total': memory.total,
+            'swap_percent': psutil.swap_memory().percent,
+            'disk_io': disk._asdict() if disk else None,
+            'net_io': net._asdict() if net else None,
+        }
+
+
+class ProcfsBackend(CollectorBackend):
+    """Linux backend reading /proc through file descriptors that stay open; each sample is four pread() calls"""
+
+    name = "procfs"
+    FILES = ('stat', 'meminfo', 'diskstats', 'net/dev')
+
+    def __init__(self, proc_root: str = "/proc", sys_block: str = "/sys/block"):
+        self.proc_root = proc_root
+        self._fds: Dict[str, int] = {}
+        self._buffers: Dict[str, int] = {}
+        try:
+            for name in self.FILES:
+                self._fds[name] = os.open(os.path.join(proc_root, name), os.O_RDONLY)
+                self._buffers[name] = 16384
+        except OSError:
+            self.close()
+            raise
+        # Whole disks only (sda, nvme0n1), like psutil: summing partitions would double-count
+        try:
+            self._disks: Optional[set] = {name.replace('!', '/').encode() for name in os.listdir(sys_block)}
+        except OSError:
+            self._disks = None
+        self._previous_cpu: Optional[List[List[int]]] = None
+
+    def close(self):
+        for fd in self._fds.values():
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        self._fds.clear()
+
+    def __del__(self):
+        self.close()
+
+    def _read(self, name: str) -> bytes:
+        """Whole file via pread at offset 0 (the kernel regenerates proc files on every read)"""
+        fd, size = self._fds[name], self._buffers[name]
+        while True:
+            data = os.pread(fd, size, 0)
+            if len(data) < size:
+                return data
+            # Buffer was filled exactly: the file may be longer, so retry with more room
+            size *= 2
+            self._buffers[name] = size
+
+    # ------------------------------------------------------------------ parsers
+
+    def _per_core(self, data: bytes) -> List[float]:
+        """Per-core busy percent since the previous sample (0.0 on the first call, as with psutil)"""
+        cores = []
+        for line in data.split(b'\n'):
+            if not line.startswith(b'cpu'):
+                if cores:
+                    break
+                continue
+            if line[3:4] == b' ':
+                continue  # aggregate "cpu" line
+            fields = line.split()
+            # user nice system idle iowait irq softirq steal (guest time is already included in user)
+            cores.append([int(value) for value in fields[1:9]])
+
+        previous, self._previous_cpu = self._previous_cpu, cores
+        if previous is None or len(previous) != len(cores):
+            return [0.0] * len(cores)
+        percents = []
+        for now, last in zip(cores, previous):
+            total = sum(now) - sum(last)
+            idle = (now[3] + now[4]) - (last[3] + last[4])
+            percents.append(round(max(0.0, min(100.0, (total - idle) / total * 100)), 1) if total > 0 else 0.0)
+        return percents
+
+    MEMINFO_KEYS = frozenset((b'MemTotal', b'MemFree', b'MemAvailable', b'SwapTotal', b'SwapFree'))
+
+    def _meminfo(self, data: bytes) -> Dict[str, int]:
+        values = {}
+        for line in data.split(b'\n'):
+            key, _, rest = line.partition(b':')
+            if key in self.MEMINFO_KEYS:
+                values[key.decode()] = int(rest.split()[0]) * 1024
+                if len(values) == len(self.MEMINFO_KEYS):
+                    break
+        return values
+
+    def _disk_io(self, data: bytes) -> Dict:
+        totals = {'read_count': 0, 'write_count': 0, 'read_bytes': 0, 'write_bytes': 0,
+                  'read_time': 0, 'write_time': 0}
+        for line in data.split(b'\n'):
+            fields = line.split()
+            if len(fields) < 14:
+                continue  # blank lines and old-style partition lines
+            if self._disks is not None and fields[2] not in self._disks:
+                continue
+            totals['read_count'] += int(fields[3])
+            totals['read_bytes'] += int(fields[5]) * 512
+            totals['read_time'] += int(fields[6])
+            totals['write_count'] += int(fields[7])
+            totals['write_bytes'] += int(fields[9]) * 512
+            totals['write_time'] += int(fields[10])
+        return totals
+
+    @staticmethod
+    def _net_io(data: bytes) -> Dict:
+        totals = [0] * 16
+        for line in data.split(b'\n')[2:]:
+            _, sep, rest = line.partition(b':')
+            if not sep:
+                continue
+            for index, value in enumerate(rest.split()[:16]):
+                totals[index] += int(value)
+        return {
+            'bytes_sent': totals[8], 'bytes_recv': totals[0],
+            'packets_sent': totals[9], 'packets_recv': totals[1],
+            'errin': totals[2], 'errout': totals[10],
+            'dropin': totals[3], 'dropout': totals[11],
+        }
+
+    def sample(self) -> Dict:
+        per_core = self._per_core(self._read('stat'))
+        memory = self._meminfo(self._read('meminfo'))
+        total = memory.get('MemTotal', 0)
+        available = memory.get('MemAvailable', memory.get('MemFree', 0))
+        swap_total = memory.get('SwapTotal', 0)
+        swap_used = swap_total - memory.get('SwapFree', 0)
+        return {
+            'per_core': per_core,
+            'memory_percent': (total - available) / total * 100 if total else 0.0,
+            'memory_used': total - available,
+            'memory_available': available,
+            'memory_total': total,
+            'swap_percent': swap_used / swap_total * 100 if swap_total else 0.0,
+            'disk_io': self._disk_io(self._read('diskstats')),
+            'net_io': self._net_io(self._read('net/dev')),
+        }
+
+
+BACKENDS = {
+    'psutil': PsutilBackend,
+    'procfs': ProcfsBackend,
+}
+
+
+def create_backend(name: str = "auto") -> CollectorBackend:
+    """Backend by name; "auto" picks /proc on Linux when it is readable and psutil otherwise"""
+    if name != "auto":
+        return BACKENDS[name]()
+    if platform.system() == "Linux":
+        try:
+            return ProcfsBackend()
+        except OSError:
+            pass
+    return PsutilBackend()
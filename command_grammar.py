@@ -0,0 +1,411 @@
+"""
+Command Grammar for JARVIS
+Compound natural-language commands tokenized once and parsed in a single linear pass into a small AST
+"""
+
+import re
+from typing import List, Optional, Tuple
+
+# One master expression: each match is a token, so the whole command is tokenized in one scan
+_TOKEN = re.compile(r"""
+    (?P<quoted>"[^"]*"|(?<!\w)'[^']*')   # quoted text is never split or treated as keywords
+  | (?P<sep>[,;])
+  | (?P<word>[^\s,;"]+)
+  | (?P<other>\S)
+""", re.VERBOSE)
+
+# First words that can start a standalone clause; anything else keeps an "and" inside one command
+ACTION_VERBS = frozenset({
+    'open', 'launch', 'start', 'close', 'check', 'show', 'get', 'tell', 'give', 'what', "what's", 'how', 'who',
+    'where', 'search', 'find', 'look', 'take', 'set', 'turn', 'mute', 'unmute', 'increase', 'decrease', 'play',
+    'stop', 'create', 'make', 'write', 'read', 'delete', 'list', 'run', 'type', 'press', 'click', 'save', 'copy',
+    'paste', 'scroll', 'minimize', 'maximize', 'lock', 'send', 'schedule', 'remind', 'generate', 'notify', 'alert',
+})
+# Clauses that launch something; whatever follows in the same clause list acts on it
+LAUNCH_VERBS = frozenset({'open', 'launch', 'start'})
+CONDITION_WORDS = frozenset({'if', 'when', 'whenever', 'once'})
+FILE_VERBS = frozenset({'create', 'make', 'write', 'generate'})
+
+_REFERENCES = frozenset({'it', 'that', 'this', 'them', 'those'})
+_REFERENCE_NOUNS = frozenset({'result', 'results', 'file', 'output'})
+_COPULAS = frozenset({'is', 'are', 'was', 'were', 'be', 'gets', 'get', 'becomes', 'been'})
+_DELAY_VERBS = frozenset({'wait', 'pause', 'sleep'})
+_UNITS = {'second': 1, 'seconds': 1, 'sec': 1, 'secs': 1, 'minute': 60, 'minutes': 60, 'min': 60, 'mins': 60,
+          'hour': 3600, 'hours': 3600}
+_COUNTS = {'a': 1, 'an': 1, 'one': 1}
+_FILE_EXTENSIONS = (".txt", ".md", ".log", ".csv")
+
+
+class Token:
+    __slots__ = ('kind', 'text', 'lower', 'start', 'end')
+
+    def __init__(self, kind: str, text: str, start: int, end: int):
+        self.kind = kind
+        self.text = text
+        self.lower = text.lower()
+        self.start = start
+        self.end = end
+
+    def is_word(self, *words: str) -> bool:
+        return self.kind == 'word' and self.lower in words
+
+
+def tokenize(command: str) -> List[Token]:
+    return [Token('word' if match.lastgroup == 'other' else match.lastgroup, match.group(), match.start(), match.end())
+            for match in _TOKEN.finditer(command)]
+
+
+class Node:
+    """AST node; equality and repr cover its slots so parses compare directly in tests"""
+
+    __slots__ = ()
+
+    def __eq__(self, other) -> bool:
+        return type(self) is type(other) and all(getattr(self, s) == getattr(other, s) for s in self.__slots__)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({', '.join(repr(getattr(self, s)) for s in self.__slots__)})"
+
+
+class Command(Node):
+    __slots__ = ('text',)
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FileWithContent(Node):
+    """"create a file about <topic> [and save it as <filename>] [on desktop]" """
+
+    __slots__ = ('topic', 'filename', 'location', 'text')
+
+    def __init__(self, topic: str, filename: str, location: Optional[str], text: str):
+        self.topic = topic
+        self.filename = filename
+        self.location = location
+        self.text = text
+
+
+class Delay(Node):
+    __slots__ = ('seconds',)
+
+    def __init__(self, seconds: int):
+        self.seconds = seconds
+
+
+class Conditional(Node):
+    """"if/when/once <condition> [then|,] <action> [otherwise <otherwise>]" """
+
+    __slots__ = ('keyword', 'condition', 'action', 'otherwise', 'text')
+
+    def __init__(self, keyword: str, condition: str, action: str, otherwise: Optional[str], text: str):
+        self.keyword = keyword
+        self.condition = condition
+        self.action = action
+        self.otherwise = otherwise
+        self.text = text
+
+
+class Parallel(Node):
+    """Clauses with no ordering between them ("check the weather and show cpu usage")"""
+
+    __slots__ = ('parts',)
+
+    def __init__(self, parts: List[Node]):
+        self.parts = parts
+
+
+class Sequence(Node):
+    """Stages in order: each is a Parallel, Delay or Conditional and starts after the previous one"""
+
+    __slots__ = ('stages',)
+
+    def __init__(self, stages: List[Node]):
+        self.stages = stages
+
+
+def parse_command(command: str) -> Sequence:
+    """Parse a compound command; never raises, unrecognised text ends up in Command leaves"""
+    return _Parser(command).parse()
+
+
+class _Parser:
+    def __init__(self, command: str):
+        self.command = command
+        self.tokens = tokenize(command)
+
+    def _text(self, start: int, end: int) -> str:
+        """Original text (case and quotes kept) covered by tokens[start:end]"""
+        if start >= end:
+            return ""
+        return self.command[self.tokens[start].start:self.tokens[end - 1].end]
+
+    def _word(self, i: int) -> str:
+        return self.tokens[i].lower if i < len(self.tokens) and self.tokens[i].kind == 'word' else ''
+
+    # ------------------------------------------------------------------ connectors
+
+    def _then(self, i: int) -> int:
+        """Length of an ordering connector at i ("then", "and then", "after that", ", next"), else 0"""
+        word = self._word(i)
+        if word in ('then', 'afterwards'):
+            return 1
+        if (word == 'and' and self._word(i + 1) == 'then') or (word == 'after' and self._word(i + 1) == 'that'):
+            return 2
+        if word == 'next' and i > 0 and self.tokens[i - 1].kind == 'sep':
+            return 1
+        return 0
+
+    def _amount(self, i: int) -> Tuple[int, int]:
+        """(seconds, tokens used) for "<count> <unit>" at i, else (0, 0)"""
+        count, unit = self._word(i), self._word(i + 1)
+        if unit not in _UNITS:
+            return 0, 0
+        if count.isdigit():
+            return int(count) * _UNITS[unit], 2
+        if count in _COUNTS:
+            return _COUNTS[count] * _UNITS[unit], 2
+        return 0, 0
+
+    def _delay(self, i: int, at_start: bool) -> Tuple[int, int]:
+        """(seconds, length) for "wait/pause [for] N unit" anywhere or "after/in N unit" opening a clause"""
+        word = self._word(i)
+        if word in _DELAY_VERBS:
+            j = i + 2 if self._word(i + 1) == 'for' else i + 1
+            seconds, used = self._amount(j)
+            return (seconds, j - i + used) if used else (0, 0)
+        if at_start and word in ('after', 'in'):
+            seconds, used = self._amount(i + 1)
+            return (seconds, 1 + used) if used else (0, 0)
+        return 0, 0
+
+    def _otherwise(self, i: int) -> int:
+        word = self._word(i)
+        if word in ('otherwise', 'else'):
+            return 1
+        if word == 'or' and self._word(i + 1) == 'else':
+            return 2
+        return 0
+
+    # ------------------------------------------------------------------ grammar
+
+    def parse(self) -> Sequence:
+        stages: List[Node] = []
+        segment = None
+        i, n = 0, len(self.tokens)
+        while i < n:
+            if segment is None:
+                if self.tokens[i].kind == 'sep':
+                    i += 1
+                    continue
+                if self._word(i) in CONDITION_WORDS:
+                    parsed = self._conditional(i)
+                    if parsed:
+                        stages.append(parsed[0])
+                        i = parsed[1]
+                        continue
+                seconds, used = self._delay(i, at_start=True)
+                if used:
+                    stages.append(Delay(seconds))
+                    i += used
+                    continue
+                segment = i
+            connector = self._then(i)
+            seconds, used = (0, 0) if connector else self._delay(i, at_start=False)
+            if connector or used:
+                self._close(segment, i, stages)
+                segment = None
+                if used:
+                    stages.append(Delay(seconds))
+                i += connector or used
+                continue
+            i += 1
+        if segment is not None:
+            self._close(segment, n, stages)
+        return Sequence(stages)
+
+    def _close(self, start: int, end: int, stages: List[Node]):
+        while start < end and self.tokens[start].kind == 'sep':
+            start += 1
+        while end > start and self.tokens[end - 1].kind == 'sep':
+            end -= 1
+        if start < end:
+            stages.append(Parallel(self._clauses(start, end)))
+
+    def _conditional(self, i: int) -> Optional[Tuple[Conditional, int]]:
+        """Conditional stage starting at i; None when no condition/action boundary is found"""
+        keyword = self._word(i)
+        n = len(self.tokens)
+        j = i + 1
+        condition_end = action_start = None
+        while j < n:
+            token = self.tokens[j]
+            if token.kind == 'sep':
+                condition_end = j
+                action_start = j + 1 + (self._word(j + 1) == 'then')
+                break
+            connector = self._then(j)
+            if connector:
+                condition_end, action_start = j, j + connector
+                break
+            # "when notepad opens take a screenshot": the action starts at the first verb not used as a state
+            if j > i + 1 and token.kind == 'word' and token.lower in ACTION_VERBS and \
+                    self._word(j - 1) not in _COPULAS:
+                condition_end = action_start = j
+                break
+            j += 1
+        if condition_end is None or condition_end == i + 1:
+            return None
+
+        action_end = j = action_start
+        otherwise = None
+        while j < n and not self._then(j) and not self._delay(j, at_start=False)[1]:
+            skip = self._otherwise(j + (self.tokens[j].kind == 'sep'))
+            if skip:
+                action_end = j
+                j += skip + (self.tokens[j].kind == 'sep')
+                other_start = j
+                while j < n and not self._then(j) and not self._delay(j, at_start=False)[1]:
+                    j += 1
+                otherwise = self._text(other_start, j).strip(' ,;') or None
+                break
+            j += 1
+            action_end = j
+        action = self._text(action_start, action_end).strip(' ,;')
+        if not action:
+            return None
+        return Conditional(keyword, self._text(i + 1, condition_end).strip(' ,;'), action, otherwise,
+                           self._text(i, j).strip(' ,;')), j
+
+    def _has_reference(self, start: int, end: int) -> bool:
+        for k in range(start, end):
+            word = self._word(k)
+            if word in _REFERENCES or (word == 'the' and self._word(k + 1) in _REFERENCE_NOUNS):
+                return True
+        return False
+
+    def _clauses(self, start: int, end: int) -> List[Node]:
+        """Split a segment on "and"/commas only when every part is a command of its own with no data dependency"""
+        if self._is_file_clause(start, end):
+            return [self._clause(start, end)]
+        bounds, part_start = [], start
+        for k in range(start, end):
+            if self.tokens[k].kind == 'sep' or self._word(k) == 'and':
+                if k > part_start:
+                    bounds.append((part_start, k))
+                part_start = k + 1
+        if part_start < end:
+            bounds.append((part_start, end))
+        if len(bounds) < 2 or not all(self._word(s) in ACTION_VERBS for s, _ in bounds):
+            return [self._clause(start, end)]
+        # "open chrome and search ..." or "search ... and read it" is one request, not two independent ones
+        if any(self._word(s) in LAUNCH_VERBS for s, _ in bounds[:-1]) or \
+                any(self._has_reference(s, e) for s, e in bounds[1:]):
+            return [self._clause(start, end)]
+        return [self._clause(s, e) for s, e in bounds]
+
+    def _clause(self, start: int, end: int) -> Node:
+        if self._is_file_clause(start, end):
+            node = self._file_clause(start, end)
+            if node:
+                return node
+        return Command(self._text(start, end))
+
+    # ------------------------------------------------------------------ file-with-content clauses
+
+    def _is_file_clause(self, start: int, end: int) -> bool:
+        has_verb = has_content = False
+        for k in range(start, end):
+            word = self._word(k)
+            has_verb = has_verb or word in FILE_VERBS
+            has_content = has_content or word in ('about', 'containing') or \
+                (word == 'with' and self._word(k + 1) == 'content')
+        return has_verb and has_content
+
+    def _file_clause(self, start: int, end: int) -> Optional[FileWithContent]:
+        """One pass with a small state machine: words go to the topic or filename, keywords switch between them"""
+        topic: List[str] = []
+        filename: List[str] = []
+        location = None
+        mode = None
+        k = start
+        while k < end:
+            token = self.tokens[k]
+            word = token.lower
+            following = self._word(k + 1)
+            if token.kind == 'quoted':
+                if mode == 'filename':
+                    filename.append(token.text.strip('"\''))
+                elif mode == 'topic':
+                    topic.append(token.text.strip('"\''))
+                k += 1
+                continue
+            if token.kind == 'sep':
+                mode = None
+                k += 1
+                continue
+            # Content keywords; "write about" replaces any earlier topic
+            if word in ('about', 'containing') or (word == 'with' and following == 'content'):
+                if not topic or self._word(k - 1) == 'write':
+                    topic = []
+                    mode = 'topic'
+                    k += 2 if word == 'with' else 1
+                    continue
+            # Filename keywords
+            name_length = 0
+            if word in ('named', 'called', 'filename'):
+                name_length = 1
+            elif word in ('name', 'call') and following == 'it':
+                name_length = 2
+            elif (word == 'file' and following == 'name') or (word == 'with' and following == 'name'):
+                name_length = 2
+            elif word == 'save' and following == 'as':
+                name_length = 2
+            elif word == 'save' and following == 'it' and self._word(k + 2) == 'as':
+                name_length = 3
+            elif word == 'file' and mode is None and not filename and k > start and \
+                    self._word(k - 1) in ('a', 'file', 'create', 'make') and following not in \
+                    ('', 'about', 'containing', 'with', 'named', 'called', 'on', 'in', 'and'):
+                name_length = 1
+            if name_length:
+                mode = 'filename'
+                k += name_length
+                continue
+            # Locations end the current field
+            if word in ('on', 'in', 'to', 'onto') and following == 'desktop':
+                location = 'desktop'
+                mode = None
+                k += 2
+                continue
+            if word in ('in', 'on') and (following == 'folder' or
+                                         (following in ('this', 'the') and self._word(k + 2) == 'folder')):
+                mode = None
+                k += 2 if following == 'folder' else 3
+                continue
+            if word == 'here':
+                mode = None
+                k += 1
+                continue
+            # "and save/write/name ..." ends the topic; any "and"/preposition ends a filename
+            if word == 'and' and (mode == 'filename' or following in ('save', 'write', 'name', 'call', 'put', 'store')):
+                mode = None
+                k += 1
+                continue
+            if mode == 'filename' and word in ('on', 'in', 'with', 'write'):
+                mode = None
+            if mode == 'topic':
+                topic.append(word)
+            elif mode == 'filename':
+                filename.append(token.text.strip('"\''))
+            k += 1
+
+        topic_text = " ".join(topic).strip(" .,;")
+        if not topic_text:
+            return None
+        name = " ".join(filename).strip()
+        if name and not name.lower().endswith(_FILE_EXTENSIONS) and "." not in name:
+            name += ".txt"
+        if not name:
+            safe = re.sub(r"[^a-z0-9_\-]+", "_", topic_text.lower()).strip("_")
+            name = (safe[:30] or "untitled") + ".txt"
+        return FileWithContent(topic_text, name, location, self._text(start, end))
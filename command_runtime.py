@@ -0,0 +1,367 @@
+"""
+Command Runtime for JARVIS
+One asyncio loop on a background thread runs compound-command step graphs: delays are timers and
+"when/once" conditions are watchers, so pending commands never block the session or each other
+"""
+
+import asyncio
+import concurrent.futures
+import itertools
+import operator
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from worker_pool import WorkerPool, DONE, CANCELLED
+
+WATCH_KEYWORDS = frozenset({'when', 'whenever', 'once'})
+
+_METRIC_FIELDS = {'cpu': 'cpu_percent', 'processor': 'cpu_percent', 'memory': 'memory_percent',
+                  'ram': 'memory_percent', 'swap': 'swap_percent'}
+_ABOVE = ('above', 'over', 'exceeds', 'exceed', 'greater than', 'more than', 'higher than', '>')
+_METRIC = re.compile(
+    r"^(?:the\s+)?(?P<metric>cpu|processor|memory|ram|swap)(?:\s+(?:usage|use|load|level))?\s+"
+    r"(?:is\s+|goes\s+|gets\s+|rises\s+|climbs\s+|drops\s+|falls\s+)?"
+    r"(?P<op>above|over|exceeds?|greater than|more than|higher than|below|under|less than|lower than|>|<)\s*"
+    r"(?P<value>\d+(?:\.\d+)?)\s*(?:%|percent)?$", re.IGNORECASE)
+_FILE = re.compile(
+    r"^(?:the\s+)?(?:file\s+)?(?P<path>\S+?)\s+(?:file\s+)?"
+    r"(?P<event>exists|is created|gets created|appears|changes|is modified|is updated|gets modified|"
+    r"is deleted|gets deleted|disappears|is removed)$", re.IGNORECASE)
+_FILE_EXISTS = re.compile(r"^file\s+exists\s+(?P<path>\S+)$", re.IGNORECASE)
+_PROCESS = re.compile(
+    r"^(?:the\s+)?(?:process\s+|app\s+|application\s+|program\s+)?(?P<name>[\w.\-]+(?: [\w.\-]+)?)\s+"
+    r"(?P<event>opens|is opened|starts|is started|launches|is launched|is running|runs|is open|"
+    r"closes|is closed|exits|stops|quits|is not running|is no longer running)$", re.IGNORECASE)
+_PROCESS_GONE = ('closes', 'is closed', 'exits', 'stops', 'quits', 'is not running', 'is no longer running')
+
+
+# ---------------------------------------------------------------------- watchers
+
+class Watch:
+    """A condition that can be checked now (for "if") or awaited until it holds (for "when/once")"""
+
+    description = "condition"
+
+    def check(self) -> bool:
+        raise NotImplementedError
+
+    async def wait(self):
+        raise NotImplementedError
+
+
+class FileWatch(Watch):
+    """Filesystem events by stat polling: exists, modified or deleted"""
+
+    def __init__(self, path: Path, event: str, poll: float = 0.5):
+        self.path = Path(path)
+        self.event = event
+        self.poll = poll
+        self.description = f"file {self.path.name} {event}"
+
+    def _stat(self):
+        try:
+            info = os.stat(self.path)
+            return info.st_mtime_ns, info.st_size
+        except OSError:
+            return None
+
+    def check(self) -> bool:
+        exists = self._stat() is not None
+        return exists if self.event == 'exists' else (not exists if self.event == 'deleted' else False)
+
+    async def wait(self):
+        baseline = self._stat()
+        while True:
+            current = self._stat()
+            if self.event == 'exists' and current is not None:
+                return
+            if self.event == 'deleted' and current is None:
+                return
+            if self.event == 'modified' and current != baseline:
+                return
+            await asyncio.sleep(self.poll)
+
+
+class ProcessWatch(Watch):
+    """Process start or exit, checked against the shared process table off the event loop"""
+
+    def __init__(self, name: str, running: bool, poll: float = 1.0, table=None):
+        self.name = name
+        self.running = running
+        self.poll = poll
+        self._table = table
+        self.description = f"{name} {'running' if running else 'not running'}"
+
+    def check(self) -> bool:
+        if self._table is None:
+            from process_table import get_process_table
+            self._table = get_process_table()
+        return bool(self._table.find(self.name)) == self.running
+
+    async def wait(self):
+        loop = asyncio.get_running_loop()
+        while not await loop.run_in_executor(None, self.check):
+            await asyncio.sleep(self.poll)
+
+
+class MetricWatch(Watch):
+    """Metric threshold pushed by the collector's listener after every sample (no polling of its own)"""
+
+    def __init__(self, field: str, above: bool, threshold: float, collector=None):
+        self.field = field
+        self.above = above
+        self.threshold = threshold
+        self._collector = collector
+        self._compare = operator.gt if above else operator.lt
+        self.description = f"{field} {'>' if above else '<'} {threshold:g}"
+
+    @property
+    def collector(self):
+        if self._collector is None:
+            from metrics_collector import get_collector
+            self._collector = get_collector()
+        return self._collector
+
+    def _holds(self, sample: Dict) -> bool:
+        value = sample.get(self.field)
+        return value is not None and self._compare(value, self.threshold)
+
+    def check(self) -> bool:
+        return self._holds(self.collector.latest())
+
+    async def wait(self):
+        loop = asyncio.get_running_loop()
+        met = loop.create_future()
+
+        def on_sample(sample: Dict):
+            if self._holds(sample):
+                loop.call_soon_threadsafe(lambda: met.done() or met.set_result(True))
+
+        collector = self.collector
+        collector.add_listener(on_sample)
+        try:
+            await met
+        finally:
+            collector.remove_listener(on_sample)
+
+
+def compile_condition(condition: str, base_dir: Optional[str] = None, file_poll: float = 0.5,
+                      process_poll: float = 1.0, collector=None, process_table=None) -> Optional[Watch]:
+    """Watch for a condition phrase ("cpu is above 90 percent", "notepad opens", "report.txt exists"), or None"""
+    text = " ".join(condition.strip().split())
+    match = _METRIC.match(text)
+    if match:
+        return MetricWatch(_METRIC_FIELDS[match.group('metric').lower()], match.group('op').lower() in _ABOVE,
+                           float(match.group('value')), collector=collector)
+    match = _FILE_EXISTS.match(text) or _FILE.match(text)
+    if match:
+        event = (match.groupdict().get('event') or 'exists').lower()
+        if event in ('changes', 'is modified', 'is updated', 'gets modified'):
+            event = 'modified'
+        elif event in ('is deleted', 'gets deleted', 'disappears', 'is removed'):
+            event = 'deleted'
+        else:
+            event = 'exists'
+        path = Path(match.group('path').strip('"\''))
+        if not path.is_absolute() and base_dir:
+            path = Path(base_dir) / path
+        return FileWatch(path, event, poll=file_poll)
+    match = _PROCESS.match(text)
+    if match:
+        return ProcessWatch(match.group('name'), match.group('event').lower() not in _PROCESS_GONE,
+                            poll=process_poll, table=process_table)
+    return None
+
+
+# ---------------------------------------------------------------------- runtime
+
+class PendingCommand:
+    """A submitted step graph; `future` resolves to the per-step results in step order"""
+
+    def __init__(self, command_id: int, description: str, steps: List[Dict]):
+        self.id = command_id
+        self.description = description
+        self.steps = steps
+        self.submitted = time.time()
+        self.future: concurrent.futures.Future = concurrent.futures.Future()
+        self.waiting_on: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        self._dependents: List[int] = [0] * len(steps)
+
+
+class CommandRuntime:
+    def __init__(self, pool: WorkerPool, run_step: Callable[[Dict], str], kind_of: Callable[[Dict], str],
+                 watch_for: Callable[[str], Optional[Watch]], watch_timeout: float = 3600):
+        """run_step(step) runs one blocking step on the pool under kind_of(step); watch_for(condition) compiles
+        when/once conditions. Delays, settling time and watchers are awaited on the loop and hold no worker.
+        """
+        self.pool = pool
+        self.run_step = run_step
+        self.kind_of = kind_of
+        self.watch_for = watch_for
+        self.watch_timeout = watch_timeout
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, PendingCommand] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------ lifecycle
+
+    def start(self):
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self.pool.start()
+            self._loop = asyncio.new_event_loop()
+            ready = threading.Event()
+            self._thread = threading.Thread(target=self._run_loop, args=(ready,), name="jarvis-commands",
+                                            daemon=True)
+            self._thread.start()
+        ready.wait()
+
+    def _run_loop(self, ready: threading.Event):
+        asyncio.set_event_loop(self._loop)
+        self._loop.call_soon(ready.set)
+        self._loop.run_forever()
+
+    def stop(self):
+        """Cancel everything pending and stop the loop"""
+        for command in self.pending():
+            self.cancel(command.id)
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2)
+        self.pool.stop(wait=False)
+
+    # ------------------------------------------------------------------ commands
+
+    def submit(self, steps: List[Dict], description: str = "") -> PendingCommand:
+        """Start a step graph; returns at once. Steps without 'after' wait for the previous step."""
+        self.start()
+        command = PendingCommand(next(self._ids), description, steps)
+        with self._lock:
+            self._pending[command.id] = command
+        command.future.add_done_callback(lambda _: self._forget(command.id))
+        self._loop.call_soon_threadsafe(self._launch, command)
+        return command
+
+    def _launch(self, command: PendingCommand):
+        command._task = self._loop.create_task(self._run_graph(command))
+
+        def finished(task: asyncio.Task):
+            if command.future.done():
+                return
+            if task.cancelled():
+                command.future.cancel()
+            elif task.exception() is not None:
+                command.future.set_exception(task.exception())
+            else:
+                command.future.set_result(task.result())
+        command._task.add_done_callback(finished)
+
+    def _forget(self, command_id: int):
+        with self._lock:
+            self._pending.pop(command_id, None)
+
+    def pending(self) -> List[PendingCommand]:
+        with self._lock:
+            return list(self._pending.values())
+
+    def cancel(self, command_id: int) -> bool:
+        """Cancel a pending command: its watchers and timers stop, and running steps are asked to stop"""
+        with self._lock:
+            command = self._pending.get(command_id)
+        if command is None or self._loop is None:
+            return False
+        self._loop.call_soon_threadsafe(lambda: command._task.cancel() if command._task else command.future.cancel())
+        return True
+
+    # ------------------------------------------------------------------ graph execution (on the loop)
+
+    async def _run_graph(self, command: PendingCommand) -> List[str]:
+        steps = command.steps
+        tasks: List[asyncio.Task] = []
+        for index, step in enumerate(steps):
+            deps = step.get('after', [index - 1] if index else [])
+            deps = sorted({dep for dep in deps if 0 <= dep < index})
+            for dep in deps:
+                command._dependents[dep] += 1
+            tasks.append(asyncio.ensure_future(self._run_after([tasks[dep] for dep in deps], command, index)))
+        try:
+            return list(await asyncio.gather(*tasks))
+        except asyncio.CancelledError:
+            for task in tasks:
+                task.cancel()
+            raise
+
+    async def _run_after(self, deps: List[asyncio.Task], command: PendingCommand, index: int) -> str:
+        if deps:
+            await asyncio.wait(deps)
+        step = command.steps[index]
+        try:
+            if step['type'] == 'delay':
+                await asyncio.sleep(step['seconds'])
+                return f"Waited {step['seconds']} seconds"
+            if step['type'] == 'conditional' and step.get('keyword') in WATCH_KEYWORDS:
+                return await self._watch(command, step)
+            result = await self._offload(step)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            return f"Error executing step '{step.get('raw_command', step)}': {e}"
+        # Only steps that declare settling time (app launches) hold back what depends on them
+        if step.get('settle') and command._dependents[index]:
+            await asyncio.sleep(step['settle'])
+        return result
+
+    async def _offload(self, step: Dict) -> str:
+        """Run a blocking step on the worker pool and await it without blocking the loop"""
+        loop = asyncio.get_running_loop()
+        done = loop.create_future()
+
+        def resolve(job):
+            if done.done():
+                return
+            if job.status == DONE:
+                done.set_result(job.result)
+            else:
+                done.set_exception(RuntimeError(job.error or job.status))
+
+        job = self.pool.submit(self.kind_of(step), self.run_step, step,
+                               on_done=lambda job: loop.call_soon_threadsafe(resolve, job))
+        if job.status == CANCELLED:
+            resolve(job)
+        try:
+            return await done
+        except asyncio.CancelledError:
+            self.pool.cancel(job)
+            raise
+
+    async def _watch(self, command: PendingCommand, step: Dict) -> str:
+        """when/once: wait for the condition, then run the action (or the otherwise branch on timeout)"""
+        condition = step['condition']
+        watch = self.watch_for(condition)
+        if watch is None:
+            return f"Can't watch for: {condition}"
+        command.waiting_on = watch.description
+        try:
+            await asyncio.wait_for(watch.wait(), self.watch_timeout)
+        except asyncio.TimeoutError:
+            if step.get('otherwise'):
+                result = await self._offload(self._action_step(step['otherwise']))
+                return f"Condition not met within {self.watch_timeout:g}s, {result[0].lower()}{result[1:]}"
+            return f"Condition not met within {self.watch_timeout:g}s: {condition}"
+        finally:
+            command.waiting_on = None
+        result = await self._offload(self._action_step(step['action']))
+        return f"Condition met ({condition}), {result[0].lower()}{result[1:]}"
+
+    @staticmethod
+    def _action_step(action: str) -> Dict:
+        return {'type': 'simple', 'command': action, 'raw_command': action}
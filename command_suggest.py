@@ -0,0 +1,269 @@
+"""
+Command Suggestions for JARVIS
+Autocomplete over command templates and the user's history: a prefix trie with cached top-k per node,
+frequency/recency weighting, and a trigram index for typo tolerance
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional, Set
+
+# Known commands offered before the user has any history
+COMMAND_TEMPLATES = [
+    "system status", "cpu usage", "memory usage", "disk usage", "battery status", "network analysis",
+    "performance metrics", "system health check", "system report", "list running processes",
+    "take screenshot", "set volume to 50", "mute volume", "open calculator", "open notepad", "open chrome",
+    "close notepad", "weather today", "what's the weather in London", "tell me a joke", "calculate 2+2",
+    "search python programming", "google search latest AI news", "wikipedia Alan Turing", "latest news headlines",
+    "list files", "create folder called projects", "create a file about robotics and save it as robotics_info.txt",
+    "read file notes.txt", "delete file old_notes.txt", "schedule reminder to check email in 10 minutes",
+    "schedule backup weekly", "list scheduled tasks", "cancel pending commands", "list voices", "test voice",
+    "change voice", "train wake word", "voice on", "voice off", "help",
+    "take screenshot then open calculator and type 2+2",
+    "open notepad then type 'Hello World' and save the file",
+    "get system status then take screenshot",
+    "search for weather then take screenshot of results",
+    "create folder called 'projects' then create file inside it",
+    "launch calculator, wait 2 seconds, then type 5*5",
+    "if file exists data.txt then read it, otherwise create it",
+    "when cpu is above 90 percent then list running processes",
+    "check the weather and show cpu usage",
+]
+
+MAX_KEY_LENGTH = 48     # Deeper prefixes are answered from the node at this depth and filtered
+_REBASE_AT = 60.0       # Rescale scores before 2 ** exponent gets large
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _trigrams(text: str) -> Set[str]:
+    """Per-word trigrams with a leading pad, so word starts count and word order does not"""
+    grams = set()
+    for word in text.split():
+        padded = f" {word}"
+        grams.update(padded[i:i + 3] for i in range(max(1, len(padded) - 2)))
+    return grams
+
+
+class _Node:
+    __slots__ = ('children', 'top')
+
+    def __init__(self):
+        self.children: Dict[str, '_Node'] = {}
+        self.top: List[int] = []   # entry ids, best first
+
+
+class _Entry:
+    __slots__ = ('text', 'key', 'score', 'count', 'last_used', 'history', 'grams')
+
+    def __init__(self, text: str, key: str, score: float, history: bool):
+        self.text = text
+        self.key = key
+        self.grams = 0
+        self.score = score
+        self.count = 0
+        self.last_used = 0.0
+        self.history = history
+
+
+class SuggestionIndex:
+    def __init__(self, templates=COMMAND_TEMPLATES, half_life_days: float = 14, max_history: int = 2000,
+                 width: int = 8, template_weight: float = 0.5, store=None, clock=time.time):
+        """Each use adds 2 ** ((t - epoch) / half_life) to an entry's score, so older uses count for less
+        while the ranking of untouched entries never changes; that keeps the per-node top-k caches valid.
+        """
+        self.half_life = half_life_days * 86400
+        self.max_history = max_history
+        self.width = width
+        self.template_weight = template_weight
+        self.store = store
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._templates = list(templates)
+        self._reset(clock())
+        for template in self._templates:
+            self._add(template, self.template_weight * self._weight(self._epoch), history=False)
+
+    def _reset(self, epoch: float):
+        self._epoch = epoch
+        self._root = _Node()
+        self._entries: List[_Entry] = []
+        self._ids: Dict[str, int] = {}
+        self._postings: Dict[str, List[int]] = {}
+        self._history_count = 0
+
+    def _weight(self, when: float) -> float:
+        return 2.0 ** ((when - self._epoch) / self.half_life)
+
+    # ------------------------------------------------------------------ index maintenance
+
+    def _keys(self, key: str) -> List[str]:
+        """The full text plus every word-start suffix, so "weather" finds "what's the weather" """
+        keys = [key[:MAX_KEY_LENGTH]]
+        for i, char in enumerate(key):
+            if char == ' ' and i + 1 < len(key):
+                keys.append(key[i + 1:i + 1 + MAX_KEY_LENGTH])
+        return keys
+
+    def _add(self, text: str, score: float, history: bool) -> int:
+        key = _normalize(text)
+        entry_id = self._ids.get(key)
+        if entry_id is not None:
+            return entry_id
+        entry_id = len(self._entries)
+        self._entries.append(_Entry(text.strip(), key, score, history))
+        self._ids[key] = entry_id
+        self._history_count += history
+        grams = _trigrams(key)
+        self._entries[entry_id].grams = len(grams)
+        for trigram in grams:
+            self._postings.setdefault(trigram, []).append(entry_id)
+        self._promote(entry_id)
+        return entry_id
+
+    def _promote(self, entry_id: int):
+        """Re-rank entry_id in the top lists along all its key paths (its score only ever increases)"""
+        score = self._entries[entry_id].score
+        for key in self._keys(self._entries[entry_id].key):
+            node = self._root
+            self._rank(node.top, entry_id, score)
+            for char in key:
+                node = node.children.setdefault(char, _Node())
+                self._rank(node.top, entry_id, score)
+
+    def _rank(self, top: List[int], entry_id: int, score: float):
+        if entry_id in top:
+            top.remove(entry_id)
+        elif len(top) >= self.width and self._entries[top[-1]].score >= score:
+            return
+        position = len(top)
+        while position and self._entries[top[position - 1]].score < score:
+            position -= 1
+        top.insert(position, entry_id)
+        del top[self.width:]
+
+    def _rebase(self, now: float):
+        """Move the epoch forward; every score is scaled by the same factor, so no ranking changes"""
+        factor = self._weight(now)
+        for entry in self._entries:
+            entry.score /= factor
+        self._epoch = now
+
+    def _rebuild(self) -> List[str]:
+        """Drop the weakest history entries once history outgrows max_history; returns the dropped keys"""
+        history = sorted((e for e in self._entries if e.history), key=lambda e: e.score, reverse=True)
+        keep, dropped = history[:self.max_history], history[self.max_history:]
+        templates = [e for e in self._entries if not e.history]
+        self._reset(self._epoch)
+        for entry in templates + keep:
+            entry_id = self._add(entry.text, entry.score, entry.history)
+            self._entries[entry_id].count = entry.count
+            self._entries[entry_id].last_used = entry.last_used
+        return [entry.key for entry in dropped]
+
+    def record(self, command: str, now: Optional[float] = None):
+        """Count a command the user ran: new commands join the index, known ones move up"""
+        key = _normalize(command)
+        if not key or len(key) > 200:
+            return
+        now = self._clock() if now is None else now
+        dropped: List[str] = []
+        with self._lock:
+            if (now - self._epoch) / self.half_life > _REBASE_AT:
+                self._rebase(now)
+            entry_id = self._ids.get(key)
+            if entry_id is None:
+                entry_id = self._add(command, 0.0, history=True)
+            entry = self._entries[entry_id]
+            entry.score += self._weight(now)
+            entry.count += 1
+            entry.last_used = now
+            self._promote(entry_id)
+            if self._history_count > self.max_history * 1.25:
+                dropped = self._rebuild()
+        if self.store is not None:
+            self.store.put('command_history', key, {'text': entry.text, 'count': entry.count, 'last_used': now})
+            for old in dropped:
+                self.store.delete('command_history', old)
+
+    def load_history(self, items: Dict[str, Dict]):
+        """Restore persisted history; each entry is replayed as `count` uses at its last-use time"""
+        with self._lock:
+            for key, data in items.items():
+                entry_id = self._add(data.get('text', key), 0.0, history=True)
+                entry = self._entries[entry_id]
+                entry.count = data.get('count', 1)
+                entry.last_used = data.get('last_used', self._epoch)
+                entry.score += entry.count * self._weight(entry.last_used)
+                self._promote(entry_id)
+            if self._history_count > self.max_history:
+                self._rebuild()
+
+    # ------------------------------------------------------------------ queries
+
+    def suggest(self, prefix: str, k: int = 5) -> List[str]:
+        """Top-k completions: prefix matches by weight, then trigram matches for typos if there is room"""
+        query = _normalize(prefix)
+        k = min(k, self.width)
+        with self._lock:
+            if not query:
+                return [self._entries[i].text for i in self._root.top[:k]]
+            node = self._root
+            for char in query[:MAX_KEY_LENGTH]:
+                node = node.children.get(char)
+                if node is None:
+                    break
+            results = []
+            if node is not None:
+                if len(query) > MAX_KEY_LENGTH:
+                    results = [i for i in node.top if query in self._entries[i].key][:k]
+                else:
+                    results = node.top[:k]
+            if len(results) < k and len(query) >= 3:
+                results = results + self._fuzzy(query, k - len(results), set(results))
+            return [self._entries[i].text for i in results]
+
+    def _fuzzy(self, query: str, k: int, exclude: Set[int]) -> List[int]:
+        grams = _trigrams(query)
+        overlap: Dict[int, int] = {}
+        for gram in grams:
+            for entry_id in self._postings.get(gram, ()):
+                overlap[entry_id] = overlap.get(entry_id, 0) + 1
+        needed = max(2, int(len(grams) * 0.4 + 0.999))
+        # Most shared trigrams first; ties go to the closer-sized (higher Dice) entry, then to weight
+        scored = [(count, 2 * count / (len(grams) + self._entries[entry_id].grams), self._entries[entry_id].score,
+                   entry_id) for entry_id, count in overlap.items() if count >= needed and entry_id not in exclude]
+        scored.sort(reverse=True)
+        return [entry[-1] for entry in scored[:k]]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_index: Optional[SuggestionIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_suggestion_index() -> SuggestionIndex:
+    """Shared index over the built-in templates and the persisted command history"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            try:
+                from config import Config
+                settings = getattr(Config, "SUGGESTIONS", {})
+            except Exception:
+                settings = {}
+            try:
+                from state_store import get_state_store
+                store = get_state_store()
+            except Exception as e:
+                print(f"Command history unavailable: {e}")
+                store = None
+            _index = SuggestionIndex(half_life_days=settings.get("half_life_days", 14),
+                                     max_history=settings.get("max_history", 2000), store=store)
+            if store is not None:
+                _index.load_history(store.items('command_history'))
+        return _index
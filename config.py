@@ -113,6 +113,128 @@ class Config:
         "emphasis": True       # Emphasize important words
     }
     
+    # Pre-rendered audio for phrases JARVIS says often
+    TTS_CACHE = {
+        "enabled": True,
+        "max_mb": 64,          # LRU eviction once the WAV cache grows past this
+        "prewarm": True        # Render the fixed phrase set in the background at startup
+    }
+    
+    # On-device wake word spotting (templates are enrolled with 'train wake word')
+    WAKE_WORD_SETTINGS = {
+        "engine": "local",       # local (MFCC + DTW on enrolled samples) or google
+        "threshold": None,       # None = calibrate from the spread of the enrolled samples
+        "cloud_fallback": True   # Use cloud recognition until templates have been enrolled
+    }
+    
+    # Talking over JARVIS interrupts it (needs the continuous capture pipeline)
+    BARGE_IN = {
+        "enabled": True,
+        "threshold_ratio": 3.0     # How much louder than the usual speech threshold while JARVIS talks
+    }
+    
+    # Speech-to-text backend
+    SPEECH_RECOGNITION = {
+        "backend": "google",       # google (cloud), vosk or whisper (offline, CPU)
+        "fallback": "google",      # Used when the configured backend cannot be loaded
+        "language": "en-US",
+        "vosk_model_path": os.getenv("VOSK_MODEL_PATH", ""),
+        "whisper_model": "base.en",
+        "streaming": True,         # Report partial transcripts while the user is still talking
+        "max_utterance_age_seconds": 3.0  # Speech that ended longer ago than this before a prompt is ignored
+    }
+    
+    # Background host metrics sampler (status queries read its ring buffers)
+    METRICS = {
+        "interval": 1.0,           # Seconds between samples
+        "backend": "auto",         # "procfs" (Linux, kept-open /proc fds), "psutil", or "auto"
+        "history_minutes": 60,     # In-memory history for rolling min/avg/max
+        "persist": True,           # Record samples in the on-disk metric store (data/metrics)
+        "raw_retention_days": 2,   # Full-resolution samples; older data survives as 1 min / 1 h rollups
+        "minute_retention_days": 35
+    }
+    
+    # Local OpenMetrics/Prometheus endpoint (http://host:port/metrics)
+    METRICS_EXPORTER = {
+        "enabled": os.getenv("JARVIS_METRICS_EXPORTER", "false").lower() == "true",
+        "host": "127.0.0.1",
+        "port": int(os.getenv("JARVIS_METRICS_PORT", "9464"))
+    }
+    
+    # Streaming anomaly detection over collector samples
+    ANOMALY_DETECTION = {
+        "enabled": True,
+        "window_seconds": 120,        # Rolling window for z-scores
+        "z_threshold": 4.0,
+        "sustain_seconds": 10,        # Deviation must last this long (filters short spikes)
+        "thresholds": {               # (warning, critical), compared with the EWMA baseline
+            "cpu_percent": (80, 95),
+            "memory_percent": (80, 90),
+            "swap_percent": (80, 95),
+        },
+        "leak_window_minutes": 10,    # Memory growth slope test
+        "leak_min_rise_percent": 5.0,
+        "cooldown_seconds": 600,      # Repeat an unchanged alert at most this often
+        "speak_min_severity": "critical"
+    }
+    
+    # Cached host identity and connection-table sampling (see network_state.py)
+    NETWORK = {
+        "identity_refresh_seconds": 300,   # Hostname/IP re-resolved in the background
+        "connections_interval_seconds": 30 # psutil.net_connections() is expensive on busy hosts
+    }
+    
+    # Scheduled task execution (skills/task_scheduler.py)
+    SCHEDULER = {
+        "workers": 4,
+        "concurrency": {"backup": 1, "command": 2, "system_check": 1, "weather": 1},  # Reminders are uncapped
+        "timeouts": {"command": 120, "backup": 1800, "system_check": 60, "weather": 30},
+        "priorities": {"reminder": 0},  # Lower runs first when workers are busy (default 10)
+        "misfire_policy": "fire_once",  # Runs missed while JARVIS was down: fire_once, fire_all or skip
+        "misfire_grace_seconds": 60,    # Runs later than this on startup count as missed
+        "max_catch_up_runs": 24         # Upper bound for fire_all
+    }
+    
+    # Compound command execution (skills/command_processor.py)
+    COMMANDS = {
+        "parallel_steps": 4,            # Independent steps ("X and Y") run concurrently
+        "concurrency": {"ui": 1},       # Launches and keystrokes go to the focused window one at a time
+        "timeouts": {"command": 120, "file": 180},
+        "settle_seconds": 0.5,          # Wait after an app launch before steps that act on it
+        "watch_timeout_seconds": 3600,  # "when/once" watchers give up (or run "otherwise") after this
+        "file_poll_seconds": 0.5,
+        "process_poll_seconds": 1.0     # Metric thresholds need no polling: the collector pushes samples
+    }
+    
+    # Deduplicating backups (backup_store.py)
+    BACKUP = {
+        "directory": "backups",         # Chunk store and manifests
+        "paths": ["config.py", "jarvis.py", "*.txt"],  # Files or glob patterns, relative to the working directory
+        "chunk_size_kb": 1024,
+        "large_file_mb": 8,             # Files at least this big are hashed on the parallel pool
+        "keep_last": 30                 # Older manifests are pruned and their unreferenced chunks deleted
+    }
+    
+    # Command autocomplete (command_suggest.py)
+    SUGGESTIONS = {
+        "half_life_days": 14,           # A use this old counts half as much as one today
+        "max_history": 2000             # Distinct past commands kept; the least used are dropped first
+    }
+    
+    # Tool-calling agent (agent_orchestrator.py)
+    AGENT = {
+        "model": "",                    # OpenRouter model with tool calling; empty uses OPENROUTER_MODEL
+        "max_turns": 4,                 # Model calls per task; the last one must answer without tools
+        "parallel_tools": 4,            # Tool calls from one turn run concurrently
+        "tool_timeout_seconds": 60,
+        "max_tool_output_chars": 4000,  # Longer tool results are truncated before going back to the model
+        "route_tools": True,            # Send only the BM25-selected tools with each query (tool_router.py)
+        "router_top_k": 6,
+        "router_min_score": 1.5,        # Below this best-match score every tool is sent
+        "timeout_seconds": 30,
+        "max_tokens": 800
+    }
+    
     # System Settings
     DEBUG_MODE = True
     LOG_CONVERSATIONS = True
@@ -0,0 +1,184 @@
+"""
+Event Scheduler for JARVIS
+One thread, one min-heap of deadlines: sleeps until the earliest timer (or a new earlier one) instead of polling
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from metrics_exporter import SCHEDULER_LAG
+
+
+class Timer:
+    """A pending call; cancelled timers stay in the heap and are skipped when they surface"""
+
+    __slots__ = ('when', 'seq', 'callback', 'args', 'key', 'cancelled')
+
+    def __init__(self, when: float, seq: int, callback: Callable, args: tuple, key: Optional[str]):
+        self.when = when
+        self.seq = seq
+        self.callback = callback
+        self.args = args
+        self.key = key
+        self.cancelled = False
+
+    def __lt__(self, other: 'Timer') -> bool:
+        return (self.when, self.seq) < (other.when, other.seq)
+
+
+class EventScheduler:
+    def __init__(self, clock: Callable[[], float] = time.time, max_sleep: float = 60.0,
+                 dispatch: Optional[Callable[[Timer], None]] = None):
+        """Timers keyed by wall-clock deadlines (epoch seconds).
+
+        max_sleep bounds a single wait while timers are pending so wall-clock jumps (suspend, NTP) are noticed;
+        with no timers the thread sleeps until something is scheduled. dispatch(timer) runs due timers,
+        by default inline on the scheduler thread.
+        """
+        self._clock = clock
+        self.max_sleep = max_sleep
+        self._dispatch = dispatch or self._run_inline
+        self._heap: List[Timer] = []
+        self._keys: Dict[str, Timer] = {}
+        self._cancelled = 0
+        self._seq = itertools.count()
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self.wakeups = 0
+        self.fired = 0
+
+    # ------------------------------------------------------------------ lifecycle
+
+    def start(self):
+        with self._condition:
+            if self._thread and self._thread.is_alive():
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="jarvis-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2)
+
+    # ------------------------------------------------------------------ timers
+
+    def schedule_at(self, when: float, callback: Callable, *args, key: Optional[str] = None) -> Timer:
+        """Call callback(*args) at epoch time `when`; a key replaces any pending timer with the same key"""
+        with self._condition:
+            if key is not None:
+                self._cancel_locked(self._keys.get(key))
+            timer = Timer(when, next(self._seq), callback, args, key)
+            heapq.heappush(self._heap, timer)
+            if key is not None:
+                self._keys[key] = timer
+            # Only an insertion that becomes the new earliest deadline needs to wake the thread
+            if self._heap[0] is timer:
+                self._condition.notify()
+            return timer
+
+    def schedule_many(self, entries: Iterable[Tuple[float, Callable, tuple, Optional[str]]]) -> List[Timer]:
+        """Bulk insert of (when, callback, args, key) in one heapify pass, e.g. restoring a saved queue"""
+        with self._condition:
+            timers = []
+            for when, callback, args, key in entries:
+                if key is not None:
+                    self._cancel_locked(self._keys.get(key))
+                timer = Timer(when, next(self._seq), callback, tuple(args), key)
+                if key is not None:
+                    self._keys[key] = timer
+                timers.append(timer)
+            self._heap.extend(timers)
+            heapq.heapify(self._heap)
+            self._condition.notify()
+            return timers
+
+    def schedule_in(self, delay: float, callback: Callable, *args, key: Optional[str] = None) -> Timer:
+        return self.schedule_at(self._clock() + delay, callback, *args, key=key)
+
+    def cancel(self, timer_or_key) -> bool:
+        """Cancel a Timer or the pending timer with that key; O(1), the heap entry is dropped lazily"""
+        with self._condition:
+            timer = self._keys.get(timer_or_key) if isinstance(timer_or_key, str) else timer_or_key
+            return self._cancel_locked(timer)
+
+    def _cancel_locked(self, timer: Optional[Timer]) -> bool:
+        if timer is None or timer.cancelled:
+            return False
+        timer.cancelled = True
+        if timer.key is not None and self._keys.get(timer.key) is timer:
+            del self._keys[timer.key]
+        self._cancelled += 1
+        # Keep dead entries from dominating the heap after mass cancellation
+        if self._cancelled > 64 and self._cancelled * 2 > len(self._heap):
+            self._heap = [entry for entry in self._heap if not entry.cancelled]
+            heapq.heapify(self._heap)
+            self._cancelled = 0
+        return True
+
+    def next_deadline(self) -> Optional[float]:
+        with self._condition:
+            self._discard_cancelled()
+            return self._heap[0].when if self._heap else None
+
+    def pending(self, key: str) -> Optional[Timer]:
+        with self._condition:
+            return self._keys.get(key)
+
+    def __len__(self) -> int:
+        with self._condition:
+            return len(self._heap) - self._cancelled
+
+    # ------------------------------------------------------------------ scheduler thread
+
+    def _discard_cancelled(self):
+        while self._heap and self._heap[0].cancelled:
+            heapq.heappop(self._heap)
+            self._cancelled -= 1
+
+    def _pop_due(self) -> List[Timer]:
+        """Due timers in deadline order (caller holds the lock)"""
+        now = self._clock()
+        due = []
+        while self._heap and (self._heap[0].cancelled or self._heap[0].when <= now):
+            timer = heapq.heappop(self._heap)
+            if timer.cancelled:
+                self._cancelled -= 1
+                continue
+            if timer.key is not None and self._keys.get(timer.key) is timer:
+                del self._keys[timer.key]
+            due.append(timer)
+        return due
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if not self._running:
+                    return
+                due = self._pop_due()
+                if not due:
+                    self._discard_cancelled()
+                    timeout = None
+                    if self._heap:
+                        timeout = min(self.max_sleep, max(0.0, self._heap[0].when - self._clock()))
+                    self._condition.wait(timeout)
+                    self.wakeups += 1
+                    continue
+            for timer in due:
+                SCHEDULER_LAG.observe(max(0.0, self._clock() - timer.when))
+                self.fired += 1
+                try:
+                    self._dispatch(timer)
+                except Exception as e:
+                    print(f"Scheduler error: {e}")
+
+    @staticmethod
+    def _run_inline(timer: Timer):
+        timer.callback(*timer.args)
@@ -15,6 +15,11 @@ import os
 from datetime import datetime
 import random
 
+try:
+    import readline  # Tab completion in text mode; not available on every platform
+except ImportError:
+    readline = None
+
 # Rich console for beautiful output
 from rich.console import Console
 from rich.panel import Panel
@@ -49,6 +54,10 @@ except Exception as e:
     print(f"Multi-model brain not available: {e}")
 
 from system_control import SystemControl
+from metric_store import parse_time_range
+from command_suggest import get_suggestion_index
+from anomaly_detector import SEVERITY_RANK
+from metrics_exporter import COMMAND_LATENCY, start_exporter_from_config
 
 # Skills
 from skills.weather import WeatherSkill
@@ -155,6 +164,9 @@ class JARVIS:
         
         try:
             self.system_monitor = SystemMonitor()
+            # Alerts from the streaming anomaly detector are printed (and spoken in voice modes)
+            self.speak_alerts = False
+            self.system_monitor.anomaly_detector.subscribe(self._on_system_alert)
             console.print("[green]✅ Advanced system monitor initialized[/green]")
         except Exception as e:
             console.print(f"[yellow]⚠️ System monitor failed: {e}[/yellow]")
@@ -172,12 +184,26 @@ class JARVIS:
                                                self.web_skill,
                                                self.utility_skill,
                                                self.file_skill,
-                                               multi_brain=multi_brain_ref)
+                                               multi_brain=multi_brain_ref,
+                                               system_monitor=self.system_monitor)
             except Exception as e:
                 console.print(f"[yellow]Agent initialization failed: {e}[/yellow]")
                 console.print("[yellow]Falling back to basic brain mode[/yellow]")
                 self.agent_available = False
         
+        # Pre-render greetings and stock phrases so they play without synthesis delay
+        if getattr(Config, "TTS_CACHE", {}).get("prewarm", True):
+            greetings = getattr(self.brain, "responses", {}).get("greeting", [])
+            self.voice_engine.prewarm_phrases(greetings)
+        
+        # Optional OpenMetrics endpoint for scraping host metrics and JARVIS internals
+        try:
+            exporter = start_exporter_from_config()
+            if exporter:
+                console.print(f"[green]✅ Metrics exporter listening on {exporter.url}[/green]")
+        except Exception as e:
+            console.print(f"[yellow]⚠️ Metrics exporter failed: {e}[/yellow]")
+        
         # System state
         self.is_running = False
         self.is_sleeping = False
@@ -235,7 +261,7 @@ class JARVIS:
             classification_prompt = f"""
 Analyze this command and determine its primary intent. Respond with only ONE of these categories:
 
-SYSTEM: system status, CPU usage, memory, disk space, processes, system info
+SYSTEM: system status, CPU usage, memory, disk space, processes, system info, performance monitoring
 TIME: current time, date, what time is it, calendar
 MATH: calculations, arithmetic, mathematical expressions like "10+10", "what is 5*3"
 WEATHER: weather information, forecast, temperature
@@ -316,6 +342,27 @@ Intent:"""
             
         return False  # Not handled, use agent orchestrator
 
+    def _show_compound_results(self, results, use_voice=True):
+        """Print the per-step summary of a finished compound command"""
+        summary = "Command sequence completed:\n"
+        for i, result in enumerate(results, 1):
+            summary += f"{i}. {result}\n"
+        
+        console.print(Panel(summary.strip(), title="Compound Command Results", border_style="green"))
+        
+        if use_voice:
+            self.voice_engine.speak("All command steps completed successfully")
+    
+    def _report_compound_results(self, future, use_voice=True):
+        """Completion callback for compound commands that ran in the background"""
+        if future.cancelled():
+            console.print("[yellow]Pending compound command cancelled[/yellow]")
+            return
+        try:
+            self._show_compound_results(future.result(), use_voice)
+        except Exception as e:
+            console.print(f"[red]Error processing compound command: {e}[/red]")
+    
     def process_command(self, command, use_voice=True):
         """Process and execute commands with intelligent intent classification"""
         if not command:
@@ -362,10 +409,16 @@ Intent:"""
             return
         
         # Use AI to classify and route the command intelligently
+        started = time.perf_counter()
         intent = self._classify_command_intent(command)
         console.print(f"[dim]Classified intent: {intent}[/dim]")
-        
-        # Handle the command based on its classified intent
+        try:
+            self._run_classified_command(original_command, intent, use_voice)
+        finally:
+            COMMAND_LATENCY.observe(time.perf_counter() - started, intent=intent)
+    
+    def _run_classified_command(self, original_command, intent, use_voice=True):
+        """Handle the command based on its classified intent, falling back to the agent"""
         handled = self._handle_classified_command(original_command, intent, use_voice)
         
         if not handled:
@@ -541,10 +594,36 @@ Intent:"""
             # If no clear math expression, let it go to general AI
             return False
 
+    def _on_system_alert(self, alert):
+        """Anomaly detector subscriber (runs on the metrics thread)"""
+        color = "red" if alert.severity == "critical" else "yellow"
+        console.print(f"\n[{color}]⚠️ {alert.message}[/{color}]")
+        min_severity = Config.ANOMALY_DETECTION.get("speak_min_severity", "critical")
+        if self.speak_alerts and SEVERITY_RANK.get(alert.severity, 0) >= SEVERITY_RANK.get(min_severity, 2):
+            self.voice_engine.speak(f"Warning: {alert.message.split(' (')[0]}")
+    
+    def _handle_metric_history(self, command, use_voice=True):
+        """Answer from recorded history: "average CPU yesterday afternoon", "memory usage in the last 2 hours" """
+        command_lower = command.lower()
+        if not (self.system_monitor
+                and any(word in command_lower for word in ("average", "history", "usage", "peak"))
+                and any(word in command_lower for word in ("cpu", "processor", "memory", "ram", "disk", "network", "upload", "download", "swap"))
+                and parse_time_range(command_lower)):
+            return False
+        response = self.system_monitor.get_metric_history(command_lower)
+        if use_voice:
+            self.voice_engine.speak(response)
+        else:
+            console.print(f"[blue]JARVIS:[/blue] {response}")
+        return True
+    
     def _handle_system_commands(self, command, use_voice=True):
         """Handle system-related commands"""
         command_lower = command.lower()
         
+        if self._handle_metric_history(command, use_voice):
+            return True
+        
         if any(phrase in command_lower for phrase in ["cpu usage", "processor usage", "whats the cpu"]):
             status = self.system_control.get_cpu_usage()
             if "CPU Usage:" in status:
@@ -1305,6 +1384,9 @@ Conversation Length: {model_info['conversation_length']} messages"""
             console.print(Panel(result, title="Network Status", border_style="blue"))
             return
         
+        if self._handle_metric_history(command, use_voice):
+            return
+        
         # RAM/Memory usage commands (minimal and natural)
         if "ram usage" in command or "memory usage" in command or "whats the ram" in command:
             status = self.system_control.get_memory_usage()
@@ -1379,6 +1461,23 @@ Conversation Length: {model_info['conversation_length']} messages"""
                     console.print(f"[blue]JARVIS:[/blue] {response}")
             return
         
+        if self.system_monitor and ("monitoring status" in command or "monitoring progress" in command):
+            job_id = next((word for word in command.split() if word.startswith("mon_")), None)
+            status = self.system_monitor.get_monitoring_status(job_id)
+            console.print(Panel(status, title="Performance Monitoring", border_style="yellow"))
+            if use_voice:
+                self.voice_engine.speak(status.splitlines()[0])
+            return
+        
+        if self.system_monitor and any(phrase in command for phrase in ["stop monitoring", "cancel monitoring"]):
+            job_id = next((word for word in command.split() if word.startswith("mon_")), None)
+            response = self.system_monitor.cancel_monitoring(job_id)
+            if use_voice:
+                self.voice_engine.speak(response)
+            else:
+                console.print(f"[blue]JARVIS:[/blue] {response}")
+            return
+        
         if "monitor performance" in command or "system performance" in command:
             if self.system_monitor:
                 # Extract duration if specified
@@ -1390,16 +1489,19 @@ Conversation Length: {model_info['conversation_length']} messages"""
                     except:
                         pass
                 
+                def report_when_done(job):
+                    # Runs in the background once the job finishes or is cancelled
+                    console.print(Panel(job.report, title="Performance Monitoring", border_style="yellow"))
+                    if use_voice:
+                        self.voice_engine.speak("Performance monitoring completed")
+                
+                job_id = self.system_monitor.start_monitoring(duration, on_complete=report_when_done)
+                response = (f"Monitoring system performance for {duration} minutes in the background (job {job_id}). "
+                            f"Say 'monitoring status' or 'stop monitoring' at any time.")
                 if use_voice:
                     self.voice_engine.speak(f"Monitoring system performance for {duration} minutes")
                 else:
-                    console.print(f"[blue]JARVIS:[/blue] Monitoring system performance for {duration} minutes")
-                
-                performance = self.system_monitor.monitor_performance(duration)
-                console.print(Panel(performance, title="Performance Monitoring", border_style="yellow"))
-                
-                if use_voice:
-                    self.voice_engine.speak("Performance monitoring completed")
+                    console.print(f"[blue]JARVIS:[/blue] {response}")
             else:
                 response = "Performance monitoring not available."
                 if use_voice:
@@ -1773,13 +1875,37 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
                 console.print(f"[blue]JARVIS:[/blue] {final_response}")
             return
         
+        # Pending compound commands (delays, "when/once" watchers)
+        if self.command_processor and "cancel pending" in command:
+            cancelled = self.command_processor.cancel_pending_commands()
+            response = f"Cancelled {cancelled} pending command{'s' if cancelled != 1 else ''}."
+            if use_voice:
+                self.voice_engine.speak(response)
+            else:
+                console.print(f"[blue]JARVIS:[/blue] {response}")
+            return
+        
         # Enhanced compound command processing
-        if self.command_processor and any(keyword in command for keyword in ["then", "and then", "after", ";"]):
+        if self.command_processor and any(keyword in command for keyword in
+                                          ["then", "after", ";", " and ", ", ", "when ", "once ", "wait ", "pause "]):
             try:
                 # Parse the complex command
                 steps = self.command_processor.parse_complex_command(command)
+                deferred = self.command_processor.is_deferred(steps)
                 
-                if len(steps) > 1:
+                # "when was ..." / "once upon a time ..." are questions, not watchers: leave them to the agent
+                if (len(steps) > 1 or deferred) and not self.command_processor.is_question(steps):
+                    if deferred:
+                        # Delays and watchers run on the command runtime; the session stays responsive
+                        pending = self.command_processor.start_parsed_commands(steps, description=original_command)
+                        pending.future.add_done_callback(lambda future: self._report_compound_results(future, use_voice))
+                        response = f"Started compound command with {len(steps)} steps; I'll report back when it completes."
+                        if use_voice:
+                            self.voice_engine.speak(response)
+                        else:
+                            console.print(f"[blue]JARVIS:[/blue] {response}")
+                        return
+                    
                     response = f"Executing compound command with {len(steps)} steps..."
                     if use_voice:
                         self.voice_engine.speak(response)
@@ -1788,17 +1914,7 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
                     
                     # Execute the parsed steps
                     results = self.command_processor.execute_parsed_commands(steps, use_voice)
-                    
-                    # Show execution summary
-                    summary = "Command sequence completed:\n"
-                    for i, result in enumerate(results, 1):
-                        summary += f"{i}. {result}\n"
-                    
-                    console.print(Panel(summary.strip(), title="Compound Command Results", border_style="green"))
-                    
-                    if use_voice:
-                        self.voice_engine.speak("All command steps completed successfully")
-                    
+                    self._show_compound_results(results, use_voice)
                     return
                     
             except Exception as e:
@@ -1866,12 +1982,28 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
         # Default to current model
         return self.multi_brain.current_model
     
+    def _setup_completion(self):
+        """Tab-complete whole command lines in text mode from the suggestion index"""
+        if readline is None:
+            return
+        matches = []
+        
+        def complete(text, state):
+            if state == 0:
+                matches[:] = get_suggestion_index().suggest(readline.get_line_buffer(), 8)
+            return matches[state] if state < len(matches) else None
+        
+        readline.set_completer_delims("")
+        readline.set_completer(complete)
+        readline.parse_and_bind("tab: complete")
+    
     def run_text_mode(self):
         """Run JARVIS in text-only mode"""
         console.print("[cyan]JARVIS Text Mode - Type your commands[/cyan]")
         console.print("[dim]Type 'exit', 'quit', or 'goodbye' to exit[/dim]")
         console.print("[dim]Type 'voice on' to enable voice responses[/dim]")
-        console.print("[dim]Voice commands: 'list voices', 'change voice [number/name]', 'test voice'[/dim]")
+        console.print("[dim]Voice commands: 'list voices', 'change voice [number/name]', 'test voice', 'train wake word'[/dim]")
+        self._setup_completion()
         
         use_voice = False
         
@@ -1881,6 +2013,7 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
                 
                 if not command:
                     continue
+                get_suggestion_index().record(command)
                 
                 # Toggle voice mode
                 if command.lower() in ['voice on', 'enable voice']:
@@ -1889,6 +2022,7 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
                     continue
                 elif command.lower() in ['voice off', 'disable voice']:
                     use_voice = False
+                    self.speak_alerts = False
                     console.print("[blue]JARVIS:[/blue] Voice responses disabled.")
                     continue
                 
@@ -1912,6 +2046,13 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
                 elif command.lower() in ['test voice', 'voice test']:
                     self.voice_engine.test_current_voice()
                     continue
+                elif command.lower() in ['train wake word', 'enroll wake word']:
+                    self.voice_engine.train_wake_word()
+                    continue
+                elif command.lower() in ['reset wake word']:
+                    self.voice_engine.reset_wake_word()
+                    console.print("[blue]JARVIS:[/blue] Wake word templates cleared.")
+                    continue
                 
                 if command.lower() in ['exit', 'quit', 'goodbye']:
                     console.print("[blue]JARVIS:[/blue] Goodbye!")
@@ -1957,8 +2098,10 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
         console.print("[cyan]JARVIS Voice Mode - Type your commands, JARVIS will speak responses[/cyan]")
         console.print("[dim]Type 'exit', 'quit', or 'goodbye' to exit[/dim]")
         console.print("[dim]Type 'voice off' to disable voice responses[/dim]")
+        self._setup_completion()
         
         use_voice = True
+        self.speak_alerts = True
         
         while self.is_running:
             try:
@@ -1966,6 +2109,7 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
                 
                 if not command:
                     continue
+                get_suggestion_index().record(command)
                 
                 # Toggle voice mode
                 if command.lower() in ['voice off', 'disable voice']:
@@ -1974,6 +2118,7 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
                     continue
                 elif command.lower() in ['voice on', 'enable voice']:
                     use_voice = True
+                    self.speak_alerts = True
                     self.voice_engine.speak("Voice responses enabled.")
                     continue
                 
@@ -2001,7 +2146,24 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
             return
             
         console.print("[cyan]🎤 JARVIS Voice Mode - Say 'JARVIS' to wake me up[/cyan]")
+        self.speak_alerts = True
         console.print("[dim]Press Ctrl+C to exit voice mode[/dim]")
+        detector = self.voice_engine.wake_word_detector
+        if detector is not None and not detector.is_trained:
+            console.print("[dim]Tip: run 'train wake word' in text mode to detect the wake word offline[/dim]")
+        
+        # Show interim transcripts from streaming recognizers while the user is still talking
+        last_partial = {"text": ""}
+        def show_partial(text):
+            if text and text != last_partial["text"]:
+                last_partial["text"] = text
+                console.print(f"[dim]… {text}[/dim]")
+        if not getattr(self, "_partial_listener_added", False):
+            self.voice_engine.add_partial_listener(show_partial)
+            self._partial_listener_added = True
+        
+        # Continuous capture (and barge-in) only runs while voice mode is active
+        self.voice_engine.start_voice_mode()
         
         # Greet user in voice mode
         greeting = self.get_time_greeting()
@@ -2014,10 +2176,16 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
         
         while self.is_running:
             try:
+                # Without the capture pipeline we can't tell our voice from the user's: let speech finish first.
+                # With it, listening continues while we talk and the user can barge in.
+                if self.voice_engine.audio_capture is None:
+                    self.voice_engine.wait_until_done()
+                
                 # Listen for wake word
                 if self.voice_engine.listen_for_wake_word():
-                    # Wake word detected, get command
-                    self.voice_engine.speak("Yes?")
+                    # Wake word detected, get command (a barge-in already carries it)
+                    if not self.voice_engine.has_pending_command:
+                        self.voice_engine.speak("Yes?", wait=True)
                     
                     command = self.voice_engine.listen_for_command(timeout=10, phrase_timeout=3)
                     
@@ -2040,6 +2208,8 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
             except Exception as e:
                 console.print(f"[red]Voice mode error: {e}[/red]")
                 time.sleep(1)  # Brief pause before retrying
+        
+        self.voice_engine.stop_voice_mode()
     
     def get_time_greeting(self):
         """Get appropriate greeting based on time of day"""
@@ -2060,6 +2230,9 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
         
         self.is_running = False
         
+        # Let any farewell still in the speech queue finish playing
+        self.voice_engine.shutdown(timeout=5)
+        
         console.print("[green]JARVIS systems offline. Goodbye![/green]")
         sys.exit(0)
 
@@ -10,15 +10,16 @@ from PySide6.QtWidgets import (
     QTextEdit, QLineEdit, QPushButton, QComboBox, QLabel, QSplitter,
     QTabWidget, QTreeWidget, QTreeWidgetItem, QFileDialog, QMessageBox,
     QProgressBar, QStatusBar, QMenuBar, QMenu, QCheckBox, QSpinBox,
-    QDialog, QListWidget, QDialogButtonBox
+    QDialog, QListWidget, QDialogButtonBox, QCompleter
 )
-from PySide6.QtCore import Qt, QThread, Signal, QTimer
+from PySide6.QtCore import Qt, QThread, Signal, QTimer, QStringListModel
 from PySide6.QtGui import QFont, QTextCursor, QAction
 
 # Import all JARVIS modules for full functionality
 from multi_model_brain import MultiModelBrain
 from settings_dialog import SettingsDialog
 from config import Config
+from command_suggest import get_suggestion_index
 from voice_engine import VoiceEngine
 from skills.weather import WeatherSkill
 from skills.utility import UtilitySkill
@@ -116,14 +117,8 @@ class JarvisWorker(QThread):
             # Voice output if enabled
             if self.voice_enabled and self.voice_engine:
                 try:
-                    # Shorten response for voice if it's too long
-                    voice_response = response
-                    if len(response) > 300:
-                        # Use first sentence or first 200 chars for voice
-                        sentences = response.split('. ')
-                        voice_response = sentences[0] + "." if sentences else response[:200] + "..."
-                    
-                    self.voice_engine.speak(voice_response)
+                    # Speak the full response; talking over it interrupts playback
+                    self.voice_engine.speak(response)
                 except Exception as e:
                     print(f"Voice output error: {e}")
             
@@ -153,6 +148,7 @@ class VoiceChatWorker(QThread):
     def run(self):
         """Main voice chat loop"""
         self.active = True
+        self.voice_engine.start_voice_mode()
         self.status_update.emit("Voice chat active - Start speaking...")
         
         while self.active:
@@ -174,19 +170,13 @@ class VoiceChatWorker(QThread):
                         self.response_ready.emit(response)
                         self.status_update.emit("🗣️ Speaking...")
                         
-                        # Speak the response (shorten if too long)
-                        voice_response = response
-                        if len(response) > 300:
-                            sentences = response.split('. ')
-                            voice_response = sentences[0] + "." if sentences else response[:200] + "..."
-                        
-                        self.voice_engine.speak(voice_response)
-                        
-                        # Brief pause before listening again
-                        self.msleep(1000)
+                        # With continuous capture we keep listening while speaking so the user can barge in;
+                        # otherwise finish speaking before listening again so we don't hear ourselves
+                        self.voice_engine.speak(response, wait=self.voice_engine.audio_capture is None)
                     else:
                         self.response_ready.emit("I'm not sure how to respond to that.")
-                        self.voice_engine.speak("I'm not sure how to respond to that.")
+                        self.voice_engine.speak("I'm not sure how to respond to that.",
+                                                wait=self.voice_engine.audio_capture is None)
                         
                 elif self.active:  # Only continue if still active - no timeout message
                     # Just continue listening - no status message for timeouts
@@ -198,6 +188,7 @@ class VoiceChatWorker(QThread):
                     self.error_occurred.emit(error_msg)
                     self.msleep(2000)  # Wait before retrying
         
+        self.voice_engine.stop_voice_mode()
         self.status_update.emit("Voice chat stopped")
     
     def _process_command_with_skills(self, command):
@@ -471,6 +462,8 @@ class MicrophoneSettingsDialog(QDialog):
 
 
 class MainWindow(QMainWindow):
+    alert_raised = Signal(str)
+    
     def __init__(self):
         super().__init__()
         self.setWindowTitle("JARVIS AI Assistant - Full Featured")
@@ -514,6 +507,18 @@ class MainWindow(QMainWindow):
         self.setup_ui()
         self.setup_menus()
         
+        # Optional OpenMetrics endpoint (Config.METRICS_EXPORTER)
+        try:
+            from metrics_exporter import start_exporter_from_config
+            start_exporter_from_config()
+        except Exception as e:
+            print(f"Metrics exporter not available: {e}")
+        
+        # Anomaly alerts arrive on the metrics thread; the signal hands them to the UI thread
+        self.alert_raised.connect(lambda message: self.append_text("Alert", message))
+        self.skills['system_monitor'].anomaly_detector.subscribe(
+            lambda alert: self.alert_raised.emit(f"{alert.severity.upper()}: {alert.message}"))
+        
         # Auto-refresh models
         self.refresh_models()
         
@@ -616,6 +621,13 @@ class MainWindow(QMainWindow):
         self.input = QLineEdit()
         self.input.setPlaceholderText("Type your command... (Try: 'weather', 'joke', 'system info', 'search python')")
         self.input.returnPressed.connect(self.on_send)
+        # Suggestions come ranked (and typo tolerant) from the index, so the completer must not re-filter them
+        self.suggestion_model = QStringListModel()
+        completer = QCompleter(self.suggestion_model, self.input)
+        completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        completer.setCaseSensitivity(Qt.CaseInsensitive)
+        self.input.setCompleter(completer)
+        self.input.textEdited.connect(self.update_suggestions)
         input_layout.addWidget(self.input, 1)
         
         self.btn_send = QPushButton("Send")
@@ -697,12 +709,30 @@ class MainWindow(QMainWindow):
         btn_disk_info.clicked.connect(self.show_disk_info)
         system_controls.addWidget(btn_disk_info)
         
+        self.btn_monitor = QPushButton("Monitor 5 min")
+        self.btn_monitor.clicked.connect(self.start_performance_monitoring)
+        system_controls.addWidget(self.btn_monitor)
+        
+        self.btn_stop_monitor = QPushButton("Stop Monitoring")
+        self.btn_stop_monitor.clicked.connect(self.stop_performance_monitoring)
+        self.btn_stop_monitor.setEnabled(False)
+        system_controls.addWidget(self.btn_stop_monitor)
+        
         layout.addLayout(system_controls)
         
+        # Progress of the background monitoring job, polled by the refresh timer
+        self.monitor_status = QLabel("")
+        layout.addWidget(self.monitor_status)
+        self.monitor_job_id = None
+        
         self.tab_widget.addTab(system_widget, "System")
         
-        # Auto-refresh system info
+        # Auto-refresh system info; reads come from the background sampler so this never blocks the UI
         self.refresh_system_info()
+        self.system_refresh_timer = QTimer(self)
+        self.system_refresh_timer.timeout.connect(self.refresh_system_info)
+        self.system_refresh_timer.timeout.connect(self.refresh_monitoring_status)
+        self.system_refresh_timer.start(2000)
     
     def setup_menus(self):
         """Setup application menus"""
@@ -757,11 +787,15 @@ class MainWindow(QMainWindow):
         msg = self.brain.switch_model(name)
         self.append_text("System", msg)
     
+    def update_suggestions(self, text):
+        self.suggestion_model.setStringList(get_suggestion_index().suggest(text, 8) if text.strip() else [])
+    
     def on_send(self):
         text = self.input.text().strip()
         if not text:
             return
         
+        get_suggestion_index().record(text)
         self.append_text("You", text)
         self.input.clear()
         
@@ -905,16 +939,56 @@ class MainWindow(QMainWindow):
                 self.system_info.setText(info)
             else:
                 import psutil
+                from metrics_collector import get_collector
+                sample = get_collector().latest()
                 info = f"""
 System Information:
-CPU Usage: {psutil.cpu_percent()}%
-Memory Usage: {psutil.virtual_memory().percent}%
+CPU Usage: {sample.get('cpu_percent', 0.0):.1f}%
+Memory Usage: {sample.get('memory_percent', 0.0):.1f}%
 Disk Usage: {psutil.disk_usage('/').percent}%
 """
                 self.system_info.setText(info)
         except Exception as e:
             self.system_info.setText(f"Error getting system info: {e}")
     
+    def start_performance_monitoring(self):
+        """Start a 5 minute background monitoring job without blocking the UI"""
+        if 'system_monitor' not in self.skills:
+            return
+        self.monitor_job_id = self.skills['system_monitor'].start_monitoring(5)
+        self.btn_monitor.setEnabled(False)
+        self.btn_stop_monitor.setEnabled(True)
+        self.append_text("System", f"Performance monitoring started (job {self.monitor_job_id})")
+        self.refresh_monitoring_status()
+    
+    def stop_performance_monitoring(self):
+        """Cancel the running monitoring job"""
+        if self.monitor_job_id and 'system_monitor' in self.skills:
+            self.skills['system_monitor'].cancel_monitoring(self.monitor_job_id)
+            self.refresh_monitoring_status()
+    
+    def refresh_monitoring_status(self):
+        """Show live progress of the monitoring job and its report once done"""
+        if not self.monitor_job_id or 'system_monitor' not in self.skills:
+            return
+        monitor = self.skills['system_monitor']
+        job = monitor.get_monitoring_job(self.monitor_job_id)
+        if job is None:
+            return
+        progress = job.progress()
+        if job.is_running:
+            self.monitor_status.setText(
+                f"Monitoring {progress['id']}: {progress['percent']:.0f}% - "
+                f"CPU {progress['cpu_now']:.1f}% (avg {progress['cpu_avg']:.1f}%), "
+                f"Memory {progress['memory_now']:.1f}%"
+            )
+            return
+        self.monitor_status.setText(f"Monitoring {progress['id']}: {progress['status']}")
+        self.append_text("System", monitor.get_monitoring_status(self.monitor_job_id))
+        self.monitor_job_id = None
+        self.btn_monitor.setEnabled(True)
+        self.btn_stop_monitor.setEnabled(False)
+    
     def show_memory_info(self):
         """Show detailed memory information"""
         try:
@@ -0,0 +1,415 @@
+"""
+Columnar Metric Store for JARVIS
+Append-only, time-chunked binary columns with raw -> 1 minute -> 1 hour rollups and memory-mapped range queries
+"""
+
+import os
+import re
+import shutil
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from metrics_collector import FIELDS
+
+# (level, bucket width in seconds, chunk span in seconds); raw rows are stored as sampled
+LEVELS = (
+    ('raw', 0, 3600),
+    ('1m', 60, 86400),
+    ('1h', 3600, 86400 * 32),
+)
+_LEVEL = {name: (resolution, span) for name, resolution, span in LEVELS}
+
+DEFAULT_RETENTION = {
+    'raw': 2 * 86400,
+    '1m': 35 * 86400,
+    '1h': None,
+}
+
+TIME_DTYPE = np.dtype('<f8')
+VALUE_DTYPE = np.dtype('<f4')
+COUNT_DTYPE = np.dtype('<u4')
+STATS = ('avg', 'min', 'max')
+
+
+class _Rollup:
+    """Running aggregate for the open bucket of one rollup level"""
+
+    def __init__(self, width: int, fields: int):
+        self.width = width
+        self.bucket: Optional[float] = None
+        self.count = 0
+        self.total = np.zeros(fields, dtype=np.float64)
+        self.low = np.full(fields, np.inf)
+        self.high = np.full(fields, -np.inf)
+
+    def add(self, times: np.ndarray, counts: np.ndarray, avgs: np.ndarray, lows: np.ndarray,
+            highs: np.ndarray) -> Optional[Tuple[np.ndarray, ...]]:
+        """Fold rows (sorted by time) into buckets; returns the buckets that closed, or None"""
+        buckets = np.floor(times / self.width) * self.width
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        keys = buckets[starts]
+        weights = counts.astype(np.float64)
+        group_counts = np.add.reduceat(weights, starts)
+        group_totals = np.add.reduceat(avgs * weights[:, None], starts, axis=0)
+        group_lows = np.minimum.reduceat(lows, starts, axis=0)
+        group_highs = np.maximum.reduceat(highs, starts, axis=0)
+
+        if self.bucket is not None and keys[0] == self.bucket:
+            group_counts[0] += self.count
+            group_totals[0] += self.total
+            group_lows[0] = np.minimum(group_lows[0], self.low)
+            group_highs[0] = np.maximum(group_highs[0], self.high)
+        elif self.bucket is not None:
+            # The open bucket closes before the first new one
+            keys = np.r_[self.bucket, keys]
+            group_counts = np.r_[self.count, group_counts]
+            group_totals = np.vstack([self.total, group_totals])
+            group_lows = np.vstack([self.low, group_lows])
+            group_highs = np.vstack([self.high, group_highs])
+
+        # The last bucket stays open for future samples
+        self.bucket = float(keys[-1])
+        self.count = int(group_counts[-1])
+        self.total = group_totals[-1].copy()
+        self.low = group_lows[-1].copy()
+        self.high = group_highs[-1].copy()
+        if len(keys) == 1:
+            return None
+        closed = slice(0, len(keys) - 1)
+        counts_out = group_counts[closed]
+        return (keys[closed], counts_out, group_totals[closed] / counts_out[:, None],
+                group_lows[closed], group_highs[closed])
+
+    def drain(self) -> Optional[Tuple[np.ndarray, ...]]:
+        """Close the open bucket (used on shutdown so partial minutes are not lost)"""
+        if self.bucket is None or self.count == 0:
+            return None
+        row = (np.array([self.bucket]), np.array([float(self.count)]), (self.total / self.count)[None, :],
+               self.low[None, :], self.high[None, :])
+        self.bucket, self.count = None, 0
+        self.total[:] = 0
+        self.low[:] = np.inf
+        self.high[:] = -np.inf
+        return row
+
+
+class MetricStore:
+    def __init__(self, root, fields: Sequence[str] = FIELDS, retention: Optional[Dict[str, Optional[float]]] = None,
+                 flush_rows: int = 60):
+        """Open (or create) a store under root; raw rows are buffered and written every flush_rows samples.
+
+        Layout: root/<level>/<chunk start>/time.f8 plus one fixed-width column file per field
+        (raw: <field>.f4; rollups: count.u4 and <field>.avg|min|max.f4).
+        """
+        self.root = Path(root)
+        self.fields = tuple(fields)
+        self._index = {name: i for i, name in enumerate(self.fields)}
+        self.retention = dict(DEFAULT_RETENTION, **(retention or {}))
+        self.flush_rows = flush_rows
+
+        self._lock = threading.RLock()
+        self._pending_times: List[float] = []
+        self._pending_values: List[np.ndarray] = []
+        self._rollups = {name: _Rollup(resolution, len(self.fields)) for name, resolution, _ in LEVELS if resolution}
+        self._last_chunk: Optional[float] = None
+        for name, _, _ in LEVELS:
+            (self.root / name).mkdir(parents=True, exist_ok=True)
+
+    # ------------------------------------------------------------------ writing
+
+    def append(self, timestamp: float, values) -> None:
+        """Append one sample; values is a mapping of field -> value or a sequence in field order"""
+        if isinstance(values, dict):
+            row = np.array([values.get(name, 0.0) for name in self.fields], dtype=np.float64)
+        else:
+            row = np.asarray(values, dtype=np.float64)
+        with self._lock:
+            self._pending_times.append(float(timestamp))
+            self._pending_values.append(row)
+            if len(self._pending_times) >= self.flush_rows:
+                self.flush()
+
+    def append_sample(self, sample: Dict) -> None:
+        """MetricsCollector listener: store the scalar fields of one sample"""
+        self.append(sample['timestamp'], sample)
+
+    def append_many(self, timestamps, values) -> None:
+        """Append a batch of samples (timestamps ascending, values shaped [rows, fields])"""
+        times = np.asarray(timestamps, dtype=np.float64)
+        rows = np.asarray(values, dtype=np.float64).reshape(len(times), len(self.fields))
+        with self._lock:
+            self.flush()
+            self._write_raw(times, rows)
+
+    def flush(self) -> None:
+        """Write buffered raw samples (and any rollup buckets they close) to disk"""
+        with self._lock:
+            if not self._pending_times:
+                return
+            times = np.array(self._pending_times, dtype=np.float64)
+            rows = np.vstack(self._pending_values)
+            self._pending_times.clear()
+            self._pending_values.clear()
+            self._write_raw(times, rows)
+
+    def close(self) -> None:
+        """Flush raw data and the open rollup buckets"""
+        with self._lock:
+            self.flush()
+            closed = self._rollups['1m'].drain()
+            if closed is not None:
+                self._write_rollup('1m', *closed)
+                closed = self._rollups['1h'].add(*closed)
+                if closed is not None:
+                    self._write_rollup('1h', *closed)
+            closed = self._rollups['1h'].drain()
+            if closed is not None:
+                self._write_rollup('1h', *closed)
+
+    def _write_raw(self, times: np.ndarray, rows: np.ndarray) -> None:
+        for chunk, part in self._split(times, _LEVEL['raw'][1]):
+            columns = {'time.f8': times[part].astype(TIME_DTYPE)}
+            for name, i in self._index.items():
+                columns[f'{name}.f4'] = rows[part, i].astype(VALUE_DTYPE)
+            self._append_columns('raw', chunk, columns)
+
+        ones = np.ones(len(times))
+        closed = self._rollups['1m'].add(times, ones, rows, rows, rows)
+        if closed is not None:
+            self._write_rollup('1m', *closed)
+            closed = self._rollups['1h'].add(*closed)
+            if closed is not None:
+                self._write_rollup('1h', *closed)
+
+        chunk = float(np.floor(times[-1] / _LEVEL['raw'][1]) * _LEVEL['raw'][1])
+        if chunk != self._last_chunk:
+            self._last_chunk = chunk
+            self.enforce_retention(now=float(times[-1]))
+
+    def _write_rollup(self, level: str, times, counts, avgs, lows, highs) -> None:
+        for chunk, part in self._split(times, _LEVEL[level][1]):
+            columns = {'time.f8': times[part].astype(TIME_DTYPE), 'count.u4': counts[part].astype(COUNT_DTYPE)}
+            for name, i in self._index.items():
+                columns[f'{name}.avg.f4'] = avgs[part, i].astype(VALUE_DTYPE)
+                columns[f'{name}.min.f4'] = lows[part, i].astype(VALUE_DTYPE)
+                columns[f'{name}.max.f4'] = highs[part, i].astype(VALUE_DTYPE)
+            self._append_columns(level, chunk, columns)
+
+    @staticmethod
+    def _split(times: np.ndarray, span: int):
+        """Yield (chunk start, slice) for runs of rows falling in the same chunk"""
+        chunks = np.floor(times / span) * span
+        edges = np.flatnonzero(np.r_[True, chunks[1:] != chunks[:-1], True])
+        for begin, end in zip(edges[:-1], edges[1:]):
+            yield float(chunks[begin]), slice(begin, end)
+
+    def _append_columns(self, level: str, chunk: float, columns: Dict[str, np.ndarray]) -> None:
+        directory = self.root / level / str(int(chunk))
+        directory.mkdir(exist_ok=True)
+        for filename, data in columns.items():
+            with open(directory / filename, 'ab') as f:
+                f.write(data.tobytes())
+
+    # ------------------------------------------------------------------ retention
+
+    def enforce_retention(self, now: Optional[float] = None) -> int:
+        """Delete chunks that lie entirely outside each level's retention; returns chunks removed"""
+        now = time.time() if now is None else now
+        removed = 0
+        for level, _, span in LEVELS:
+            keep = self.retention.get(level)
+            if keep is None:
+                continue
+            for chunk in self._chunks(level):
+                if chunk + span <= now - keep:
+                    shutil.rmtree(self.root / level / str(int(chunk)), ignore_errors=True)
+                    removed += 1
+        return removed
+
+    # ------------------------------------------------------------------ reading
+
+    def _chunks(self, level: str) -> List[float]:
+        try:
+            names = os.listdir(self.root / level)
+        except FileNotFoundError:
+            return []
+        return sorted(float(name) for name in names if name.isdigit())
+
+    def _read(self, level: str, columns: Sequence[str], start: float, end: float) -> Dict[str, np.ndarray]:
+        """Rows with start <= time < end from every overlapping chunk, columns memory-mapped"""
+        span = _LEVEL[level][1]
+        parts: Dict[str, List[np.ndarray]] = {name: [] for name in ('time.f8',) + tuple(columns)}
+        for chunk in self._chunks(level):
+            if chunk + span <= start or chunk >= end:
+                continue
+            directory = self.root / level / str(int(chunk))
+            maps = {name: self._map(directory / name) for name in parts}
+            # A crash can leave columns of different lengths; only whole rows count
+            rows = min(len(m) for m in maps.values())
+            if rows == 0:
+                continue
+            times = maps['time.f8'][:rows]
+            lo, hi = np.searchsorted(times, [start, end], side='left')
+            for name, m in maps.items():
+                parts[name].append(np.array(m[lo:hi]))
+        return {
+            name: np.concatenate(arrays) if arrays else np.zeros(0, dtype=self._dtype(name))
+            for name, arrays in parts.items()
+        }
+
+    @staticmethod
+    def _dtype(filename: str) -> np.dtype:
+        return {'f8': TIME_DTYPE, 'f4': VALUE_DTYPE, 'u4': COUNT_DTYPE}[filename.rsplit('.', 1)[1]]
+
+    def _map(self, path: Path) -> np.ndarray:
+        dtype = self._dtype(path.name)
+        try:
+            size = path.stat().st_size
+        except FileNotFoundError:
+            return np.zeros(0, dtype=dtype)
+        rows = size // dtype.itemsize
+        if rows == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode='r', shape=(rows,))
+
+    def choose_level(self, start: float, now: Optional[float] = None) -> str:
+        """Finest level whose retention still covers start"""
+        now = time.time() if now is None else now
+        for level, _, _ in LEVELS:
+            keep = self.retention.get(level)
+            if keep is None or start >= now - keep:
+                return level
+        return LEVELS[-1][0]
+
+    def query(self, field: str, start: float, end: float, level: Optional[str] = None,
+              stat: str = 'avg') -> Tuple[np.ndarray, np.ndarray]:
+        """(timestamps, values) of one field in [start, end); rollup levels return the chosen stat per bucket"""
+        if field not in self._index:
+            raise KeyError(f"Unknown metric: {field}")
+        with self._lock:
+            self.flush()
+        level = level or self.choose_level(start)
+        column = f'{field}.f4' if level == 'raw' else f'{field}.{stat}.f4'
+        data = self._read(level, [column], start, end)
+        return data['time.f8'], data[column].astype(np.float64)
+
+    def aggregate(self, field: str, start: float, end: float, level: Optional[str] = None) -> Dict:
+        """min/avg/max and sample count of one field over [start, end)"""
+        if field not in self._index:
+            raise KeyError(f"Unknown metric: {field}")
+        with self._lock:
+            self.flush()
+        level = level or self.choose_level(start)
+        if level == 'raw':
+            values = self._read(level, [f'{field}.f4'], start, end)[f'{field}.f4'].astype(np.float64)
+            if len(values) == 0:
+                return {'min': 0.0, 'avg': 0.0, 'max': 0.0, 'samples': 0, 'level': level}
+            return {'min': float(values.min()), 'avg': float(values.mean()), 'max': float(values.max()),
+                    'samples': int(len(values)), 'level': level}
+
+        columns = ['count.u4'] + [f'{field}.{stat}.f4' for stat in STATS]
+        data = self._read(level, columns, start, end)
+        counts = data['count.u4'].astype(np.float64)
+        total = counts.sum()
+        if total == 0:
+            return {'min': 0.0, 'avg': 0.0, 'max': 0.0, 'samples': 0, 'level': level}
+        return {
+            'min': float(data[f'{field}.min.f4'].min()),
+            'avg': float((data[f'{field}.avg.f4'] * counts).sum() / total),
+            'max': float(data[f'{field}.max.f4'].max()),
+            'samples': int(total),
+            'level': level,
+        }
+
+    def time_span(self) -> Tuple[Optional[float], Optional[float]]:
+        """Oldest and newest timestamps available at any level"""
+        with self._lock:
+            self.flush()
+        oldest = newest = None
+        for level, _, _ in LEVELS:
+            for chunk in self._chunks(level):
+                times = self._map(self.root / level / str(int(chunk)) / 'time.f8')
+                if len(times):
+                    oldest = float(times[0]) if oldest is None else min(oldest, float(times[0]))
+                    newest = float(times[-1]) if newest is None else max(newest, float(times[-1]))
+        return oldest, newest
+
+
+# ---------------------------------------------------------------------- natural-language time ranges
+
+_DAY_PARTS = {
+    'morning': (6, 12),
+    'afternoon': (12, 18),
+    'evening': (18, 22),
+    'night': (22, 30),
+}
+_UNITS = {'minute': 60, 'min': 60, 'hour': 3600, 'day': 86400, 'week': 7 * 86400}
+# Whole phrases only: "this machine" or "this process" is not a time range
+_TODAY = re.compile(r'\b(?:today|tonight|this\s+(?:morning|afternoon|evening|night))\b')
+_THIS_WEEK = re.compile(r'\bthis\s+week\b')
+
+
+def parse_time_range(text: str, now: Optional[float] = None) -> Optional[Tuple[float, float, str]]:
+    """Turn phrases like 'yesterday afternoon', 'last 2 hours', 'this morning' or 'this week' into (start, end, label)"""
+    now = time.time() if now is None else now
+    text = text.lower()
+
+    match = re.search(r'\b(?:last|past)\s+(\d+|an?|one)?\s*(minute|min|hour|day|week)s?\b', text)
+    if match:
+        amount = match.group(1)
+        count = int(amount) if amount and amount.isdigit() else 1
+        seconds = count * _UNITS[match.group(2)]
+        unit = match.group(2) if match.group(2) != 'min' else 'minute'
+        label = f"last {count} {unit}s" if count != 1 else f"last {unit}"
+        return now - seconds, now, label
+
+    today = datetime.fromtimestamp(now).replace(hour=0, minute=0, second=0, microsecond=0)
+    if 'last night' in text:
+        day, part, label = today - timedelta(days=1), 'night', "last night"
+    elif 'yesterday' in text:
+        day, part, label = today - timedelta(days=1), None, "yesterday"
+    elif _TODAY.search(text):
+        day, part, label = today, None, "today"
+    elif _THIS_WEEK.search(text):
+        return (today - timedelta(days=today.weekday())).timestamp(), now, "this week"
+    else:
+        return None
+
+    if part is None:
+        part = next((name for name in _DAY_PARTS if name in text), None)
+        if 'tonight' in text:
+            part = 'night'
+        if part:
+            label = f"{label} {part}" if label == "yesterday" else f"this {part}"
+    if part is None:
+        start, end = day, day + timedelta(days=1)
+    else:
+        first, last = _DAY_PARTS[part]
+        start, end = day + timedelta(hours=first), day + timedelta(hours=last)
+    return start.timestamp(), min(end.timestamp(), now), label
+
+
+_store: Optional[MetricStore] = None
+_store_lock = threading.Lock()
+
+
+def get_metric_store() -> MetricStore:
+    """Shared store under Config.DATA_DIR/metrics"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            from config import Config
+            settings = getattr(Config, "METRICS", {})
+            _store = MetricStore(
+                Path(Config.DATA_DIR) / "metrics",
+                retention={
+                    'raw': settings.get("raw_retention_days", 2) * 86400,
+                    '1m': settings.get("minute_retention_days", 35) * 86400,
+                },
+            )
+        return _store
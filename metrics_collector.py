@@ -0,0 +1,265 @@
+"""
+Background Metrics Collector for JARVIS
+One sampler thread records host metrics into preallocated NumPy ring buffers; status queries read them instantly
+"""
+
+import atexit
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import psutil
+
+from collector_backends import create_backend
+
+# Scalar columns stored per sample
+FIELDS = (
+    'cpu_percent',
+    'memory_percent',
+    'memory_used',
+    'memory_available',
+    'swap_percent',
+    'disk_read_bps',
+    'disk_write_bps',
+    'net_sent_bps',
+    'net_recv_bps',
+)
+_COLUMN = {name: index for index, name in enumerate(FIELDS)}
+
+
+class MetricsCollector:
+    def __init__(self, interval: float = 1.0, history_seconds: float = 3600, sampler: Optional[Callable] = None,
+                 cores: Optional[int] = None):
+        """Initialize ring buffers sized for history_seconds of samples taken every interval seconds.
+
+        sampler is any callable returning raw counters; by default the platform's collector backend.
+        """
+        self.interval = interval
+        self.sampler = sampler or create_backend()
+        # Leave room for faster sampling requested by monitoring jobs
+        self.capacity = max(2, int(history_seconds / min(interval, 0.5)))
+        self.cores = cores or psutil.cpu_count(logical=True) or 1
+
+        self._times = np.zeros(self.capacity, dtype=np.float64)
+        self._values = np.zeros((self.capacity, len(FIELDS)), dtype=np.float64)
+        self._per_core = np.zeros((self.capacity, self.cores), dtype=np.float32)
+        self._count = 0
+        self._next = 0
+
+        self._lock = threading.Lock()
+        self._has_sample = threading.Event()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._listeners: List[Callable[[Dict], None]] = []
+        self._interval_requests: Dict[str, float] = {}
+
+        self._previous: Optional[Tuple[float, Dict]] = None
+        self._latest: Dict = {}
+
+    # ------------------------------------------------------------------ lifecycle
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._running = True
+        # Prime the backend's CPU baseline so the first real sample is meaningful
+        self._previous = (time.time(), self.sampler())
+        self._thread = threading.Thread(target=self._run, name="jarvis-metrics", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        self._wakeup.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2)
+
+    @property
+    def is_running(self) -> bool:
+        return self._running and self._thread is not None and self._thread.is_alive()
+
+    def request_interval(self, owner: str, seconds: Optional[float]):
+        """Ask for faster sampling (e.g. while a monitoring job runs); None withdraws the request"""
+        with self._lock:
+            if seconds is None:
+                self._interval_requests.pop(owner, None)
+            else:
+                self._interval_requests[owner] = seconds
+        self._wakeup.set()
+
+    @property
+    def current_interval(self) -> float:
+        with self._lock:
+            return min([self.interval] + list(self._interval_requests.values()))
+
+    def add_listener(self, callback: Callable[[Dict], None]):
+        """Call callback(sample) on the collector thread after every sample"""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _run(self):
+        # A short first wait gives the backend enough of a CPU window without delaying the first query by a full interval
+        delay = min(0.1, self.current_interval)
+        while self._running:
+            self._wakeup.wait(delay)
+            delay = self.current_interval
+            self._wakeup.clear()
+            if not self._running:
+                break
+            try:
+                self.sample_once()
+            except Exception:
+                pass
+
+    # ------------------------------------------------------------------ sampling
+
+    def sample_once(self, now: Optional[float] = None) -> Dict:
+        """Take one sample, convert counters to rates and append it to the ring"""
+        now = time.time() if now is None else now
+        raw = self.sampler()
+        per_core = list(raw.get('per_core') or [])
+        cpu = float(np.mean(per_core)) if per_core else float(raw.get('cpu_percent', 0.0))
+
+        rates = {'disk_read_bps': 0.0, 'disk_write_bps': 0.0, 'net_sent_bps': 0.0, 'net_recv_bps': 0.0}
+        if self._previous is not None:
+            last_time, last = self._previous
+            elapsed = max(now - last_time, 1e-6)
+            rates['disk_read_bps'] = self._rate(raw, last, 'disk_io', 'read_bytes', elapsed)
+            rates['disk_write_bps'] = self._rate(raw, last, 'disk_io', 'write_bytes', elapsed)
+            rates['net_sent_bps'] = self._rate(raw, last, 'net_io', 'bytes_sent', elapsed)
+            rates['net_recv_bps'] = self._rate(raw, last, 'net_io', 'bytes_recv', elapsed)
+        self._previous = (now, raw)
+
+        sample = {
+            'timestamp': now,
+            'cpu_percent': cpu,
+            'per_core': per_core,
+            'memory_percent': float(raw.get('memory_percent', 0.0)),
+            'memory_used': float(raw.get('memory_used', 0.0)),
+            'memory_available': float(raw.get('memory_available', 0.0)),
+            'memory_total': float(raw.get('memory_total', 0.0)),
+            'swap_percent': float(raw.get('swap_percent', 0.0)),
+            'disk_io': raw.get('disk_io'),
+            'net_io': raw.get('net_io'),
+            **rates,
+        }
+
+        with self._lock:
+            row = self._next
+            self._times[row] = now
+            self._values[row] = [sample[name] for name in FIELDS]
+            cores = min(len(per_core), self.cores)
+            self._per_core[row, :cores] = per_core[:cores]
+            self._next = (row + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+            self._latest = sample
+        self._has_sample.set()
+
+        for callback in list(self._listeners):
+            try:
+                callback(sample)
+            except Exception:
+                pass
+        return sample
+
+    @staticmethod
+    def _rate(raw: Dict, last: Dict, group: str, key: str, elapsed: float) -> float:
+        current, previous = raw.get(group), last.get(group)
+        if not current or not previous:
+            return 0.0
+        # Counters can reset (e.g. interface re-created); never report negative throughput
+        return max(0.0, (current[key] - previous[key]) / elapsed)
+
+    # ------------------------------------------------------------------ queries
+
+    def wait_for_sample(self, timeout: Optional[float] = None) -> bool:
+        """Block until the first sample exists (at most one interval after start)"""
+        if timeout is None:
+            timeout = self.current_interval * 2 + 0.5
+        return self._has_sample.wait(timeout)
+
+    def latest(self) -> Dict:
+        """Most recent sample, as a dict; empty if nothing has been sampled yet"""
+        if not self._has_sample.is_set():
+            self.wait_for_sample()
+        with self._lock:
+            return dict(self._latest)
+
+    def _window_rows(self, seconds: Optional[float]) -> np.ndarray:
+        """Indices of samples within the last `seconds` (caller holds the lock)"""
+        if self._count == 0:
+            return np.zeros(0, dtype=np.int64)
+        rows = (self._next - self._count + np.arange(self._count)) % self.capacity
+        if seconds is None:
+            return rows
+        cutoff = self._times[(self._next - 1) % self.capacity] - seconds
+        return rows[self._times[rows] >= cutoff]
+
+    def history(self, field: str, seconds: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(timestamps, values) for one field over the last `seconds`, oldest first"""
+        with self._lock:
+            rows = self._window_rows(seconds)
+            if field == 'per_core':
+                return self._times[rows].copy(), self._per_core[rows].copy()
+            return self._times[rows].copy(), self._values[rows, _COLUMN[field]].copy()
+
+    def window(self, field: str, seconds: float = 60) -> Dict:
+        """Rolling min/avg/max of one field over the last `seconds`"""
+        _, values = self.history(field, seconds)
+        if len(values) == 0:
+            return {'min': 0.0, 'avg': 0.0, 'max': 0.0, 'samples': 0}
+        return {
+            'min': float(values.min()),
+            'avg': float(values.mean()),
+            'max': float(values.max()),
+            'samples': int(len(values)),
+        }
+
+    def summary(self, seconds: float = 60) -> Dict[str, Dict]:
+        """Rolling min/avg/max for every field at once (one vectorized pass)"""
+        with self._lock:
+            rows = self._window_rows(seconds)
+            values = self._values[rows]
+        if len(values) == 0:
+            return {}
+        mins, means, maxes = values.min(axis=0), values.mean(axis=0), values.max(axis=0)
+        return {
+            name: {'min': float(mins[i]), 'avg': float(means[i]), 'max': float(maxes[i]), 'samples': len(values)}
+            for i, name in enumerate(FIELDS)
+        }
+
+
+_collector: Optional[MetricsCollector] = None
+_collector_lock = threading.Lock()
+
+
+def get_collector() -> MetricsCollector:
+    """Shared process-wide collector, started on first use"""
+    global _collector
+    with _collector_lock:
+        if _collector is None:
+            try:
+                from config import Config
+                settings = getattr(Config, "METRICS", {})
+            except Exception:
+                settings = {}
+            _collector = MetricsCollector(
+                interval=settings.get("interval", 1.0),
+                history_seconds=settings.get("history_minutes", 60) * 60,
+                sampler=create_backend(settings.get("backend", "auto"))
+            )
+            if settings.get("persist", True):
+                # Every sample also goes to the on-disk store for long-range history queries
+                try:
+                    from metric_store import get_metric_store
+                    store = get_metric_store()
+                    _collector.add_listener(store.append_sample)
+                    atexit.register(store.close)
+                except Exception as e:
+                    print(f"Metric store unavailable: {e}")
+            _collector.start()
+        return _collector
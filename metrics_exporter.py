@@ -0,0 +1,353 @@
+"""
+OpenMetrics Exporter for JARVIS
+In-process counters/histograms for JARVIS internals plus host metrics, served as OpenMetrics text over local HTTP
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    type = "unknown"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Labels:
+        return tuple((name, str(labels.get(name, ""))) for name in self.label_names)
+
+    def render(self, openmetrics: bool = True) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        super().__init__(name, help, labels)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self, openmetrics: bool = True) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        # OpenMetrics names the family without _total; the 0.0.4 text format uses the sample name
+        family = self.name if openmetrics else f"{self.name}_total"
+        lines = [f"# TYPE {family} counter", f"# HELP {family} {self.help}"]
+        lines += [f"{self.name}_total{_format_labels(key)} {_format_value(value)}" for key, value in values]
+        return lines
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        super().__init__(name, help, labels)
+        self._values: Dict[Labels, float] = {}
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def render(self, openmetrics: bool = True) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        lines = [f"# TYPE {self.name} gauge", f"# HELP {self.name} {self.help}"]
+        lines += [f"{self.name}{_format_labels(key)} {_format_value(value)}" for key, value in values]
+        return lines
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [per-bucket counts (+Inf last), sum]
+        self._series: Dict[Labels, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the with-block, even when it raises"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels) -> int:
+        series = self._series.get(self._key(labels))
+        return sum(series[0]) if series else 0
+
+    def render(self, openmetrics: bool = True) -> List[str]:
+        with self._lock:
+            snapshot = [(key, list(series[0]), series[1]) for key, series in self._series.items()]
+        lines = [f"# TYPE {self.name} histogram", f"# HELP {self.name} {self.help}"]
+        bounds = self.buckets + (float('inf'),)
+        for key, counts, total in snapshot:
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(key, ('le', _format_value(bound)))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {cumulative}")
+        return lines
+
+
+class CallbackMetric(_Metric):
+    """Gauge or counter whose samples are read at scrape time (costs nothing between scrapes)"""
+
+    def __init__(self, name: str, help: str, type: str,
+                 func: Callable[[], Iterable[Tuple[Dict[str, str], float]]]):
+        super().__init__(name, help)
+        self.type = type
+        self.func = func
+        self._last_error = None
+
+    def render(self, openmetrics: bool = True) -> List[str]:
+        try:
+            samples = list(self.func())
+        except Exception as e:
+            # Skip the family for this scrape; report each distinct failure once rather than every scrape
+            if repr(e) != self._last_error:
+                self._last_error = repr(e)
+                print(f"Metric callback {self.name} failed: {e!r}")
+            return []
+        self._last_error = None
+        sample_name = f"{self.name}_total" if self.type == "counter" else self.name
+        family = self.name if openmetrics or self.type != "counter" else sample_name
+        lines = [f"# TYPE {family} {self.type}", f"# HELP {family} {self.help}"]
+        for labels, value in samples:
+            lines.append(f"{sample_name}{_format_labels(tuple(labels.items()))} {_format_value(value)}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        """Add a metric; registering the same name again replaces the previous one"""
+        with self._lock:
+            self._metrics[metric.name] = metric
+        return metric
+
+    def unregister(self, name: str):
+        with self._lock:
+            self._metrics.pop(name, None)
+
+    def render(self, openmetrics: bool = True) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render(openmetrics))
+        if openmetrics:
+            lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def register_callback(name: str, help: str, type: str, func: Callable, registry: Registry = REGISTRY):
+    """Expose a value computed at scrape time, e.g. a queue depth; func returns [(labels, value), ...]"""
+    return registry.register(CallbackMetric(name, help, type, func))
+
+
+# ---------------------------------------------------------------------- JARVIS internals
+
+COMMAND_LATENCY = REGISTRY.register(Histogram(
+    "jarvis_command_duration_seconds", "Time to handle a command, by classified intent", labels=("intent",)))
+LLM_LATENCY = REGISTRY.register(Histogram(
+    "jarvis_llm_request_duration_seconds", "LLM provider request latency", labels=("provider",)))
+LLM_ERRORS = REGISTRY.register(Counter(
+    "jarvis_llm_errors", "Failed LLM provider requests", labels=("provider", "reason")))
+SCHEDULER_LAG = REGISTRY.register(Histogram(
+    "jarvis_scheduler_lag_seconds", "Delay between a task's due time and when it started",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 15.0, 30.0, 60.0)))
+
+
+class _LLMCall:
+    def __init__(self):
+        self.reason: Optional[str] = None
+
+    def error(self, reason: str = "error"):
+        """Mark the request failed without raising (e.g. a non-200 response)"""
+        self.reason = reason
+
+
+@contextmanager
+def llm_call(provider: str):
+    """Time one provider request; exceptions and call.error(...) count as failures"""
+    call = _LLMCall()
+    started = time.perf_counter()
+    try:
+        yield call
+    except Exception as e:
+        call.error(type(e).__name__)
+        raise
+    finally:
+        LLM_LATENCY.observe(time.perf_counter() - started, provider=provider)
+        if call.reason:
+            LLM_ERRORS.inc(provider=provider, reason=call.reason)
+
+
+def _host_metrics():
+    """Latest collector sample, shared by the host metric callbacks"""
+    from metrics_collector import get_collector
+    return get_collector().latest()
+
+
+def _register_host_metrics(registry: Registry = REGISTRY):
+    gauges = (
+        ("jarvis_host_cpu_percent", "Host CPU utilization", 'cpu_percent'),
+        ("jarvis_host_memory_percent", "Host memory utilization", 'memory_percent'),
+        ("jarvis_host_memory_used_bytes", "Host memory in use", 'memory_used'),
+        ("jarvis_host_memory_available_bytes", "Host memory available", 'memory_available'),
+        ("jarvis_host_swap_percent", "Host swap utilization", 'swap_percent'),
+    )
+    for name, help, field in gauges:
+        register_callback(name, help, "gauge", lambda field=field: [({}, _host_metrics().get(field, 0.0))], registry)
+    register_callback("jarvis_host_cpu_core_percent", "Per-core CPU utilization", "gauge",
+                      lambda: [({'core': str(i)}, value) for i, value in enumerate(_host_metrics().get('per_core') or [])],
+                      registry)
+    counters = (
+        ("jarvis_host_disk_read_bytes", "Bytes read from disk since boot", 'disk_io', 'read_bytes'),
+        ("jarvis_host_disk_written_bytes", "Bytes written to disk since boot", 'disk_io', 'write_bytes'),
+        ("jarvis_host_network_sent_bytes", "Bytes sent on all interfaces", 'net_io', 'bytes_sent'),
+        ("jarvis_host_network_received_bytes", "Bytes received on all interfaces", 'net_io', 'bytes_recv'),
+    )
+    for name, help, group, key in counters:
+        register_callback(name, help, "counter",
+                          lambda group=group, key=key: [({}, (_host_metrics().get(group) or {}).get(key, 0))],
+                          registry)
+
+
+# ---------------------------------------------------------------------- HTTP endpoint
+
+class _Handler(BaseHTTPRequestHandler):
+    registry: Registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/metrics', '/'):
+            self.send_error(404)
+            return
+        openmetrics = "application/openmetrics-text" in self.headers.get("Accept", "")
+        body = self.registry.render(openmetrics).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", OPENMETRICS_CONTENT_TYPE if openmetrics else PROMETHEUS_CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MetricsExporter:
+    def __init__(self, host: str = "127.0.0.1", port: int = 9464, registry: Registry = REGISTRY):
+        """Serve registry.render() at http://host:port/metrics from a daemon thread"""
+        self.host = host
+        self.port = port
+        self.registry = registry
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> int:
+        """Bind and start serving; returns the bound port (useful with port=0)"""
+        handler = type("MetricsHandler", (_Handler,), {"registry": self.registry})
+        self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="jarvis-metrics-http", daemon=True)
+        self._thread.start()
+        return self.port
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/metrics"
+
+
+_exporter: Optional[MetricsExporter] = None
+
+
+def start_exporter_from_config() -> Optional[MetricsExporter]:
+    """Start the exporter if Config.METRICS_EXPORTER enables it; safe to call more than once"""
+    global _exporter
+    if _exporter is not None:
+        return _exporter
+    from config import Config
+    settings = getattr(Config, "METRICS_EXPORTER", {})
+    if not settings.get("enabled", False):
+        return None
+    _register_host_metrics()
+    exporter = MetricsExporter(settings.get("host", "127.0.0.1"), settings.get("port", 9464))
+    exporter.start()
+    _exporter = exporter
+    return exporter
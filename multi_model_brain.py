@@ -7,6 +7,7 @@ This file intentionally avoids system-control or destructive operations.
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 from config import Config
+from metrics_exporter import llm_call
 
 
 class MultiModelBrain:
@@ -230,21 +231,24 @@ class MultiModelBrain:
                 messages = context_messages + [{"role": "user", "content": command}]
             
             # API request
-            response = requests.post(
-                "https://openrouter.ai/api/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {api_key}",
-                    "Content-Type": "application/json",
-                    "HTTP-Referer": "https://github.com/RaghavVijayanand/jarvis",
-                    "X-Title": "JARVIS AI Assistant"
-                },
-                json={
-                    "model": api_model,
-                    "messages": messages,
-                    "max_tokens": 1000,
-                    "temperature": 0.7,
-                }
-            )
+            with llm_call("openrouter") as call:
+                response = requests.post(
+                    "https://openrouter.ai/api/v1/chat/completions",
+                    headers={
+                        "Authorization": f"Bearer {api_key}",
+                        "Content-Type": "application/json",
+                        "HTTP-Referer": "https://github.com/RaghavVijayanand/jarvis",
+                        "X-Title": "JARVIS AI Assistant"
+                    },
+                    json={
+                        "model": api_model,
+                        "messages": messages,
+                        "max_tokens": 1000,
+                        "temperature": 0.7,
+                    }
+                )
+                if response.status_code != 200:
+                    call.error(f"http_{response.status_code}")
             
             if response.status_code == 200:
                 data = response.json()
@@ -275,7 +279,8 @@ class MultiModelBrain:
                 context_str = "\n".join([f"{msg['role']}: {msg['content']}" for msg in recent_context])
                 prompt = f"Context:\n{context_str}\n\nNew message: {command}"
             
-            response = model.generate_content(prompt)
+            with llm_call("gemini"):
+                response = model.generate_content(prompt)
             return response.text if response.text else "No response generated."
             
         except ImportError:
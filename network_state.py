@@ -0,0 +1,198 @@
+"""
+Network State Service for JARVIS
+Host identity resolved off the caller's thread and connection tables sampled on an interval, served from cache
+"""
+
+import socket
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, Optional
+
+import psutil
+
+
+def outbound_ip() -> Optional[str]:
+    """Address of the interface used for outbound traffic (UDP connect sends no packets and needs no DNS)"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        sock.connect(("192.0.2.1", 80))
+        return sock.getsockname()[0]
+    except OSError:
+        return None
+    finally:
+        sock.close()
+
+
+class NetworkState:
+    def __init__(self, identity_refresh: float = 300.0, connections_interval: float = 30.0,
+                 hostname: Callable[[], str] = socket.gethostname, resolve: Callable[[str], str] = socket.gethostbyname,
+                 connections: Callable = psutil.net_connections, local_ip: Callable[[], Optional[str]] = outbound_ip):
+        """Refresh host identity every identity_refresh seconds and connections every connections_interval"""
+        self.identity_refresh = identity_refresh
+        self.connections_interval = connections_interval
+        self._hostname = hostname
+        self._resolve = resolve
+        self._connections = connections
+        self._local_ip = local_ip
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._identity_ready = threading.Event()
+        self._connections_ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+        self._identity: Dict = {'hostname': None, 'ip_address': None, 'resolved_at': None}
+        self._summary: Dict = {}
+        self._totals = Counter()
+        self._samples = 0
+        self._peak = 0
+        self._next_identity = 0.0
+        self._next_connections = 0.0
+
+    # ------------------------------------------------------------------ lifecycle
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="jarvis-network", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        self._wakeup.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2)
+
+    def refresh(self):
+        """Ask the background thread to refresh everything now (returns immediately)"""
+        self._next_identity = self._next_connections = 0.0
+        self._wakeup.set()
+
+    def _run(self):
+        while self._running:
+            now = time.monotonic()
+            if now >= self._next_identity:
+                self.refresh_identity()
+                self._next_identity = time.monotonic() + self.identity_refresh
+            if now >= self._next_connections:
+                self.sample_connections()
+                self._next_connections = time.monotonic() + self.connections_interval
+            delay = max(0.0, min(self._next_identity, self._next_connections) - time.monotonic())
+            self._wakeup.wait(delay)
+            self._wakeup.clear()
+
+    # ------------------------------------------------------------------ sampling (background thread)
+
+    def refresh_identity(self) -> Dict:
+        """Resolve hostname and address; slow or broken resolvers only delay this thread"""
+        try:
+            hostname = self._hostname()
+        except OSError:
+            hostname = "unknown"
+        ip_address = None
+        try:
+            ip_address = self._local_ip()
+        except OSError:
+            pass
+        if not ip_address:
+            try:
+                ip_address = self._resolve(hostname)
+            except OSError:
+                ip_address = None
+        identity = {'hostname': hostname, 'ip_address': ip_address, 'resolved_at': time.time()}
+        with self._lock:
+            self._identity = identity
+        self._identity_ready.set()
+        return identity
+
+    def sample_connections(self) -> Dict:
+        """One pass over the connection table, folded into a TCP/UDP/state breakdown"""
+        started = time.perf_counter()
+        try:
+            connections = self._connections()
+        except (psutil.AccessDenied, OSError) as e:
+            summary = {'error': str(e), 'sampled_at': time.time()}
+            with self._lock:
+                self._summary = summary
+            self._connections_ready.set()
+            return summary
+
+        kinds = Counter()
+        states = Counter()
+        for conn in connections:
+            if conn.type == socket.SOCK_STREAM:
+                kinds['tcp'] += 1
+                states[conn.status] += 1
+            elif conn.type == socket.SOCK_DGRAM:
+                kinds['udp'] += 1
+        total = len(connections)
+        summary = {
+            'total': total,
+            'tcp': kinds['tcp'],
+            'udp': kinds['udp'],
+            'states': dict(states),
+            'listening': states.get(psutil.CONN_LISTEN, 0),
+            'sampled_at': time.time(),
+            'sample_seconds': time.perf_counter() - started,
+        }
+        with self._lock:
+            self._summary = summary
+            self._samples += 1
+            self._peak = max(self._peak, total)
+            self._totals.update({'total': total, 'tcp': kinds['tcp'], 'udp': kinds['udp']})
+        self._connections_ready.set()
+        return summary
+
+    # ------------------------------------------------------------------ queries (never block on the network)
+
+    def identity(self, wait: float = 0.0) -> Dict:
+        """Cached hostname/IP; before the first resolution the hostname is read locally and ip_address is None"""
+        if wait:
+            self._identity_ready.wait(wait)
+        with self._lock:
+            identity = dict(self._identity)
+        if identity['hostname'] is None:
+            try:
+                identity['hostname'] = socket.gethostname()
+            except OSError:
+                identity['hostname'] = "unknown"
+        return identity
+
+    def connection_summary(self, wait: float = 2.0) -> Dict:
+        """Latest connection breakdown plus averages/peak over all samples; waits briefly for the first one"""
+        if not self._connections_ready.is_set():
+            self._connections_ready.wait(wait)
+        with self._lock:
+            summary = dict(self._summary)
+            if self._samples:
+                summary['average_total'] = self._totals['total'] / self._samples
+                summary['peak_total'] = self._peak
+                summary['samples'] = self._samples
+        if summary.get('sampled_at'):
+            summary['age_seconds'] = max(0.0, time.time() - summary['sampled_at'])
+        return summary
+
+
+_state: Optional[NetworkState] = None
+_state_lock = threading.Lock()
+
+
+def get_network_state() -> NetworkState:
+    """Shared service, started on first use"""
+    global _state
+    with _state_lock:
+        if _state is None:
+            try:
+                from config import Config
+                settings = getattr(Config, "NETWORK", {})
+            except Exception:
+                settings = {}
+            _state = NetworkState(
+                identity_refresh=settings.get("identity_refresh_seconds", 300),
+                connections_interval=settings.get("connections_interval_seconds", 30),
+            )
+            _state.start()
+        return _state
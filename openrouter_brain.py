@@ -3,6 +3,7 @@ import json
 import time
 from datetime import datetime
 from config import Config
+from metrics_exporter import llm_call
 from rich.console import Console
 
 console = Console()
@@ -62,12 +63,15 @@ Keep responses focused and practical. When asked about your identity or who crea
         # Try with retries for 502 errors
         for attempt in range(3):
             try:
-                response = requests.post(
-                    f"{self.base_url}/chat/completions",
-                    headers=headers,
-                    json=test_data,
-                    timeout=15
-                )
+                with llm_call("openrouter") as call:
+                    response = requests.post(
+                        f"{self.base_url}/chat/completions",
+                        headers=headers,
+                        json=test_data,
+                        timeout=15
+                    )
+                    if response.status_code != 200:
+                        call.error(f"http_{response.status_code}")
                 
                 if response.status_code == 200:
                     return response.json()
@@ -136,12 +140,15 @@ Keep responses focused and practical. When asked about your identity or who crea
                 "presence_penalty": 0
             }
             
-            response = requests.post(
-                f"{self.base_url}/chat/completions",
-                headers=headers,
-                json=data,
-                timeout=30
-            )
+            with llm_call("openrouter") as call:
+                response = requests.post(
+                    f"{self.base_url}/chat/completions",
+                    headers=headers,
+                    json=data,
+                    timeout=30
+                )
+                if response.status_code != 200:
+                    call.error(f"http_{response.status_code}")
             
             if response.status_code == 200:
                 result = response.json()
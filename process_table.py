@@ -0,0 +1,215 @@
+"""
+Process Table for JARVIS
+Keeps psutil Process handles between samples so per-process CPU is a real delta, and indexes processes by name
+"""
+
+import heapq
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Set
+
+import psutil
+
+_GONE = (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess)
+
+
+class ProcessEntry:
+    """Last known state of one process plus the counters needed for the next CPU delta"""
+
+    __slots__ = ('pid', 'process', 'name', 'cpu_total', 'sampled_at', 'cpu_percent', 'memory_rss',
+                 'memory_percent', 'status')
+
+    def __init__(self, pid: int, process, name: str):
+        self.pid = pid
+        self.process = process
+        self.name = name
+        self.cpu_total: Optional[float] = None
+        self.sampled_at = 0.0
+        self.cpu_percent = 0.0
+        self.memory_rss = 0
+        self.memory_percent = 0.0
+        self.status = ''
+
+    def to_dict(self) -> Dict:
+        return {
+            'pid': self.pid,
+            'name': self.name,
+            'cpu_percent': self.cpu_percent,
+            'memory_percent': self.memory_percent,
+            'memory_rss': self.memory_rss,
+            'status': self.status,
+        }
+
+
+class ProcessTable:
+    def __init__(self, warmup: float = 0.25, pids: Callable[[], List[int]] = psutil.pids,
+                 process_factory: Callable = psutil.Process, clock: Callable[[], float] = time.monotonic,
+                 memory_total: Optional[int] = None):
+        """Process snapshots with persistent handles.
+
+        CPU percent is measured between consecutive refreshes (psutil semantics: 100% = one full core).
+        warmup is how long the very first snapshot waits to get a baseline for CPU deltas.
+        """
+        self.warmup = warmup
+        self._pids = pids
+        self._process_factory = process_factory
+        self._clock = clock
+        self._memory_total = memory_total
+        self._entries: Dict[int, ProcessEntry] = {}
+        self._by_name: Dict[str, Set[int]] = {}
+        self._lock = threading.RLock()
+        self.last_refresh = 0.0
+        self.refreshes = 0
+
+    # ------------------------------------------------------------------ sampling
+
+    def refresh(self) -> int:
+        """Sample every process once; returns the number of live processes"""
+        with self._lock:
+            memory_total = self._memory_total or psutil.virtual_memory().total
+            self._sync_pids()
+
+            now = self._clock()
+            for pid, entry in list(self._entries.items()):
+                try:
+                    # One batched read of the process's stat/status data per sample
+                    with entry.process.oneshot():
+                        times = entry.process.cpu_times()
+                        memory = entry.process.memory_info()
+                        status = entry.process.status()
+                except _GONE:
+                    self._drop(pid)
+                    continue
+                total = times.user + times.system
+                if entry.cpu_total is not None and total < entry.cpu_total:
+                    # CPU time went backwards: the PID now belongs to a new process
+                    self._drop(pid)
+                    self._add(pid)
+                    entry = self._entries.get(pid)
+                    if entry is None:
+                        continue
+                    entry.cpu_total = None
+                if entry.cpu_total is not None and now > entry.sampled_at:
+                    entry.cpu_percent = (total - entry.cpu_total) / (now - entry.sampled_at) * 100
+                else:
+                    entry.cpu_percent = 0.0
+                entry.cpu_total = total
+                entry.sampled_at = now
+                entry.memory_rss = memory.rss
+                entry.memory_percent = memory.rss / memory_total * 100 if memory_total else 0.0
+                entry.status = status
+
+            self.last_refresh = now
+            self.refreshes += 1
+            return len(self._entries)
+
+    def _add(self, pid: int):
+        try:
+            process = self._process_factory(pid)
+            name = process.name()
+        except _GONE:
+            return
+        self._entries[pid] = ProcessEntry(pid, process, name)
+        self._by_name.setdefault(name.lower(), set()).add(pid)
+
+    def _drop(self, pid: int):
+        entry = self._entries.pop(pid, None)
+        if entry is None:
+            return
+        key = entry.name.lower()
+        pids = self._by_name.get(key)
+        if pids is not None:
+            pids.discard(pid)
+            if not pids:
+                del self._by_name[key]
+
+    def ensure_fresh(self, max_age: float = 1.0):
+        """Refresh if the last sample is older than max_age; the first call takes a CPU baseline first"""
+        with self._lock:
+            if self.refreshes == 0:
+                self.refresh()
+                time.sleep(self.warmup)
+                self.refresh()
+            elif self._clock() - self.last_refresh > max_age:
+                self.refresh()
+
+    # ------------------------------------------------------------------ queries
+
+    def top(self, limit: int = 10, key: str = 'cpu_percent', max_age: float = 1.0) -> List[Dict]:
+        """Top processes by cpu_percent or memory_percent (heap selection, not a full sort)"""
+        self.ensure_fresh(max_age)
+        with self._lock:
+            entries = heapq.nlargest(limit, self._entries.values(), key=lambda e: getattr(e, key))
+            return [entry.to_dict() for entry in entries]
+
+    def snapshot(self, max_age: float = 1.0) -> List[Dict]:
+        self.ensure_fresh(max_age)
+        with self._lock:
+            return [entry.to_dict() for entry in self._entries.values()]
+
+    def find(self, name: str, refresh: bool = True) -> List[int]:
+        """PIDs whose name matches: exact (case-insensitive) names first, otherwise substring matches"""
+        with self._lock:
+            if refresh or self.refreshes == 0:
+                self._sync_pids()
+            key = name.lower()
+            if key in self._by_name:
+                return sorted(self._by_name[key])
+            return sorted(pid for known, pids in self._by_name.items() if key in known for pid in pids)
+
+    def _sync_pids(self):
+        """Cheap membership update (no per-process reads) so lookups see new and exited processes"""
+        current = set(self._pids())
+        for pid in list(self._entries):
+            if pid not in current:
+                self._drop(pid)
+        for pid in current:
+            if pid not in self._entries:
+                self._add(pid)
+
+    def process(self, pid: int):
+        """The persistent psutil.Process handle for pid, or None"""
+        with self._lock:
+            entry = self._entries.get(pid)
+            return entry.process if entry else None
+
+    def name_of(self, pid: int) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(pid)
+            return entry.name if entry else None
+
+    def kill(self, name: str) -> Dict[str, int]:
+        """Kill every process matching name; returns counts of killed and denied processes"""
+        killed = denied = 0
+        for pid in self.find(name):
+            handle = self.process(pid)
+            if handle is None:
+                continue
+            try:
+                # The stored handle checks creation time, so a reused PID is never killed by mistake
+                handle.kill()
+                killed += 1
+            except psutil.NoSuchProcess:
+                pass
+            except psutil.AccessDenied:
+                denied += 1
+            with self._lock:
+                self._drop(pid)
+        return {'killed': killed, 'denied': denied}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+_table: Optional[ProcessTable] = None
+_table_lock = threading.Lock()
+
+
+def get_process_table() -> ProcessTable:
+    """Shared process table so every caller benefits from the same CPU baseline"""
+    global _table
+    with _table_lock:
+        if _table is None:
+            _table = ProcessTable()
+        return _table
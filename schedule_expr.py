@@ -0,0 +1,170 @@
+"""
+Schedule Expressions for JARVIS
+Free-form schedule strings compiled once into structured recurrences with fast next-fire computation
+"""
+
+import math
+import re
+from datetime import datetime, time as dtime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+UNITS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400, 'week': 7 * 86400,
+         'sec': 1, 'min': 60, 'hr': 3600}  # Spoken abbreviations ("in 10 mins", "every 2 hrs")
+WEEKDAYS = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+NAMED_PERIODS = {'hourly': 3600, 'every hour': 3600, 'daily': 86400, 'every day': 86400,
+                 'weekly': 7 * 86400, 'every week': 7 * 86400}
+
+_COUNT = r'(\d+|an?|one)'
+_UNIT = r'(second|sec|minute|min|hour|hr|day|week)s?'
+# A delay anywhere in a sentence ("remind me to stretch in 10 mins"); compile_schedule wants the whole string
+DELAY_PHRASE = re.compile(rf'\bin {_COUNT} {_UNIT}\b')
+_DELAY = re.compile(rf'^in {_COUNT} {_UNIT}$')
+_EVERY = re.compile(rf'^every {_COUNT} {_UNIT}$')
+_CLOCK = re.compile(r'\b(\d{1,2}):(\d{2})\s*(am|pm)?\b')
+_WEEKDAY = re.compile(r'\b(' + '|'.join(WEEKDAYS) + r')s?\b')
+_REPEAT = re.compile(r'\b(every|each|weekdays|weekends|' + '|'.join(f'{day}s' for day in WEEKDAYS) + r')\b')
+
+
+class Recurrence:
+    """Compiled schedule; next_fire(after) is the first fire time strictly after `after` (epoch seconds)"""
+
+    kind = "base"
+    recurring = True
+
+    def next_fire(self, after: float) -> Optional[float]:
+        raise NotImplementedError
+
+    def occurrences(self, first: float, until: float, limit: int = 1000) -> List[float]:
+        """Fire times from `first` (itself a fire time) up to and including `until`"""
+        times = []
+        when: Optional[float] = first
+        while when is not None and when <= until and len(times) < limit:
+            times.append(when)
+            when = self.next_fire(when)
+        return times
+
+    def to_dict(self) -> Dict:
+        raise NotImplementedError
+
+    @staticmethod
+    def from_dict(data: Dict) -> 'Recurrence':
+        kind = data['kind']
+        if kind == Once.kind:
+            return Once(data['at'])
+        if kind == Interval.kind:
+            return Interval(data['period'], data['anchor'])
+        if kind == Calendar.kind:
+            return Calendar([tuple(t) for t in data['times']], data.get('weekdays'))
+        raise ValueError(f"Unknown recurrence kind: {kind}")
+
+
+class Once(Recurrence):
+    kind = "once"
+    recurring = False
+
+    def __init__(self, at: float):
+        self.at = at
+
+    def next_fire(self, after: float) -> Optional[float]:
+        return self.at if self.at > after else None
+
+    def to_dict(self) -> Dict:
+        return {'kind': self.kind, 'at': self.at}
+
+
+class Interval(Recurrence):
+    """Every `period` seconds counted from `anchor` (runs never drift, however late each one starts)"""
+
+    kind = "interval"
+
+    def __init__(self, period: float, anchor: float):
+        self.period = period
+        self.anchor = anchor
+
+    def next_fire(self, after: float) -> Optional[float]:
+        steps = max(1, math.floor((after - self.anchor) / self.period) + 1)
+        when = self.anchor + steps * self.period
+        # Guard against floating-point rounding landing exactly on `after`
+        return when if when > after else when + self.period
+
+    def to_dict(self) -> Dict:
+        return {'kind': self.kind, 'period': self.period, 'anchor': self.anchor}
+
+
+class Calendar(Recurrence):
+    """Wall-clock times of day, optionally restricted to weekdays (0 = Monday), in local time"""
+
+    kind = "calendar"
+
+    def __init__(self, times: Sequence[Tuple[int, int]], weekdays: Optional[Sequence[int]] = None):
+        self.times = sorted(set((int(h), int(m)) for h, m in times))
+        self.weekdays = sorted(set(weekdays)) if weekdays else None
+        self._clock = [dtime(h, m) for h, m in self.times]
+
+    def next_fire(self, after: float) -> Optional[float]:
+        start = datetime.fromtimestamp(after).date()
+        for offset in range(8):
+            day = start + timedelta(days=offset)
+            if self.weekdays is not None and day.weekday() not in self.weekdays:
+                continue
+            for clock in self._clock:
+                candidate = datetime.combine(day, clock).timestamp()
+                if candidate > after:
+                    return candidate
+        return None
+
+    def to_dict(self) -> Dict:
+        return {'kind': self.kind, 'times': [list(t) for t in self.times], 'weekdays': self.weekdays}
+
+
+def _count(text: str) -> int:
+    return 1 if text in ('a', 'an', 'one') else int(text)
+
+
+def compile_schedule(when: str, now: float) -> Optional[Recurrence]:
+    """Compile a schedule string ("in 10 minutes", "every 2 hours", "daily", "08:00", "monday at 9:30 pm")"""
+    text = " ".join(when.lower().split())
+    if text.startswith("at "):
+        text = text[3:]
+
+    match = _DELAY.match(text)
+    if match:
+        return Once(now + _count(match.group(1)) * UNITS[match.group(2)])
+
+    match = _EVERY.match(text)
+    if match:
+        return Interval(_count(match.group(1)) * UNITS[match.group(2)], now)
+
+    weekdays = [WEEKDAYS.index(name) for name in _WEEKDAY.findall(text)]
+    if "weekdays" in text:
+        weekdays += range(5)
+    elif "weekends" in text:
+        weekdays += (5, 6)
+
+    calendar = None
+    clock = _CLOCK.search(text)
+    if clock:
+        hour, minute, meridiem = int(clock.group(1)), int(clock.group(2)), clock.group(3)
+        if meridiem == 'pm' and hour < 12:
+            hour += 12
+        elif meridiem == 'am' and hour == 12:
+            hour = 0
+        if hour > 23 or minute > 59:
+            return None
+        calendar = Calendar([(hour, minute)], weekdays or None)
+    elif weekdays:
+        # A day without a time keeps the time of day it was scheduled at
+        created = datetime.fromtimestamp(now)
+        calendar = Calendar([(created.hour, created.minute)], weekdays)
+
+    if calendar is not None:
+        # "monday at 9" is the coming Monday only; "every monday", "mondays" and "weekdays" repeat
+        if weekdays and not _REPEAT.search(text):
+            at = calendar.next_fire(now)
+            return Once(at) if at is not None else None
+        return calendar
+
+    period = NAMED_PERIODS.get(text)
+    if period:
+        return Interval(period, now)
+    return None
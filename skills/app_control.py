@@ -2,7 +2,10 @@ import subprocess
 import os
 import time
 import psutil
-import winreg
+try:
+    import winreg  # Windows only
+except ImportError:
+    winreg = None
 from pathlib import Path
 import json
 
@@ -21,6 +24,8 @@ class ApplicationControl:
     def _get_installed_applications(self):
         """Get list of installed applications from Windows registry"""
         apps = {}
+        if winreg is None:
+            return apps
         
         # Registry keys to check for installed programs
         registry_keys = [
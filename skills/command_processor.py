@@ -4,105 +4,117 @@ Handles complex compound commands and natural language parsing
 """
 
 import re
-import time
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Optional
 from datetime import datetime, timedelta
 
+from command_grammar import LAUNCH_VERBS, Conditional, Delay, FileWithContent, parse_command
+from command_runtime import WATCH_KEYWORDS, CommandRuntime, PendingCommand, Watch, compile_condition
+from command_suggest import get_suggestion_index
+from worker_pool import WorkerPool
+
+# Steps that act on the focused window keep their relative order
+UI_VERBS = frozenset({'type', 'press', 'click', 'save', 'copy', 'paste', 'scroll', 'close', 'minimize', 'maximize'})
+
+
+def _verb(text: str) -> str:
+    words = text.strip().lower().split()
+    return words[0] if words else ''
+
 class CommandProcessor:
     def __init__(self, jarvis_instance):
         """Initialize with reference to main JARVIS instance"""
         self.jarvis = jarvis_instance
         
-        # Command patterns for complex parsing
-        self.sequence_patterns = [
-            r"(.*?)\s*(?:then|and then|after that|next)\s*(.*)",
-            r"(.*?)\s*(?:,\s*then|,\s*and then)\s*(.*)",
-            r"(.*?)\s*(?:;\s*then|;\s*and)\s*(.*)",
-        ]
-        
-        # Time delay patterns
-        self.delay_patterns = [
-            r"wait\s+(\d+)\s+seconds?",
-            r"pause\s+for\s+(\d+)\s+seconds?",
-            r"after\s+(\d+)\s+seconds?",
-            r"in\s+(\d+)\s+seconds?",
-        ]
-        
-        # Conditional patterns
-        self.conditional_patterns = [
-            r"if\s+(.*?)\s+then\s+(.*)",
-            r"when\s+(.*?)\s+(?:then\s+)?(.*)",
-            r"once\s+(.*?)\s+(?:then\s+)?(.*)",
-        ]
-        
         # File operation context
         self.file_context = {}
         
+        # Compound commands run on an asyncio runtime: blocking steps go to a small pool, while delays and
+        # when/once watchers are awaited on the loop, so several pending commands can coexist
+        try:
+            from config import Config
+            settings = getattr(Config, "COMMANDS", {})
+        except Exception:
+            settings = {}
+        self.settle_seconds = settings.get("settle_seconds", 0.5)
+        self.file_poll = settings.get("file_poll_seconds", 0.5)
+        self.process_poll = settings.get("process_poll_seconds", 1.0)
+        self.pool = WorkerPool(
+            workers=settings.get("parallel_steps", 4),
+            limits=settings.get("concurrency", {"ui": 1}),
+            timeouts=settings.get("timeouts", {})
+        )
+        self.runtime = CommandRuntime(self.pool, self._run_step, self._step_kind, self._watch_for,
+                                      watch_timeout=settings.get("watch_timeout_seconds", 3600))
+        
     def parse_complex_command(self, command: str) -> List[Dict]:
-        """Parse complex commands into executable steps"""
+        """Parse complex commands into a step DAG; each step's 'after' lists the steps it must wait for"""
         steps = []
-        
-        # Check for conditional commands
-        conditional_match = self._match_pattern(command, self.conditional_patterns)
-        if conditional_match:
-            condition, action = conditional_match
-            steps.append({
-                'type': 'conditional',
-                'condition': condition.strip(),
-                'action': action.strip(),
-                'raw_command': command
-            })
-            return steps
-        
-        # Check for sequence commands
-        sequence_match = self._match_pattern(command, self.sequence_patterns)
-        if sequence_match:
-            first_part, second_part = sequence_match
-            
-            # Parse first part
-            first_steps = self._parse_single_command(first_part.strip())
-            steps.extend(first_steps)
-            
-            # Check for delays in second part
-            delay_match = self._match_pattern(second_part, self.delay_patterns)
-            if delay_match:
-                delay_seconds = int(delay_match[0])
+        barrier: List[int] = []
+        # Stages run in order; the clauses inside one stage are independent of each other
+        for stage in parse_command(command).stages:
+            if isinstance(stage, Delay):
                 steps.append({
                     'type': 'delay',
-                    'seconds': delay_seconds,
-                    'raw_command': f"wait {delay_seconds} seconds"
+                    'seconds': stage.seconds,
+                    'raw_command': f"wait {stage.seconds} seconds",
+                    'after': barrier
                 })
-                # Remove delay from second part
-                second_part = re.sub(r'wait\s+\d+\s+seconds?', '', second_part).strip()
-                second_part = re.sub(r'pause\s+for\s+\d+\s+seconds?', '', second_part).strip()
-            
-            # Parse second part if there's anything left
-            if second_part:
-                second_steps = self._parse_single_command(second_part)
-                steps.extend(second_steps)
-            
-            return steps
-        
-        # Single command
-        steps.extend(self._parse_single_command(command))
+            elif isinstance(stage, Conditional):
+                steps.append({
+                    'type': 'conditional',
+                    'keyword': stage.keyword,
+                    'condition': stage.condition,
+                    'action': stage.action,
+                    'otherwise': stage.otherwise,
+                    'raw_command': stage.text,
+                    'after': barrier
+                })
+            else:
+                added = self._lower_clauses(stage.parts, barrier, steps)
+                if added:
+                    barrier = added
+                continue
+            barrier = [len(steps) - 1]
         return steps
     
-    def _match_pattern(self, text: str, patterns: List[str]) -> Optional[Tuple]:
-        """Match text against multiple patterns"""
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return match.groups()
-        return None
+    def _lower_clauses(self, parts: List, after: List[int], steps: List[Dict]) -> List[int]:
+        """Append the steps for independent clauses (they share only `after`); returns their indices"""
+        added: List[int] = []
+        last_ui: Optional[int] = None
+        for part in parts:
+            if isinstance(part, FileWithContent):
+                sub = [{
+                    'type': 'file_creation_with_content',
+                    'topic': part.topic,
+                    'filename': part.filename,
+                    'location': part.location,
+                    'raw_command': part.text
+                }]
+            else:
+                sub = self._parse_single_command(part.text)
+            deps = list(after)
+            for step in sub:
+                verb = _verb(step.get('command', ''))
+                touches_ui = step['type'] == 'simple' and (verb in UI_VERBS or verb in LAUNCH_VERBS)
+                # Keystrokes and launches act on the focused window, so they keep their relative order
+                if touches_ui and last_ui is not None:
+                    deps.append(last_ui)
+                if step['type'] == 'simple' and verb in LAUNCH_VERBS:
+                    step['settle'] = self.settle_seconds
+                step['after'] = sorted(set(deps))
+                steps.append(step)
+                index = len(steps) - 1
+                if touches_ui:
+                    last_ui = index
+                added.append(index)
+                # Sub-parsers return sequences (launch, wait, type ...), so their steps chain
+                deps = list(after) + [index]
+        return added
     
     def _parse_single_command(self, command: str) -> List[Dict]:
         """Parse a single command into actionable steps"""
         command = command.strip()
         
-        # File creation with content
-        if self._is_file_creation_with_content(command):
-            return self._parse_file_creation_command(command)
-        
         # Application automation sequences
         if self._is_app_automation_sequence(command):
             return self._parse_app_automation_sequence(command)
@@ -118,90 +130,6 @@ class CommandProcessor:
             'raw_command': command
         }]
     
-    def _is_file_creation_with_content(self, command: str) -> bool:
-        """Check if command is about creating files with specific content"""
-        file_keywords = ['create', 'make', 'write', 'generate']
-        content_keywords = ['about', 'containing', 'with content', 'text about']
-        
-        has_file_keyword = any(keyword in command.lower() for keyword in file_keywords)
-        has_content_keyword = any(keyword in command.lower() for keyword in content_keywords)
-        
-        return has_file_keyword and has_content_keyword
-    
-    def _parse_file_creation_command(self, command: str) -> List[Dict]:
-        """Parse file creation commands with content generation.
-        Robustly extracts filename, optional location, and topic.
-        """
-        steps = []
-
-        text = command.strip()
-        lower = text.lower()
-
-        # Extract a topic: prefer "write about X" then generic "about X"
-        topic = None
-        m_topic = re.search(r"write\s+about\s+(.+)", lower, re.IGNORECASE)
-        if m_topic:
-            topic = m_topic.group(1).strip()
-        elif " about " in lower:
-            topic = lower.split(" about ", 1)[1].strip()
-
-        # Trim trailing phrases from topic (e.g., "and save as ...", locations, filename specs)
-        if topic:
-            topic = re.split(
-                r"\b(?:and\s+save(?:\s+it)?\s+as|save\s+as|named|called|name\s+it|call\s+it|in\s+this\s+folder|on\s+this\s+folder|in\s+folder|on\s+folder|on\s+desktop|in\s+desktop|here|with\s+name|file\s+name|filename)\b",
-                topic,
-                1,
-                flags=re.IGNORECASE,
-            )[0].strip(" .,;")
-
-        # Extract filename via multiple patterns with non-greedy + lookahead to stop at conjunctions/locations
-        filename = None
-        filename_patterns = [
-            r"(?:named|called|name\s+it|call\s+it)\s+([\w\-. ]+?)(?=\s+(?:on|in|and|with|write|save)\b|$)",
-            r"save\s+(?:it\s+)?as\s+([\w\-. ]+?)(?=\s+(?:on|in|and|with|write)\b|$)",
-            r"create\s+(?:a\s+)?file\s+([\w\-. ]+?)(?=\s+(?:on|in|and|with|write|called|named)\b|$)",
-        ]
-        for pat in filename_patterns:
-            m = re.search(pat, lower, re.IGNORECASE)
-            if m:
-                filename = m.group(1).strip().strip('\"\'')
-                break
-
-        # Clean filename of location or extra chatter and ensure extension
-        if filename:
-            filename = re.split(r"\b(?:in|on)\s+(?:this|the)\s+folder\b", filename, 1, flags=re.IGNORECASE)[0]
-            filename = re.split(r"\b(?:on|in)\s+desktop\b", filename, 1, flags=re.IGNORECASE)[0]
-            filename = re.split(r"\band\s+write\b", filename, 1, flags=re.IGNORECASE)[0]
-            filename = filename.replace(" here", "").replace(" in here", "").strip()
-
-        # Ensure txt extension by default
-        if filename and not filename.lower().endswith((".txt", ".md", ".log", ".csv")):
-            if "." not in filename:
-                filename += ".txt"
-
-        # Fallback filename from topic
-        if not filename and topic:
-            safe = re.sub(r"[^a-z0-9_\-]+", "_", topic.lower()).strip("_")
-            filename = (safe[:30] or "untitled") + ".txt"
-
-        # Detect location keywords
-        location = None
-        if any(kw in lower for kw in ["on desktop", "to desktop", "onto desktop", "in desktop"]):
-            location = "desktop"
-
-        if topic and filename:
-            steps.append(
-                {
-                    "type": "file_creation_with_content",
-                    "topic": topic,
-                    "filename": filename,
-                    "location": location,
-                    "raw_command": command,
-                }
-            )
-
-        return steps
-    
     def _is_app_automation_sequence(self, command: str) -> bool:
         """Check if command involves app automation"""
         app_keywords = ['open', 'launch', 'start']
@@ -266,66 +194,99 @@ class CommandProcessor:
         
         return steps
     
+    def start_parsed_commands(self, steps: List[Dict], description: str = "") -> PendingCommand:
+        """Start parsed steps as a DAG without waiting; the returned command's future yields the results"""
+        return self.runtime.submit(steps, description)
+    
     def execute_parsed_commands(self, steps: List[Dict], use_voice: bool = True) -> List[str]:
-        """Execute a list of parsed command steps"""
-        results = []
-        
-        for i, step in enumerate(steps):
-            try:
-                if step['type'] == 'delay':
-                    self._execute_delay(step, use_voice)
-                    results.append(f"Waited {step['seconds']} seconds")
-                
-                elif step['type'] == 'conditional':
-                    result = self._execute_conditional(step, use_voice)
-                    results.append(result)
-                
-                elif step['type'] == 'file_creation_with_content':
-                    result = self._execute_file_creation_with_content(step, use_voice)
-                    results.append(result)
-                
-                elif step['type'] == 'simple':
-                    # Use existing JARVIS command processing
-                    self.jarvis.process_command(step['command'], use_voice=False)
-                    results.append(f"Executed: {step['command']}")
-                
-                # Small delay between commands for stability
-                if i < len(steps) - 1:
-                    time.sleep(0.5)
-                    
-            except Exception as e:
-                error_msg = f"Error executing step '{step.get('raw_command', step)}': {e}"
-                results.append(error_msg)
-                continue
-        
-        return results
+        """Execute parsed steps as a DAG and wait: each starts once its 'after' steps finish; results keep step order.
+
+        Steps without 'after' wait for the previous step, so hand-built lists still run in sequence.
+        """
+        if not steps:
+            return []
+        return self.start_parsed_commands(steps).future.result()
     
-    def _execute_delay(self, step: Dict, use_voice: bool):
-        """Execute a delay step"""
-        seconds = step['seconds']
-        if use_voice:
-            self.jarvis.voice_engine.speak(f"Waiting {seconds} seconds")
-        time.sleep(seconds)
+    @staticmethod
+    def is_deferred(steps: List[Dict]) -> bool:
+        """Whether the steps wait on time or an external event, so they should run in the background"""
+        return any(step['type'] == 'delay' or CommandProcessor._is_watch(step) is True for step in steps)
     
-    def _execute_conditional(self, step: Dict, use_voice: bool) -> str:
-        """Execute a conditional step (simplified implementation)"""
+    @staticmethod
+    def is_question(steps: List[Dict]) -> bool:
+        """Whether a when/once step has nothing to watch ("when was python released"): the text is a question"""
+        return any(CommandProcessor._is_watch(step) is False for step in steps)
+    
+    @staticmethod
+    def _is_watch(step: Dict) -> Optional[bool]:
+        """For when/once steps, whether the condition compiles to a watcher; None for any other step"""
+        if step['type'] != 'conditional' or step.get('keyword') not in WATCH_KEYWORDS:
+            return None
+        try:
+            return compile_condition(step['condition']) is not None
+        except Exception:
+            return False
+    
+    def pending_commands(self) -> List[PendingCommand]:
+        return self.runtime.pending()
+    
+    def cancel_pending_commands(self) -> int:
+        return sum(self.runtime.cancel(command.id) for command in self.runtime.pending())
+    
+    def _watch_for(self, condition: str) -> Optional[Watch]:
+        file_skill = getattr(self.jarvis, 'file_skill', None)
+        return compile_condition(condition, base_dir=getattr(file_skill, 'current_directory', None),
+                                 file_poll=self.file_poll, process_poll=self.process_poll)
+    
+    @staticmethod
+    def _step_kind(step: Dict) -> str:
+        if step['type'] == 'file_creation_with_content':
+            return 'file'
+        verb = _verb(step.get('command', ''))
+        if step['type'] == 'simple' and (verb in UI_VERBS or verb in LAUNCH_VERBS):
+            return 'ui'
+        return 'command'
+    
+    def _run_step(self, step: Dict) -> str:
+        """Run one blocking step on a pool worker"""
+        try:
+            if step['type'] == 'conditional':
+                return self._execute_conditional(step)
+            if step['type'] == 'file_creation_with_content':
+                return self._execute_file_creation_with_content(step)
+            if step['type'] == 'simple':
+                # Use existing JARVIS command processing
+                self.jarvis.process_command(step['command'], use_voice=False)
+                return f"Executed: {step['command']}"
+            return f"Skipped unknown step type: {step['type']}"
+        except Exception as e:
+            return f"Error executing step '{step.get('raw_command', step)}': {e}"
+    
+    def _execute_conditional(self, step: Dict, use_voice: bool = False) -> str:
+        """Execute an "if" step: the condition is checked once (when/once steps are watched by the runtime)"""
         condition = step['condition']
         action = step['action']
         
-        # Simple condition checking (can be expanded)
         if "file exists" in condition.lower():
             filename = condition.lower().replace("file exists", "").replace("if", "").strip()
-            if self.jarvis.file_skill.file_exists(filename):
+            met = self.jarvis.file_skill.file_exists(filename)
+        else:
+            watch = self._watch_for(condition)
+            if watch is None:
+                # Unknown condition: execute action anyway
                 self.jarvis.process_command(action, use_voice=False)
-                return f"Condition met, executed: {action}"
-            else:
-                return f"Condition not met: {condition}"
+                return f"Executed conditional action: {action}"
+            met = watch.check()
         
-        # Default: execute action anyway
-        self.jarvis.process_command(action, use_voice=False)
-        return f"Executed conditional action: {action}"
+        if met:
+            self.jarvis.process_command(action, use_voice=False)
+            return f"Condition met, executed: {action}"
+        elif step.get('otherwise'):
+            self.jarvis.process_command(step['otherwise'], use_voice=False)
+            return f"Condition not met, executed: {step['otherwise']}"
+        return f"Condition not met: {condition}"
     
-    def _execute_file_creation_with_content(self, step: Dict, use_voice: bool) -> str:
+    def _execute_file_creation_with_content(self, step: Dict, use_voice: bool = False) -> str:
         """Execute file creation with AI-generated content"""
         topic = step['topic']
         filename = step['filename']
@@ -365,25 +326,5 @@ class CommandProcessor:
         return result
     
     def get_command_suggestions(self, partial_command: str) -> List[str]:
-        """Get command suggestions based on partial input"""
-        suggestions = []
-        
-        # Common compound command patterns
-        compound_patterns = [
-            "take screenshot then open calculator and type 2+2",
-            "create a file about robotics and save it as robotics_info.txt",
-            "open notepad then type 'Hello World' and save the file",
-            "get system status then take screenshot",
-            "search for weather then take screenshot of results",
-            "create folder called 'projects' then create file inside it",
-            "launch calculator, wait 2 seconds, then type 5*5",
-            "if file exists data.txt then read it, otherwise create it"
-        ]
-        
-        # Filter suggestions based on partial command
-        partial_lower = partial_command.lower()
-        for pattern in compound_patterns:
-            if any(word in pattern.lower() for word in partial_lower.split() if len(word) > 2):
-                suggestions.append(pattern)
-        
-        return suggestions[:5]  # Return top 5 suggestions
+        """Get command suggestions based on partial input (templates and history, typo tolerant)"""
+        return get_suggestion_index().suggest(partial_command, 5)
@@ -9,24 +9,150 @@ import json
 import os
 import platform
 import subprocess
+import threading
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
-import wmi
+from typing import Callable, Dict, Iterator, List, Optional
+import numpy as np
 import socket
+try:
+    import wmi  # Windows only; hardware details fall back to psutil elsewhere
+except ImportError:
+    wmi = None
+from metrics_collector import get_collector
+from metric_store import get_metric_store, parse_time_range
+from process_table import get_process_table
+from anomaly_detector import get_anomaly_detector
+from network_state import get_network_state
+from state_store import get_state_store
+
+
+class MonitorJob:
+    """A performance monitoring session fed by the shared metrics collector"""
+    
+    # Columns recorded per sample
+    COLUMNS = ('timestamp', 'cpu_percent', 'memory_percent', 'disk_read_bps', 'disk_write_bps',
+               'net_sent_bps', 'net_recv_bps')
+    
+    def __init__(self, job_id: str, duration: float, interval: float, on_complete: Optional[Callable] = None):
+        self.id = job_id
+        self.duration = duration
+        self.interval = interval
+        self.on_complete = on_complete
+        self.started = time.time()
+        self.finished: Optional[float] = None
+        self.status = 'running'
+        self.samples: List[tuple] = []
+        self.report: Optional[str] = None
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+    
+    @property
+    def is_running(self) -> bool:
+        return self.status == 'running'
+    
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.time()) - self.started
+    
+    def add_sample(self, sample: Dict):
+        with self._lock:
+            if self.is_running:
+                self.samples.append(tuple(sample.get(name, 0.0) for name in self.COLUMNS))
+    
+    def finish(self, status: str) -> bool:
+        """Mark the job finished; False if it already was"""
+        with self._lock:
+            if not self.is_running:
+                return False
+            self.status = status
+            self.finished = time.time()
+            return True
+    
+    def mark_done(self):
+        self._done.set()
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the job has finished and its report is ready"""
+        return self._done.wait(timeout)
+    
+    def summary(self) -> Dict:
+        with self._lock:
+            if not self.samples:
+                return {}
+            data = np.array(self.samples, dtype=np.float64)
+        cpu, memory = data[:, 1], data[:, 2]
+        return {
+            'samples': len(data),
+            'avg_cpu': float(cpu.mean()), 'min_cpu': float(cpu.min()), 'max_cpu': float(cpu.max()),
+            'avg_memory': float(memory.mean()), 'max_memory': float(memory.max()),
+            'avg_disk_read_bps': float(data[:, 3].mean()), 'avg_disk_write_bps': float(data[:, 4].mean()),
+            'avg_net_sent_bps': float(data[:, 5].mean()), 'avg_net_recv_bps': float(data[:, 6].mean()),
+        }
+    
+    def progress(self) -> Dict:
+        summary = self.summary()
+        with self._lock:
+            latest = self.samples[-1] if self.samples else None
+        return {
+            'id': self.id,
+            'status': self.status,
+            'elapsed': self.elapsed,
+            'duration': self.duration,
+            'percent': min(100.0, self.elapsed / self.duration * 100) if self.duration else 100.0,
+            'samples': summary.get('samples', 0),
+            'cpu_now': latest[1] if latest else 0.0,
+            'memory_now': latest[2] if latest else 0.0,
+            'cpu_avg': summary.get('avg_cpu', 0.0),
+            'cpu_max': summary.get('max_cpu', 0.0),
+            'report': self.report,
+        }
+    
+    def to_log(self) -> Dict:
+        """Job record for the log; the samples themselves live in the metric store"""
+        return {
+            'timestamp': datetime.now().isoformat(),
+            'job_id': self.id,
+            'status': self.status,
+            'started': self.started,
+            'finished': self.finished,
+            'duration_minutes': self.elapsed / 60,
+            'summary': self.summary()
+        }
+
 
 class SystemMonitor:
     def __init__(self):
         """Initialize system monitoring"""
         self.monitoring_data = {}
-        self.alerts_file = "system_alerts.json"
-        self.performance_log = "performance_log.json"
-        self.wmi_available = True
+        self.state_store = get_state_store()
+        self.wmi_available = wmi is not None
         
         try:
-            self.wmi_interface = wmi.WMI()
+            self.wmi_interface = wmi.WMI() if wmi is not None else None
         except:
             self.wmi_available = False
         
+        # Shared background sampler; queries read its latest sample instead of blocking
+        self.collector = get_collector()
+        
+        # On-disk history of every collector sample (raw, 1 min and 1 h rollups)
+        try:
+            self.metric_store = get_metric_store()
+            self.performance_log = str(self.metric_store.root / "monitoring_jobs.jsonl")
+        except Exception:
+            self.metric_store = None
+            self.performance_log = "monitoring_jobs.jsonl"
+        
+        # Background performance monitoring jobs
+        self.monitor_jobs: Dict[str, MonitorJob] = {}
+        self._jobs_lock = threading.RLock()
+        self._job_counter = 0
+        self._active_jobs = 0  # Running jobs; the collector listener is attached while this is above zero
+        
+        # Streaming anomaly detection over the collector's samples; alerts are logged as they are raised
+        self.anomaly_detector = get_anomaly_detector()
+        self.anomaly_detector.subscribe(self._on_anomaly_alert)
+        
         # Performance thresholds
         self.thresholds = {
             'cpu_warning': 80,
@@ -43,7 +169,9 @@ class SystemMonitor:
         """Get basic system information for quick reference"""
         try:
             # Get current system stats
-            cpu_percent = psutil.cpu_percent(interval=1)
+            sample = self.collector.latest()
+            cpu_percent = round(sample.get('cpu_percent', 0.0), 1)
+            cpu_window = self.collector.window('cpu_percent', 60)
             memory = psutil.virtual_memory()
             
             # Get disk usage for Windows (use C:)
@@ -64,7 +192,7 @@ class SystemMonitor:
             minutes, _ = divmod(remainder, 60)
             uptime_str = f"{days}d {hours}h {minutes}m"
             
-            info = f"""CPU Usage: {cpu_percent}%
+            info = f"""CPU Usage: {cpu_percent}% (1 min avg {cpu_window['avg']:.1f}%, max {cpu_window['max']:.1f}%)
 Memory Usage: {memory.percent}% ({self._format_bytes(memory.used)}/{self._format_bytes(memory.total)})
 Disk Usage: {disk_percent:.1f}%
 Uptime: {uptime_str}
@@ -109,7 +237,7 @@ Processes: {len(psutil.pids())}"""
                 info.append(f"Current Frequency: {cpu_freq.current:.2f}Mhz")
             
             # CPU usage per core
-            cpu_usage = psutil.cpu_percent(interval=1, percpu=True)
+            cpu_usage = [round(value, 1) for value in self.collector.latest().get('per_core', [])]
             info.append("CPU Usage Per Core:")
             for i, percentage in enumerate(cpu_usage):
                 info.append(f"  Core {i}: {percentage}%")
@@ -170,12 +298,15 @@ Processes: {len(psutil.pids())}"""
     def get_performance_metrics(self) -> Dict:
         """Get current performance metrics"""
         try:
+            sample = self.collector.latest()
+            cpu_freq = psutil.cpu_freq()
             metrics = {
                 'timestamp': datetime.now().isoformat(),
                 'cpu': {
-                    'usage_percent': psutil.cpu_percent(interval=1),
-                    'usage_per_core': psutil.cpu_percent(interval=1, percpu=True),
-                    'frequency': psutil.cpu_freq()._asdict() if psutil.cpu_freq() else None,
+                    'usage_percent': sample.get('cpu_percent', 0.0),
+                    'usage_per_core': sample.get('per_core', []),
+                    'rolling_1m': self.collector.window('cpu_percent', 60),
+                    'frequency': cpu_freq._asdict() if cpu_freq else None,
                     'load_average': os.getloadavg() if hasattr(os, 'getloadavg') else None
                 },
                 'memory': {
@@ -187,10 +318,11 @@ Processes: {len(psutil.pids())}"""
                 'processes': self._get_top_processes()
             }
             
-            # Disk I/O
-            disk_io = psutil.disk_io_counters()
-            if disk_io:
-                metrics['disk']['io'] = disk_io._asdict()
+            # Disk I/O (cumulative counters plus the sampler's current rates)
+            if sample.get('disk_io'):
+                metrics['disk']['io'] = dict(sample['disk_io'],
+                                             read_bps=sample['disk_read_bps'],
+                                             write_bps=sample['disk_write_bps'])
             
             # Disk usage for each partition
             for partition in psutil.disk_partitions():
@@ -206,13 +338,15 @@ Processes: {len(psutil.pids())}"""
                     continue
             
             # Network I/O
-            net_io = psutil.net_io_counters()
-            if net_io:
-                metrics['network']['io'] = net_io._asdict()
+            if sample.get('net_io'):
+                metrics['network']['io'] = dict(sample['net_io'],
+                                                sent_bps=sample['net_sent_bps'],
+                                                recv_bps=sample['net_recv_bps'])
             
-            # Network connections
-            connections = len(psutil.net_connections())
-            metrics['network']['connections'] = connections
+            # Network connections (sampled in the background)
+            summary = get_network_state().connection_summary()
+            if 'total' in summary:
+                metrics['network']['connections'] = summary['total']
             
             return metrics
             
@@ -222,18 +356,7 @@ Processes: {len(psutil.pids())}"""
     def _get_top_processes(self, limit: int = 10) -> List[Dict]:
         """Get top processes by CPU usage"""
         try:
-            processes = []
-            for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent', 'status']):
-                try:
-                    proc_info = proc.info
-                    proc_info['cpu_percent'] = proc.cpu_percent()
-                    processes.append(proc_info)
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    continue
-            
-            # Sort by CPU usage
-            processes.sort(key=lambda x: x.get('cpu_percent', 0), reverse=True)
-            return processes[:limit]
+            return get_process_table().top(limit, 'cpu_percent')
             
         except Exception:
             return []
@@ -254,32 +377,27 @@ Processes: {len(psutil.pids())}"""
             health_report.append(f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
             health_report.append("")
             
+            # CPU and memory status come from the streaming detector (smoothed baselines, sustained
+            # deviations, leak slope) rather than one instantaneous sample
+            detected = self.anomaly_detector.active_alerts()
+            status_icons = {'critical': "🔴 CRITICAL", 'warning': "🟡 WARNING"}
+            
+            def series_status(series):
+                severities = [a.severity for a in detected if a.series == series]
+                if 'critical' in severities:
+                    return status_icons['critical']
+                return status_icons['warning'] if severities else "✅ GOOD"
+            
             # CPU Health
             cpu_usage = metrics['cpu']['usage_percent']
-            health_report.append(f"CPU Usage: {cpu_usage:.1f}%")
-            
-            if cpu_usage > self.thresholds['cpu_critical']:
-                alerts.append(f"🔴 CRITICAL: CPU usage is very high ({cpu_usage:.1f}%)")
-                health_report.append("  Status: 🔴 CRITICAL")
-            elif cpu_usage > self.thresholds['cpu_warning']:
-                alerts.append(f"🟡 WARNING: CPU usage is high ({cpu_usage:.1f}%)")
-                health_report.append("  Status: 🟡 WARNING")
-            else:
-                health_report.append("  Status: ✅ GOOD")
+            health_report.append(f"CPU Usage: {cpu_usage:.1f}% (baseline {self.anomaly_detector.baseline('cpu_percent'):.1f}%)")
+            health_report.append(f"  Status: {series_status('cpu_percent')}")
             
             # Memory Health
             memory_percent = metrics['memory']['virtual']['percent']
             memory_available = self._format_bytes(metrics['memory']['virtual']['available'])
             health_report.append(f"Memory Usage: {memory_percent:.1f}% (Available: {memory_available})")
-            
-            if memory_percent > self.thresholds['memory_critical']:
-                alerts.append(f"🔴 CRITICAL: Memory usage is very high ({memory_percent:.1f}%)")
-                health_report.append("  Status: 🔴 CRITICAL")
-            elif memory_percent > self.thresholds['memory_warning']:
-                alerts.append(f"🟡 WARNING: Memory usage is high ({memory_percent:.1f}%)")
-                health_report.append("  Status: 🟡 WARNING")
-            else:
-                health_report.append("  Status: ✅ GOOD")
+            health_report.append(f"  Status: {series_status('memory_percent')}")
             
             # Disk Health
             health_report.append("Disk Usage:")
@@ -325,13 +443,16 @@ Processes: {len(psutil.pids())}"""
             health_report.append(f"System Uptime: {self._format_timedelta(uptime)}")
             
             # Overall health status
-            if alerts:
+            if alerts or detected:
                 health_report.append("\n=== ALERTS ===")
+                for alert in detected:
+                    health_report.append(f"{status_icons.get(alert.severity, 'ℹ️ INFO')}: {alert.message}")
                 for alert in alerts:
                     health_report.append(alert)
                 
-                # Save alerts
-                self._save_alerts(alerts)
+                # Save alerts (detector alerts were saved when they were raised)
+                if alerts:
+                    self._save_alerts(alerts)
             else:
                 health_report.append("\n✅ System health is GOOD - No issues detected")
             
@@ -431,76 +552,138 @@ Processes: {len(psutil.pids())}"""
         
         return None
     
-    def monitor_performance(self, duration_minutes: int = 5) -> str:
-        """Monitor system performance over time"""
+    def start_monitoring(self, duration_minutes: float = 5, interval: float = 0.5,
+                         on_complete: Optional[Callable] = None) -> str:
+        """Start a background performance monitoring job and return its ID immediately"""
+        with self._jobs_lock:
+            self._job_counter += 1
+            job_id = f"mon_{self._job_counter}"
+            job = MonitorJob(job_id, duration_minutes * 60, interval, on_complete)
+            self.monitor_jobs[job_id] = job
+            self._active_jobs += 1
+            if self._active_jobs == 1:
+                self.collector.add_listener(self._on_metrics_sample)
+        # Sub-second sampling only while someone is watching
+        self.collector.request_interval(job_id, interval)
+        return job_id
+    
+    def monitor_performance(self, duration_minutes: float = 5, wait: bool = False) -> str:
+        """Monitor system performance over time as a background job.
+        
+        Returns right away with the job ID unless wait=True, in which case it blocks for the report.
+        """
         try:
-            samples = []
-            interval = 30  # seconds
-            total_samples = (duration_minutes * 60) // interval
-            
-            for i in range(total_samples):
-                sample = {
-                    'timestamp': datetime.now().isoformat(),
-                    'cpu_percent': psutil.cpu_percent(interval=1),
-                    'memory_percent': psutil.virtual_memory().percent,
-                    'disk_usage': {}
-                }
-                
-                # Sample disk usage for main drives
-                for partition in psutil.disk_partitions()[:2]:  # Limit to first 2 drives
-                    try:
-                        usage = psutil.disk_usage(partition.mountpoint)
-                        sample['disk_usage'][partition.device] = (usage.used / usage.total) * 100
-                    except:
-                        continue
-                
-                samples.append(sample)
-                
-                if i < total_samples - 1:  # Don't sleep on last iteration
-                    time.sleep(interval)
-            
-            # Analyze samples
-            if not samples:
-                return "No performance data collected"
-            
-            avg_cpu = sum(s['cpu_percent'] for s in samples) / len(samples)
-            max_cpu = max(s['cpu_percent'] for s in samples)
-            avg_memory = sum(s['memory_percent'] for s in samples) / len(samples)
-            max_memory = max(s['memory_percent'] for s in samples)
-            
-            report = []
-            report.append(f"=== PERFORMANCE MONITORING REPORT ===")
-            report.append(f"Duration: {duration_minutes} minutes")
-            report.append(f"Samples: {len(samples)}")
-            report.append("")
-            report.append(f"CPU Usage:")
-            report.append(f"  Average: {avg_cpu:.1f}%")
-            report.append(f"  Maximum: {max_cpu:.1f}%")
-            report.append("")
-            report.append(f"Memory Usage:")
-            report.append(f"  Average: {avg_memory:.1f}%")
-            report.append(f"  Maximum: {max_memory:.1f}%")
-            
-            # Save detailed data
-            log_data = {
-                'timestamp': datetime.now().isoformat(),
-                'duration_minutes': duration_minutes,
-                'samples': samples,
-                'summary': {
-                    'avg_cpu': avg_cpu,
-                    'max_cpu': max_cpu,
-                    'avg_memory': avg_memory,
-                    'max_memory': max_memory
-                }
-            }
-            
-            self._save_performance_log(log_data)
-            
-            return "\n".join(report)
-            
+            job_id = self.start_monitoring(duration_minutes)
+            if wait:
+                job = self.monitor_jobs[job_id]
+                job.wait()
+                return job.report
+            return (f"Performance monitoring started (job {job_id}, {duration_minutes} minutes). "
+                    f"Ask for 'monitoring status' or 'stop monitoring' any time.")
         except Exception as e:
             return f"Error monitoring performance: {e}"
     
+    def get_monitoring_job(self, job_id: Optional[str] = None) -> Optional["MonitorJob"]:
+        """Look up a job by ID, or the most recent one"""
+        with self._jobs_lock:
+            if job_id:
+                return self.monitor_jobs.get(job_id)
+            return next(reversed(self.monitor_jobs.values()), None) if self.monitor_jobs else None
+    
+    def get_monitoring_status(self, job_id: Optional[str] = None) -> str:
+        """Progress of a monitoring job, or its report once finished"""
+        job = self.get_monitoring_job(job_id)
+        if job is None:
+            return "No performance monitoring job found."
+        if not job.is_running and job.report:
+            return job.report
+        progress = job.progress()
+        return (f"Monitoring job {job.id}: {progress['percent']:.0f}% complete "
+                f"({progress['elapsed']:.0f}s of {progress['duration']:.0f}s, {progress['samples']} samples). "
+                f"CPU now {progress['cpu_now']:.1f}% (avg {progress['cpu_avg']:.1f}%, max {progress['cpu_max']:.1f}%), "
+                f"memory {progress['memory_now']:.1f}%")
+    
+    def iter_monitoring_progress(self, job_id: Optional[str] = None, every: float = 1.0) -> Iterator[Dict]:
+        """Yield progress snapshots every `every` seconds until the job finishes (last one includes the report)"""
+        job = self.get_monitoring_job(job_id)
+        if job is None:
+            return
+        while not job.wait(every):
+            yield job.progress()
+        yield job.progress()
+    
+    def cancel_monitoring(self, job_id: Optional[str] = None) -> str:
+        """Stop a running monitoring job early; a report is still produced from the samples so far"""
+        job = self.get_monitoring_job(job_id)
+        if job is None:
+            return "No performance monitoring job found."
+        if not job.is_running:
+            return f"Monitoring job {job.id} is already {job.status}."
+        self._finish_job(job, 'cancelled')
+        return f"Monitoring job {job.id} cancelled after {len(job.samples)} samples."
+    
+    def list_monitoring_jobs(self) -> List[Dict]:
+        with self._jobs_lock:
+            return [job.progress() for job in self.monitor_jobs.values()]
+    
+    def _on_metrics_sample(self, sample: Dict):
+        """Collector callback: feed every running job and finish the ones that are due"""
+        with self._jobs_lock:
+            running = [job for job in self.monitor_jobs.values() if job.is_running]
+        for job in running:
+            job.add_sample(sample)
+            if job.elapsed >= job.duration:
+                self._finish_job(job, 'completed')
+    
+    def _finish_job(self, job: "MonitorJob", status: str):
+        # Finishing and the listener decision happen together, so a job started meanwhile keeps its samples
+        with self._jobs_lock:
+            if not job.finish(status):
+                return
+            self._active_jobs -= 1
+            if self._active_jobs == 0:
+                self.collector.remove_listener(self._on_metrics_sample)
+        self.collector.request_interval(job.id, None)
+        
+        job.report = self._build_monitoring_report(job)
+        try:
+            self._save_performance_log(job.to_log())
+        except Exception as e:
+            print(f"Error saving performance log: {e}")
+        job.mark_done()
+        if job.on_complete:
+            try:
+                job.on_complete(job)
+            except Exception as e:
+                print(f"Monitoring callback error: {e}")
+    
+    def _build_monitoring_report(self, job: "MonitorJob") -> str:
+        summary = job.summary()
+        if not summary:
+            return f"Monitoring job {job.id} {job.status}: no performance data collected"
+        
+        report = []
+        report.append(f"=== PERFORMANCE MONITORING REPORT ===")
+        report.append(f"Job: {job.id} ({job.status})")
+        duration = f"{job.elapsed:.0f} seconds" if job.elapsed < 120 else f"{job.elapsed / 60:.1f} minutes"
+        report.append(f"Duration: {duration}")
+        report.append(f"Samples: {summary['samples']} (every {job.interval:g}s)")
+        report.append("")
+        report.append(f"CPU Usage:")
+        report.append(f"  Average: {summary['avg_cpu']:.1f}%")
+        report.append(f"  Minimum: {summary['min_cpu']:.1f}%")
+        report.append(f"  Maximum: {summary['max_cpu']:.1f}%")
+        report.append("")
+        report.append(f"Memory Usage:")
+        report.append(f"  Average: {summary['avg_memory']:.1f}%")
+        report.append(f"  Maximum: {summary['max_memory']:.1f}%")
+        report.append("")
+        report.append(f"Disk I/O: {self._format_bytes(summary['avg_disk_read_bps'])}/s read, "
+                      f"{self._format_bytes(summary['avg_disk_write_bps'])}/s write (average)")
+        report.append(f"Network: {self._format_bytes(summary['avg_net_sent_bps'])}/s sent, "
+                      f"{self._format_bytes(summary['avg_net_recv_bps'])}/s received (average)")
+        return "\n".join(report)
+    
     def _format_bytes(self, bytes_value: int) -> str:
         """Format bytes to human readable format"""
         for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
@@ -525,76 +708,85 @@ Processes: {len(psutil.pids())}"""
         
         return ", ".join(parts) if parts else "Less than a minute"
     
-    def _save_alerts(self, alerts: List[str]):
-        """Save system alerts to file"""
+    def _on_anomaly_alert(self, alert):
+        """Detector subscriber: keep a record of every raised alert"""
+        self._save_alerts([f"{alert.severity.upper()}: {alert.message}"], alert.severity)
+    
+    def _save_alerts(self, alerts: List[str], severity: Optional[str] = None):
+        """Append system alerts to the state store (one row each; nothing is re-read)"""
         try:
-            alert_data = {
-                'timestamp': datetime.now().isoformat(),
-                'alerts': alerts
-            }
-            
-            # Load existing alerts
-            existing_alerts = []
-            if os.path.exists(self.alerts_file):
-                with open(self.alerts_file, 'r') as f:
-                    existing_alerts = json.load(f)
-            
-            # Add new alerts
-            existing_alerts.append(alert_data)
-            
-            # Keep only last 100 alerts
-            existing_alerts = existing_alerts[-100:]
-            
-            # Save back to file
-            with open(self.alerts_file, 'w') as f:
-                json.dump(existing_alerts, f, indent=2)
-                
+            self.state_store.add_alerts(alerts, severity)
         except Exception as e:
             print(f"Error saving alerts: {e}")
     
     def _save_performance_log(self, log_data: Dict):
-        """Save performance monitoring data"""
+        """Append one monitoring job record (a single JSON line; nothing is re-read or rewritten)"""
         try:
-            # Load existing logs
-            existing_logs = []
-            if os.path.exists(self.performance_log):
-                with open(self.performance_log, 'r') as f:
-                    existing_logs = json.load(f)
-            
-            # Add new log
-            existing_logs.append(log_data)
-            
-            # Keep only last 50 logs
-            existing_logs = existing_logs[-50:]
-            
-            # Save back to file
-            with open(self.performance_log, 'w') as f:
-                json.dump(existing_logs, f, indent=2)
-                
+            if self.metric_store is not None:
+                self.metric_store.flush()
+            with open(self.performance_log, 'a') as f:
+                f.write(json.dumps(log_data) + "\n")
         except Exception as e:
             print(f"Error saving performance log: {e}")
     
+    # Spoken metric names -> (store field, label, unit)
+    HISTORY_METRICS = (
+        (('memory', 'ram'), 'memory_percent', 'memory usage', '%'),
+        (('swap',), 'swap_percent', 'swap usage', '%'),
+        (('disk read',), 'disk_read_bps', 'disk read', 'B/s'),
+        (('disk write', 'disk',), 'disk_write_bps', 'disk write', 'B/s'),
+        (('upload', 'sent'), 'net_sent_bps', 'upload', 'B/s'),
+        (('download', 'network', 'received'), 'net_recv_bps', 'download', 'B/s'),
+        (('cpu', 'processor'), 'cpu_percent', 'CPU', '%'),
+    )
+    
+    def get_metric_history(self, query: str) -> str:
+        """Answer questions like 'average CPU yesterday afternoon' from the metric store"""
+        if self.metric_store is None:
+            return "Performance history is not available"
+        time_range = parse_time_range(query)
+        if time_range is None:
+            return "Please give a time range, for example 'yesterday afternoon' or 'last 2 hours'"
+        start, end, label = time_range
+        
+        query = query.lower()
+        field, name, unit = 'cpu_percent', 'CPU', '%'
+        for words, metric, metric_name, metric_unit in self.HISTORY_METRICS:
+            if any(word in query for word in words):
+                field, name, unit = metric, metric_name, metric_unit
+                break
+        
+        stats = self.metric_store.aggregate(field, start, end)
+        if stats['samples'] == 0:
+            return f"No {name} history recorded for {label}"
+        
+        def fmt(value):
+            return f"{value:.1f}%" if unit == '%' else f"{self._format_bytes(value)}/s"
+        
+        span = f"{datetime.fromtimestamp(start):%a %H:%M} - {datetime.fromtimestamp(end):%a %H:%M}"
+        return (f"Average {name} {label} ({span}): {fmt(stats['avg'])} "
+                f"(min {fmt(stats['min'])}, max {fmt(stats['max'])}, {stats['samples']} samples)")
+    
     def get_network_analysis(self) -> str:
         """Get detailed network analysis"""
         try:
             analysis = []
             analysis.append("=== NETWORK ANALYSIS ===")
             
-            # Active connections
-            connections = psutil.net_connections()
-            tcp_count = sum(1 for conn in connections if conn.type == socket.SOCK_STREAM)
-            udp_count = sum(1 for conn in connections if conn.type == socket.SOCK_DGRAM)
-            
-            analysis.append(f"Active Connections: {len(connections)}")
-            analysis.append(f"  TCP: {tcp_count}")
-            analysis.append(f"  UDP: {udp_count}")
+            # Active connections (cached breakdown from the network-state sampler)
+            summary = get_network_state().connection_summary()
+            if 'error' in summary:
+                analysis.append(f"Active Connections: unavailable ({summary['error']})")
+            elif 'total' in summary:
+                analysis.append(f"Active Connections: {summary['total']} "
+                                f"(sampled {summary['age_seconds']:.0f}s ago, peak {summary['peak_total']})")
+                analysis.append(f"  TCP: {summary['tcp']}")
+                analysis.append(f"  UDP: {summary['udp']}")
+            else:
+                analysis.append("Active Connections: sampling...")
             
             # Connection states
-            states = {}
-            for conn in connections:
-                if hasattr(conn, 'status'):
-                    states[conn.status] = states.get(conn.status, 0) + 1
-            
+            states = summary.get('states', {})
             if states:
                 analysis.append("Connection States:")
                 for state, count in sorted(states.items()):
@@ -5,21 +5,46 @@ Handles scheduled tasks, reminders, and automation routines
 
 import threading
 import time
-import json
-import os
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Callable
-import schedule
+import re
+from datetime import datetime
+from typing import Dict, Optional
+from tts_worker import PRIORITY_HIGH
+from event_scheduler import EventScheduler
+from schedule_expr import DELAY_PHRASE, Recurrence, compile_schedule
+from state_store import get_state_store
+from worker_pool import WorkerPool, current_job, DONE, FAILED, TIMED_OUT, CANCELLED
+
+# What to do with runs that were due while JARVIS was not running (or the machine was asleep)
+MISFIRE_POLICIES = ("fire_once", "fire_all", "skip")
 
 class TaskScheduler:
-    def __init__(self, jarvis_instance):
+    def __init__(self, jarvis_instance, store=None):
         """Initialize task scheduler with reference to JARVIS"""
         self.jarvis = jarvis_instance
-        self.tasks_file = "scheduled_tasks.json"
+        self.store = store or get_state_store()
         self.active_tasks = {}
         self.task_counter = 0
-        self.scheduler_thread = None
+        self.scheduler = EventScheduler()
         self.is_running = False
+        self._lock = threading.RLock()
+        
+        # Due tasks run on a bounded pool so a slow backup or LLM command never delays a reminder
+        try:
+            from config import Config
+            settings = getattr(Config, "SCHEDULER", {})
+        except Exception:
+            settings = {}
+        self.pool = WorkerPool(
+            workers=settings.get("workers", 4),
+            limits=settings.get("concurrency", {}),
+            timeouts=settings.get("timeouts", {}),
+            timers=self.scheduler
+        )
+        self.priorities = settings.get("priorities", {"reminder": 0})
+        self.misfire_policy = settings.get("misfire_policy", "fire_once")
+        self.misfire_grace = settings.get("misfire_grace_seconds", 60)
+        self.max_catch_up = settings.get("max_catch_up_runs", 24)
+        self._recurrences: Dict[str, Recurrence] = {}
         
         # Load existing tasks
         self.load_tasks()
@@ -27,33 +52,40 @@ class TaskScheduler:
         # Start scheduler thread
         self.start_scheduler()
     
-    def schedule_task(self, task_description: str, when: str, task_type: str = "command") -> str:
+    def schedule_task(self, task_description: str, when: str, task_type: str = "command",
+                      misfire: Optional[str] = None) -> str:
         """Schedule a task for execution"""
         try:
+            # Compile the 'when' parameter once; only the structured form is used from here on
+            now = time.time()
+            recurrence = compile_schedule(when, now)
+            if recurrence is None:
+                return f"Unable to parse schedule time: {when}"
+            if misfire is not None and misfire not in MISFIRE_POLICIES:
+                return f"Unknown misfire policy: {misfire}"
+            
             task_id = f"task_{self.task_counter}"
             self.task_counter += 1
             
-            # Parse the 'when' parameter
-            schedule_time = self._parse_schedule_time(when)
-            if not schedule_time:
-                return f"Unable to parse schedule time: {when}"
-            
             # Create task object
             task = {
                 'id': task_id,
                 'description': task_description,
                 'schedule': when,
                 'type': task_type,
-                'created': datetime.now().isoformat(),
-                'next_run': schedule_time.isoformat() if schedule_time else None,
+                'created': datetime.fromtimestamp(now).isoformat(),
+                'recurrence': recurrence.to_dict(),
                 'status': 'scheduled'
             }
+            if misfire:
+                task['misfire'] = misfire
+            self._recurrences[task_id] = recurrence
             
             self.active_tasks[task_id] = task
-            self.save_tasks()
             
-            # Schedule with the schedule library
-            self._add_to_scheduler(task)
+            # Queue on the event scheduler
+            self._add_to_scheduler(task, recurrence.next_fire(now))
+            self.save_task(task)
             
             return f"Task scheduled: {task_description} at {when} (ID: {task_id})"
             
@@ -104,10 +136,11 @@ class TaskScheduler:
         task = self.active_tasks[task_id]
         task['status'] = 'cancelled'
         
-        # Remove from scheduler
-        schedule.clear(task_id)
+        # Remove from scheduler and stop a run that is in progress
+        self.scheduler.cancel(task_id)
+        self.pool.cancel(task_id)
         
-        self.save_tasks()
+        self.save_task(task)
         return f"Task cancelled: {task['description']}"
     
     def execute_task_now(self, task_id: str) -> str:
@@ -119,105 +152,62 @@ class TaskScheduler:
         result = self._execute_task(task)
         return f"Task executed: {task['description']}. Result: {result}"
     
-    def _parse_schedule_time(self, when: str) -> Optional[datetime]:
-        """Parse various time formats into datetime"""
-        when = when.lower().strip()
-        now = datetime.now()
-        
-        try:
-            # Handle relative times
-            if "in" in when:
-                if "minute" in when:
-                    minutes = int(''.join(filter(str.isdigit, when)))
-                    return now + timedelta(minutes=minutes)
-                elif "hour" in when:
-                    hours = int(''.join(filter(str.isdigit, when)))
-                    return now + timedelta(hours=hours)
-                elif "day" in when:
-                    days = int(''.join(filter(str.isdigit, when)))
-                    return now + timedelta(days=days)
-            
-            # Handle specific times
-            elif ":" in when:  # HH:MM format
-                time_part = when.replace("at", "").strip()
-                hour, minute = map(int, time_part.split(":"))
-                scheduled_time = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
-                
-                # If time has passed today, schedule for tomorrow
-                if scheduled_time <= now:
-                    scheduled_time += timedelta(days=1)
-                
-                return scheduled_time
-            
-            # Handle recurring patterns
-            elif when in ["daily", "every day"]:
-                return now + timedelta(days=1)
-            elif when in ["weekly", "every week"]:
-                return now + timedelta(weeks=1)
-            elif when in ["hourly", "every hour"]:
-                return now + timedelta(hours=1)
-            
-            # Handle specific days
-            elif "monday" in when:
-                days_ahead = 0 - now.weekday()
-                if days_ahead <= 0:
-                    days_ahead += 7
-                return now + timedelta(days=days_ahead)
-            
-            # Add more patterns as needed
-            
-        except Exception:
-            pass
-        
-        return None
+    def _recurrence(self, task: Dict) -> Optional[Recurrence]:
+        """Compiled schedule for a task (tasks saved before schedules were compiled are compiled from their text)"""
+        recurrence = self._recurrences.get(task['id'])
+        if recurrence is None:
+            if 'recurrence' in task:
+                recurrence = Recurrence.from_dict(task['recurrence'])
+            else:
+                created = _parse_time(task.get('created')) or time.time()
+                recurrence = compile_schedule(task['schedule'], created)
+                if recurrence is None:
+                    return None
+                task['recurrence'] = recurrence.to_dict()
+            self._recurrences[task['id']] = recurrence
+        return recurrence
     
-    def _add_to_scheduler(self, task: Dict):
-        """Add task to the schedule library"""
-        when = task['schedule'].lower()
-        task_id = task['id']
-        
-        if "daily" in when or "every day" in when:
-            schedule.every().day.do(self._execute_task_wrapper, task).tag(task_id)
-        elif "weekly" in when or "every week" in when:
-            schedule.every().week.do(self._execute_task_wrapper, task).tag(task_id)
-        elif "hourly" in when or "every hour" in when:
-            schedule.every().hour.do(self._execute_task_wrapper, task).tag(task_id)
-        elif ":" in when:  # Specific time
-            time_part = when.replace("at", "").strip()
-            schedule.every().day.at(time_part).do(self._execute_task_wrapper, task).tag(task_id)
-        elif "in" in when:
-            # For one-time tasks with delays
-            delay_seconds = self._parse_delay_seconds(when)
-            if delay_seconds:
-                threading.Timer(delay_seconds, self._execute_task_wrapper, args=[task]).start()
+    def _add_to_scheduler(self, task: Dict, due: Optional[float]):
+        """Queue the task's next run on the event scheduler"""
+        task['next_run'] = datetime.fromtimestamp(due).isoformat() if due is not None else None
+        if due is not None:
+            self.scheduler.schedule_at(due, self._dispatch_task, task, due, key=task['id'])
     
-    def _parse_delay_seconds(self, when: str) -> Optional[int]:
-        """Parse delay string into seconds"""
-        when = when.lower()
-        try:
-            if "minute" in when:
-                minutes = int(''.join(filter(str.isdigit, when)))
-                return minutes * 60
-            elif "hour" in when:
-                hours = int(''.join(filter(str.isdigit, when)))
-                return hours * 3600
-            elif "second" in when:
-                seconds = int(''.join(filter(str.isdigit, when)))
-                return seconds
-        except:
-            pass
-        return None
+    def _dispatch_task(self, task: Dict, due: float):
+        """Scheduler-thread callback: hand the task to the pool and queue its next run right away"""
+        if task.get('status') != 'scheduled':
+            return
+        recurrence = self._recurrence(task)
+        now = time.time()
+        if recurrence is not None and due < now - self.misfire_grace:
+            # Fired long after its slot (suspend, clock jump): the misfire policy decides the runs, not one per slot
+            self._add_to_scheduler(task, self._apply_misfire(task, recurrence, due, now))
+            self.save_task(task)
+            return
+        if recurrence is not None and recurrence.recurring:
+            # The next run counts from this run's due time, so late starts never shift the schedule
+            self._add_to_scheduler(task, recurrence.next_fire(due))
+            self.save_task(task)
+        self._submit(task)
     
-    def _execute_task_wrapper(self, task: Dict):
-        """Wrapper for task execution with error handling"""
-        try:
-            result = self._execute_task(task)
-            task['last_run'] = datetime.now().isoformat()
-            task['last_result'] = result
-            self.save_tasks()
-        except Exception as e:
-            task['last_error'] = str(e)
-            self.save_tasks()
+    def _submit(self, task: Dict):
+        task_type = task.get('type', 'command')
+        self.pool.submit(task_type, self._execute_task, task, key=task['id'],
+                         priority=self.priorities.get(task_type, 10), on_done=self._record_result)
+    
+    def _record_result(self, job):
+        """Worker-thread callback: store the outcome of a run"""
+        task = job.args[0]
+        with self._lock:
+            task['last_run'] = datetime.fromtimestamp(job.started or job.finished).isoformat()
+            if job.status == DONE:
+                task['last_result'] = job.result
+            elif job.status in (FAILED, TIMED_OUT):
+                task['last_error'] = job.error
+            recurrence = self._recurrence(task)
+            if task.get('status') == 'scheduled' and not (recurrence and recurrence.recurring):
+                task['status'] = 'completed' if job.status != CANCELLED else 'cancelled'
+            self.save_task(task)
     
     def _execute_task(self, task: Dict) -> str:
         """Execute a task based on its type"""
@@ -227,7 +217,9 @@ class TaskScheduler:
         try:
             if task_type == "reminder":
                 message = description.replace("reminder:", "").strip()
-                self.jarvis.voice_engine.speak(f"Reminder: {message}")
+                # The stock preamble plays from the audio cache; only the message is synthesized
+                self.jarvis.voice_engine.speak("Reminder", priority=PRIORITY_HIGH)
+                self.jarvis.voice_engine.speak(message, priority=PRIORITY_HIGH)
                 return f"Reminder delivered: {message}"
             
             elif task_type == "system_check":
@@ -257,32 +249,43 @@ class TaskScheduler:
             return f"Task execution failed: {e}"
     
     def _perform_backup(self) -> str:
-        """Perform basic file backup"""
+        """Incremental backup into the content-addressed store, then retention pruning"""
         try:
-            import shutil
             from pathlib import Path
+            from backup_store import BackupStore
+            try:
+                from config import Config
+                settings = getattr(Config, "BACKUP", {})
+            except Exception:
+                settings = {}
             
-            # Create backup directory
-            backup_dir = Path("backups") / datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Backup important files
-            important_files = ["config.py", "jarvis.py", "*.txt"]
-            backed_up = 0
+            store = BackupStore(
+                settings.get("directory", "backups"),
+                chunk_size=settings.get("chunk_size_kb", 1024) * 1024,
+                large_file=settings.get("large_file_mb", 8) * 1024 * 1024,
+            )
             
-            for pattern in important_files:
+            files = []
+            for pattern in settings.get("paths", ["config.py", "jarvis.py", "*.txt"]):
                 if "*" in pattern:
-                    for file_path in Path(".").glob(pattern):
-                        if file_path.is_file():
-                            shutil.copy2(file_path, backup_dir)
-                            backed_up += 1
-                else:
-                    file_path = Path(pattern)
-                    if file_path.exists():
-                        shutil.copy2(file_path, backup_dir)
-                        backed_up += 1
+                    files.extend(p for p in sorted(Path(".").glob(pattern)) if p.is_file())
+                elif Path(pattern).is_file():
+                    files.append(Path(pattern))
             
-            return f"Backup completed: {backed_up} files backed up to {backup_dir}"
+            job = current_job()
+            try:
+                manifest = store.backup(files, cancelled=lambda: bool(job and job.cancel_requested))
+            except InterruptedError:
+                return "Backup cancelled: no manifest written"
+            pruned = store.prune(settings.get("keep_last", 30))
+            
+            stats = manifest['stats']
+            result = (f"Backup completed: {stats['files']} files ({stats['unchanged']} unchanged, "
+                      f"{stats['new_chunks']} new chunks, {stats['new_bytes']} bytes stored) "
+                      f"as {manifest['id']} in {store.root}")
+            if pruned['manifests_removed']:
+                result += f"; pruned {pruned['manifests_removed']} old backups, freed {pruned['bytes_freed']} bytes"
+            return result
             
         except Exception as e:
             return f"Backup failed: {e}"
@@ -291,66 +294,93 @@ class TaskScheduler:
         """Start the background scheduler thread"""
         if not self.is_running:
             self.is_running = True
-            self.scheduler_thread = threading.Thread(target=self._scheduler_loop, daemon=True)
-            self.scheduler_thread.start()
+            self.scheduler.start()
+            self.pool.start()
     
     def stop_scheduler(self):
         """Stop the scheduler"""
         self.is_running = False
-        schedule.clear()
-    
-    def _scheduler_loop(self):
-        """Main scheduler loop"""
-        while self.is_running:
-            try:
-                schedule.run_pending()
-                time.sleep(30)  # Check every 30 seconds
-            except Exception as e:
-                print(f"Scheduler error: {e}")
-                time.sleep(60)  # Wait longer on error
+        self.pool.stop(wait=False)
+        self.scheduler.stop()
     
-    def save_tasks(self):
-        """Save tasks to file"""
+    def save_task(self, task: Dict):
+        """Persist one task (a single row update in the state store)"""
         try:
-            with open(self.tasks_file, 'w') as f:
-                json.dump(self.active_tasks, f, indent=2)
+            with self._lock:
+                self.store.save_task(task)
         except Exception as e:
-            print(f"Error saving tasks: {e}")
+            print(f"Error saving task: {e}")
+    
+    def save_tasks(self):
+        """Persist every task"""
+        with self._lock:
+            for task in list(self.active_tasks.values()):
+                self.save_task(task)
     
     def load_tasks(self):
-        """Load tasks from file"""
+        """Load tasks from the state store and rebuild the pending queue in one pass"""
         try:
-            if os.path.exists(self.tasks_file):
-                with open(self.tasks_file, 'r') as f:
-                    self.active_tasks = json.load(f)
-                    
-                # Reactivate non-completed tasks
-                for task in self.active_tasks.values():
-                    if task.get('status') == 'scheduled':
-                        self._add_to_scheduler(task)
+            self.active_tasks = self.store.load_tasks()
+            
+            # New IDs continue after the highest stored one
+            numbers = [int(task_id.split("_")[-1]) for task_id in self.active_tasks
+                       if task_id.split("_")[-1].isdigit()]
+            self.task_counter = max(numbers, default=-1) + 1
+            
+            now = time.time()
+            timers = []
+            for task in self.active_tasks.values():
+                if task.get('status') != 'scheduled':
+                    continue
+                recurrence = self._recurrence(task)
+                if recurrence is None:
+                    continue
+                due = _parse_time(task.get('next_run'))
+                if due is not None:
+                    # next_run is stored with microsecond precision; snap it back onto the exact schedule slot
+                    slot = recurrence.next_fire(due - 1e-3)
+                    if slot is not None and abs(slot - due) < 1e-3:
+                        due = slot
+                else:
+                    due = recurrence.next_fire(_parse_time(task.get('created')) or now)
+                if due is not None and due < now - self.misfire_grace:
+                    due = self._apply_misfire(task, recurrence, due, now)
+                task['next_run'] = datetime.fromtimestamp(due).isoformat() if due is not None else None
+                if due is not None:
+                    timers.append((due, self._dispatch_task, (task, due), task['id']))
+                self.save_task(task)
+            self.scheduler.schedule_many(timers)
                         
         except Exception as e:
             print(f"Error loading tasks: {e}")
             self.active_tasks = {}
     
+    def _apply_misfire(self, task: Dict, recurrence: Recurrence, due: float, now: float) -> Optional[float]:
+        """Handle runs missed while JARVIS was down; returns the next due time to queue (or None)"""
+        policy = task.get('misfire', self.misfire_policy)
+        missed = recurrence.occurrences(due, now, limit=self.max_catch_up)
+        runs = {'fire_all': len(missed), 'fire_once': 1, 'skip': 0}.get(policy, 1)
+        task['misfired'] = task.get('misfired', 0) + len(missed)
+        for _ in range(runs):
+            self._submit(task)
+        if not recurrence.recurring and runs == 0:
+            task['status'] = 'missed'
+        return recurrence.next_fire(now) if recurrence.recurring else None
+    
     # Voice command handlers
     def process_schedule_command(self, command: str) -> str:
         """Process schedule-related voice commands"""
         command = command.lower()
         
         if "schedule" in command and "reminder" in command:
-            # Extract reminder details
-            if "to" in command:
-                parts = command.split("to", 1)
-                if len(parts) > 1:
-                    reminder_text = parts[1].strip()
-                    when = "in 5 minutes"  # Default
-                    
-                    if "in" in command:
-                        when_match = command.split("in", 1)[-1].strip()
-                        when = f"in {when_match}"
-                    
-                    return self.schedule_reminder(reminder_text, when)
+            # Extract reminder details: the delay phrase can sit anywhere, the message follows "to"
+            delay = DELAY_PHRASE.search(command)
+            when = delay.group(0) if delay else "in 5 minutes"  # Default
+            rest = command[:delay.start()] + command[delay.end():] if delay else command
+            message = re.search(r'\bto\b(.*)', rest)
+            if message and message.group(1).strip():
+                reminder_text = " ".join(message.group(1).split())
+                return self.schedule_reminder(reminder_text, when)
         
         elif "schedule" in command and "task" in command:
             # Generic task scheduling
@@ -370,3 +400,10 @@ class TaskScheduler:
             return "Please specify task ID to cancel (e.g., 'cancel task task_1')"
         
         return "I couldn't understand the schedule command. Try 'schedule reminder to check email in 10 minutes' or 'list scheduled tasks'."
+
+
+def _parse_time(value: Optional[str]) -> Optional[float]:
+    try:
+        return datetime.fromisoformat(value).timestamp() if value else None
+    except ValueError:
+        return None
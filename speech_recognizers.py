@@ -0,0 +1,272 @@
+"""
+Speech Recognition Backends for JARVIS
+Pluggable cloud and offline speech-to-text with streaming partial results
+"""
+
+import json
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+
+class RecognitionError(Exception):
+    """The backend failed (service unreachable, model missing), as opposed to hearing no words"""
+
+
+class RecognitionSession:
+    """Incremental recognition of one utterance; the base session buffers and transcribes at the end"""
+
+    def __init__(self, backend: "SpeechBackend", sample_rate: int):
+        self.backend = backend
+        self.sample_rate = sample_rate
+        self._chunks: List[bytes] = []
+
+    def accept(self, pcm: bytes) -> Optional[str]:
+        """Feed 16-bit mono PCM; returns the current partial transcript when the backend has one"""
+        self._chunks.append(pcm)
+        return None
+
+    def finish(self) -> str:
+        return self.backend.transcribe(b''.join(self._chunks), self.sample_rate)
+
+
+class SpeechBackend:
+    name = "base"
+    offline = False
+    streaming = False
+
+    def is_available(self) -> bool:
+        return True
+
+    def transcribe(self, pcm: bytes, sample_rate: int = SAMPLE_RATE) -> str:
+        """Transcribe a complete utterance of 16-bit mono PCM; returns '' when no words were recognized"""
+        raise NotImplementedError
+
+    def start_session(self, sample_rate: int = SAMPLE_RATE) -> RecognitionSession:
+        return RecognitionSession(self, sample_rate)
+
+
+class GoogleSpeechBackend(SpeechBackend):
+    name = "google"
+
+    def __init__(self, language: str = "en-US"):
+        import speech_recognition as sr
+        self._sr = sr
+        self.language = language
+        self.recognizer = sr.Recognizer()
+
+    def transcribe(self, pcm: bytes, sample_rate: int = SAMPLE_RATE) -> str:
+        audio = self._sr.AudioData(pcm, sample_rate, 2)
+        try:
+            return self.recognizer.recognize_google(audio, language=self.language)
+        except self._sr.UnknownValueError:
+            return ""
+        except self._sr.RequestError as e:
+            raise RecognitionError(str(e)) from e
+
+
+class _VoskSession(RecognitionSession):
+    def __init__(self, backend: "VoskSpeechBackend", sample_rate: int):
+        super().__init__(backend, sample_rate)
+        self._recognizer = backend.new_recognizer(sample_rate)
+        self._final_parts: List[str] = []
+
+    def accept(self, pcm: bytes) -> Optional[str]:
+        if self._recognizer.AcceptWaveform(pcm):
+            # Vosk closed a segment on an internal pause
+            text = json.loads(self._recognizer.Result()).get("text", "")
+            if text:
+                self._final_parts.append(text)
+            return " ".join(self._final_parts)
+        partial = json.loads(self._recognizer.PartialResult()).get("partial", "")
+        return " ".join(self._final_parts + ([partial] if partial else []))
+
+    def finish(self) -> str:
+        text = json.loads(self._recognizer.FinalResult()).get("text", "")
+        if text:
+            self._final_parts.append(text)
+        return " ".join(self._final_parts)
+
+
+class VoskSpeechBackend(SpeechBackend):
+    name = "vosk"
+    offline = True
+    streaming = True
+
+    def __init__(self, model_path: Optional[str] = None):
+        """Load a Vosk (Kaldi) model from model_path; small English models decode faster than real time on one core"""
+        try:
+            import vosk
+        except ImportError as e:
+            raise RecognitionError("vosk is not installed (pip install vosk)") from e
+        vosk.SetLogLevel(-1)
+        try:
+            self.model = vosk.Model(model_path) if model_path else vosk.Model(lang="en-us")
+        except Exception as e:
+            raise RecognitionError(f"Could not load Vosk model: {e}") from e
+        self._vosk = vosk
+
+    def new_recognizer(self, sample_rate: int):
+        return self._vosk.KaldiRecognizer(self.model, sample_rate)
+
+    def transcribe(self, pcm: bytes, sample_rate: int = SAMPLE_RATE) -> str:
+        session = self.start_session(sample_rate)
+        session.accept(pcm)
+        return session.finish()
+
+    def start_session(self, sample_rate: int = SAMPLE_RATE) -> RecognitionSession:
+        return _VoskSession(self, sample_rate)
+
+
+class WhisperSpeechBackend(SpeechBackend):
+    name = "whisper"
+    offline = True
+
+    def __init__(self, model_size: str = "base.en", compute_type: str = "int8"):
+        """CPU Whisper via faster-whisper (CTranslate2); transcribes whole utterances, no partials"""
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError as e:
+            raise RecognitionError("faster-whisper is not installed (pip install faster-whisper)") from e
+        try:
+            self.model = WhisperModel(model_size, device="cpu", compute_type=compute_type)
+        except Exception as e:
+            raise RecognitionError(f"Could not load Whisper model: {e}") from e
+
+    def transcribe(self, pcm: bytes, sample_rate: int = SAMPLE_RATE) -> str:
+        if sample_rate != SAMPLE_RATE:
+            raise RecognitionError("Whisper backend expects 16 kHz audio")
+        audio = np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+        segments, _ = self.model.transcribe(audio, language="en", beam_size=1, vad_filter=False)
+        return " ".join(segment.text.strip() for segment in segments).strip()
+
+
+BACKENDS = {
+    "google": GoogleSpeechBackend,
+    "vosk": VoskSpeechBackend,
+    "whisper": WhisperSpeechBackend,
+}
+
+
+def create_backend(name: str, **options) -> SpeechBackend:
+    """Instantiate a backend by name; raises RecognitionError if it cannot be loaded"""
+    if name not in BACKENDS:
+        raise RecognitionError(f"Unknown speech backend: {name}")
+    return BACKENDS[name](**options)
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """Word-level Levenshtein distance divided by the reference length"""
+    ref = reference.lower().split()
+    hyp = hypothesis.lower().split()
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, 1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word)
+            )
+        previous = current
+    return previous[-1] / len(ref)
+
+
+class StreamingTranscriber:
+    def __init__(self, backend: SpeechBackend, on_partial: Optional[Callable[[str], None]] = None):
+        """Transcribe utterances while they are still being spoken, fed by AudioCapture events.
+
+        Audio is handed over to a dedicated thread so slow decoding never stalls the capture loop.
+        """
+        self.backend = backend
+        self.on_partial = on_partial
+        self._events: "queue.Queue" = queue.Queue()
+        self._finals: Dict[int, str] = {}
+        self._finals_cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="jarvis-stt", daemon=True)
+        self._thread.start()
+
+    def attach(self, capture):
+        capture.add_listener(self._on_capture_event)
+
+    def detach(self, capture):
+        capture.remove_listener(self._on_capture_event)
+        self._events.put(None)
+
+    def wait_for_final(self, end_position: int, timeout: float = 5.0) -> Optional[str]:
+        """Final transcript of the utterance that ended at end_position (see Utterance.end_position)"""
+        with self._finals_cond:
+            self._finals_cond.wait_for(lambda: end_position in self._finals, timeout)
+            return self._finals.pop(end_position, None)
+
+    def _on_capture_event(self, event: str, info: dict):
+        self._events.put((event, info))
+
+    def _run(self):
+        session = None
+        sample_rate = SAMPLE_RATE
+        while True:
+            item = self._events.get()
+            if item is None:
+                return
+            event, info = item
+            try:
+                if event == 'speech_start':
+                    sample_rate = info.get('sample_rate', SAMPLE_RATE)
+                    session = self.backend.start_session(sample_rate)
+                    session.accept(info['pre_roll'].tobytes())
+                elif event == 'speech_audio' and session is not None:
+                    partial = session.accept(info['samples'].tobytes())
+                    if partial and self.on_partial:
+                        self.on_partial(partial)
+                elif event == 'speech_end' and session is not None:
+                    text = session.finish()
+                    session = None
+                    with self._finals_cond:
+                        self._finals[info['position']] = text
+                        # Results nobody collected (e.g. discarded clicks) must not pile up
+                        while len(self._finals) > 16:
+                            self._finals.pop(next(iter(self._finals)))
+                        self._finals_cond.notify_all()
+            except Exception:
+                session = None
+
+
+def benchmark_backend(backend: SpeechBackend, clips: List[tuple], chunk_ms: int = 20) -> Dict:
+    """Run (pcm int16 array, sample_rate, reference text) clips through a backend session.
+
+    Returns real-time factor, mean latency from the last chunk to the final result, and WER.
+    """
+    total_audio = 0.0
+    total_processing = 0.0
+    latencies = []
+    errors = []
+    for pcm, sample_rate, reference in clips:
+        chunk = sample_rate * chunk_ms // 1000
+        started = time.perf_counter()
+        session = backend.start_session(sample_rate)
+        for offset in range(0, len(pcm), chunk):
+            session.accept(pcm[offset:offset + chunk].tobytes())
+        fed = time.perf_counter()
+        hypothesis = session.finish()
+        finished = time.perf_counter()
+
+        total_audio += len(pcm) / sample_rate
+        total_processing += finished - started
+        latencies.append(finished - fed)
+        errors.append(word_error_rate(reference, hypothesis))
+
+    return {
+        'clips': len(clips),
+        'audio_seconds': total_audio,
+        'rtf': total_processing / total_audio if total_audio else 0.0,
+        'latency_to_final': sum(latencies) / len(latencies) if latencies else 0.0,
+        'wer': sum(errors) / len(errors) if errors else 0.0,
+    }
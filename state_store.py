@@ -0,0 +1,295 @@
+"""
+State Store for JARVIS
+One embedded SQLite database (WAL mode) for scheduled tasks, alerts and key/value memory, with batched commits
+"""
+
+import atexit
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    description TEXT NOT NULL,
+    schedule TEXT NOT NULL,
+    type TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created TEXT,
+    next_run TEXT,
+    last_run TEXT,
+    last_result TEXT,
+    last_error TEXT,
+    extra TEXT
+);
+CREATE TABLE IF NOT EXISTS alerts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp REAL NOT NULL,
+    severity TEXT,
+    message TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS kv (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    updated REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+"""
+
+TASK_COLUMNS = ('id', 'description', 'schedule', 'type', 'status', 'created', 'next_run', 'last_run',
+                'last_result', 'last_error')
+
+# Upserts update rows in place: INSERT OR REPLACE deletes and re-inserts, which moves a row to the end of rowid order
+_TASK_UPSERT = (f"INSERT INTO tasks ({', '.join(TASK_COLUMNS)}, extra) "
+                f"VALUES ({', '.join('?' * (len(TASK_COLUMNS) + 1))}) "
+                f"ON CONFLICT(id) DO UPDATE SET "
+                + ", ".join(f"{column} = excluded.{column}" for column in TASK_COLUMNS[1:] + ('extra',)))
+_KV_UPSERT = ("INSERT INTO kv (namespace, key, value, updated) VALUES (?, ?, ?, ?) "
+              "ON CONFLICT(namespace, key) DO UPDATE SET value = excluded.value, updated = excluded.updated")
+
+
+class StateStore:
+    def __init__(self, path, commit_interval: float = 0.5, max_alerts: int = 1000):
+        """Open (or create) the database at path.
+
+        Writes go into an open transaction that is committed at most commit_interval seconds later
+        (or on flush/close), so a burst of small updates costs one fsync.
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.commit_interval = commit_interval
+        self.max_alerts = max_alerts
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.RLock()
+        self._dirty = threading.Event()
+        self._in_transaction = False
+        self._closed = False
+        self._alert_inserts = 0
+        self._kv_cache: Dict[str, Dict[str, str]] = {}
+        self._flusher = threading.Thread(target=self._flush_loop, name="jarvis-state", daemon=True)
+        self._flusher.start()
+
+    # ------------------------------------------------------------------ transactions
+
+    def _write(self, sql: str, params: Iterable = (), many: bool = False):
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("state store is closed")
+            if not self._in_transaction:
+                self._conn.execute("BEGIN")
+                self._in_transaction = True
+            if many:
+                self._conn.executemany(sql, params)
+            else:
+                self._conn.execute(sql, tuple(params))
+        self._dirty.set()
+
+    def flush(self):
+        """Commit pending writes now"""
+        with self._lock:
+            if self._closed:
+                return
+            if self._in_transaction:
+                self._conn.execute("COMMIT")
+                self._in_transaction = False
+            self._dirty.clear()
+
+    def _flush_loop(self):
+        while not self._closed:
+            self._dirty.wait()
+            time.sleep(self.commit_interval)
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                print(f"State store commit failed: {e}")
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self.flush()
+            self._closed = True
+            self._dirty.set()
+            self._conn.close()
+
+    def _query(self, sql: str, params: Iterable = ()) -> List[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, tuple(params)).fetchall()
+
+    # ------------------------------------------------------------------ meta
+
+    def get_meta(self, key: str) -> Optional[str]:
+        rows = self._query("SELECT value FROM meta WHERE key = ?", (key,))
+        return rows[0][0] if rows else None
+
+    def set_meta(self, key: str, value: str):
+        self._write("INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                    (key, value))
+
+    # ------------------------------------------------------------------ tasks
+
+    def save_task(self, task: Dict):
+        """Insert or update one task row"""
+        extra = {key: value for key, value in task.items() if key not in TASK_COLUMNS}
+        values = [task.get(column) for column in TASK_COLUMNS]
+        values[TASK_COLUMNS.index('last_result')] = _text(task.get('last_result'))
+        self._write(_TASK_UPSERT, values + [json.dumps(extra) if extra else None])
+
+    def delete_task(self, task_id: str):
+        self._write("DELETE FROM tasks WHERE id = ?", (task_id,))
+
+    def load_tasks(self) -> Dict[str, Dict]:
+        tasks = {}
+        for row in self._query(f"SELECT {', '.join(TASK_COLUMNS)}, extra FROM tasks ORDER BY rowid"):
+            task = {column: value for column, value in zip(TASK_COLUMNS, row) if value is not None}
+            if row[-1]:
+                task.update(json.loads(row[-1]))
+            tasks[task['id']] = task
+        return tasks
+
+    # ------------------------------------------------------------------ alerts
+
+    def add_alert(self, message: str, severity: Optional[str] = None, timestamp: Optional[float] = None):
+        self.add_alerts([message], severity, timestamp)
+
+    def add_alerts(self, messages: List[str], severity: Optional[str] = None, timestamp: Optional[float] = None):
+        """Append alerts; only the newest max_alerts rows are kept"""
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            self._write("INSERT INTO alerts (timestamp, severity, message) VALUES (?, ?, ?)",
+                        [(timestamp, severity, message) for message in messages], many=True)
+            self._alert_inserts += len(messages)
+            if self._alert_inserts >= max(1, self.max_alerts // 10):
+                # Amortized pruning: one primary-key range delete per max_alerts/10 inserts
+                self._alert_inserts = 0
+                self._write("DELETE FROM alerts WHERE id <= (SELECT MAX(id) FROM alerts) - ?", (self.max_alerts,))
+
+    def recent_alerts(self, limit: int = 100) -> List[Dict]:
+        """Newest alerts first"""
+        rows = self._query("SELECT timestamp, severity, message FROM alerts ORDER BY id DESC LIMIT ?", (limit,))
+        return [{'timestamp': ts, 'severity': severity, 'message': message} for ts, severity, message in rows]
+
+    # ------------------------------------------------------------------ key/value memory
+
+    def get(self, namespace: str, key: str, default: Any = None) -> Any:
+        rows = self._query("SELECT value FROM kv WHERE namespace = ? AND key = ?", (namespace, key))
+        return json.loads(rows[0][0]) if rows else default
+
+    def put(self, namespace: str, key: str, value: Any):
+        encoded = json.dumps(value)
+        with self._lock:
+            self._write(_KV_UPSERT, (namespace, key, encoded, time.time()))
+            if namespace in self._kv_cache:
+                self._kv_cache[namespace][key] = encoded
+
+    def delete(self, namespace: str, key: str):
+        with self._lock:
+            self._write("DELETE FROM kv WHERE namespace = ? AND key = ?", (namespace, key))
+            self._kv_cache.get(namespace, {}).pop(key, None)
+
+    def items(self, namespace: str) -> Dict[str, Any]:
+        with self._lock:
+            rows = self._query("SELECT key, value FROM kv WHERE namespace = ? ORDER BY rowid", (namespace,))
+            self._kv_cache[namespace] = dict(rows)
+        return {key: json.loads(value) for key, value in rows}
+
+    def sync(self, namespace: str, mapping: Dict[str, Any]) -> int:
+        """Make the namespace equal to mapping, writing only keys that changed; returns rows written"""
+        with self._lock:
+            if namespace not in self._kv_cache:
+                self.items(namespace)
+            known = self._kv_cache[namespace]
+            now = time.time()
+            changed = []
+            for key, value in mapping.items():
+                encoded = json.dumps(value)
+                if known.get(key) != encoded:
+                    changed.append((namespace, key, encoded, now))
+                    known[key] = encoded
+            removed = [(namespace, key) for key in list(known) if key not in mapping]
+            if changed:
+                self._write(_KV_UPSERT, changed, many=True)
+            if removed:
+                self._write("DELETE FROM kv WHERE namespace = ? AND key = ?", removed, many=True)
+                for _, key in removed:
+                    del known[key]
+            return len(changed) + len(removed)
+
+    # ------------------------------------------------------------------ migration
+
+    def migrate_json(self, name: str, paths: Iterable[Path], importer) -> bool:
+        """Import the first existing legacy JSON file once (recorded in meta), then rename it to *.migrated"""
+        if self.get_meta(f"migrated:{name}"):
+            return False
+        for path in paths:
+            path = Path(path)
+            if not path.exists():
+                continue
+            try:
+                with open(path, 'r') as f:
+                    importer(self, json.load(f))
+            except (OSError, ValueError) as e:
+                print(f"Could not migrate {path}: {e}")
+                return False
+            self.set_meta(f"migrated:{name}", str(path))
+            self.flush()
+            try:
+                path.rename(path.with_name(path.name + ".migrated"))
+            except OSError:
+                pass
+            return True
+        self.set_meta(f"migrated:{name}", "")
+        return False
+
+
+def _text(value) -> Optional[str]:
+    return value if value is None or isinstance(value, str) else json.dumps(value)
+
+
+def _import_tasks(store: StateStore, data: Dict):
+    for task_id, task in data.items():
+        store.save_task(dict(task, id=task.get('id', task_id)))
+
+
+def _import_alerts(store: StateStore, data: List[Dict]):
+    for entry in data:
+        try:
+            timestamp = time.mktime(time.strptime(entry['timestamp'][:19], "%Y-%m-%dT%H:%M:%S"))
+        except (KeyError, ValueError):
+            timestamp = time.time()
+        store.add_alerts(list(entry.get('alerts', [])), timestamp=timestamp)
+
+
+def _import_memory(store: StateStore, data: Dict):
+    store.sync('context', data.get('context', {}))
+    store.sync('preferences', data.get('preferences', {}))
+
+
+_store: Optional[StateStore] = None
+_store_lock = threading.Lock()
+
+
+def get_state_store() -> StateStore:
+    """Shared store at Config.DATA_DIR/jarvis_state.db; legacy JSON files are imported on first start"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            from config import Config
+            _store = StateStore(Path(Config.DATA_DIR) / "jarvis_state.db")
+            atexit.register(_store.close)
+            legacy_dirs = [Path.cwd(), Path(Config.BASE_DIR)]
+            _store.migrate_json("tasks", [d / "scheduled_tasks.json" for d in legacy_dirs], _import_tasks)
+            _store.migrate_json("alerts", [d / "system_alerts.json" for d in legacy_dirs], _import_alerts)
+            _store.migrate_json("memory", [Path(Config.MEMORY_DIR) / "advanced_memory.json"], _import_memory)
+        return _store
@@ -6,9 +6,15 @@ import socket
 import time
 from datetime import datetime
 import json
-import winreg
+try:
+    import winreg  # Windows only
+except ImportError:
+    winreg = None
 import ctypes
 from pathlib import Path
+from metrics_collector import get_collector
+from process_table import get_process_table
+from network_state import get_network_state
 
 class SystemControl:
     def __init__(self):
@@ -17,14 +23,18 @@ class SystemControl:
     def get_system_status(self):
         """Get comprehensive system status"""
         try:
-            # CPU and Memory info
-            cpu_percent = psutil.cpu_percent(interval=1)
+            # CPU and Memory info from the background sampler (no 1 s blocking measurement)
+            collector = get_collector()
+            sample = collector.latest()
+            cpu_percent = sample.get('cpu_percent', 0.0)
+            cpu_window = collector.window('cpu_percent', 60)
             memory = psutil.virtual_memory()
             disk = psutil.disk_usage('/')
             
-            # Network info
-            hostname = socket.gethostname()
-            ip_address = socket.gethostbyname(hostname)
+            # Network info (resolved in the background; never waits on DNS here)
+            identity = get_network_state().identity()
+            hostname = identity['hostname']
+            ip_address = identity['ip_address'] or "resolving..."
             
             # System info
             system_info = platform.uname()
@@ -39,7 +49,7 @@ Architecture: {system_info.machine}
 Processor: {system_info.processor}
 
 Performance:
-CPU Usage: {cpu_percent}%
+CPU Usage: {cpu_percent:.1f}% (1 min: min {cpu_window['min']:.1f}% / avg {cpu_window['avg']:.1f}% / max {cpu_window['max']:.1f}%)
 Memory: {memory.percent}% used ({memory.used // (1024**3)} GB / {memory.total // (1024**3)} GB)
 Disk: {disk.percent}% used ({disk.used // (1024**3)} GB / {disk.total // (1024**3)} GB free)
 
@@ -52,21 +62,14 @@ Boot Time: {datetime.fromtimestamp(psutil.boot_time()).strftime('%Y-%m-%d %H:%M:
     def get_running_processes(self, limit=10):
         """Get top running processes"""
         try:
-            processes = []
-            for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent']):
-                try:
-                    processes.append(proc.info)
-                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                    pass
-            
-            # Sort by CPU usage
-            processes.sort(key=lambda x: x['cpu_percent'] or 0, reverse=True)
+            # CPU is measured since the table's previous sample, so idle-looking 0% values are real
+            processes = get_process_table().top(limit, 'cpu_percent')
             
             result = "Top Running Processes:\n"
             result += "PID\t\tName\t\t\tCPU%\tMemory%\n"
             result += "-" * 60 + "\n"
             
-            for proc in processes[:limit]:
+            for proc in processes:
                 pid = proc['pid']
                 name = proc['name'][:20]
                 cpu = proc['cpu_percent'] or 0
@@ -118,8 +121,11 @@ Boot Time: {datetime.fromtimestamp(psutil.boot_time()).strftime('%Y-%m-%d %H:%M:
     def get_cpu_usage(self):
         """Get only current CPU usage percentage"""
         try:
-            cpu_percent = psutil.cpu_percent(interval=1)
-            return f"CPU Usage: {cpu_percent:.1f}%"
+            collector = get_collector()
+            cpu_percent = collector.latest().get('cpu_percent', 0.0)
+            window = collector.window('cpu_percent', 60)
+            return (f"CPU Usage: {cpu_percent:.1f}% "
+                    f"(1 min avg {window['avg']:.1f}%, min {window['min']:.1f}%, max {window['max']:.1f}%)")
         except Exception as e:
             return f"Error getting CPU usage: {e}"
 
@@ -374,14 +380,7 @@ Boot Time: {datetime.fromtimestamp(psutil.boot_time()).strftime('%Y-%m-%d %H:%M:
     def kill_process(self, process_name):
         """Kill a process by name"""
         try:
-            killed_count = 0
-            for proc in psutil.process_iter(['pid', 'name']):
-                if process_name.lower() in proc.info['name'].lower():
-                    try:
-                        proc.kill()
-                        killed_count += 1
-                    except (psutil.NoSuchProcess, psutil.AccessDenied):
-                        continue
+            killed_count = get_process_table().kill(process_name)['killed']
             
             if killed_count > 0:
                 return f"Killed {killed_count} process(es) matching '{process_name}'"
@@ -394,7 +393,9 @@ Boot Time: {datetime.fromtimestamp(psutil.boot_time()).strftime('%Y-%m-%d %H:%M:
     def get_network_info(self):
         """Get network interface information"""
         try:
-            result = "Network Interfaces:\n"
+            identity = get_network_state().identity()
+            result = f"Host: {identity['hostname']} ({identity['ip_address'] or 'resolving...'})\n\n"
+            result += "Network Interfaces:\n"
             result += "Interface\t\tIP Address\t\tStatus\n"
             result += "-" * 50 + "\n"
             
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the deduplicating backup store against the old copy-everything backup.
+Builds a synthetic tree of small files plus a few large ones, then times a full backup,
+a backup of the unchanged tree, a backup after touching one file, and pruning with chunk GC.
+
+Usage: python tests/bench_backup_store.py [--files 2000] [--large 4] [--large-mb 32]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Ensure project root on path
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from backup_store import BackupStore
+
+
+def _size(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=2000, help="small files (4-64 KiB)")
+    parser.add_argument("--large", type=int, default=4, help="large files hashed on the parallel pool")
+    parser.add_argument("--large-mb", type=int, default=32, help="size of each large file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        src = tmp / "src"
+        src.mkdir()
+        files = []
+        for i in range(args.files):
+            path = src / f"file_{i:05d}.txt"
+            path.write_bytes(os.urandom(4096 * (1 + i % 16)))
+            files.append(path)
+        for i in range(args.large):
+            path = src / f"large_{i}.bin"
+            path.write_bytes(os.urandom(args.large_mb << 20))
+            files.append(path)
+        print(f"tree: {len(files)} files, {_size(src) / 1e6:.1f} MB")
+
+        start = time.perf_counter()
+        copy_dir = tmp / "copy"
+        copy_dir.mkdir()
+        for path in files:
+            shutil.copy2(path, copy_dir)
+        print(f"full copy (old):      {(time.perf_counter() - start) * 1000:9.1f} ms")
+
+        store = BackupStore(tmp / "store")
+        for label in ("first backup", "unchanged tree"):
+            manifest = store.backup(files, base=src)
+            stats = manifest['stats']
+            print(f"{label + ':':21} {stats['seconds'] * 1000:9.1f} ms   unchanged {stats['unchanged']:5d}   "
+                  f"new chunks {stats['new_chunks']:5d}   new {stats['new_bytes'] / 1e6:.1f} MB")
+
+        with open(files[-1], 'r+b') as f:
+            f.write(b'modified')
+        manifest = store.backup(files, base=src)
+        stats = manifest['stats']
+        print(f"one large file edited:{stats['seconds'] * 1000:9.1f} ms   new chunks {stats['new_chunks']}   "
+              f"store {_size(store.root) / 1e6:.1f} MB for 3 backups")
+
+        start = time.perf_counter()
+        result = store.prune(keep_last=1)
+        print(f"prune to 1 backup:    {(time.perf_counter() - start) * 1000:9.1f} ms   "
+              f"chunks deleted {result['chunks_deleted']}")
+
+
+if __name__ == '__main__':
+    main()
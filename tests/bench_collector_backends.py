@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the metrics collector backends.
+Measures the cost of one raw sample per backend, the full MetricsCollector.sample_once path, and how
+closely the /proc backend agrees with psutil on memory and cumulative I/O counters.
+
+Usage: python tests/bench_collector_backends.py [--samples 20000] [--rate 100]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Ensure project root on path
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from collector_backends import BACKENDS
+from metrics_collector import MetricsCollector
+
+
+def _time_calls(func, count: int) -> float:
+    began = time.perf_counter()
+    for _ in range(count):
+        func()
+    return (time.perf_counter() - began) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=20_000)
+    parser.add_argument("--rate", type=float, default=100.0, help="sampling rate (Hz) for the overhead estimate")
+    args = parser.parse_args()
+
+    results = {}
+    for name, backend_class in BACKENDS.items():
+        try:
+            backend = backend_class()
+        except OSError as e:
+            print(f"{name:>8}: unavailable ({e})")
+            continue
+        backend.sample()
+        per_sample = _time_calls(backend.sample, args.samples)
+        collector = MetricsCollector(interval=1.0, history_seconds=60, sampler=backend)
+        per_collect = _time_calls(collector.sample_once, args.samples)
+        results[name] = backend.sample()
+        backend.close()
+        print(f"{name:>8}: raw sample {per_sample * 1e6:8.1f} µs   collector sample_once {per_collect * 1e6:8.1f} µs   "
+              f"CPU at {args.rate:g} Hz ≈ {per_collect * args.rate * 100:.2f}% of one core")
+
+    if len(results) == 2:
+        procfs, portable = results['procfs'], results['psutil']
+        print("\nAgreement (procfs vs psutil, sampled back to back):")
+        print(f"  memory_percent   {procfs['memory_percent']:.2f} vs {portable['memory_percent']:.2f}")
+        print(f"  swap_percent     {procfs['swap_percent']:.2f} vs {portable['swap_percent']:.2f}")
+        for group, key in (('disk_io', 'read_bytes'), ('disk_io', 'write_bytes'),
+                           ('net_io', 'bytes_recv'), ('net_io', 'bytes_sent')):
+            if procfs[group] and portable[group]:
+                print(f"  {group}.{key:<12} {procfs[group][key]:,} vs {portable[group][key]:,}")
+
+
+if __name__ == '__main__':
+    main()
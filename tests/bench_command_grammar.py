@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the compound command grammar.
+Measures parse throughput over a mixed corpus, compares it with the previous approach (regex lists tried
+with re.search per call, two-way split), and checks that parse time grows linearly with command length.
+
+Usage: python tests/bench_command_grammar.py [--rounds 2000] [--max-stages 256]
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+# Ensure project root on path
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from command_grammar import parse_command, tokenize
+
+CORPUS = [
+    "check the weather and show cpu usage then take a screenshot",
+    "launch calculator, wait 2 seconds, then type 5*5",
+    "if file exists data.txt then read it, otherwise create it",
+    "create a file about robotics and save it as robotics_info.txt",
+    "open notepad then type 'Hello World' and save the file",
+    "get system status then take screenshot",
+    "what's the time",
+    "when cpu is above 90 percent, notify me then show processes",
+]
+
+LEGACY_SEQUENCE = [r"(.*?)\s*(?:then|and then|after that|next)\s*(.*)", r"(.*?)\s*(?:,\s*then|,\s*and then)\s*(.*)"]
+LEGACY_DELAY = [r"wait\s+(\d+)\s+seconds?", r"pause\s+for\s+(\d+)\s+seconds?", r"after\s+(\d+)\s+seconds?",
+                r"in\s+(\d+)\s+seconds?"]
+LEGACY_CONDITIONAL = [r"if\s+(.*?)\s+then\s+(.*)", r"when\s+(.*?)\s+(?:then\s+)?(.*)", r"once\s+(.*?)\s+(?:then\s+)?(.*)"]
+
+
+def _legacy_match(text, patterns):
+    for pattern in patterns:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            return match.groups()
+    return None
+
+
+def legacy_parse(command):
+    """The old parse_complex_command control flow (regex lists, one split into two parts)"""
+    if _legacy_match(command, LEGACY_CONDITIONAL):
+        return 1
+    match = _legacy_match(command, LEGACY_SEQUENCE)
+    if match:
+        _legacy_match(match[1], LEGACY_DELAY)
+        return 2
+    return 1
+
+
+def _rate(func, commands, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for command in commands:
+            func(command)
+    return (time.perf_counter() - start) / (rounds * len(commands))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=2000, help="passes over the corpus")
+    parser.add_argument("--max-stages", type=int, default=256, help="longest generated command (in stages)")
+    args = parser.parse_args()
+
+    grammar = _rate(parse_command, CORPUS, args.rounds)
+    legacy = _rate(legacy_parse, CORPUS, args.rounds)
+    tokens = sum(len(tokenize(c)) for c in CORPUS) / len(CORPUS)
+    print(f"corpus ({len(CORPUS)} commands, {tokens:.0f} tokens avg)")
+    print(f"  grammar: {grammar * 1e6:7.1f} µs/command  {1 / grammar:9.0f} commands/s  (full AST, any number of stages)")
+    print(f"  legacy:  {legacy * 1e6:7.1f} µs/command  {1 / legacy:9.0f} commands/s  (first split only)")
+
+    print("scaling (µs per token should stay flat):")
+    stages = 1
+    while stages <= args.max_stages:
+        command = " then ".join(["check the weather and show cpu usage"] * stages)
+        rounds = max(1, args.rounds // stages)
+        per_command = _rate(parse_command, [command], rounds)
+        print(f"  {stages:4d} stages  {len(tokenize(command)):6d} tokens  {per_command * 1e3:8.3f} ms  "
+              f"{per_command * 1e6 / len(tokenize(command)):6.2f} µs/token")
+        stages *= 4
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark for command autocomplete against the old keyword scan over a fixed pattern list.
+Fills the index with a synthetic command history, then times record() and suggest() for prefix
+queries of every length and for misspelled queries that fall through to trigram matching.
+
+Usage: python tests/bench_command_suggest.py [--history 2000] [--queries 5000]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Ensure project root on path
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from command_suggest import COMMAND_TEMPLATES, SuggestionIndex
+
+VERBS = ["open", "close", "search", "play", "create file", "read file", "remind me to", "weather in", "calculate"]
+NOUNS = ["chrome", "notepad", "spotify", "report", "budget", "london", "paris", "groceries", "meeting", "music",
+         "python docs", "invoice", "photos", "backup", "calendar", "email", "slides", "terminal"]
+
+
+def _legacy(patterns, partial):
+    words = [w for w in partial.lower().split() if len(w) > 2]
+    return [p for p in patterns if any(w in p.lower() for w in words)][:5]
+
+
+def _typo(text: str, rng: random.Random) -> str:
+    i = rng.randrange(1, len(text))
+    return text[:i] + text[i + 1:]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--history", type=int, default=2000, help="distinct commands in the history")
+    parser.add_argument("--queries", type=int, default=5000, help="suggest() calls per query kind")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    commands = [f"{rng.choice(VERBS)} {rng.choice(NOUNS)} {i}" for i in range(args.history)]
+    index = SuggestionIndex(max_history=args.history)
+
+    started = time.perf_counter()
+    now = time.time()
+    for i, command in enumerate(commands):
+        index.record(command, now=now + i)
+    for _ in range(args.history):
+        index.record(rng.choice(commands), now=now + args.history)
+    record_us = (time.perf_counter() - started) / (2 * args.history) * 1e6
+    print(f"index: {len(index)} entries, record {record_us:.1f} µs/call")
+
+    samples = [rng.choice(commands) for _ in range(args.queries)]
+    prefixes = [s[:rng.randrange(1, len(s))] for s in samples]
+    typos = [_typo(s, rng) for s in samples]
+    patterns = COMMAND_TEMPLATES + commands
+
+    for label, queries in (("prefix", prefixes), ("typo", typos)):
+        started = time.perf_counter()
+        for query in queries:
+            index.suggest(query, 5)
+        elapsed = (time.perf_counter() - started) / len(queries) * 1e6
+        started = time.perf_counter()
+        for query in queries:
+            _legacy(patterns, query)
+        legacy = (time.perf_counter() - started) / len(queries) * 1e6
+        print(f"{label:>6}: {elapsed:7.1f} µs/suggest   keyword scan {legacy:7.1f} µs")
+
+    hits = sum(sample in index.suggest(typo, 5) for sample, typo in zip(samples, typos))
+    print(f"typo recall@5: {hits / len(samples):.1%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the event scheduler.
+Measures insert/cancel throughput, memory per pending timer, and firing jitter (actual minus due time)
+for many timers spread over a short window, all on a single scheduler thread.
+
+Usage: python tests/bench_event_scheduler.py [--timers 50000] [--spread 5] [--fire 20000]
+"""
+
+import argparse
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+# Ensure project root on path
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from event_scheduler import EventScheduler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--timers", type=int, default=50_000, help="pending timers for insert/cancel/memory")
+    parser.add_argument("--fire", type=int, default=20_000, help="timers actually fired for the jitter test")
+    parser.add_argument("--spread", type=float, default=5.0, help="seconds over which fired timers are spread")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    noop = lambda: None
+
+    # Insert, memory and cancel cost with a large pending queue
+    scheduler = EventScheduler()
+    now = time.time()
+    deadlines = [now + 3600 + rng.random() * 86400 for _ in range(args.timers)]
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    began = time.perf_counter()
+    timers = [scheduler.schedule_at(when, noop, key=f"task_{i}") for i, when in enumerate(deadlines)]
+    insert = (time.perf_counter() - began) / args.timers
+    per_timer = (tracemalloc.get_traced_memory()[0] - before) / args.timers
+    tracemalloc.stop()
+    began = time.perf_counter()
+    for timer in timers[::2]:
+        scheduler.cancel(timer)
+    cancel = (time.perf_counter() - began) / len(timers[::2])
+    print(f"insert {insert * 1e6:.2f} µs/timer   cancel {cancel * 1e6:.2f} µs/timer   "
+          f"memory {per_timer:.0f} B/pending timer (incl. key string)   threads: 1")
+
+    # Firing jitter
+    scheduler = EventScheduler()
+    lateness = np.zeros(args.fire)
+    remaining = [args.fire]
+    done = threading.Event()
+
+    def fire(index, due):
+        lateness[index] = time.time() - due
+        remaining[0] -= 1
+        if remaining[0] == 0:
+            done.set()
+
+    scheduler.start()
+    start = time.time() + 0.5
+    for index in range(args.fire):
+        due = start + rng.random() * args.spread
+        scheduler.schedule_at(due, fire, index, due)
+    done.wait(args.spread + 30)
+    scheduler.stop()
+    ms = lateness * 1000
+    print(f"fired {args.fire - remaining[0]}/{args.fire} over {args.spread:g}s   lateness ms: "
+          f"p50 {np.percentile(ms, 50):.2f}  p99 {np.percentile(ms, 99):.2f}  max {ms.max():.2f}   "
+          f"wake-ups {scheduler.wakeups}")
+
+
+if __name__ == '__main__':
+    main()
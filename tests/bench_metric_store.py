@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the columnar metric store.
+Appends millions of synthetic samples (all collector fields) and measures append throughput,
+single-sample append cost, and range-query throughput at each rollup level.
+
+Usage: python tests/bench_metric_store.py [--samples 5000000] [--batch 3600] [--queries 200]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Ensure project root on path
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from metric_store import MetricStore
+from metrics_collector import FIELDS
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=5_000_000)
+    parser.add_argument("--batch", type=int, default=3600, help="rows per append_many call")
+    parser.add_argument("--single", type=int, default=100_000, help="samples appended one at a time")
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    start = 1_700_000_000.0
+    with tempfile.TemporaryDirectory() as tmp:
+        store = MetricStore(tmp, retention={'raw': None, '1m': None})
+
+        began = time.perf_counter()
+        for offset in range(0, args.samples, args.batch):
+            rows = min(args.batch, args.samples - offset)
+            times = start + np.arange(offset, offset + rows, dtype=np.float64)
+            store.append_many(times, rng.random((rows, len(FIELDS))) * 100)
+        batch_seconds = time.perf_counter() - began
+
+        single_start = start + args.samples
+        began = time.perf_counter()
+        for i in range(args.single):
+            store.append(single_start + i, {'cpu_percent': 10.0, 'memory_percent': 50.0})
+        store.close()
+        single_seconds = time.perf_counter() - began
+
+        total = args.samples + args.single
+        size = sum(p.stat().st_size for p in Path(tmp).rglob('*') if p.is_file())
+        print(f"{total:,} samples x {len(FIELDS)} fields, {size / 1e6:.0f} MB on disk "
+              f"({size / total:.0f} bytes/sample incl. rollups)\n")
+        print(f"append_many  {args.samples / batch_seconds:>12,.0f} samples/s")
+        print(f"append       {args.single / single_seconds:>12,.0f} samples/s "
+              f"({single_seconds / args.single * 1e6:.1f} us each)\n")
+
+        span = float(total)
+        print(f"{'query':<26} {'level':>6} {'per query':>12} {'rows/s':>14}")
+        for label, width, level in (("1 hour", 3600, 'raw'), ("6 hours (afternoon)", 6 * 3600, 'raw'),
+                                    ("6 hours (afternoon)", 6 * 3600, '1m'), ("1 day", 86400, '1m'),
+                                    ("all history", span, '1h')):
+            offsets = rng.random(args.queries) * max(span - width, 1)
+            rows = 0
+            began = time.perf_counter()
+            for offset in offsets:
+                rows += store.aggregate('cpu_percent', start + offset, start + offset + width, level=level)['samples']
+            elapsed = time.perf_counter() - began
+            print(f"{label:<26} {level:>6} {elapsed / args.queries * 1000:>9.2f} ms {rows / elapsed:>14,.0f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the process table.
+Optionally spawns idle child processes so the table holds 1,000+ entries, then compares a fresh
+psutil.process_iter scan (the old approach) with ProcessTable refreshes, top-N queries and name lookups.
+
+Usage: python tests/bench_process_table.py [--spawn 1000] [--rounds 5]
+"""
+
+import argparse
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import psutil
+
+# Ensure project root on path
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from process_table import ProcessTable
+
+
+def spawn_idle(count):
+    """Start count cheap sleeping processes (the 'sleep' binary where available)"""
+    sleep = shutil.which("sleep")
+    command = [sleep, "600"] if sleep else [sys.executable, "-c", "import time; time.sleep(600)"]
+    children = []
+    for _ in range(count):
+        try:
+            children.append(subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+        except OSError as e:
+            print(f"Stopped spawning after {len(children)} processes: {e}")
+            break
+    return children
+
+
+def legacy_scan(limit=10):
+    """The previous implementation: fresh handles, cpu_percent outside oneshot(), full sort"""
+    processes = []
+    for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent', 'status']):
+        try:
+            info = proc.info
+            info['cpu_percent'] = proc.cpu_percent()
+            processes.append(info)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    processes.sort(key=lambda x: x.get('cpu_percent') or 0, reverse=True)
+    return processes[:limit]
+
+
+def timed(func, rounds):
+    began = time.perf_counter()
+    for _ in range(rounds):
+        result = func()
+    return (time.perf_counter() - began) / rounds, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--spawn", type=int, default=1000, help="idle child processes to start (0 for none)")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    children = spawn_idle(args.spawn) if args.spawn else []
+    try:
+        time.sleep(0.5)
+        table = ProcessTable(warmup=0.5)
+        first, _ = timed(table.refresh, 1)
+        count = len(table)
+        print(f"{count} processes\n")
+
+        legacy, legacy_top = timed(legacy_scan, args.rounds)
+        refresh, _ = timed(table.refresh, args.rounds)
+        top, table_top = timed(lambda: table.top(10, max_age=3600), args.rounds * 20)
+        lookup, _ = timed(lambda: table.find("sleep", refresh=False), args.rounds * 20)
+        nonzero_legacy = sum(1 for p in legacy_scan(count) if p.get('cpu_percent'))
+        nonzero_table = sum(1 for p in table.snapshot(max_age=3600) if p['cpu_percent'])
+
+        print(f"{'legacy process_iter scan':<28} {legacy * 1000:>9.1f} ms")
+        print(f"{'table first refresh':<28} {first * 1000:>9.1f} ms (opens handles)")
+        print(f"{'table refresh':<28} {refresh * 1000:>9.1f} ms ({refresh / count * 1e6:.1f} us/process)")
+        print(f"{'table top-10 (cached)':<28} {top * 1000:>9.3f} ms")
+        print(f"{'name lookup (index)':<28} {lookup * 1e6:>9.1f} us")
+        print(f"\nprocesses with non-zero CPU: legacy {nonzero_legacy}, table {nonzero_table}")
+    finally:
+        for child in children:
+            child.kill()
+        for child in children:
+            child.wait()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
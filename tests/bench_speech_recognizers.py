@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the speech-to-text backends.
+Runs a WAV fixture set through each backend as a 20 ms chunked stream and reports
+real-time factor, latency from the end of audio to the final transcript, and word error rate.
+
+Fixtures are 16-bit mono WAV files with the reference transcript next to them:
+
+    fixtures/turn_on_the_lights.wav
+    fixtures/turn_on_the_lights.txt
+
+Usage: python tests/bench_speech_recognizers.py --fixtures DIR [--backends google,vosk,whisper]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Ensure project root on path
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from speech_recognizers import RecognitionError, benchmark_backend, create_backend
+from wake_word import read_wav
+
+
+def load_clips(directory: Path):
+    clips = []
+    for wav_path in sorted(directory.glob("*.wav")):
+        transcript = wav_path.with_suffix(".txt")
+        if not transcript.exists():
+            continue
+        pcm, rate = read_wav(wav_path)
+        clips.append((pcm, rate, transcript.read_text(encoding="utf-8").strip()))
+    return clips
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", type=Path, required=True, help="directory of WAV files with .txt transcripts")
+    parser.add_argument("--backends", default="google,vosk,whisper", help="comma-separated backend names")
+    parser.add_argument("--vosk-model", default=None, help="path to a Vosk model directory")
+    parser.add_argument("--whisper-model", default="base.en")
+    args = parser.parse_args()
+
+    clips = load_clips(args.fixtures)
+    if not clips:
+        print(f"No WAV/transcript pairs found in {args.fixtures}")
+        return 1
+
+    options = {
+        "vosk": {"model_path": args.vosk_model},
+        "whisper": {"model_size": args.whisper_model},
+    }
+
+    print(f"{len(clips)} clips, {sum(len(p) / r for p, r, _ in clips):.1f} s of audio\n")
+    print(f"{'backend':<10} {'RTF':>8} {'latency':>10} {'WER':>8}")
+    for name in [n.strip() for n in args.backends.split(",") if n.strip()]:
+        try:
+            backend = create_backend(name, **options.get(name, {}))
+            result = benchmark_backend(backend, clips)
+        except RecognitionError as e:
+            print(f"{name:<10} skipped: {e}")
+            continue
+        print(f"{name:<10} {result['rtf']:>8.3f} {result['latency_to_final'] * 1000:>8.0f} ms {result['wer']:>7.1%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
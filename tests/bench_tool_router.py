@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Benchmark for retrieval-based tool selection in the agent.
+Runs a scripted query set through the BM25 tool router and compares the prompt the agent sends
+(system prompt, query and tool definitions; tokens estimated at 4 characters each) with and without
+routing. It also reports router latency, how often the expected tools were selected, and how often
+the router fell back to the full tool set.
+With --live (needs OPENROUTER_API_KEY) every query also goes to the model both ways, and the report
+adds end-to-end latency per query and per model call.
+
+Usage: python tests/bench_tool_router.py [--live] [--top-k 6] [--min-score 1.5]
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Ensure project root on path
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from agent_orchestrator import SYSTEM_PROMPT, AgentOrchestrator, OpenRouterProvider
+from config import Config
+from tool_router import ToolRouter
+
+# (query, tools a correct answer needs; empty means plain chat)
+QUERIES = [
+    ("what's the weather like in Paris", ["get_weather"]),
+    ("will it rain today", ["get_weather"]),
+    ("tell me a joke", ["tell_joke"]),
+    ("what time is it", ["get_current_time"]),
+    ("what's today's date", ["get_current_date"]),
+    ("how is my computer doing", ["get_system_status"]),
+    ("show me the top 5 processes using cpu", ["get_running_processes"]),
+    ("kill chrome", ["kill_process"]),
+    ("how much disk space is left", ["get_disk_usage"]),
+    ("what is my ip address", ["get_network_info"]),
+    ("turn the volume down to 20", ["set_volume"]),
+    ("take a screenshot", ["take_screenshot"]),
+    ("how much battery do I have", ["get_battery_info"]),
+    ("run ipconfig", ["run_command"]),
+    ("open spotify", ["launch_app"]),
+    ("close notepad", ["close_app"]),
+    ("which browsers are installed", ["list_installed_apps"]),
+    ("search the web for python asyncio tutorials", ["search_web"]),
+    ("look up Alan Turing on wikipedia", ["search_wikipedia"]),
+    ("latest technology news", ["get_news"]),
+    ("calculate 15 percent of 240", ["calculate"]),
+    ("convert 5 km to miles", ["convert_units"]),
+    ("how many grams is 2 cups of flour", ["convert_cooking_measurement"]),
+    ("generate a 20 character password", ["generate_password"]),
+    ("flip a coin", ["flip_coin"]),
+    ("roll two dice", ["roll_dice"]),
+    ("create a file called todo.txt on the desktop with buy milk", ["create_file"]),
+    ("read notes.txt", ["read_file"]),
+    ("delete old_report.docx", ["delete_file"]),
+    ("list the files in my downloads folder", ["list_files"]),
+    ("make a new folder named projects", ["create_folder"]),
+    ("rename draft.txt to final.txt", ["rename_file"]),
+    ("monitor performance for 10 minutes", ["start_performance_monitoring"]),
+    ("what was the average cpu yesterday afternoon", ["get_performance_history"]),
+    ("weather in London and tell me a joke", ["get_weather", "tell_joke"]),
+    ("check battery and disk space", ["get_battery_info", "get_disk_usage"]),
+    ("hello jarvis", []),
+    ("who are you", []),
+]
+
+
+class _Skills:
+    """Every skill method returns a placeholder; only the tool definitions matter here"""
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: f"{name} result"
+
+
+def _tokens(payload) -> int:
+    return len(json.dumps(payload)) // 4
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--live", action="store_true", help="also call the model both ways (needs an API key)")
+    parser.add_argument("--top-k", type=int, default=6)
+    parser.add_argument("--min-score", type=float, default=1.5)
+    args = parser.parse_args()
+
+    skills = _Skills()
+    agent = AgentOrchestrator(skills, skills, skills, skills, skills, system_monitor=skills, provider=skills,
+                              app_control=skills)
+    started = time.perf_counter()
+    router = ToolRouter({tool.name: tool.routing_text() for tool in agent.tools.values()},
+                        k=args.top_k, min_score=args.min_score)
+    build_ms = (time.perf_counter() - started) * 1000
+    agent.router = router
+    print(f"{len(agent.tools)} tools, index built in {build_ms:.2f} ms")
+
+    full_tokens, routed_tokens, route_us = [], [], []
+    hits = fallbacks = 0
+    for query, expected in QUERIES:
+        messages = [{"role": "system", "content": SYSTEM_PROMPT}, {"role": "user", "content": query}]
+        started = time.perf_counter()
+        selected = router.select(query)
+        route_us.append((time.perf_counter() - started) * 1e6)
+        schemas = agent._tool_schemas(query)
+        full_tokens.append(_tokens(messages) + _tokens(agent._schemas))
+        routed_tokens.append(_tokens(messages) + _tokens(schemas))
+        names = {s['function']['name'] for s in schemas}
+        fallbacks += selected is None
+        found = all(name in names for name in expected)
+        hits += found
+        if not found:
+            print(f"  missed {expected} for {query!r}: {selected}")
+
+    full, routed = sum(full_tokens), sum(routed_tokens)
+    print(f"queries: {len(QUERIES)}, expected tools selected: {hits}/{len(QUERIES)}, full-set fallbacks: {fallbacks}")
+    print(f"prompt tokens/query: {full / len(QUERIES):.0f} all tools -> {routed / len(QUERIES):.0f} routed "
+          f"({1 - routed / full:.0%} fewer)")
+    print(f"routing: {statistics.mean(route_us):.1f} µs/query (max {max(route_us):.1f})")
+
+    if not args.live:
+        return
+    if not Config.OPENROUTER_API_KEY:
+        print("--live needs OPENROUTER_API_KEY")
+        return
+    settings = getattr(Config, "AGENT", {})
+    provider = OpenRouterProvider(Config.OPENROUTER_API_KEY, settings.get("model") or Config.OPENROUTER_MODEL,
+                                  Config.OPENROUTER_BASE_URL)
+    for label, routed_mode in (("all tools", False), ("routed", True)):
+        agent.route_tools = routed_mode
+        latencies, prompts = [], []
+        original = provider.complete
+
+        def counting(messages, tools, tool_choice="auto"):
+            started = time.perf_counter()
+            message = original(messages, tools, tool_choice)
+            latencies.append(time.perf_counter() - started)
+            prompts.append(_tokens(messages) + _tokens(tools))
+            return message
+
+        provider.complete = counting
+        agent.provider = provider
+        started = time.perf_counter()
+        for query, _ in QUERIES:
+            agent.run(query)
+        total = time.perf_counter() - started
+        provider.complete = original
+        print(f"{label:>9}: {total / len(QUERIES):.2f} s/query end to end, {statistics.median(latencies):.2f} s "
+              f"median model call, ~{sum(prompts) / len(prompts):.0f} prompt tokens/call")
+
+
+if __name__ == '__main__':
+    main()
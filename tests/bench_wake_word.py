@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the on-device wake word spotter.
+Reports false-accept / false-reject rates and CPU cost per second of audio over a directory of WAV fixtures:
+
+    fixtures/templates/*.wav   enrolment recordings of the wake word
+    fixtures/positive/*.wav    clips that contain the wake word
+    fixtures/negative/*.wav    clips that do not (other speech, noise, silence)
+
+Without --fixtures a synthetic set is generated so the benchmark runs anywhere.
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Ensure project root on path
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from wake_word import SAMPLE_RATE, WakeWordDetector, read_wav, write_wav
+
+# (F1, F2) formant pairs of the synthetic "words"; the first is the wake word
+KEYWORD = [(730, 1090), (270, 2290), (570, 840)]
+OTHER_WORDS = [
+    [(300, 870), (660, 1720)],
+    [(440, 1020), (730, 1090), (390, 1990), (270, 2290)],
+    [(660, 1720), (300, 870), (270, 2290)],
+    [(390, 1990), (640, 1190), (440, 1020)],
+]
+
+
+def synth_word(syllables, rng, stretch=1.0, f0=120.0, level=0.3):
+    """Render a word as voiced syllables: harmonics of f0 shaped by two formant peaks"""
+    pieces = []
+    for f1, f2 in syllables:
+        duration = 0.18 * stretch * rng.uniform(0.9, 1.1)
+        t = np.arange(int(duration * SAMPLE_RATE)) / SAMPLE_RATE
+        pitch = f0 * (1 + 0.05 * np.sin(2 * np.pi * 3 * t))
+        phase = 2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE
+        tone = np.zeros_like(t)
+        for k in range(1, int(4000 / f0)):
+            freq = k * f0
+            gain = np.exp(-((freq - f1) / 120.0) ** 2) + 0.6 * np.exp(-((freq - f2) / 160.0) ** 2) + 0.02
+            tone += gain * np.sin(k * phase)
+        envelope = np.sin(np.pi * np.linspace(0, 1, len(t))) ** 0.5
+        pieces.append(tone * envelope)
+    word = np.concatenate(pieces)
+    return word / (np.abs(word).max() + 1e-9) * level
+
+
+def embed(word, rng, total=2.0, snr_db=20.0):
+    """Place a word at a random offset inside a noisy clip"""
+    clip = np.zeros(int(total * SAMPLE_RATE))
+    offset = rng.integers(int(0.2 * SAMPLE_RATE), len(clip) - len(word) - int(0.2 * SAMPLE_RATE))
+    clip[offset:offset + len(word)] += word
+    signal_power = np.mean(word ** 2) if len(word) else 1e-4
+    noise = rng.normal(0, np.sqrt(signal_power / 10 ** (snr_db / 10)), len(clip))
+    return np.clip((clip + noise) * 32767, -32768, 32767).astype(np.int16)
+
+
+def generate_fixtures(directory: Path, seed=7, positives=40, negatives=60):
+    rng = np.random.default_rng(seed)
+    for name in ("templates", "positive", "negative"):
+        (directory / name).mkdir(parents=True, exist_ok=True)
+
+    for i in range(3):
+        word = synth_word(KEYWORD, rng, stretch=rng.uniform(0.95, 1.05), f0=rng.uniform(110, 130))
+        write_wav(directory / "templates" / f"t{i}.wav", embed(word, rng, total=1.2, snr_db=30))
+
+    for i in range(positives):
+        word = synth_word(KEYWORD, rng, stretch=rng.uniform(0.8, 1.2), f0=rng.uniform(95, 150),
+                          level=rng.uniform(0.1, 0.5))
+        write_wav(directory / "positive" / f"p{i}.wav", embed(word, rng, snr_db=rng.uniform(10, 25)))
+
+    for i in range(negatives):
+        kind = i % 4
+        if kind == 3:
+            # Background noise only
+            clip = rng.normal(0, rng.uniform(0.001, 0.02), 2 * SAMPLE_RATE) * 32767
+            write_wav(directory / "negative" / f"n{i}.wav", clip.astype(np.int16))
+            continue
+        word = synth_word(OTHER_WORDS[i % len(OTHER_WORDS)], rng, stretch=rng.uniform(0.8, 1.2),
+                          f0=rng.uniform(95, 150), level=rng.uniform(0.1, 0.5))
+        write_wav(directory / "negative" / f"n{i}.wav", embed(word, rng, snr_db=rng.uniform(10, 25)))
+
+
+def run(fixtures: Path):
+    with tempfile.TemporaryDirectory() as tmp:
+        detector = WakeWordDetector(tmp)
+        for path in sorted((fixtures / "templates").glob("*.wav")):
+            pcm, _ = read_wav(path)
+            detector.enroll(pcm)
+
+        results = {}
+        for label in ("positive", "negative"):
+            clips = [read_wav(path)[0] for path in sorted((fixtures / label).glob("*.wav"))]
+            started = time.process_time()
+            hits = sum(detector.detect(clip) for clip in clips)
+            cpu = time.process_time() - started
+            audio_seconds = sum(len(clip) for clip in clips) / SAMPLE_RATE
+            results[label] = (len(clips), hits, cpu, audio_seconds)
+
+    positives, true_accepts, pos_cpu, pos_audio = results["positive"]
+    negatives, false_accepts, neg_cpu, neg_audio = results["negative"]
+    stats = detector.get_stats()
+
+    print(f"Templates:          {stats['templates']} (threshold {stats['threshold']:.2f})")
+    print(f"False reject rate:  {(positives - true_accepts) / max(positives, 1):.1%} "
+          f"({positives - true_accepts}/{positives})")
+    print(f"False accept rate:  {false_accepts / max(negatives, 1):.1%} ({false_accepts}/{negatives})")
+    print(f"Gated by VAD:       {stats['gated']} of {stats['clips']} clips")
+    print(f"CPU per audio sec:  {(pos_cpu + neg_cpu) / (pos_audio + neg_audio) * 1000:.1f} ms "
+          f"({(pos_audio + neg_audio):.0f} s of audio)")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", type=Path, help="directory with templates/, positive/ and negative/ WAVs")
+    args = parser.parse_args()
+
+    if args.fixtures:
+        run(args.fixtures)
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        generate_fixtures(Path(tmp))
+        run(Path(tmp))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Tests for the function-calling agent against a replayed provider: each scripted task records the model
+responses it should get, and the suite checks tool dispatch, parallel calls (UI tools run in order afterwards),
+tool timeouts and model calls per task.
+"""
+
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Ensure project root on path
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from agent_orchestrator import AgentOrchestrator
+
+
+class ReplayProvider:
+    """Returns scripted assistant messages in order and records every request"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def complete(self, messages, tools, tool_choice="auto"):
+        self.requests.append({'messages': [dict(m) for m in messages], 'tools': tools, 'tool_choice': tool_choice})
+        return self.responses.pop(0)
+
+
+def _call(call_id, name, **arguments):
+    return {"id": call_id, "type": "function", "function": {"name": name, "arguments": json.dumps(arguments)}}
+
+
+def _tools(*calls):
+    return {"role": "assistant", "content": None, "tool_calls": list(calls)}
+
+
+def _answer(text):
+    return {"role": "assistant", "content": text}
+
+
+class FakeSkills:
+    """Stands in for every skill object the orchestrator binds; records the calls it receives"""
+
+    def __init__(self):
+        self.calls = []
+        self.barrier = None
+
+    def __getattr__(self, name):
+        def method(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            if self.barrier is not None:
+                self.barrier.wait()
+            return f"{name} result"
+        return method
+
+
+def _agent(responses, skills=None, **kwargs):
+    skills = skills or FakeSkills()
+    provider = ReplayProvider(responses)
+    agent = AgentOrchestrator(skills, skills, skills, skills, skills, system_monitor=skills, provider=provider,
+                              app_control=skills, **kwargs)
+    return agent, provider, skills
+
+
+# Recorded tasks: (query, model responses, expected answer, expected model calls)
+TASKS = [
+    ("hello jarvis", [_answer("Good evening, sir.")], "Good evening, sir.", 1),
+    ("what time is it", [_tools(_call("c1", "get_current_time"))], "The current time is", 1),
+    ("weather in Paris and tell me a joke",
+     [_tools(_call("c1", "get_weather", query="Paris"), _call("c2", "tell_joke"))],
+     "get_weather result\ntell_joke result", 1),
+    ("open chrome and take a screenshot",
+     [_tools(_call("c1", "launch_app", app_name="chrome"), _call("c2", "take_screenshot"))],
+     "launch_app_by_name result\ntake_screenshot result", 1),
+    ("how is my computer doing",
+     [_tools(_call("c1", "get_system_status")), _answer("All systems nominal.")], "All systems nominal.", 2),
+    ("summarize notes.txt and list my files",
+     [_tools(_call("c1", "read_file", filename="notes.txt"), _call("c2", "list_files")),
+      _answer("Your notes are about groceries; 3 files here.")], "Your notes are about groceries; 3 files here.", 2),
+    ("average cpu yesterday and current battery",
+     [_tools(_call("c1", "get_performance_history", query="average cpu yesterday"), _call("c2", "get_battery_info")),
+      _answer("CPU averaged 12%; battery at 80%.")], "CPU averaged 12%; battery at 80%.", 2),
+]
+
+
+def _replay_tasks():
+    rows = []
+    for query, responses, expected, calls in TASKS:
+        agent, provider, _ = _agent(responses)
+        answer = agent.run(query)
+        rows.append((query, answer, expected, len(provider.requests), calls))
+    return rows
+
+
+def test_replayed_tasks_take_one_or_two_model_calls():
+    rows = _replay_tasks()
+    for query, answer, expected, made, calls in rows:
+        assert expected in answer, (query, answer)
+        assert made == calls, (query, made)
+    assert sum(row[3] for row in rows) / len(rows) <= 1.5
+
+
+def test_tool_results_are_sent_back_with_call_ids():
+    agent, provider, skills = _agent(TASKS[5][1])
+    agent.run("summarize notes.txt and list my files")
+    assert ('read_file', (), {'filename': 'notes.txt'}) in skills.calls
+    first, second = provider.requests
+    assert {t['function']['name'] for t in first['tools']} >= {'read_file', 'list_files'}
+    schema = {t['function']['name']: t['function']['parameters'] for t in first['tools']}
+    assert schema['read_file']['required'] == ['filename'] and schema['list_files']['required'] == []
+    tool_messages = [m for m in second['messages'] if m['role'] == 'tool']
+    assert [m['tool_call_id'] for m in tool_messages] == ['c1', 'c2']
+    assert tool_messages[0]['content'] == 'read_file result'
+    assert agent.stats == {'tasks': 1, 'model_calls': 2, 'tool_calls': 2, 'full_tool_sets': 0}
+
+
+def test_parallel_calls_run_concurrently():
+    skills = FakeSkills()
+    skills.barrier = threading.Barrier(3, timeout=5)  # Only passes if all three tools are in flight at once
+    responses = [_tools(_call("c1", "get_weather", query="Oslo"), _call("c2", "tell_joke"), _call("c3", "flip_coin"))]
+    agent, provider, _ = _agent(responses, skills)
+    assert agent.run("weather, joke and a coin flip") == "get_weather result\ntell_joke result\nflip_coin result"
+
+
+class OrderedSkills(FakeSkills):
+    """Weather and joke only return once both are in flight; records when each call finishes"""
+
+    def __init__(self, delay=0.0):
+        super().__init__()
+        self.overlap = threading.Barrier(2, timeout=5)
+        self.delay = delay
+        self.finished = []
+
+    def __getattr__(self, name):
+        def method(*args, **kwargs):
+            if name in ("get_weather", "tell_joke"):
+                self.overlap.wait()
+            time.sleep(self.delay)
+            self.finished.append(name)
+            return f"{name} result"
+        return method
+
+
+def test_ui_tools_run_in_call_order_after_parallel_calls():
+    skills = OrderedSkills(delay=0.05)
+    responses = [_tools(_call("c1", "launch_app", app_name="notepad"), _call("c2", "get_weather", query="Oslo"),
+                        _call("c3", "type_text", text="hello"), _call("c4", "tell_joke"))]
+    agent, provider, _ = _agent(responses, skills, automation_skill=skills)
+    assert agent.run("open notepad, type hello, weather and a joke") == \
+        "launch_app_by_name result\nget_weather result\ntype_text result\ntell_joke result"
+    assert set(skills.finished[:2]) == {"get_weather", "tell_joke"}
+    assert skills.finished[2:] == ["launch_app_by_name", "type_text"]
+
+
+def test_single_call_is_bounded_by_the_tool_timeout():
+    responses = [_tools(_call("c1", "get_system_status")), _answer("It is taking a while, sir.")]
+    agent, provider, _ = _agent(responses, OrderedSkills(delay=0.5))
+    agent.tool_timeout = 0.1
+    started = time.perf_counter()
+    assert agent.run("how is my computer doing") == "It is taking a while, sir."
+    assert time.perf_counter() - started < 0.4
+    errors = [m['content'] for m in provider.requests[1]['messages'] if m['role'] == 'tool']
+    assert errors == ["Error: get_system_status timed out after 0.1s"]
+
+
+def test_bad_calls_are_reported_to_the_model():
+    bad_json = {"id": "c1", "type": "function", "function": {"name": "calculate", "arguments": "{2+2"}}
+    responses = [_tools(bad_json, _call("c2", "no_such_tool")),
+                 _tools(_call("c3", "calculate", expression="2+2")), _answer("unused")]
+    agent, provider, skills = _agent(responses)
+    assert agent.run("what is 2+2") == "calculate result"
+    errors = [m['content'] for m in provider.requests[1]['messages'] if m['role'] == 'tool']
+    assert errors[0].startswith("Error: invalid arguments for calculate")
+    assert errors[1] == "Error: unknown tool 'no_such_tool'"
+    assert [c[0] for c in skills.calls] == ['calculate']
+
+
+def test_turn_limit_forces_an_answer():
+    responses = [_tools(_call(f"c{i}", "get_system_status")) for i in range(2)] + [_answer("Done looping.")]
+    agent, provider, _ = _agent(responses)
+    agent.max_turns = 3
+    assert agent.run("keep checking") == "Done looping."
+    assert [r['tool_choice'] for r in provider.requests] == ["auto", "auto", "none"]
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
+    rows = _replay_tasks()
+    print(f"\n{'task':<45} model calls")
+    for query, _, _, made, _ in rows:
+        print(f"{query:<45} {made}")
+    print(f"{'average':<45} {sum(r[3] for r in rows) / len(rows):.2f}")
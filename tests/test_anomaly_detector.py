@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming anomaly detector using synthetic metric traces:
+short spikes, sustained load, level shifts, slow memory leaks, deduplication and the event queue.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Ensure project root on path
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from anomaly_detector import AnomalyDetector
+
+SERIES = ['cpu_percent', 'memory_percent', 'net_recv_bps']
+
+
+def make_detector(**options):
+    settings = dict(window=120, z_threshold=4.0, sustain=10, thresholds={'cpu_percent': (80, 95)},
+                    leak_window=600, leak_min_rise=5.0, cooldown=600)
+    settings.update(options)
+    return AnomalyDetector(SERIES, **settings)
+
+
+def feed(detector, cpu, memory, net, start=0.0):
+    alerts = []
+    for i, row in enumerate(zip(cpu, memory, net)):
+        alerts.extend(detector.update(row, timestamp=start + i))
+    return alerts
+
+
+def noise(rng, n, level, spread):
+    return level + rng.normal(0, spread, n)
+
+
+def test_short_spikes_do_not_alert():
+    rng = np.random.default_rng(1)
+    detector = make_detector()
+    cpu = noise(rng, 600, 20, 3)
+    cpu[300:303] = 100.0
+    cpu[450] = 99.0
+    alerts = feed(detector, cpu, noise(rng, 600, 50, 0.5), noise(rng, 600, 1e5, 1e4))
+    assert alerts == [], alerts
+
+
+def test_sustained_load_alerts_once_per_condition():
+    rng = np.random.default_rng(2)
+    detector = make_detector()
+    cpu = np.r_[noise(rng, 300, 20, 3), noise(rng, 300, 97, 1)]
+    alerts = feed(detector, cpu, noise(rng, 600, 50, 0.5), noise(rng, 600, 1e5, 1e4))
+
+    kinds = [(a.series, a.kind, a.severity) for a in alerts]
+    assert ('cpu_percent', 'anomaly', 'critical') in kinds or ('cpu_percent', 'anomaly', 'warning') in kinds
+    threshold = [a for a in alerts if a.kind == 'threshold']
+    # Warning first, then one escalation to critical; never repeated inside the cooldown
+    assert [a.severity for a in threshold] == ['warning', 'critical']
+    assert all(a.series == 'cpu_percent' for a in alerts)
+    assert {a.kind for a in detector.active_alerts()} >= {'threshold'}
+
+
+def test_level_shift_in_one_series_is_detected():
+    rng = np.random.default_rng(3)
+    detector = make_detector()
+    net = np.r_[noise(rng, 300, 1e5, 1e4), noise(rng, 100, 5e6, 1e5)]
+    alerts = feed(detector, noise(rng, 400, 20, 3), noise(rng, 400, 50, 0.5), net)
+    assert [(a.series, a.kind) for a in alerts] == [('net_recv_bps', 'anomaly')]
+    assert alerts[0].timestamp - 300 >= 9  # only after the shift has been sustained
+
+
+def test_memory_leak_slope():
+    rng = np.random.default_rng(4)
+    leaking = make_detector()
+    memory = 40 + np.linspace(0, 8, 900) + rng.normal(0, 0.3, 900)
+    alerts = feed(leaking, noise(rng, 900, 20, 3), memory, noise(rng, 900, 1e5, 1e4))
+    assert [(a.series, a.kind) for a in alerts] == [('memory_percent', 'leak')]
+
+    steady = make_detector()
+    memory = 40 + 3 * np.sin(np.linspace(0, 12, 900)) + rng.normal(0, 0.3, 900)
+    alerts = feed(steady, noise(rng, 900, 20, 3), memory, noise(rng, 900, 1e5, 1e4))
+    assert [a for a in alerts if a.kind == 'leak'] == []
+
+
+def test_subscribers_queue_and_cooldown():
+    rng = np.random.default_rng(5)
+    detector = make_detector(cooldown=100)
+    received = []
+    unsubscribe = detector.subscribe(received.append)
+    cpu = np.r_[noise(rng, 100, 20, 3), np.full(400, 99.0)]
+    alerts = feed(detector, cpu, noise(rng, 500, 50, 0.5), noise(rng, 500, 1e5, 1e4))
+
+    critical = [a for a in alerts if a.kind == 'threshold' and a.severity == 'critical']
+    # Still true after the cooldown, so it is repeated (roughly every 100 s)
+    assert len(critical) >= 2
+    assert all(b.timestamp - a.timestamp >= 100 for a, b in zip(critical, critical[1:]))
+    assert received == alerts
+    assert detector.get_alert(timeout=0) is alerts[0]
+
+    unsubscribe()
+    feed(detector, np.full(200, 99.0), np.full(200, 50.0), np.full(200, 1e5), start=500)
+    assert len(received) == len(alerts)
+
+
+def test_update_cost_is_microseconds():
+    rng = np.random.default_rng(6)
+    series = [f'core_{i}' for i in range(48)]
+    detector = AnomalyDetector(series, thresholds={'core_0': (80, 95)}, leak_series=series[:4])
+    values = rng.random((2000, 48)) * 100
+    started = time.perf_counter()
+    for i, row in enumerate(values):
+        detector.update(row, timestamp=float(i))
+    per_update = (time.perf_counter() - started) / len(values)
+    assert per_update < 1e-3, f"{per_update * 1e6:.0f} us per update"
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
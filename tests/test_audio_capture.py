@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests for the ring-buffer capture pipeline and its VAD endpointer.
+WAV files stand in for the microphone so the tests run headless.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Ensure project root on path
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from audio_capture import AudioCapture, RingBuffer, WavFileSource, SAMPLE_RATE
+from wake_word import write_wav
+
+
+def _tone(seconds, level=8000, freq=220):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (np.sin(2 * np.pi * freq * t) * level).astype(np.int16)
+
+
+def _noise(seconds, level=60, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.normal(0, level, int(seconds * SAMPLE_RATE)).astype(np.int16)
+
+
+def _capture(tmp, *segments, trailing_silence=1.0, **kwargs):
+    path = Path(tmp) / "input.wav"
+    write_wav(path, np.concatenate(segments))
+    capture = AudioCapture(WavFileSource(path, trailing_silence=trailing_silence), **kwargs)
+    capture.start()
+    assert capture.wait_until_finished(timeout=10)
+    utterances = []
+    while True:
+        utterance = capture.get_utterance(timeout=0)
+        if utterance is None:
+            return capture, utterances
+        utterances.append(utterance)
+
+
+def test_ring_buffer_wraps_and_keeps_absolute_positions():
+    ring = RingBuffer(10)
+    ring.write(np.arange(8, dtype=np.int16))
+    ring.write(np.arange(8, 14, dtype=np.int16))
+    assert ring.total_written == 14
+    assert list(ring.latest(4)) == [10, 11, 12, 13]
+    # Samples older than the capacity are gone; reads are clamped to what remains
+    assert list(ring.read(0, 6)) == [4, 5]
+
+
+def test_emits_one_utterance_per_phrase_with_pre_roll():
+    with tempfile.TemporaryDirectory() as tmp:
+        capture, utterances = _capture(
+            tmp, _noise(1.0), _tone(0.6), _noise(1.0, seed=1), _tone(0.4), _noise(0.5, seed=2),
+            pre_roll_ms=300, hangover_ms=400
+        )
+        assert len(utterances) == 2
+        # pre-roll + speech + hangover
+        assert 0.6 + 0.3 <= utterances[0].duration <= 0.6 + 0.3 + 0.5
+        # The first 300 ms are the quiet pre-roll, the speech follows
+        pre_roll = utterances[0].pcm[:int(0.25 * SAMPLE_RATE)]
+        assert np.abs(pre_roll).max() < 1000
+        assert np.abs(utterances[0].pcm).max() > 7000
+        assert capture.stats['utterances'] == 2
+
+
+def test_noise_floor_adapts_to_steady_background():
+    with tempfile.TemporaryDirectory() as tmp:
+        # A loud steady background would trip a fixed threshold; the calibrated floor absorbs it
+        capture, utterances = _capture(tmp, _noise(3.0, level=400), min_rms=150, trailing_silence=0)
+        assert utterances == []
+        assert capture.noise_floor > 250
+
+
+def test_short_clicks_are_discarded():
+    with tempfile.TemporaryDirectory() as tmp:
+        capture, utterances = _capture(tmp, _noise(1.0), _tone(0.08), _noise(1.0, seed=1))
+        assert utterances == []
+        assert capture.stats['discarded_short'] == 1
+
+
+def test_suppress_blocks_new_utterances():
+    with tempfile.TemporaryDirectory() as tmp:
+        events = []
+        path = Path(tmp) / "input.wav"
+        write_wav(path, np.concatenate([_noise(0.5), _tone(0.5), _noise(1.0)]))
+        capture = AudioCapture(WavFileSource(path), suppress=lambda: True)
+        capture.add_listener(lambda event, info: events.append(event))
+        capture.start()
+        capture.wait_until_finished(timeout=10)
+        assert capture.get_utterance(timeout=0) is None
+        assert events == []
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
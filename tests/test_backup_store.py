@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Tests for the deduplicating backup store: unchanged files skip hashing, only new chunks are written,
+restores are byte-exact, identical large files stored in parallel count each chunk once, and pruning
+garbage-collects chunks no remaining manifest references.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Ensure project root on path
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from backup_store import BackupStore
+
+
+def _tree(base: Path):
+    (base / "notes").mkdir(parents=True)
+    (base / "config.py").write_text("API_KEY = 'x'\n")
+    (base / "notes" / "todo.txt").write_text("buy milk\n" * 100)
+    (base / "big.bin").write_bytes(os.urandom(10 * 1024))
+    return [base / "config.py", base / "notes" / "todo.txt", base / "big.bin"]
+
+
+def _chunk_count(store: BackupStore) -> int:
+    return sum(1 for _ in store.chunk_dir.glob("*/*"))
+
+
+def test_incremental_backup_and_restore():
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        files = _tree(tmp / "src")
+        store = BackupStore(tmp / "store", chunk_size=4096, large_file=8192)
+
+        first = store.backup(files, base=tmp / "src")
+        assert first['stats']['files'] == 3 and first['stats']['unchanged'] == 0
+        assert first['stats']['new_chunks'] == _chunk_count(store)
+        assert sorted(first['files']) == ['big.bin', 'config.py', 'notes/todo.txt']
+
+        second = store.backup(files, base=tmp / "src")
+        assert second['stats']['unchanged'] == 3 and second['stats']['new_chunks'] == 0
+
+        # Changing the tail of the big file only stores the chunk that changed
+        with open(files[2], 'r+b') as f:
+            f.seek(9 * 1024)
+            f.write(b'\0' * 16)
+        third = store.backup(files, base=tmp / "src")
+        assert third['stats']['unchanged'] == 2 and third['stats']['new_chunks'] == 1
+
+        assert store.list_backups() == [first['id'], second['id'], third['id']]
+        assert store.restore(first['id'], tmp / "out") == 3
+        for relative in first['files']:
+            original = (tmp / "src" / relative).read_bytes()
+            restored = (tmp / "out" / relative).read_bytes()
+            if relative == 'big.bin':
+                assert restored != original and restored[:9 * 1024] == original[:9 * 1024]
+            else:
+                assert restored == original
+
+
+def test_unchanged_files_are_not_read():
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        files = _tree(tmp / "src")
+        store = BackupStore(tmp / "store")
+        store.backup(files, base=tmp / "src")
+
+        read = []
+        original = store._store_file
+        store._store_file = lambda path: read.append(path) or original(path)
+        (tmp / "src" / "config.py").write_text("API_KEY = 'y'\n")
+        store.backup(files, base=tmp / "src")
+        assert read == [tmp / "src" / "config.py"]
+
+
+def test_duplicate_large_files_on_the_pool():
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        (tmp / "src").mkdir()
+        data = os.urandom(64 * 4096)
+        files = []
+        for i in range(8):
+            path = tmp / "src" / f"copy{i}.bin"
+            path.write_bytes(data)
+            files.append(path)
+        for attempt in range(5):
+            # Every copy goes through the thread pool and races to store the same chunks
+            store = BackupStore(tmp / f"store{attempt}", chunk_size=4096, large_file=8192, workers=8)
+            stats = store.backup(files, base=tmp / "src")['stats']
+            assert stats['new_chunks'] == _chunk_count(store) == 64
+            assert stats['new_bytes'] == len(data)
+            assert not list(store.chunk_dir.glob("*/*.tmp"))
+            assert store.restore(store.list_backups()[-1], tmp / f"out{attempt}") == 8
+            assert (tmp / f"out{attempt}" / "copy7.bin").read_bytes() == data
+
+
+def test_prune_collects_unreferenced_chunks():
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        files = _tree(tmp / "src")
+        store = BackupStore(tmp / "store", chunk_size=4096)
+        store.backup(files, base=tmp / "src")
+        before = _chunk_count(store)
+        (tmp / "src" / "config.py").write_text("API_KEY = 'changed'\n")
+        latest = store.backup(files, base=tmp / "src")
+        assert _chunk_count(store) == before + 1
+
+        result = store.prune(keep_last=1)
+        assert result['manifests_removed'] == 1 and result['chunks_deleted'] == 1
+        assert store.list_backups() == [latest['id']]
+        assert _chunk_count(store) == before
+        assert store.restore(latest['id'], tmp / "out") == 3
+        assert (tmp / "out" / "config.py").read_text() == "API_KEY = 'changed'\n"
+
+
+def test_cancelled_backup_writes_no_manifest():
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        files = _tree(tmp / "src")
+        store = BackupStore(tmp / "store")
+        try:
+            store.backup(files, base=tmp / "src", cancelled=lambda: True)
+            assert False, "expected InterruptedError"
+        except InterruptedError:
+            pass
+        assert store.list_backups() == []
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
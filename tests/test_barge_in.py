@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Tests for barge-in: interrupting speech output when the user starts talking.
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Ensure project root on path
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from audio_capture import AudioCapture, WavFileSource, SAMPLE_RATE
+from tts_worker import TTSWorker
+from wake_word import write_wav
+
+
+class FakeLoopEngine:
+    """Mimics pyttsx3's external event loop; every utterance takes `duration` seconds to speak"""
+
+    duration = 5.0
+
+    def __init__(self):
+        self.spoken = []
+        self.stopped = []
+        self._current = None
+        self._ends_at = 0.0
+
+    def say(self, text):
+        self._current = text
+        self._ends_at = time.monotonic() + self.duration
+
+    def startLoop(self, use_driver_loop=True):
+        pass
+
+    def iterate(self):
+        pass
+
+    def isBusy(self):
+        busy = time.monotonic() < self._ends_at
+        if not busy and self._current is not None:
+            self.spoken.append(self._current)
+            self._current = None
+        return busy
+
+    def stop(self):
+        self.stopped.append(self._current)
+        self._current = None
+        self._ends_at = 0.0
+
+    def endLoop(self):
+        pass
+
+
+def test_interrupt_stops_speech_quickly_and_flushes_queue():
+    worker = TTSWorker(FakeLoopEngine)
+    worker.start()
+    try:
+        first = worker.speak_async("A very long answer")
+        queued = worker.speak_async("More of the answer")
+        deadline = time.time() + 2
+        while not worker.is_speaking and time.time() < deadline:
+            time.sleep(0.005)
+
+        started = time.perf_counter()
+        assert worker.interrupt()
+        assert first.result(timeout=1) is False
+        elapsed = time.perf_counter() - started
+
+        assert elapsed < 0.1
+        assert queued.cancelled()
+        assert worker.engine.stopped == ["A very long answer"]
+        assert not worker.interrupt()  # nothing left playing
+    finally:
+        worker.shutdown(timeout=0)
+
+
+def test_capture_detects_user_over_playback_with_raised_threshold():
+    t = np.arange(int(0.5 * SAMPLE_RATE)) / SAMPLE_RATE
+    echo = (np.sin(2 * np.pi * 200 * t) * 300).astype(np.int16)      # our own voice leaking back, above the normal threshold
+    user = (np.sin(2 * np.pi * 300 * t) * 12000).astype(np.int16)    # the user talking over it
+    quiet = np.zeros(int(0.6 * SAMPLE_RATE), dtype=np.int16)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "duplex.wav"
+        write_wav(path, np.concatenate([quiet, echo, quiet, user, quiet]))
+        events = []
+        capture = AudioCapture(WavFileSource(path), playback=lambda: True, playback_ratio=3.0)
+        capture.add_listener(lambda event, info: events.append((event, info.get('during_playback'))))
+        capture.start()
+        assert capture.wait_until_finished(timeout=5)
+
+        utterances = []
+        while True:
+            utterance = capture.get_utterance(timeout=0)
+            if utterance is None:
+                break
+            utterances.append(utterance)
+
+        assert len(utterances) == 1
+        assert utterances[0].during_playback
+        assert ('speech_start', True) in events
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Tests for the compound command grammar: a corpus of real phrasings with their expected AST, plus seeded
+fuzzing that builds random sequences (and random garbage) and checks the parse structure and invariants.
+"""
+
+import random
+import sys
+from pathlib import Path
+
+# Ensure project root on path
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from command_grammar import (Command, Conditional, Delay, FileWithContent, Parallel, Sequence, parse_command,
+                             tokenize)
+
+CORPUS = [
+    ("A then B then C", [[Command('A')], [Command('B')], [Command('C')]]),
+    ("check the weather and show cpu usage then take a screenshot",
+     [[Command('check the weather'), Command('show cpu usage')], [Command('take a screenshot')]]),
+    ("launch calculator, wait 2 seconds, then type 5*5",
+     [[Command('launch calculator')], Delay(2), [Command('type 5*5')]]),
+    ("wait a minute then check the weather", [Delay(60), [Command('check the weather')]]),
+    ("in 5 seconds take a screenshot", [Delay(5), [Command('take a screenshot')]]),
+    ("open spotify; next play music", [[Command('open spotify')], [Command('play music')]]),
+    # One request each: no split inside quotes, after a launch, on a back-reference or a non-verb
+    ("open notepad then type 'Hello World and then bye'",
+     [[Command('open notepad')], [Command("type 'Hello World and then bye'")]]),
+    ("open chrome and search for cats", [[Command('open chrome and search for cats')]]),
+    ("search for cats and read it aloud", [[Command('search for cats and read it aloud')]]),
+    ("tell me about salt and pepper", [[Command('tell me about salt and pepper')]]),
+    ("remind me in 10 minutes", [[Command('remind me in 10 minutes')]]),
+    ("play next song", [[Command('play next song')]]),
+    ("if file exists data.txt then read it, otherwise create it",
+     [Conditional('if', 'file exists data.txt', 'read it', 'create it',
+                  'if file exists data.txt then read it, otherwise create it')]),
+    ("when notepad opens take a screenshot then show cpu usage",
+     [Conditional('when', 'notepad opens', 'take a screenshot', None, 'when notepad opens take a screenshot'),
+      [Command('show cpu usage')]]),
+    ("once chrome is open search for cats",
+     [Conditional('once', 'chrome is open', 'search for cats', None, 'once chrome is open search for cats')]),
+    ("create a file about robotics and save it as robotics_info.txt",
+     [[FileWithContent('robotics', 'robotics_info.txt', None,
+                       'create a file about robotics and save it as robotics_info.txt')]]),
+    ("create a file named notes about the history of rome on desktop",
+     [[FileWithContent('the history of rome', 'notes.txt', 'desktop',
+                       'create a file named notes about the history of rome on desktop')]]),
+    ("write about Solar Power", [[FileWithContent('solar power', 'solar_power.txt', None, 'write about Solar Power')]]),
+    ("create file todo.md with content groceries and chores then show it",
+     [[FileWithContent('groceries and chores', 'todo.md', None, 'create file todo.md with content groceries and chores')],
+      [Command('show it')]]),
+]
+
+INDEPENDENT = ["check the weather", "show cpu usage", "get battery status", "take a screenshot", "list files",
+               "search for python tutorials", "play some music", "set volume to 40", "what's the time"]
+JOINERS = [" and ", ", ", ", and ", "; "]
+CONNECTORS = [" then ", ", then ", " and then ", " after that ", "; then ", " THEN "]
+
+
+def _expected(stages):
+    return Sequence([Parallel(stage) if isinstance(stage, list) else stage for stage in stages])
+
+
+def test_corpus():
+    for command, stages in CORPUS:
+        assert parse_command(command) == _expected(stages), (command, parse_command(command))
+
+
+def test_fuzz_generated_sequences():
+    rng = random.Random(46)
+    for _ in range(2000):
+        stages, pieces = [], []
+        for position in range(rng.randint(1, 5)):
+            if position and rng.random() < 0.2:
+                seconds = rng.randint(1, 90)
+                pieces.append(rng.choice([f", wait {seconds} seconds,", f" pause for {seconds} seconds"]))
+                stages.append(Delay(seconds))
+                pieces.append(rng.choice(CONNECTORS) if rng.random() < 0.5 else " ")
+            elif position:
+                pieces.append(rng.choice(CONNECTORS))
+            clauses = rng.sample(INDEPENDENT, rng.randint(1, 3))
+            clauses = [c.upper() if rng.random() < 0.1 else c for c in clauses]
+            text = clauses[0]
+            for clause in clauses[1:]:
+                text += rng.choice(JOINERS) + clause
+            pieces.append(text)
+            stages.append([Command(c) for c in clauses])
+        command = "".join(pieces)
+        assert parse_command(command) == _expected(stages), (command, parse_command(command))
+
+
+def test_fuzz_garbage_never_raises():
+    rng = random.Random(7)
+    vocabulary = ["then", "and", "if", "when", "once", "otherwise", "wait", "pause", "for", "in", "after", "that",
+                  "5", "a", "seconds", "minute", "create", "file", "about", "named", "save", "it", "as", "open",
+                  "on", "desktop", ",", ";", "'", '"', "x", "é", "🙂", "  ", "\t", "next", "the", "result"]
+    for _ in range(3000):
+        command = " ".join(rng.choice(vocabulary) for _ in range(rng.randint(0, 25)))
+        tree = parse_command(command)
+        assert tree == parse_command(command)
+        for stage in tree.stages:
+            assert isinstance(stage, (Parallel, Delay, Conditional))
+            for part in getattr(stage, 'parts', []):
+                assert part.text and part.text in command
+    assert [t.kind for t in tokenize("say 'hi, there' now;")] == ['word', 'quoted', 'word', 'sep']
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
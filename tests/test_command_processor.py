@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Tests for compound command execution: "then" and delays order steps, independent parts run concurrently
+on the worker pool, results come back in step order, and only launches add settling time.
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+# Ensure project root on path
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from skills.command_processor import CommandProcessor
+
+
+class FakeJarvis:
+    def __init__(self, duration=0.2):
+        self.duration = duration
+        self.log = []
+        self.lock = threading.Lock()
+        self.voice_engine = SimpleNamespace(speak=lambda text: None)
+
+    def process_command(self, command, use_voice=True):
+        with self.lock:
+            self.log.append(('start', command, time.perf_counter()))
+        time.sleep(self.duration)
+        with self.lock:
+            self.log.append(('end', command, time.perf_counter()))
+
+    def times(self, command):
+        return {kind: t for kind, name, t in self.log if name == command}
+
+
+def _graph(processor, command):
+    return [(step.get('command', step['raw_command']), step['after'])
+            for step in processor.parse_complex_command(command)]
+
+
+def test_only_explicit_ordering_creates_edges():
+    processor = CommandProcessor(FakeJarvis())
+    assert _graph(processor, "check the weather and show cpu usage then take a screenshot") == [
+        ('check the weather', []), ('show cpu usage', []), ('take a screenshot', [0, 1])]
+    assert _graph(processor, "launch calculator, wait 2 seconds, then type 5*5") == [
+        ('launch calculator', []), ('wait 2 seconds', [0]), ('type 5*5', [1])]
+    # Data dependencies keep a segment as one command
+    assert _graph(processor, "search for cats and read it aloud") == [('search for cats and read it aloud', [])]
+    assert _graph(processor, "tell me about salt and pepper") == [('tell me about salt and pepper', [])]
+    assert processor.parse_complex_command("launch notepad then type hi")[0]['settle'] == processor.settle_seconds
+
+
+def test_independent_steps_run_concurrently_in_order():
+    jarvis = FakeJarvis(duration=0.3)
+    processor = CommandProcessor(jarvis)
+    steps = processor.parse_complex_command("check the weather, show cpu usage and get battery status then list files")
+    started = time.perf_counter()
+    results = processor.execute_parsed_commands(steps, use_voice=False)
+    elapsed = time.perf_counter() - started
+
+    assert results == ["Executed: check the weather", "Executed: show cpu usage",
+                       "Executed: get battery status", "Executed: list files"]
+    # Three parallel steps then one: ~2 step durations, where the old loop took 4 plus 1.5 s of sleeps
+    assert elapsed < 0.9, elapsed
+    last = jarvis.times("list files")['start']
+    for command in ("check the weather", "show cpu usage", "get battery status"):
+        assert jarvis.times(command)['end'] <= last
+
+
+def test_delays_and_errors():
+    jarvis = FakeJarvis(duration=0.0)
+    processor = CommandProcessor(jarvis)
+    steps = processor.parse_complex_command("take a screenshot then wait 1 second then show cpu usage")
+    started = time.perf_counter()
+    results = processor.execute_parsed_commands(steps, use_voice=False)
+    assert results[1] == "Waited 1 seconds"
+    assert 1.0 <= jarvis.times("show cpu usage")['start'] - started < 1.5
+
+    def broken(command, use_voice=True):
+        raise RuntimeError("boom")
+    jarvis.process_command = broken
+    results = processor.execute_parsed_commands(
+        [{'type': 'simple', 'command': 'x', 'raw_command': 'x'},
+         {'type': 'simple', 'command': 'y', 'raw_command': 'y'}], use_voice=False)
+    assert results == ["Error executing step 'x': boom", "Error executing step 'y': boom"]
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Tests for the asyncio command runtime: delays don't block the caller or other commands, and when/once
+conditions wait on file, process and metric watchers (with timeout, otherwise branch and cancellation),
+while when/once questions with nothing to watch are not deferred.
+"""
+
+import concurrent.futures
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+# Ensure project root on path
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from command_runtime import CommandRuntime, FileWatch, MetricWatch, ProcessWatch, compile_condition
+from skills.command_processor import CommandProcessor
+from worker_pool import WorkerPool
+
+
+class FakeCollector:
+    def __init__(self):
+        self.listeners = []
+
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        self.listeners.remove(callback)
+
+    def latest(self):
+        return {'cpu_percent': 10.0}
+
+    def push(self, **sample):
+        for callback in list(self.listeners):
+            callback(sample)
+
+
+class FakeTable:
+    def __init__(self):
+        self.running = set()
+
+    def find(self, name, refresh=True):
+        return [1234] if name in self.running else []
+
+
+def _runtime(watch_for, watch_timeout=5.0):
+    ran = []
+
+    def run_step(step):
+        ran.append(step['command'])
+        return f"Executed: {step['command']}"
+    runtime = CommandRuntime(WorkerPool(workers=2), run_step, lambda step: 'command', watch_for, watch_timeout)
+    return runtime, ran
+
+
+def _when(condition, action, otherwise=None):
+    return {'type': 'conditional', 'keyword': 'when', 'condition': condition, 'action': action,
+            'otherwise': otherwise, 'raw_command': f"when {condition} then {action}", 'after': []}
+
+
+def test_compile_condition():
+    metric = compile_condition("cpu usage goes above 90%")
+    assert isinstance(metric, MetricWatch) and metric.field == 'cpu_percent' and metric.above and metric.threshold == 90
+    assert not compile_condition("memory drops below 20 percent").above
+    assert compile_condition("report.txt is modified", base_dir="/tmp").path == Path("/tmp/report.txt")
+    assert compile_condition("file exists data.txt").event == 'exists'
+    assert compile_condition("notes.md disappears").event == 'deleted'
+    process = compile_condition("notepad opens")
+    assert isinstance(process, ProcessWatch) and process.running
+    assert not compile_condition("google chrome closes").running
+    assert compile_condition("it feels like it") is None
+
+
+def test_delays_do_not_block_other_commands():
+    jarvis = SimpleNamespace(process_command=lambda command, use_voice=True: None)
+    processor = CommandProcessor(jarvis)
+    started = time.perf_counter()
+    slow = processor.start_parsed_commands(processor.parse_complex_command("wait 1 second then take a screenshot"))
+    fast = processor.start_parsed_commands(processor.parse_complex_command("check the weather and show cpu usage"))
+    assert time.perf_counter() - started < 0.2
+    assert fast.future.result(timeout=1) == ["Executed: check the weather", "Executed: show cpu usage"]
+    assert not slow.future.done() and len(processor.pending_commands()) == 1
+    assert slow.future.result(timeout=2) == ["Waited 1 seconds", "Executed: take a screenshot"]
+    assert time.perf_counter() - started >= 1.0
+    assert processor.is_deferred(slow.steps) and not processor.is_deferred(fast.steps)
+    processor.runtime.stop()
+
+
+def test_file_and_process_watchers():
+    with tempfile.TemporaryDirectory() as tmp:
+        table = FakeTable()
+
+        def watch_for(condition):
+            return compile_condition(condition, base_dir=tmp, file_poll=0.05, process_poll=0.05, process_table=table)
+        runtime, ran = _runtime(watch_for)
+        on_file = runtime.submit([_when("report.txt exists", "show the report")])
+        on_process = runtime.submit([_when("notepad opens", "take a screenshot")])
+        time.sleep(0.3)
+        assert ran == [] and on_file.waiting_on == "file report.txt exists"
+
+        (Path(tmp) / "report.txt").write_text("done")
+        assert on_file.future.result(timeout=2) == ["Condition met (report.txt exists), executed: show the report"]
+        assert not on_process.future.done()
+        table.running.add("notepad")
+        assert on_process.future.result(timeout=2)[0].startswith("Condition met (notepad opens)")
+        runtime.stop()
+
+
+def test_metric_watcher_timeout_and_cancel():
+    collector = FakeCollector()
+    runtime, ran = _runtime(lambda condition: compile_condition(condition, collector=collector), watch_timeout=0.5)
+    hot = runtime.submit([_when("cpu is above 90 percent", "show processes")])
+    expires = runtime.submit([_when("memory is above 99 percent", "notify me", otherwise="show memory usage")])
+    time.sleep(0.1)
+    collector.push(cpu_percent=50.0, memory_percent=40.0)
+    time.sleep(0.1)
+    assert not hot.future.done()
+    threading.Thread(target=collector.push, kwargs={'cpu_percent': 95.0, 'memory_percent': 40.0}).start()
+    assert hot.future.result(timeout=1) == ["Condition met (cpu is above 90 percent), executed: show processes"]
+    assert expires.future.result(timeout=2) == ["Condition not met within 0.5s, executed: show memory usage"]
+    assert collector.listeners == []
+
+    runtime.watch_timeout = 60
+    waiting = runtime.submit([_when("cpu is above 99 percent", "x"), {'type': 'simple', 'command': 'y',
+                                                                    'raw_command': 'y'}])
+    time.sleep(0.1)
+    assert len(collector.listeners) == 1
+    assert runtime.cancel(waiting.id)
+    try:
+        waiting.future.result(timeout=1)
+        assert False, "expected cancellation"
+    except concurrent.futures.CancelledError:
+        pass
+    time.sleep(0.05)
+    assert collector.listeners == [] and runtime.pending() == [] and 'y' not in ran
+    runtime.stop()
+
+
+def test_questions_are_not_deferred_watchers():
+    processor = CommandProcessor(SimpleNamespace())
+    try:
+        for question in ("when was python released, tell me", "when is my next meeting and what time is it",
+                         "once upon a time tell me a story"):
+            steps = processor.parse_complex_command(question)
+            assert not processor.is_deferred(steps), question
+            assert processor.is_question(steps), question
+        for watcher in ("when cpu is above 90 percent tell me", "once notepad opens type hello"):
+            steps = processor.parse_complex_command(watcher)
+            assert processor.is_deferred(steps) and not processor.is_question(steps), watcher
+        assert not processor.is_question(processor.parse_complex_command("open notepad and type hello"))
+    finally:
+        processor.runtime.stop()
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Tests for command autocomplete: prefix completions come from the per-node top-k caches, recent and frequent
+commands outrank stale ones, typos fall back to trigram matches, and history survives a restart.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Ensure project root on path
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from command_suggest import SuggestionIndex
+from state_store import StateStore
+
+DAY = 86400.0
+TEMPLATES = ["system status", "take screenshot", "open notepad", "open calculator", "open chrome",
+             "what's the weather in London", "weather today", "list running processes"]
+
+
+def _index(**kwargs) -> SuggestionIndex:
+    return SuggestionIndex(TEMPLATES, clock=lambda: 0.0, **kwargs)
+
+
+def test_prefix_and_word_start_matches():
+    index = _index()
+    assert set(index.suggest("open", 5)) == {"open notepad", "open calculator", "open chrome"}
+    assert index.suggest("OPEN  note")[0] == "open notepad"
+    # Word starts inside a command match too
+    assert set(index.suggest("weather")) == {"weather today", "what's the weather in London"}
+    assert len(index.suggest("", 3)) == 3
+
+
+def test_frequency_and_recency_ranking():
+    index = _index(half_life_days=7)
+    for _ in range(3):
+        index.record("open chrome", now=0.0)
+    assert index.suggest("open")[0] == "open chrome"
+
+    # One use a month later beats three uses a month earlier (half-life one week)
+    index.record("open calculator", now=30 * DAY)
+    assert index.suggest("open")[0] == "open calculator"
+
+    # New commands join the index and are suggested by prefix
+    index.record("open spotify and play jazz", now=30 * DAY)
+    assert "open spotify and play jazz" in index.suggest("open sp")
+
+    # Rebasing the epoch far in the future keeps the ordering intact
+    index.record("open notepad", now=2000 * DAY)
+    assert index.suggest("open")[0] == "open notepad"
+    assert set(index.suggest("open")[1:3]) == {"open spotify and play jazz", "open calculator"}
+
+
+def test_typo_tolerance():
+    index = _index()
+    assert index.suggest("scrnshot")[0] == "take screenshot"
+    assert index.suggest("sytem staus")[0] == "system status"
+    assert index.suggest("opn notpad")[0] == "open notepad"
+    assert index.suggest("xq") == []
+
+
+def test_history_persists_and_is_capped():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = StateStore(Path(tmp) / "state.db")
+        index = SuggestionIndex(TEMPLATES, max_history=10, store=store, clock=lambda: 0.0)
+        for i in range(30):
+            index.record(f"remind me about item {i}", now=i * 60.0)
+        index.record("remind me about item 29", now=31 * 60.0)
+        assert sum(1 for e in index._entries if e.history) <= 12
+        assert index.suggest("remind me")[0] == "remind me about item 29"
+        store.flush()
+
+        persisted = store.items('command_history')
+        assert len(persisted) <= 12 and persisted["remind me about item 29"]['count'] == 2
+
+        restored = SuggestionIndex(TEMPLATES, max_history=10, clock=lambda: 31 * 60.0)
+        restored.load_history(persisted)
+        assert restored.suggest("remind me")[0] == "remind me about item 29"
+        assert sum(1 for e in restored._entries if e.history) <= 10
+        store.close()
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Tests for the event scheduler: deadline ordering, wake-up on earlier insertions, keyed replacement and
+cancellation, and no wake-ups while idle. Also checks TaskScheduler fires "in N seconds" tasks on time.
+"""
+
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+# Ensure project root on path
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from event_scheduler import EventScheduler
+from state_store import StateStore
+
+
+def test_fires_in_deadline_order():
+    scheduler = EventScheduler()
+    fired, done = [], threading.Event()
+    now = time.time()
+    for label, delay in (("c", 0.09), ("a", 0.03), ("b", 0.06)):
+        scheduler.schedule_at(now + delay, fired.append, label)
+    scheduler.schedule_at(now + 0.12, done.set)
+    scheduler.start()
+    try:
+        assert done.wait(2)
+        assert fired == ["a", "b", "c"]
+    finally:
+        scheduler.stop()
+
+
+def test_earlier_insertion_wakes_thread():
+    scheduler = EventScheduler()
+    scheduler.start()
+    try:
+        scheduler.schedule_in(30, lambda: None)
+        time.sleep(0.05)
+        fired_at = []
+        done = threading.Event()
+        due = time.time() + 0.05
+        scheduler.schedule_at(due, lambda: (fired_at.append(time.time()), done.set()))
+        assert done.wait(2)
+        assert fired_at[0] - due < 0.1
+    finally:
+        scheduler.stop()
+
+
+def test_cancel_and_keyed_replacement():
+    scheduler = EventScheduler()
+    fired, done = [], threading.Event()
+    first = scheduler.schedule_in(0.02, fired.append, "cancelled")
+    scheduler.schedule_in(0.02, fired.append, "old", key="task_1")
+    scheduler.schedule_in(0.04, fired.append, "new", key="task_1")
+    scheduler.schedule_in(0.08, done.set)
+    assert scheduler.cancel(first)
+    assert not scheduler.cancel(first)
+    assert len(scheduler) == 2
+
+    scheduler.start()
+    try:
+        assert done.wait(2)
+        assert fired == ["new"]
+        assert scheduler.pending("task_1") is None
+        assert not scheduler.cancel("task_1")
+    finally:
+        scheduler.stop()
+
+
+def test_mass_cancel_compacts_heap():
+    scheduler = EventScheduler()
+    timers = [scheduler.schedule_in(3600 + i, lambda: None) for i in range(1000)]
+    for timer in timers[:900]:
+        scheduler.cancel(timer)
+    assert len(scheduler) == 100
+    assert len(scheduler._heap) < 1000
+    assert scheduler.next_deadline() == timers[900].when
+
+
+def test_no_idle_wakeups():
+    scheduler = EventScheduler()
+    scheduler.start()
+    try:
+        time.sleep(0.2)
+        assert scheduler.wakeups == 0
+        scheduler.schedule_in(3600, lambda: None)
+        time.sleep(0.1)
+        # One wake-up for the insertion, then it sleeps toward the far deadline
+        assert scheduler.wakeups == 1
+    finally:
+        scheduler.stop()
+
+
+def test_task_scheduler_runs_delayed_task():
+    from skills.task_scheduler import TaskScheduler
+
+    spoken = []
+    done = threading.Event()
+
+    def speak(text, priority=None):
+        spoken.append(text)
+        if text == "stretch":
+            done.set()
+
+    jarvis = SimpleNamespace(voice_engine=SimpleNamespace(speak=speak))
+    with tempfile.TemporaryDirectory() as tmp:
+        store = StateStore(Path(tmp) / "state.db")
+        scheduler = TaskScheduler(jarvis, store=store)
+        try:
+            scheduler.schedule_reminder("stretch", "in 1 second")
+            assert done.wait(3)
+            assert spoken == ["Reminder", "stretch"]
+            time.sleep(0.1)
+            assert scheduler.active_tasks["task_0"]['status'] == 'completed'
+        finally:
+            scheduler.stop_scheduler()
+            store.close()
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
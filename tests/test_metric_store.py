@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Tests for the columnar metric store: append/flush, rollups, retention, crash-torn columns and time phrases.
+"""
+
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+# Ensure project root on path
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from metric_store import MetricStore, parse_time_range
+
+FIELDS = ('cpu_percent', 'memory_percent')
+START = 1_700_000_000.0 - (1_700_000_000.0 % 3600)  # hour-aligned
+
+
+def test_append_query_and_rollups():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = MetricStore(tmp, fields=FIELDS, retention={'raw': None, '1m': None}, flush_rows=10)
+        # Two hours of 1 Hz samples: CPU ramps 0..99 every 100 s, memory constant
+        times = START + np.arange(7200, dtype=np.float64)
+        cpu = (np.arange(7200) % 100).astype(np.float64)
+        for t, c in zip(times[:30], cpu[:30]):
+            store.append(t, {'cpu_percent': c, 'memory_percent': 40.0})
+        store.append_many(times[30:], np.column_stack([cpu[30:], np.full(7170, 40.0)]))
+
+        stamps, values = store.query('cpu_percent', START, START + 10, level='raw')
+        assert list(values) == list(range(10))
+        raw = store.aggregate('cpu_percent', START, START + 7200, level='raw')
+        assert raw['samples'] == 7200 and abs(raw['avg'] - cpu.mean()) < 1e-6
+
+        # Closed minute buckets agree with raw data; the last minute is still open
+        minutes = store.aggregate('cpu_percent', START, START + 7140, level='1m')
+        assert minutes['samples'] == 7140
+        assert abs(minutes['avg'] - cpu[:7140].mean()) < 1e-3
+        assert minutes['min'] == 0.0 and minutes['max'] == 99.0
+        stamps, _ = store.query('memory_percent', START, START + 7200, level='1m')
+        assert np.all(np.diff(stamps) == 60)
+
+        store.close()
+        hours = store.aggregate('cpu_percent', START, START + 7200, level='1h')
+        assert hours['samples'] == 7200 and abs(hours['avg'] - cpu.mean()) < 1e-3
+
+
+def test_retention_drops_old_raw_chunks_and_keeps_rollups():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = MetricStore(tmp, fields=FIELDS, retention={'raw': 3600, '1m': None}, flush_rows=1)
+        times = START + np.arange(0, 4 * 3600, 10, dtype=np.float64)
+        store.append_many(times, np.column_stack([np.full(len(times), 25.0), np.full(len(times), 50.0)]))
+
+        assert store.aggregate('cpu_percent', START, START + 3600, level='raw')['samples'] == 0
+        assert store.aggregate('cpu_percent', START, START + 3600, level='1m')['avg'] == 25.0
+        assert store.choose_level(START, now=times[-1]) == '1m'
+        assert store.choose_level(times[-1] - 60, now=times[-1]) == 'raw'
+
+
+def test_torn_columns_and_reopen():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = MetricStore(tmp, fields=FIELDS, flush_rows=100)
+        for i in range(5):
+            store.append(START + i, [float(i), 1.0])
+        store.flush()
+        # Simulate a crash mid-write: one column got an extra row
+        chunk = Path(tmp) / 'raw' / str(int(START))
+        with open(chunk / 'cpu_percent.f4', 'ab') as f:
+            f.write(np.float32(99).tobytes())
+
+        reopened = MetricStore(tmp, fields=FIELDS)
+        stamps, values = reopened.query('cpu_percent', START, START + 100, level='raw')
+        assert list(values) == [0.0, 1.0, 2.0, 3.0, 4.0]
+        assert reopened.time_span() == (START, START + 4)
+
+
+def test_parse_time_range():
+    now = datetime(2026, 3, 11, 15, 30).timestamp()
+    start, end, label = parse_time_range("average cpu yesterday afternoon", now)
+    assert datetime.fromtimestamp(start) == datetime(2026, 3, 10, 12, 0)
+    assert datetime.fromtimestamp(end) == datetime(2026, 3, 10, 18, 0)
+    assert label == "yesterday afternoon"
+
+    start, end, label = parse_time_range("memory over the last 2 hours", now)
+    assert end - start == 7200 and end == now
+
+    start, end, _ = parse_time_range("cpu this afternoon", now)
+    assert datetime.fromtimestamp(start) == datetime(2026, 3, 11, 12, 0) and end == now
+
+    start, end, label = parse_time_range("peak memory this week", now)
+    assert datetime.fromtimestamp(start) == datetime(2026, 3, 9) and end == now and label == "this week"
+
+    assert parse_time_range("cpu usage", now) is None
+    # "this" alone does not mean today
+    assert parse_time_range("memory usage of this machine", now) is None
+    assert parse_time_range("is this process using the cpu", now) is None
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
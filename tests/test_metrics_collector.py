@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Tests for the background metrics collector's ring buffers, rates and rolling windows.
+Uses a scripted sampler so results are deterministic.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Ensure project root on path
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from metrics_collector import MetricsCollector
+
+
+class ScriptedSampler:
+    def __init__(self):
+        self.step = 0
+
+    def __call__(self):
+        self.step += 1
+        return {
+            'per_core': [self.step * 10.0, self.step * 10.0 + 2],
+            'memory_percent': 50.0,
+            'memory_used': 4e9,
+            'memory_available': 4e9,
+            'memory_total': 8e9,
+            'swap_percent': 0.0,
+            'disk_io': {'read_bytes': self.step * 1000, 'write_bytes': 0},
+            'net_io': {'bytes_sent': self.step * 500, 'bytes_recv': self.step * 2000},
+        }
+
+
+def test_rates_latest_and_window():
+    collector = MetricsCollector(interval=1.0, history_seconds=10, sampler=ScriptedSampler(), cores=2)
+    for second in range(5):
+        collector.sample_once(now=1000.0 + second)
+
+    latest = collector.latest()
+    assert latest['cpu_percent'] == 51.0
+    assert latest['per_core'] == [50.0, 52.0]
+    # Counters become per-second rates from the second sample on
+    assert latest['disk_read_bps'] == 1000.0
+    assert latest['net_recv_bps'] == 2000.0
+
+    window = collector.window('cpu_percent', seconds=2)
+    assert window == {'min': 31.0, 'avg': 41.0, 'max': 51.0, 'samples': 3}
+    assert collector.summary(seconds=60)['memory_percent']['avg'] == 50.0
+
+
+def test_ring_wraps_without_growing():
+    collector = MetricsCollector(interval=1.0, history_seconds=4, sampler=ScriptedSampler(), cores=2)
+    for second in range(20):
+        collector.sample_once(now=float(second))
+    times, values = collector.history('cpu_percent')
+    assert len(times) == collector.capacity
+    assert list(times) == sorted(times) and times[-1] == 19.0
+    _, per_core = collector.history('per_core')
+    assert per_core.shape == (collector.capacity, 2)
+
+
+def test_background_thread_and_interval_requests():
+    collector = MetricsCollector(interval=5.0, history_seconds=60, sampler=ScriptedSampler(), cores=2)
+    seen = []
+    collector.add_listener(seen.append)
+    collector.start()
+    try:
+        assert collector.wait_for_sample(timeout=2)
+        collector.request_interval("job", 0.05)
+        assert collector.current_interval == 0.05
+        time.sleep(0.3)
+        assert len(seen) >= 3
+        collector.request_interval("job", None)
+        assert collector.current_interval == 5.0
+    finally:
+        collector.stop()
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Tests for the OpenMetrics exporter: text exposition of counters, gauges, histograms and
+scrape-time callbacks, LLM call tracking, and the HTTP endpoint.
+"""
+
+import contextlib
+import io
+import sys
+import urllib.request
+from pathlib import Path
+
+# Ensure project root on path
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from metrics_exporter import (
+    LLM_ERRORS, LLM_LATENCY, CallbackMetric, Counter, Gauge, Histogram, MetricsExporter, Registry, llm_call,
+)
+
+
+def test_histogram_and_counter_exposition():
+    registry = Registry()
+    latency = registry.register(Histogram("cmd_seconds", "Command latency", labels=("intent",), buckets=(0.1, 1.0)))
+    errors = registry.register(Counter("errors", "Errors", labels=("reason",)))
+    depth = registry.register(Gauge("queue_depth", "Queue depth"))
+
+    for value in (0.05, 0.5, 0.5, 3.0):
+        latency.observe(value, intent="SYSTEM")
+    errors.inc(reason='http "502"')
+    depth.set(4)
+
+    text = registry.render()
+    lines = text.splitlines()
+    assert '# TYPE cmd_seconds histogram' in lines
+    assert 'cmd_seconds_bucket{intent="SYSTEM",le="0.1"} 1' in lines
+    assert 'cmd_seconds_bucket{intent="SYSTEM",le="1"} 3' in lines
+    assert 'cmd_seconds_bucket{intent="SYSTEM",le="+Inf"} 4' in lines
+    assert 'cmd_seconds_count{intent="SYSTEM"} 4' in lines
+    assert 'cmd_seconds_sum{intent="SYSTEM"} 4.05' in lines
+    assert '# TYPE errors counter' in lines
+    assert 'errors_total{reason="http \\"502\\""} 1' in lines
+    assert 'queue_depth 4' in lines
+    assert lines[-1] == '# EOF'
+
+    # Prometheus 0.0.4 text format: counter family carries _total, no EOF marker
+    legacy = registry.render(openmetrics=False).splitlines()
+    assert '# TYPE errors_total counter' in legacy and '# EOF' not in legacy
+
+
+def test_callbacks_are_read_at_scrape_time():
+    registry = Registry()
+    state = {'hits': 0}
+    registry.register(CallbackMetric("cache_lookups", "Lookups", "counter",
+                                     lambda: [({'result': 'hit'}, state['hits'])]))
+    state['hits'] = 7
+    assert 'cache_lookups_total{result="hit"} 7' in registry.render().splitlines()
+
+    registry.register(CallbackMetric("broken", "Raises", "gauge", lambda: 1 / 0))
+    logged = io.StringIO()
+    with contextlib.redirect_stdout(logged):
+        assert registry.render().endswith("# EOF\n")
+        registry.render()
+    assert logged.getvalue().count("Metric callback broken failed: ZeroDivisionError") == 1
+
+
+def test_llm_call_records_latency_and_errors():
+    before = LLM_LATENCY.count(provider="test")
+    with llm_call("test") as call:
+        call.error("http_500")
+    try:
+        with llm_call("test"):
+            raise TimeoutError()
+    except TimeoutError:
+        pass
+    with llm_call("test"):
+        pass
+    assert LLM_LATENCY.count(provider="test") == before + 3
+    assert LLM_ERRORS.value(provider="test", reason="http_500") >= 1
+    assert LLM_ERRORS.value(provider="test", reason="TimeoutError") >= 1
+
+
+def test_http_endpoint():
+    registry = Registry()
+    registry.register(Gauge("up", "Exporter is up")).set(1)
+    exporter = MetricsExporter(port=0, registry=registry)
+    exporter.start()
+    try:
+        request = urllib.request.Request(exporter.url, headers={"Accept": "application/openmetrics-text"})
+        with urllib.request.urlopen(request, timeout=5) as response:
+            assert response.headers["Content-Type"].startswith("application/openmetrics-text")
+            body = response.read().decode()
+        assert "up 1" in body.splitlines() and body.endswith("# EOF\n")
+        with urllib.request.urlopen(exporter.url, timeout=5) as response:
+            assert response.headers["Content-Type"].startswith("text/plain")
+    finally:
+        exporter.stop()
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Tests for the network-state service: queries never wait on a slow resolver, and the connection
+breakdown comes from the interval sampler rather than a fresh psutil.net_connections() per call.
+"""
+
+import socket
+import sys
+import threading
+import time
+from collections import namedtuple
+from pathlib import Path
+
+import psutil
+
+# Ensure project root on path
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from network_state import NetworkState
+
+Conn = namedtuple('Conn', 'type status')
+
+
+def _connections(calls):
+    def fake():
+        calls.append(1)
+        return [
+            Conn(socket.SOCK_STREAM, psutil.CONN_ESTABLISHED),
+            Conn(socket.SOCK_STREAM, psutil.CONN_ESTABLISHED),
+            Conn(socket.SOCK_STREAM, psutil.CONN_LISTEN),
+            Conn(socket.SOCK_DGRAM, psutil.CONN_NONE),
+        ]
+    return fake
+
+
+def test_identity_does_not_block_on_slow_resolver():
+    release = threading.Event()
+
+    def slow_resolve(hostname):
+        release.wait(5)
+        return "10.0.0.7"
+
+    state = NetworkState(hostname=lambda: "jarvis-host", resolve=slow_resolve, local_ip=lambda: None,
+                         connections=_connections([]))
+    state.start()
+    try:
+        started = time.perf_counter()
+        identity = state.identity()
+        assert time.perf_counter() - started < 0.1
+        assert identity['ip_address'] is None
+        assert identity['hostname']
+
+        release.set()
+        identity = state.identity(wait=2)
+        assert identity == {'hostname': "jarvis-host", 'ip_address': "10.0.0.7",
+                            'resolved_at': identity['resolved_at']}
+    finally:
+        release.set()
+        state.stop()
+
+
+def test_local_ip_preferred_over_dns():
+    def resolve(hostname):
+        raise AssertionError("DNS should not be consulted")
+
+    state = NetworkState(hostname=lambda: "h", resolve=resolve, local_ip=lambda: "192.168.1.20")
+    assert state.refresh_identity()['ip_address'] == "192.168.1.20"
+
+    failing = NetworkState(hostname=lambda: "h", resolve=lambda name: (_ for _ in ()).throw(socket.gaierror()),
+                           local_ip=lambda: None)
+    assert failing.refresh_identity()['ip_address'] is None
+
+
+def test_connection_summary_served_from_cache():
+    calls = []
+    state = NetworkState(connections_interval=60, identity_refresh=60, hostname=lambda: "h",
+                         local_ip=lambda: "127.0.0.1", connections=_connections(calls))
+    state.start()
+    try:
+        first = state.connection_summary()
+        for _ in range(50):
+            summary = state.connection_summary()
+        assert len(calls) == 1
+        assert summary['total'] == 4 and summary['tcp'] == 3 and summary['udp'] == 1
+        assert summary['states'] == {psutil.CONN_ESTABLISHED: 2, psutil.CONN_LISTEN: 1}
+        assert summary['listening'] == 1
+        assert summary['samples'] == 1 and summary['peak_total'] == 4
+        assert first['sampled_at'] == summary['sampled_at']
+    finally:
+        state.stop()
+
+
+def test_access_denied_is_reported():
+    def denied():
+        raise psutil.AccessDenied()
+
+    state = NetworkState(connections=denied)
+    summary = state.sample_connections()
+    assert 'error' in summary
+    assert 'total' not in state.connection_summary(wait=0)
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Tests for the process table: CPU deltas between samples, PID churn, the name index and top-N selection.
+Uses fake process handles so the numbers are deterministic.
+"""
+
+import sys
+from collections import namedtuple
+from contextlib import contextmanager
+from pathlib import Path
+
+import psutil
+
+# Ensure project root on path
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from process_table import ProcessTable
+
+CpuTimes = namedtuple('CpuTimes', 'user system')
+MemInfo = namedtuple('MemInfo', 'rss vms')
+
+
+class FakeProcess:
+    def __init__(self, pid, name, cpu=0.0, rss=0):
+        self.pid, self._name, self.cpu, self.rss = pid, name, cpu, rss
+        self.oneshots = 0
+        self.killed = False
+        self.gone = False
+
+    @contextmanager
+    def oneshot(self):
+        self.oneshots += 1
+        yield
+
+    def name(self):
+        return self._name
+
+    def cpu_times(self):
+        if self.gone:
+            raise psutil.NoSuchProcess(self.pid)
+        return CpuTimes(self.cpu, 0.0)
+
+    def memory_info(self):
+        return MemInfo(self.rss, self.rss)
+
+    def status(self):
+        return 'running'
+
+    def kill(self):
+        self.killed = True
+
+
+class FakeSystem:
+    def __init__(self):
+        self.now = 0.0
+        self.procs = {}
+
+    def spawn(self, pid, name, cpu=0.0, rss=0):
+        self.procs[pid] = FakeProcess(pid, name, cpu, rss)
+        return self.procs[pid]
+
+    def table(self):
+        return ProcessTable(warmup=0, pids=lambda: list(self.procs), process_factory=lambda pid: self.procs[pid],
+                            clock=lambda: self.now, memory_total=1000)
+
+
+def test_cpu_is_a_delta_between_samples():
+    system = FakeSystem()
+    busy = system.spawn(1, "busy.exe", cpu=10.0, rss=100)
+    idle = system.spawn(2, "idle.exe", cpu=5.0, rss=300)
+    table = system.table()
+    table.refresh()
+    assert table.top(2, max_age=10)[0]['cpu_percent'] == 0.0
+
+    system.now = 2.0
+    busy.cpu += 1.0   # half a core over two seconds
+    table.refresh()
+    top = table.top(2, max_age=10)
+    assert [p['name'] for p in top] == ["busy.exe", "idle.exe"]
+    assert top[0]['cpu_percent'] == 50.0 and top[1]['cpu_percent'] == 0.0
+    assert table.top(1, key='memory_percent', max_age=10)[0]['memory_percent'] == 30.0
+    # Attributes are read inside oneshot() once per refresh
+    assert busy.oneshots == 2 and idle.oneshots == 2
+
+
+def test_exited_and_reused_pids():
+    system = FakeSystem()
+    system.spawn(1, "old.exe", cpu=50.0)
+    table = system.table()
+    table.refresh()
+
+    # PID 1 is reused by a new process: the counter goes backwards and the handle is replaced
+    replacement = FakeProcess(1, "new.exe", cpu=0.5)
+    system.procs[1] = replacement
+    table.process(1).cpu = 0.5
+    system.now = 1.0
+    table.refresh()
+    assert table.top(1, max_age=10)[0]['cpu_percent'] == 0.0
+    assert table.find("new", refresh=False) == [1] and table.find("old", refresh=False) == []
+    assert table.process(1) is replacement
+
+    system.procs[1].gone = True
+    table.refresh()
+    assert len(table) == 0
+    assert table.find("old", refresh=False) == []
+
+
+def test_name_index_and_kill():
+    system = FakeSystem()
+    a = system.spawn(10, "chrome.exe")
+    b = system.spawn(11, "chrome.exe")
+    c = system.spawn(12, "chromedriver.exe")
+    system.spawn(13, "notepad.exe")
+    table = system.table()
+
+    assert table.find("CHROME.EXE") == [10, 11]
+    assert table.find("chrome") == [10, 11, 12]
+    system.spawn(14, "code.exe")
+    assert table.find("code") == [14]
+    assert table.name_of(13) == "notepad.exe"
+
+    assert table.kill("chrome.exe") == {'killed': 2, 'denied': 0}
+    assert a.killed and b.killed and not c.killed
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Tests for compiled schedule expressions and TaskScheduler restart behaviour: next-fire computation,
+serialization, and the fire_once / fire_all / skip misfire policies when tasks were missed while down
+or a timer fires long after its slot.
+"""
+
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+# Ensure project root on path
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from schedule_expr import Calendar, Interval, Once, Recurrence, compile_schedule
+from state_store import StateStore
+
+# A Wednesday, 10:15 local time
+NOW = datetime(2026, 3, 4, 10, 15).timestamp()
+
+
+def _at(days=0, hour=0, minute=0):
+    return (datetime(2026, 3, 4) + timedelta(days=days, hours=hour, minutes=minute)).timestamp()
+
+
+def test_compile_variants():
+    assert compile_schedule("in 10 minutes", NOW).to_dict() == {'kind': 'once', 'at': NOW + 600}
+    assert compile_schedule("in an hour", NOW).next_fire(NOW) == NOW + 3600
+    assert compile_schedule("every 2 hours", NOW).next_fire(NOW + 1) == NOW + 7200
+    assert compile_schedule("daily", NOW).next_fire(NOW) == NOW + 86400
+    assert compile_schedule("at 08:00", NOW).next_fire(NOW) == _at(1, 8)
+    assert compile_schedule("daily at 9:30 pm", NOW).next_fire(NOW) == _at(0, 21, 30)
+    assert compile_schedule("monday at 09:00", NOW).next_fire(NOW) == _at(5, 9)
+    assert compile_schedule("weekdays at 07:00", NOW).next_fire(_at(2, 8)) == _at(5, 7)  # Friday -> Monday
+    assert compile_schedule("in 10 mins", NOW).to_dict() == {'kind': 'once', 'at': NOW + 600}
+    assert compile_schedule("in 2 hrs", NOW).next_fire(NOW) == NOW + 7200
+    assert compile_schedule("every 30 secs", NOW).next_fire(NOW) == NOW + 30
+    # A bare weekday is the coming one only; "every"/"each" or a plural makes it repeat
+    assert compile_schedule("monday", NOW).to_dict() == {'kind': 'once', 'at': _at(5, 10, 15)}
+    assert compile_schedule("monday at 09:00", NOW).recurring is False
+    assert compile_schedule("every monday", NOW).to_dict() == {'kind': 'calendar', 'times': [[10, 15]], 'weekdays': [0]}
+    assert compile_schedule("each friday at 18:00", NOW).next_fire(_at(2, 19)) == _at(9, 18)
+    assert compile_schedule("mondays at 09:00", NOW).recurring is True
+    for bad in ("whenever", "at 25:00", "in some minutes"):
+        assert compile_schedule(bad, NOW) is None
+
+
+def test_next_fire_and_round_trip():
+    interval = Interval(3600, NOW)
+    # Anchored: a run that starts late does not shift later runs
+    assert interval.next_fire(NOW + 3600 + 5) == NOW + 7200
+    assert interval.occurrences(NOW + 3600, NOW + 4 * 3600) == [NOW + h * 3600 for h in range(1, 5)]
+    assert Once(NOW).next_fire(NOW) is None
+    calendar = Calendar([(8, 0), (20, 0)], [0, 2])
+    assert calendar.next_fire(NOW) == _at(0, 20)
+    assert calendar.next_fire(_at(0, 20)) == _at(5, 8)
+    for recurrence in (interval, Once(NOW), calendar):
+        restored = Recurrence.from_dict(recurrence.to_dict())
+        assert restored.next_fire(NOW - 1) == recurrence.next_fire(NOW - 1)
+
+
+def test_restart_applies_misfire_policies():
+    from skills.task_scheduler import TaskScheduler
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = StateStore(Path(tmp) / "state.db")
+        now = time.time()
+        hourly = Interval(3600, now - 5.5 * 3600).to_dict()   # 5 runs missed, next one in 30 min
+        base = {'description': 'x', 'schedule': 'compiled', 'type': 'command', 'status': 'scheduled',
+                'recurrence': hourly, 'next_run': datetime.fromtimestamp(now - 4.5 * 3600).isoformat()}
+        store.save_task(dict(base, id='task_0', misfire='fire_all'))
+        store.save_task(dict(base, id='task_1', misfire='fire_once'))
+        store.save_task(dict(base, id='task_2', misfire='skip'))
+        store.save_task(dict(base, id='task_3', misfire='skip', recurrence=Once(now - 600).to_dict(),
+                             next_run=datetime.fromtimestamp(now - 600).isoformat()))
+        future = Once(now + 900)
+        store.save_task(dict(base, id='task_4', recurrence=future.to_dict(),
+                             next_run=datetime.fromtimestamp(future.at).isoformat()))
+
+        submitted = []
+        original = TaskScheduler._submit
+        TaskScheduler._submit = lambda self, task: submitted.append(task['id'])
+        try:
+            scheduler = TaskScheduler(SimpleNamespace(), store=store)
+        finally:
+            TaskScheduler._submit = original
+        scheduler.stop_scheduler()
+
+        assert submitted.count('task_0') == 5
+        assert submitted.count('task_1') == 1
+        assert 'task_2' not in submitted and 'task_3' not in submitted
+        assert scheduler.active_tasks['task_3']['status'] == 'missed'
+        assert scheduler.active_tasks['task_2']['misfired'] == 5
+
+        # Exact pending queue: each recurring task's next slot, and the untouched one-shot
+        expected_next = now - 5.5 * 3600 + 6 * 3600
+        for task_id in ('task_0', 'task_1', 'task_2'):
+            assert abs(scheduler.scheduler.pending(task_id).when - expected_next) < 1e-3
+        assert abs(scheduler.scheduler.pending('task_4').when - future.at) < 1e-3
+        assert scheduler.scheduler.pending('task_3') is None
+        assert len(scheduler.scheduler) == 4
+        assert scheduler.task_counter == 5
+
+        # State was written back, so the next restart sees nothing missed
+        stored = store.load_tasks()
+        assert stored['task_3']['status'] == 'missed'
+        assert abs(datetime.fromisoformat(stored['task_0']['next_run']).timestamp() - expected_next) < 1e-3
+        store.close()
+
+
+def test_overdue_recurring_timer_applies_the_misfire_policy():
+    from skills.task_scheduler import TaskScheduler
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = StateStore(Path(tmp) / "state.db")
+        scheduler = TaskScheduler(SimpleNamespace(), store=store)
+        scheduler.stop_scheduler()
+        submitted = []
+        scheduler._submit = lambda task: submitted.append(task['id'])
+        scheduler.max_catch_up = 10
+        scheduler.schedule_task("ping", "every 1 minute", misfire="fire_once")
+        scheduler.schedule_task("pong", "every 1 minute", misfire="fire_all")
+        ping, pong = scheduler.active_tasks['task_0'], scheduler.active_tasks['task_1']
+
+        # The timers fire two hours late, as after a suspend: not 120 runs back to back
+        now = time.time()
+        for task_id in ('task_0', 'task_1'):
+            scheduler._recurrences[task_id] = Interval(60, now - 7230)
+        scheduler._dispatch_task(ping, now - 7170)
+        scheduler._dispatch_task(pong, now - 7170)
+        assert submitted.count('task_0') == 1 and submitted.count('task_1') == 10
+        assert ping['misfired'] == 10
+        for task_id in ('task_0', 'task_1'):
+            assert now < scheduler.scheduler.pending(task_id).when <= time.time() + 60
+
+        # On time: one run, and the next slot counts from this one
+        due = scheduler.scheduler.pending('task_0').when
+        scheduler._dispatch_task(ping, due)
+        assert submitted.count('task_0') == 2
+        assert abs(scheduler.scheduler.pending('task_0').when - (due + 60)) < 1e-3
+        store.close()
+
+
+def test_schedule_command_end_to_end():
+    from skills.task_scheduler import TaskScheduler
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = StateStore(Path(tmp) / "state.db")
+        scheduler = TaskScheduler(SimpleNamespace(), store=store)
+        try:
+            before = time.time()
+            reply = scheduler.process_schedule_command("Schedule reminder to check email in 10 minutes")
+            assert "Unable to parse" not in reply, reply
+            task = scheduler.active_tasks['task_0']
+            assert task['description'] == "reminder: check email" and task['schedule'] == "in 10 minutes"
+            assert before + 600 <= scheduler.scheduler.pending('task_0').when <= time.time() + 600
+
+            scheduler.process_schedule_command("schedule a reminder in 10 mins to stretch")
+            task = scheduler.active_tasks['task_1']
+            assert task['description'] == "reminder: stretch" and task['schedule'] == "in 10 mins"
+
+            scheduler.process_schedule_command("schedule reminder to water the plants")
+            assert scheduler.active_tasks['task_2']['schedule'] == "in 5 minutes"
+        finally:
+            scheduler.stop_scheduler()
+            store.close()
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
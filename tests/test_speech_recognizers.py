@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Tests for the speech backend abstraction, using a fake streaming backend fed by WAV-driven capture.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Ensure project root on path
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from audio_capture import AudioCapture, WavFileSource
+from speech_recognizers import (RecognitionError, RecognitionSession, SpeechBackend, StreamingTranscriber,
+                                benchmark_backend, create_backend, word_error_rate)
+from wake_word import write_wav
+
+
+class CountingSession(RecognitionSession):
+    def accept(self, pcm):
+        super().accept(pcm)
+        return f"partial {len(self._chunks)}"
+
+
+class FakeStreamingBackend(SpeechBackend):
+    name = "fake"
+    streaming = True
+
+    def transcribe(self, pcm, sample_rate=16000):
+        return "turn on the lights" if pcm else ""
+
+    def start_session(self, sample_rate=16000):
+        return CountingSession(self, sample_rate)
+
+
+def test_word_error_rate():
+    assert word_error_rate("turn on the lights", "turn on the lights") == 0.0
+    assert word_error_rate("turn on the lights", "turn the light") == 0.5
+    assert word_error_rate("", "") == 0.0
+    assert word_error_rate("open notepad", "") == 1.0
+
+
+def test_unknown_backend_raises():
+    try:
+        create_backend("nope")
+    except RecognitionError:
+        return
+    raise AssertionError("expected RecognitionError")
+
+
+def test_streaming_transcriber_reports_partials_and_final():
+    tone = (np.sin(np.arange(8000) * 0.1) * 8000).astype(np.int16)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "command.wav"
+        write_wav(path, np.concatenate([np.zeros(8000, np.int16), tone, np.zeros(4000, np.int16)]))
+
+        partials = []
+        transcriber = StreamingTranscriber(FakeStreamingBackend(), on_partial=partials.append)
+        capture = AudioCapture(WavFileSource(path))
+        transcriber.attach(capture)
+        capture.start()
+        assert capture.wait_until_finished(timeout=5)
+
+        utterance = capture.get_utterance(timeout=1)
+        assert transcriber.wait_for_final(utterance.end_position, timeout=2) == "turn on the lights"
+        # Partials arrive frame by frame before the utterance is endpointed
+        assert len(partials) > 10
+        transcriber.detach(capture)
+
+
+def test_benchmark_reports_rtf_latency_and_wer():
+    result = benchmark_backend(FakeStreamingBackend(), [(np.zeros(16000, np.int16), 16000, "turn on the lights")])
+    assert result['clips'] == 1 and result['audio_seconds'] == 1.0
+    assert result['wer'] == 0.0
+    assert 0 <= result['rtf'] < 1 and result['latency_to_final'] >= 0
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
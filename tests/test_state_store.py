@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQLite state store: task rows (updated in place, so creation order holds), bounded alert
+history, incremental key/value sync, batched commits that survive reopening, and one-time migration of
+the legacy JSON files.
+"""
+
+import json
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Ensure project root on path
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from state_store import StateStore, _import_alerts, _import_memory, _import_tasks
+
+
+def test_tasks_round_trip():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = StateStore(Path(tmp) / "state.db")
+        task = {'id': 'task_3', 'description': 'reminder: stretch', 'schedule': 'in 5 minutes',
+                'type': 'reminder', 'status': 'scheduled', 'created': '2026-01-01T09:00:00',
+                'next_run': '2026-01-01T09:05:00', 'misfire': 'fire_once'}
+        store.save_task(task)
+        store.save_task(dict(task, status='completed', last_result='Reminder delivered: stretch'))
+        store.close()
+
+        store = StateStore(Path(tmp) / "state.db")
+        loaded = store.load_tasks()
+        assert list(loaded) == ['task_3']
+        assert loaded['task_3']['status'] == 'completed'
+        assert loaded['task_3']['misfire'] == 'fire_once'
+        assert 'last_error' not in loaded['task_3']
+        store.delete_task('task_3')
+        assert store.load_tasks() == {}
+        store.close()
+
+
+def test_updates_keep_creation_order():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = StateStore(Path(tmp) / "state.db")
+        base = {'description': 'x', 'schedule': 'daily', 'type': 'command', 'status': 'scheduled'}
+        for i in range(3):
+            store.save_task(dict(base, id=f'task_{i}', misfire='skip'))
+        store.save_task(dict(base, id='task_0', last_result='done'))
+        for key in ('a', 'b', 'c'):
+            store.put('memory', key, key)
+        store.put('memory', 'a', 'updated')
+        store.sync('memory', {'a': 'updated', 'b': 'synced', 'c': 'c'})
+        store.close()
+
+        store = StateStore(Path(tmp) / "state.db")
+        tasks = store.load_tasks()
+        assert list(tasks) == ['task_0', 'task_1', 'task_2']
+        assert tasks['task_0']['last_result'] == 'done' and 'misfire' not in tasks['task_0']
+        assert list(store.items('memory').items()) == [('a', 'updated'), ('b', 'synced'), ('c', 'c')]
+        store.close()
+
+
+def test_alert_history_is_bounded():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = StateStore(Path(tmp) / "state.db", max_alerts=50)
+        for i in range(200):
+            store.add_alert(f"alert {i}", severity="warning")
+        recent = store.recent_alerts(1000)
+        assert recent[0]['message'] == "alert 199"
+        assert 50 <= len(recent) <= 55
+        store.close()
+
+
+def test_sync_writes_only_changes():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = StateStore(Path(tmp) / "state.db")
+        assert store.sync('preferences', {'units': 'metric', 'voice': 'british'}) == 2
+        assert store.sync('preferences', {'units': 'metric', 'voice': 'british'}) == 0
+        assert store.sync('preferences', {'units': 'imperial'}) == 2
+        assert store.items('preferences') == {'units': 'imperial'}
+        store.put('context', 'last_city', 'London')
+        assert store.get('context', 'last_city') == 'London'
+        assert store.get('context', 'missing', 'default') == 'default'
+        store.close()
+
+
+def test_commits_are_batched_and_durable():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "state.db"
+        store = StateStore(path, commit_interval=0.2)
+        store.put('context', 'a', 1)
+        reader = sqlite3.connect(str(path))
+        assert reader.execute("SELECT COUNT(*) FROM kv").fetchone()[0] == 0
+        time.sleep(0.5)
+        assert reader.execute("SELECT COUNT(*) FROM kv").fetchone()[0] == 1
+        assert reader.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        reader.close()
+
+        store.put('context', 'b', 2)
+        store.close()
+        store = StateStore(path)
+        assert store.items('context') == {'a': 1, 'b': 2}
+        store.close()
+
+
+def test_legacy_json_migrated_once():
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        (tmp / "scheduled_tasks.json").write_text(json.dumps({
+            'task_0': {'id': 'task_0', 'description': 'daily weather update', 'schedule': '08:00',
+                       'type': 'weather', 'status': 'scheduled', 'created': '2025-12-01T08:00:00'}}))
+        (tmp / "system_alerts.json").write_text(json.dumps([
+            {'timestamp': '2025-12-01T10:00:00', 'alerts': ['🔴 CRITICAL: Disk / usage very high (97.0%)']}]))
+        (tmp / "advanced_memory.json").write_text(json.dumps({
+            'context': {'topic': 'weather'}, 'preferences': {'units': 'metric'}, 'last_updated': 'x'}))
+
+        store = StateStore(tmp / "state.db")
+        assert store.migrate_json("tasks", [tmp / "missing.json", tmp / "scheduled_tasks.json"], _import_tasks)
+        assert store.migrate_json("alerts", [tmp / "system_alerts.json"], _import_alerts)
+        assert store.migrate_json("memory", [tmp / "advanced_memory.json"], _import_memory)
+        assert (tmp / "scheduled_tasks.json.migrated").exists()
+        assert not (tmp / "scheduled_tasks.json").exists()
+
+        # A second start (even if the old file reappears) does not import again
+        (tmp / "scheduled_tasks.json").write_text(json.dumps({'task_9': {}}))
+        assert not store.migrate_json("tasks", [tmp / "scheduled_tasks.json"], _import_tasks)
+
+        assert store.load_tasks()['task_0']['schedule'] == '08:00'
+        assert store.recent_alerts()[0]['message'].startswith('🔴 CRITICAL')
+        assert store.items('preferences') == {'units': 'metric'}
+        assert store.items('context') == {'topic': 'weather'}
+        store.close()
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
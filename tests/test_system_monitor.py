@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Tests for background performance monitoring jobs: start, status, cancel and final report, and
+several jobs sharing one collector listener that is attached only while a job is running.
+The monitor is assembled without __init__ and fed by a fake collector, so nothing is sampled.
+"""
+
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+# Ensure project root on path
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from skills.system_monitor import SystemMonitor
+
+
+class FakeCollector:
+    def __init__(self):
+        self.listeners = []
+        self.intervals = {}
+        self._lock = threading.Lock()
+
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+
+    def request_interval(self, owner, seconds):
+        with self._lock:
+            if seconds is None:
+                self.intervals.pop(owner, None)
+            else:
+                self.intervals[owner] = seconds
+
+    def push(self, **sample):
+        for callback in list(self.listeners):
+            callback(sample)
+
+
+def _monitor(tmp) -> SystemMonitor:
+    monitor = SystemMonitor.__new__(SystemMonitor)
+    monitor.collector = FakeCollector()
+    monitor.metric_store = None
+    monitor.performance_log = str(Path(tmp) / "monitoring_jobs.jsonl")
+    monitor.monitor_jobs = {}
+    monitor._jobs_lock = threading.RLock()
+    monitor._job_counter = 0
+    monitor._active_jobs = 0
+    return monitor
+
+
+def test_start_status_cancel_and_report():
+    with tempfile.TemporaryDirectory() as tmp:
+        monitor = _monitor(tmp)
+        collector = monitor.collector
+        job_id = monitor.start_monitoring(duration_minutes=10, interval=0.5)
+        assert collector.listeners == [monitor._on_metrics_sample] and collector.intervals == {job_id: 0.5}
+
+        collector.push(cpu_percent=20.0, memory_percent=50.0)
+        collector.push(cpu_percent=40.0, memory_percent=50.0)
+        status = monitor.get_monitoring_status(job_id)
+        assert status.startswith(f"Monitoring job {job_id}:") and "2 samples" in status
+        assert "CPU now 40.0% (avg 30.0%, max 40.0%)" in status
+
+        assert monitor.cancel_monitoring(job_id) == f"Monitoring job {job_id} cancelled after 2 samples."
+        assert collector.listeners == [] and collector.intervals == {}
+        report = monitor.get_monitoring_status(job_id)
+        assert f"Job: {job_id} (cancelled)" in report and "Average: 30.0%" in report
+        assert monitor.cancel_monitoring(job_id) == f"Monitoring job {job_id} is already cancelled."
+        assert len(Path(monitor.performance_log).read_text().splitlines()) == 1
+
+
+def test_concurrent_jobs_share_one_listener():
+    with tempfile.TemporaryDirectory() as tmp:
+        monitor = _monitor(tmp)
+        collector = monitor.collector
+        finished = []
+        long_job = monitor.start_monitoring(duration_minutes=10)
+        short_job = monitor.start_monitoring(duration_minutes=0, on_complete=finished.append)
+        assert len(collector.listeners) == 1
+
+        # The short job completes on its first sample; the long one keeps the listener
+        collector.push(cpu_percent=10.0, memory_percent=30.0)
+        assert [job.id for job in finished] == [short_job]
+        assert monitor.get_monitoring_job(short_job).status == 'completed'
+        assert len(collector.listeners) == 1 and list(collector.intervals) == [long_job]
+        collector.push(cpu_percent=30.0, memory_percent=30.0)
+        assert len(monitor.get_monitoring_job(long_job).samples) == 2
+        assert len(monitor.get_monitoring_job(short_job).samples) == 1
+
+        monitor.cancel_monitoring(long_job)
+        assert collector.listeners == [] and monitor._active_jobs == 0
+
+        # Jobs finishing at the same time detach the listener exactly once; a new job attaches it again
+        jobs = [monitor.start_monitoring(duration_minutes=10) for _ in range(8)]
+        threads = [threading.Thread(target=monitor.cancel_monitoring, args=(job_id,)) for job_id in jobs]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert collector.listeners == [] and monitor._active_jobs == 0
+        monitor.start_monitoring(duration_minutes=10)
+        assert collector.listeners == [monitor._on_metrics_sample]
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
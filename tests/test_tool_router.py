@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for retrieval-based tool selection: BM25 ranks tools by their routing text, weak matches fall back
+to the full tool set, and the agent sends only the selected tool definitions.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+# Ensure project root on path
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from agent_orchestrator import AgentOrchestrator
+from tool_router import ToolRouter, tokenize
+
+DOCUMENTS = {
+    "get_weather": "get weather current weather information rain forecast temperature",
+    "tell_joke": "tell joke tell a random joke funny",
+    "list_files": "list files list files in current directory folder",
+    "get_running_processes": "get running processes list currently running processes sorted by cpu usage",
+    "search_web": "search web search the web for a query google online",
+}
+
+
+class _Skills:
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: f"{name} result"
+
+
+class _Provider:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.tools = []
+
+    def complete(self, messages, tools, tool_choice="auto"):
+        self.tools.append([t['function']['name'] for t in tools])
+        return self.responses.pop(0)
+
+
+def test_tokenize_stems_and_drops_stop_words():
+    assert tokenize("What are the running processes?") == ["run", "process"]
+    assert tokenize("list_files in my folders") == ["list", "file", "folder"]
+
+
+def test_ranking_and_low_confidence():
+    router = ToolRouter(DOCUMENTS, k=2, min_score=1.0)  # Scores run lower on a five-tool index
+    assert router.select("will it rain tomorrow")[0] == "get_weather"
+    assert router.select("which processes use the most cpu")[0] == "get_running_processes"
+    assert set(router.select("weather and a joke please")) == {"get_weather", "tell_joke"}
+    assert len(router.select("list files and running processes on the web", k=3)) == 3
+    # Nothing (or almost nothing) in common with any tool: no selection, so the caller sends everything
+    assert router.select("hello there") is None
+    assert ToolRouter(DOCUMENTS, min_score=100).select("weather") is None
+
+
+def test_agent_sends_only_routed_tools():
+    skills = _Skills()
+    call = {"id": "c1", "type": "function", "function": {"name": "get_weather", "arguments": json.dumps({})}}
+    provider = _Provider([{"role": "assistant", "tool_calls": [call]}, {"role": "assistant", "content": "Hi, sir."}])
+    agent = AgentOrchestrator(skills, skills, skills, skills, skills, provider=provider, app_control=skills)
+
+    assert agent.run("will it rain in Oslo") == "get_weather result"
+    assert "get_weather" in provider.tools[0] and len(provider.tools[0]) <= 6
+    assert agent.run("hello jarvis") == "Hi, sir."
+    assert len(provider.tools[1]) == len(agent.tools)
+    assert agent.stats['full_tool_sets'] == 1
+
+    # A tool the router left out still runs if the model asks for it
+    agent.provider = _Provider([{"role": "assistant", "tool_calls": [
+        {"id": "c2", "type": "function", "function": {"name": "flip_coin", "arguments": "{}"}}]}])
+    assert agent.run("will it rain in Oslo") == "flip_coin result"
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
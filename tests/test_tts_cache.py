@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Tests for the pre-rendered TTS audio cache.
+Uses a fake TTS backend and player so it runs headless (no audio device or pyttsx3 driver).
+"""
+
+import os
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+# Ensure project root on path
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from tts_cache import TTSAudioCache
+from tts_worker import TTSWorker
+
+
+class FakeTTSEngine:
+    """Mimics the pyttsx3 engine API used by the cache and worker"""
+
+    def __init__(self):
+        self.properties = {'voice': 'fake-voice', 'rate': 180, 'volume': 0.9}
+        self.spoken = []
+        self.rendered = []
+        self._queued = []
+
+    def getProperty(self, name):
+        return self.properties[name]
+
+    def setProperty(self, name, value):
+        self.properties[name] = value
+
+    def say(self, text):
+        self._queued.append(('say', text, None))
+
+    def save_to_file(self, text, path):
+        self._queued.append(('save', text, path))
+
+    def runAndWait(self):
+        for kind, text, path in self._queued:
+            if kind == 'say':
+                self.spoken.append(text)
+            else:
+                self.rendered.append(text)
+                with wave.open(path, 'wb') as wav:
+                    wav.setnchannels(1)
+                    wav.setsampwidth(2)
+                    wav.setframerate(16000)
+                    # 100 samples per character keeps file sizes predictable
+                    wav.writeframes(b'\x00\x01' * (100 * len(text)))
+        self._queued = []
+
+
+class FakePlayer:
+    def __init__(self):
+        self.played = []
+
+    def __call__(self, path, stop_event=None):
+        self.played.append(Path(path).name)
+        return True
+
+
+def test_key_depends_on_voice_settings():
+    base = TTSAudioCache.make_key("Yes?", "voice-a", 180, 0.9)
+    assert base == TTSAudioCache.make_key("Yes?", "voice-a", 180, 0.9)
+    assert base != TTSAudioCache.make_key("Yes?", "voice-b", 180, 0.9)
+    assert base != TTSAudioCache.make_key("Yes?", "voice-a", 200, 0.9)
+    assert base != TTSAudioCache.make_key("Yes?", "voice-a", 180, 0.5)
+    assert base != TTSAudioCache.make_key("No?", "voice-a", 180, 0.9)
+
+
+def test_render_then_hit():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = FakeTTSEngine()
+        cache = TTSAudioCache(tmp, player=FakePlayer())
+        key = cache.key_for(engine, "Entering sleep mode.")
+
+        assert cache.lookup(key) is None
+        path = cache.render(engine, "Entering sleep mode.")
+        assert path is not None and path.exists()
+        assert cache.lookup(key) == path
+
+        # Rendering again is a no-op
+        cache.render(engine, "Entering sleep mode.")
+        assert engine.rendered == ["Entering sleep mode."]
+
+        # A different rate is a different entry
+        engine.setProperty('rate', 220)
+        assert cache.lookup(cache.key_for(engine, "Entering sleep mode.")) is None
+
+        stats = cache.get_stats()
+        assert stats['hits'] == 1 and stats['misses'] == 2 and stats['entries'] == 1
+
+
+def test_lru_eviction_by_disk_size():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = FakeTTSEngine()
+        phrase_bytes = 44 + 200 * len("phrase-0")
+        cache = TTSAudioCache(tmp, max_bytes=phrase_bytes * 3)
+
+        keys = []
+        for i in range(3):
+            cache.render(engine, f"phrase-{i}")
+            keys.append(cache.key_for(engine, f"phrase-{i}"))
+
+        # Touch phrase-0 so phrase-1 becomes least recently used
+        assert cache.lookup(keys[0]) is not None
+        cache.render(engine, "phrase-3")
+
+        assert cache.contains(keys[0])
+        assert not cache.contains(keys[1])
+        assert not cache.path_for(keys[1]).exists()
+        assert cache.get_stats()['bytes'] <= cache.max_bytes
+
+
+def test_index_survives_restart_in_lru_order():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = FakeTTSEngine()
+        phrase_bytes = 44 + 200 * len("phrase-0")
+        cache = TTSAudioCache(tmp, max_bytes=phrase_bytes * 2)
+        old = cache.render(engine, "phrase-0")
+        new = cache.render(engine, "phrase-1")
+        past = time.time() - 60
+        os.utime(old, (past, past))
+
+        reopened = TTSAudioCache(tmp, max_bytes=phrase_bytes * 2)
+        assert reopened.get_stats()['entries'] == 2
+        reopened.render(engine, "phrase-2")
+        assert not old.exists() and new.exists()
+
+
+def test_worker_plays_cached_phrases_directly():
+    with tempfile.TemporaryDirectory() as tmp:
+        player = FakePlayer()
+        cache = TTSAudioCache(tmp, player=player)
+        worker = TTSWorker(FakeTTSEngine, cache=cache)
+        worker.start()
+        try:
+            worker.render_async("Yes?").result(timeout=5)
+            worker.speak_async("Yes?").result(timeout=5)
+            worker.speak_async("Something new").result(timeout=5)
+
+            assert len(player.played) == 1
+            assert worker.engine.spoken == ["Something new"]
+        finally:
+            worker.shutdown()
+
+
+def test_worker_renders_recurring_phrases():
+    with tempfile.TemporaryDirectory() as tmp:
+        player = FakePlayer()
+        cache = TTSAudioCache(tmp, player=player)
+        worker = TTSWorker(FakeTTSEngine, cache=cache)
+        worker.start()
+        try:
+            for _ in range(TTSAudioCache.RENDER_AFTER_USES):
+                worker.speak_async("Daily weather update ready").result(timeout=5)
+            # Let the background render run
+            deadline = time.time() + 5
+            while not cache.get_stats()['entries'] and time.time() < deadline:
+                time.sleep(0.01)
+            worker.speak_async("Daily weather update ready").result(timeout=5)
+            assert len(player.played) == 1
+        finally:
+            worker.shutdown()
+
+
+def test_worker_speaks_when_wav_playback_is_unavailable():
+    # Neither PyAudio nor winsound importable, as on Linux/macOS without PyAudio
+    saved = {name: sys.modules.get(name) for name in ('pyaudio', 'winsound')}
+    sys.modules.update({'pyaudio': None, 'winsound': None})
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = TTSAudioCache(tmp)
+        worker = TTSWorker(FakeTTSEngine, cache=cache)
+        worker.start()
+        try:
+            worker.render_async("Yes?").result(timeout=5)
+            assert worker.speak_async("Yes?").result(timeout=5) is True
+            assert worker.speak_async("Yes?", priority=0).result(timeout=5) is True
+            assert worker.engine.spoken == ["Yes?", "Yes?"]
+        finally:
+            worker.shutdown()
+            for name, module in saved.items():
+                if module is None:
+                    sys.modules.pop(name, None)
+                else:
+                    sys.modules[name] = module
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Tests for the priority-queue TTS worker: coalescing of identical pending text, priority upgrades,
+cancel/flush, idle detection that ignores background renders, and shutdown draining the queue.
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Ensure project root on path
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from tts_worker import PRIORITY_LOW, PRIORITY_NORMAL, PRIORITY_URGENT, TTSWorker
+
+
+class GatedEngine:
+    """Blocking engine (no external loop): each runAndWait waits for the gate, so tests can hold the worker"""
+
+    def __init__(self):
+        self.spoken = []
+        self.gate = threading.Event()
+        self.started = threading.Event()
+        self._text = None
+
+    def say(self, text):
+        self._text = text
+
+    def runAndWait(self):
+        self.started.set()
+        self.gate.wait(5)
+        self.spoken.append(self._text)
+
+
+class GatedCache:
+    """Never has a cached phrase; renders block on the gate like speech does"""
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.rendering = threading.Event()
+
+    def key_for(self, engine, text):
+        return text
+
+    def lookup(self, key):
+        return None
+
+    def record_use(self, text):
+        return False
+
+    def render(self, engine, text):
+        self.rendering.set()
+        self.gate.wait(5)
+        return text
+
+
+def _held_worker(cache=None):
+    """A started worker that is busy speaking "first" until engine.gate is set"""
+    engine = GatedEngine()
+    worker = TTSWorker(lambda: engine, cache=cache)
+    worker.start()
+    first = worker.speak_async("first")
+    assert engine.started.wait(2)
+    return worker, engine, first
+
+
+def test_identical_pending_text_is_coalesced():
+    worker, engine, first = _held_worker()
+    try:
+        a = worker.speak_async("hello")
+        b = worker.speak_async("hello")
+        assert a is b and worker.queue_depth == 1
+        engine.gate.set()
+        assert a.result(timeout=2) is True and first.result(timeout=2) is True
+        assert engine.spoken == ["first", "hello"]
+    finally:
+        worker.shutdown(timeout=1)
+
+
+def test_priority_upgrade_reorders_without_duplicates():
+    worker, engine, _ = _held_worker()
+    try:
+        low = worker.speak_async("later", priority=PRIORITY_LOW)
+        normal = worker.speak_async("normal", priority=PRIORITY_NORMAL)
+        upgraded = worker.speak_async("later", priority=PRIORITY_URGENT)
+        assert upgraded is low and worker.queue_depth == 2
+        engine.gate.set()
+        normal.result(timeout=2)
+        assert worker.wait_until_idle(2)
+        assert engine.spoken == ["first", "later", "normal"]
+    finally:
+        worker.shutdown(timeout=1)
+
+
+def test_cancel_and_flush():
+    worker, engine, first = _held_worker()
+    try:
+        x = worker.speak_async("x")
+        y = worker.speak_async("y")
+        z = worker.speak_async("z")
+        assert not worker.cancel(first)  # already playing
+        assert worker.cancel(x) and x.cancelled()
+        assert worker.flush() == 2 and y.cancelled() and z.cancelled()
+        assert worker.queue_depth == 0
+        engine.gate.set()
+        assert worker.wait_until_idle(2)
+        assert engine.spoken == ["first"]
+    finally:
+        worker.shutdown(timeout=1)
+
+
+def test_wait_until_idle_ignores_renders():
+    cache = GatedCache()
+    engine = GatedEngine()
+    engine.gate.set()
+    worker = TTSWorker(lambda: engine, cache=cache)
+    worker.start()
+    try:
+        render = worker.render_async("good morning")
+        assert worker.render_async("good morning") is None  # already queued
+        assert cache.rendering.wait(2)
+        started = time.perf_counter()
+        assert worker.wait_until_idle(1)
+        assert time.perf_counter() - started < 0.5
+        assert not render.done()
+        cache.gate.set()
+        assert render.result(timeout=2) == "good morning"
+    finally:
+        worker.shutdown(timeout=1)
+
+
+def test_shutdown_drains_queue_then_stops():
+    worker, engine, first = _held_worker()
+    queued = [worker.speak_async(f"line {i}") for i in range(3)]
+    threading.Timer(0.1, engine.gate.set).start()
+    worker.shutdown(timeout=3)
+    assert all(f.result(timeout=0) is True for f in [first] + queued)
+    assert engine.spoken == ["first", "line 0", "line 1", "line 2"]
+    assert not worker._thread.is_alive()
+
+
+def test_shutdown_timeout_cancels_what_is_left():
+    worker, engine, first = _held_worker()
+    queued = worker.speak_async("never spoken")
+    worker.shutdown(timeout=0.05)
+    assert queued.cancelled()
+    engine.gate.set()
+    assert first.result(timeout=2) is True
+    assert "never spoken" not in engine.spoken
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Tests for VoiceEngine's listening path: an utterance captured long before a prompt is not returned
+as the answer to it, barge-in only happens in voice modes, speech over a reply needs the wake word,
+and the TTS metrics render from a real worker.
+The engine is assembled without __init__ so no TTS driver or microphone is needed.
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import speech_recognition as sr
+
+# Ensure project root on path
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from audio_capture import AudioCapture, WavFileSource, SAMPLE_RATE
+from metrics_exporter import REGISTRY
+from tts_worker import TTSWorker
+from voice_engine import VoiceEngine
+from wake_word import write_wav
+
+
+def _engine(capture=None, max_age=3.0) -> VoiceEngine:
+    engine = VoiceEngine.__new__(VoiceEngine)
+    engine.audio_capture = capture
+    engine.max_utterance_age = max_age
+    engine.voice_mode = capture is not None
+    engine._pending_command_audio = None
+    engine._calibrated = True
+    return engine
+
+
+def _captured_utterance(tmp) -> AudioCapture:
+    """A running capture, paced like a microphone, that has queued one spoken (tone) utterance"""
+    t = np.arange(int(0.5 * SAMPLE_RATE)) / SAMPLE_RATE
+    tone = (np.sin(2 * np.pi * 300 * t) * 12000).astype(np.int16)
+    quiet = np.zeros(int(0.6 * SAMPLE_RATE), dtype=np.int16)
+    path = Path(tmp) / "speech.wav"
+    write_wav(path, np.concatenate([quiet, tone, quiet]))
+    capture = AudioCapture(WavFileSource(path, realtime=True, trailing_silence=30))
+    capture.start()
+    deadline = time.time() + 5
+    while capture.utterances.empty() and time.time() < deadline:
+        time.sleep(0.02)
+    assert capture.is_running and not capture.utterances.empty()
+    return capture
+
+
+def test_stale_utterance_is_not_returned():
+    with tempfile.TemporaryDirectory() as tmp:
+        capture = _captured_utterance(tmp)
+        engine = _engine(capture, max_age=0.2)
+        time.sleep(0.3)
+        try:
+            engine._listen(0.2, 3)
+            assert False, "expected a timeout"
+        except sr.WaitTimeoutError:
+            pass
+        finally:
+            capture.stop()
+
+
+def test_fresh_utterance_is_returned():
+    with tempfile.TemporaryDirectory() as tmp:
+        capture = _captured_utterance(tmp)
+        try:
+            audio = _engine(capture, max_age=5.0)._listen(1, 3)
+            assert audio.during_playback is False and len(audio.get_raw_data()) > 0
+        finally:
+            capture.stop()
+
+
+class _FakeWorker:
+    is_speaking = True
+
+    def __init__(self):
+        self.interrupted = 0
+
+    def interrupt(self):
+        self.interrupted += 1
+        return True
+
+
+class _FakeDetector:
+    is_trained = True
+
+    def __init__(self, spotted):
+        self.spotted = spotted
+
+    def detect(self, pcm):
+        return self.spotted
+
+
+class _Utterance:
+    during_playback = True
+
+    def get_raw_data(self, **kwargs):
+        return b"\0\0" * 160
+
+
+def test_barge_in_only_in_voice_mode():
+    engine = _engine()
+    engine.tts_worker = _FakeWorker()
+    engine._on_capture_event('speech_start', {'during_playback': True})
+    assert engine.tts_worker.interrupted == 0
+    engine.voice_mode = True
+    engine._on_capture_event('speech_start', {'during_playback': False})
+    engine._on_capture_event('speech_start', {'during_playback': True})
+    assert engine.tts_worker.interrupted == 1
+
+
+def test_speech_over_a_reply_needs_the_wake_word():
+    engine = _engine()
+    engine.sr_available = True
+    engine.wake_word_settings = {}
+    engine._listen = lambda timeout, phrase_time_limit: _Utterance()
+
+    engine.wake_word_detector = _FakeDetector(spotted=False)
+    assert engine.listen_for_wake_word("jarvis") is False
+    assert not engine.has_pending_command
+
+    engine.wake_word_detector = _FakeDetector(spotted=True)
+    assert engine.listen_for_wake_word("jarvis") is True
+    assert engine.has_pending_command
+
+
+def test_tts_metrics_render_with_a_real_worker():
+    engine = _engine()
+    engine.tts_worker = TTSWorker(lambda: None)
+    engine.tts_cache = None
+    engine._register_metrics()
+    engine.tts_worker.speak_async("queued while the worker is not started")
+    lines = REGISTRY.render().splitlines()
+    assert "jarvis_tts_queue_depth 1" in lines
+    assert "jarvis_tts_interruptions_total 0" in lines
+    engine.tts_worker.flush()
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
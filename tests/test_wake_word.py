@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Tests for the on-device wake word spotter, using synthetic WAV-style clips.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+# Ensure project root on path
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "tests"))
+sys.path.insert(0, str(ROOT))
+
+from bench_wake_word import KEYWORD, OTHER_WORDS, embed, synth_word
+from wake_word import EnergyVAD, SAMPLE_RATE, WakeWordDetector, compute_mfcc, dtw_distance
+
+
+def _enrolled_detector(tmp, rng):
+    detector = WakeWordDetector(tmp)
+    for _ in range(3):
+        detector.enroll(embed(synth_word(KEYWORD, rng), rng, total=1.2, snr_db=30))
+    return detector
+
+
+def test_vad_finds_speech_and_ignores_silence():
+    rng = np.random.default_rng(1)
+    vad = EnergyVAD()
+    assert vad.speech_segments(np.zeros(SAMPLE_RATE, dtype=np.int16)) == []
+    segments = vad.speech_segments(embed(synth_word(KEYWORD, rng), rng))
+    assert len(segments) == 1
+    start, end = segments[0]
+    assert 0.3 < (end - start) / SAMPLE_RATE < 0.8
+
+
+def test_dtw_is_near_zero_for_identical_and_tolerates_stretch():
+    rng = np.random.default_rng(2)
+    word = (synth_word(KEYWORD, rng) * 32767).astype(np.int16)
+    slow = (synth_word(KEYWORD, rng, stretch=1.2) * 32767).astype(np.int16)
+    other = (synth_word(OTHER_WORDS[0], rng) * 32767).astype(np.int16)
+    features = compute_mfcc(word)
+    assert dtw_distance(features, features) < 1e-3
+    assert dtw_distance(features, compute_mfcc(slow)) < dtw_distance(features, compute_mfcc(other))
+
+
+def test_detects_keyword_and_rejects_other_words():
+    rng = np.random.default_rng(3)
+    with tempfile.TemporaryDirectory() as tmp:
+        detector = _enrolled_detector(tmp, rng)
+        assert detector.is_trained
+
+        assert detector.detect(embed(synth_word(KEYWORD, rng, stretch=1.1, f0=140), rng, snr_db=15))
+        for word in OTHER_WORDS:
+            assert not detector.detect(embed(synth_word(word, rng), rng, snr_db=15))
+
+        # Templates persist across restarts
+        assert WakeWordDetector(tmp).get_stats()['templates'] == 3
+
+
+def test_silence_is_gated_before_matching():
+    rng = np.random.default_rng(4)
+    with tempfile.TemporaryDirectory() as tmp:
+        detector = _enrolled_detector(tmp, rng)
+        assert not detector.detect(np.zeros(2 * SAMPLE_RATE, dtype=np.int16))
+        stats = detector.get_stats()
+        assert stats['gated'] == 1 and stats['compared'] == 0
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
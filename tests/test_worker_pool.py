@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Tests for the worker pool: per-kind concurrency limits, priorities, timeouts that replace the stuck worker,
+cancellation, and a TaskScheduler reminder firing on time while a slow backup runs.
+"""
+
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+# Ensure project root on path
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from state_store import StateStore
+from worker_pool import WorkerPool, current_job, DONE, TIMED_OUT, CANCELLED
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+def test_per_kind_limit_leaves_room_for_other_kinds():
+    pool = WorkerPool(workers=3, limits={'backup': 1})
+    pool.start()
+    release = threading.Event()
+    peak = [0]
+    try:
+        def slow_backup():
+            peak[0] = max(peak[0], pool.running_count('backup'))
+            release.wait(2)
+
+        backups = [pool.submit('backup', slow_backup) for _ in range(3)]
+        assert _wait_for(lambda: pool.running_count('backup') == 1)
+        reminder = pool.submit('reminder', lambda: "ding")
+        assert _wait_for(lambda: reminder.status == DONE)
+        assert reminder.result == "ding"
+        assert [job.status for job in backups].count('queued') == 2
+
+        release.set()
+        assert _wait_for(lambda: all(job.status == DONE for job in backups))
+        assert peak[0] == 1
+    finally:
+        release.set()
+        pool.stop()
+
+
+def test_priority_order_when_busy():
+    pool = WorkerPool(workers=1)
+    order, release = [], threading.Event()
+    first = pool.submit('command', release.wait, 2)
+    pool.submit('command', order.append, "command")
+    pool.submit('reminder', order.append, "reminder", priority=0)
+    pool.start()
+    try:
+        assert _wait_for(lambda: first.status == 'running')
+        release.set()
+        assert _wait_for(lambda: len(order) == 2)
+        assert order == ["reminder", "command"]
+    finally:
+        pool.stop()
+
+
+def test_timeout_replaces_stuck_worker():
+    pool = WorkerPool(workers=1, timeouts={'command': 0.05})
+    pool.start()
+    release = threading.Event()
+    outcomes = []
+    try:
+        stuck = pool.submit('command', release.wait, 5, on_done=lambda job: outcomes.append(job.status))
+        assert _wait_for(lambda: stuck.status == TIMED_OUT)
+        assert "timed out" in stuck.error and stuck.cancel_requested
+        # The single worker is still blocked, yet new work runs on its replacement
+        after = pool.submit('reminder', lambda: "ok")
+        assert _wait_for(lambda: after.status == DONE)
+        release.set()
+        time.sleep(0.05)
+        assert outcomes == [TIMED_OUT]
+        assert pool.running_count('command') == 0
+    finally:
+        release.set()
+        pool.stop()
+
+
+def test_cancel_queued_and_running():
+    pool = WorkerPool(workers=1)
+    seen = []
+
+    def cooperative():
+        job = current_job()
+        while not job.cancel_requested:
+            time.sleep(0.005)
+        seen.append("stopped")
+        return "ignored"
+
+    pool.start()
+    try:
+        running = pool.submit('backup', cooperative, key="task_1")
+        queued = pool.submit('backup', lambda: seen.append("ran"), key="task_2")
+        assert _wait_for(lambda: running.status == 'running')
+        assert pool.cancel("task_2") == 1
+        assert pool.cancel(running) == 1
+        assert _wait_for(lambda: seen == ["stopped"])
+        assert running.status == CANCELLED and running.result is None
+        assert queued.status == CANCELLED
+        assert _wait_for(lambda: pool.running_count('backup') == 0)
+    finally:
+        pool.stop()
+
+
+def test_slow_backup_does_not_delay_reminder():
+    from skills.task_scheduler import TaskScheduler
+
+    fired = {}
+    release = threading.Event()
+    jarvis = SimpleNamespace(voice_engine=SimpleNamespace(
+        speak=lambda text, priority=None: fired.setdefault(text, time.time())))
+    with tempfile.TemporaryDirectory() as tmp:
+        store = StateStore(Path(tmp) / "state.db")
+        scheduler = TaskScheduler(jarvis, store=store)
+        scheduler._perform_backup = lambda: release.wait(5) and "Backup completed"
+        try:
+            scheduler.schedule_task("backup important files", "in 1 second", "backup")
+            scheduler.schedule_reminder("standup", "in 1 second")
+            due = time.time() + 1
+            assert _wait_for(lambda: "standup" in fired, timeout=3)
+            assert fired["standup"] - due < 0.2
+            assert scheduler.pool.running_count('backup') == 1
+            release.set()
+            assert _wait_for(lambda: scheduler.active_tasks["task_0"]['status'] == 'completed')
+            assert scheduler.active_tasks["task_0"]['last_result'] == "Backup completed"
+        finally:
+            release.set()
+            scheduler.stop_scheduler()
+            store.close()
+
+
+if __name__ == '__main__':
+    for name, func in list(globals().items()):
+        if name.startswith('test_') and callable(func):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,78 @@
+"""
+Tool Router for JARVIS
+BM25 index over tool names and descriptions, built once, that picks the few tools relevant to a query
+so the agent prompt carries only those definitions
+"""
+
+import math
+import re
+from typing import Dict, List, Optional, Tuple
+
+_WORD = re.compile(r"[a-z0-9]+")
+STOP_WORDS = frozenset("""a an and are as at be by can could do does for from get give how i in is it its
+me my of on or please show tell that the this to up what whats when where which with would you your""".split())
+
+
+def _stem(word: str) -> str:
+    """Light suffix stripping so 'processes', 'files' and 'running' meet 'process', 'file' and 'run'"""
+    if len(word) > 5 and word.endswith("ing"):
+        word = word[:-3]
+        if len(word) > 2 and word[-1] == word[-2]:
+            word = word[:-1]
+    elif len(word) > 4 and word.endswith("es") and word[-3] in "sxz":
+        word = word[:-2]
+    elif len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        word = word[:-1]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    return [_stem(word) for word in _WORD.findall(text.lower().replace("_", " ")) if word not in STOP_WORDS]
+
+
+class ToolRouter:
+    def __init__(self, documents: Dict[str, str], k: int = 6, min_score: float = 1.5, k1: float = 1.2,
+                 b: float = 0.75):
+        """documents maps tool name -> routing text. Queries whose best tool scores under min_score
+        are treated as low confidence and get no selection (the caller sends every tool).
+        """
+        self.k = k
+        self.min_score = min_score
+        self.names = list(documents)
+        self._postings: Dict[str, List[Tuple[int, float]]] = {}
+        lengths = []
+        counts_per_doc = []
+        for name in self.names:
+            terms = tokenize(documents[name])
+            lengths.append(len(terms))
+            counts: Dict[str, int] = {}
+            for term in terms:
+                counts[term] = counts.get(term, 0) + 1
+            counts_per_doc.append(counts)
+
+        # Term weights depend only on the documents, so each posting stores its final BM25 weight
+        average = sum(lengths) / len(lengths) if lengths else 1.0
+        total = len(self.names)
+        for doc, counts in enumerate(counts_per_doc):
+            norm = k1 * (1 - b + b * lengths[doc] / average)
+            for term, tf in counts.items():
+                self._postings.setdefault(term, []).append((doc, tf * (k1 + 1) / (tf + norm)))
+        for term, postings in self._postings.items():
+            idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            self._postings[term] = [(doc, weight * idf) for doc, weight in postings]
+
+    def scores(self, query: str) -> List[Tuple[str, float]]:
+        """Tools with any matching term, best first"""
+        totals: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            for doc, weight in self._postings.get(term, ()):
+                totals[doc] = totals.get(doc, 0.0) + weight
+        ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)
+        return [(self.names[doc], score) for doc, score in ranked]
+
+    def select(self, query: str, k: Optional[int] = None) -> Optional[List[str]]:
+        """Top-k tool names for the query, or None when the match is too weak to trust"""
+        ranked = self.scores(query)
+        if not ranked or ranked[0][1] < self.min_score:
+            return None
+        return [name for name, _ in ranked[:k or self.k]]
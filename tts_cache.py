@@ -0,0 +1,202 @@
+"""
+Pre-rendered TTS Audio Cache for JARVIS
+Synthesizes recurring phrases to WAV once and plays them back directly afterwards
+"""
+
+import hashlib
+import os
+import threading
+import wave
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Optional, Union
+
+
+def play_wav_file(path: Union[str, Path], stop_event: Optional[threading.Event] = None) -> bool:
+    """Play a WAV file on the default output device.
+
+    Uses PyAudio when available so playback can be interrupted between chunks,
+    otherwise falls back to winsound on Windows. Returns False if interrupted.
+    """
+    try:
+        import pyaudio
+    except ImportError:
+        pyaudio = None
+
+    if pyaudio is None:
+        import winsound
+        winsound.PlaySound(str(path), winsound.SND_FILENAME)
+        return True
+
+    audio = pyaudio.PyAudio()
+    try:
+        with wave.open(str(path), 'rb') as wav:
+            stream = audio.open(
+                format=audio.get_format_from_width(wav.getsampwidth()),
+                channels=wav.getnchannels(),
+                rate=wav.getframerate(),
+                output=True
+            )
+            try:
+                # ~20 ms chunks keep interruption latency low
+                chunk = max(1, wav.getframerate() // 50)
+                data = wav.readframes(chunk)
+                while data:
+                    if stop_event is not None and stop_event.is_set():
+                        return False
+                    stream.write(data)
+                    data = wav.readframes(chunk)
+            finally:
+                stream.stop_stream()
+                stream.close()
+    finally:
+        audio.terminate()
+    return True
+
+
+class TTSAudioCache:
+    # A phrase spoken this many times gets rendered to the cache for next time
+    RENDER_AFTER_USES = 2
+    MAX_PHRASE_LENGTH = 160
+
+    def __init__(self, cache_dir: Union[str, Path], max_bytes: int = 64 * 1024 * 1024,
+                 player: Optional[Callable] = None):
+        """Initialize the cache over a directory of WAV files, evicting least recently used past max_bytes"""
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.player = player or play_wav_file
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()  # key -> size, oldest first
+        self._total_bytes = 0
+        self._use_counts: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+        self._load_index()
+
+    @staticmethod
+    def make_key(text: str, voice_id, rate, volume) -> str:
+        """Cache key for a phrase rendered with specific voice settings"""
+        material = f"{text}\x00{voice_id}\x00{rate}\x00{float(volume or 0):.3f}"
+        return hashlib.blake2b(material.encode('utf-8'), digest_size=16).hexdigest()
+
+    def key_for(self, engine, text: str) -> str:
+        """Cache key for text as the engine would currently speak it"""
+        return self.make_key(
+            text,
+            engine.getProperty('voice'),
+            engine.getProperty('rate'),
+            engine.getProperty('volume')
+        )
+
+    def path_for(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.wav"
+
+    def lookup(self, key: str) -> Optional[Path]:
+        """Return the WAV path for a cached phrase and mark it recently used"""
+        with self._lock:
+            if key in self._entries:
+                path = self.path_for(key)
+                if path.exists():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    try:
+                        # mtime doubles as the persisted LRU order
+                        os.utime(path, None)
+                    except OSError:
+                        pass
+                    return path
+                self._total_bytes -= self._entries.pop(key)
+            self.misses += 1
+            return None
+
+    def contains(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def render(self, engine, text: str) -> Optional[Path]:
+        """Synthesize text to the cache with engine.save_to_file (must run on the engine's thread)"""
+        key = self.key_for(engine, text)
+        if self.contains(key):
+            return self.path_for(key)
+
+        path = self.path_for(key)
+        tmp_path = path.with_suffix('.tmp.wav')
+        try:
+            engine.save_to_file(text, str(tmp_path))
+            engine.runAndWait()
+            # A header-only or missing file means the driver could not render
+            if not tmp_path.exists() or tmp_path.stat().st_size <= 44:
+                return None
+            os.replace(tmp_path, path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+        with self._lock:
+            size = path.stat().st_size
+            self._entries[key] = size
+            self._total_bytes += size
+            self._evict()
+        return path
+
+    def record_use(self, text: str) -> bool:
+        """Count a spoken phrase; True when it has recurred enough to be worth rendering"""
+        if len(text) > self.MAX_PHRASE_LENGTH:
+            return False
+        with self._lock:
+            count = self._use_counts.get(text, 0) + 1
+            self._use_counts[text] = count
+            if len(self._use_counts) > 1000:
+                self._use_counts.clear()
+            return count == self.RENDER_AFTER_USES
+
+    def play(self, path: Path, stop_event: Optional[threading.Event] = None):
+        return self.player(path, stop_event)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+    def clear(self):
+        """Remove every cached phrase"""
+        with self._lock:
+            for key in list(self._entries):
+                self._remove(key)
+
+    def _load_index(self):
+        """Rebuild the LRU index from the files already on disk, oldest access first"""
+        files = []
+        for path in self.cache_dir.glob('*.wav'):
+            if path.name.endswith('.tmp.wav'):
+                path.unlink()
+                continue
+            stat = path.stat()
+            files.append((stat.st_mtime, path.stem, stat.st_size))
+        for _, key, size in sorted(files):
+            self._entries[key] = size
+            self._total_bytes += size
+        self._evict()
+
+    def _evict(self):
+        """Drop least recently used phrases until the cache fits (caller holds the lock)"""
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+
+    def _remove(self, key: str):
+        self._total_bytes -= self._entries.pop(key)
+        try:
+            self.path_for(key).unlink()
+        except OSError:
+            pass
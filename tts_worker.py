@@ -0,0 +1,290 @@
+"""
+Text-to-Speech Worker for JARVIS
+A single background thread owns the TTS engine and plays queued utterances in priority order
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Set
+
+# Lower numbers are spoken first
+PRIORITY_URGENT = 0
+PRIORITY_HIGH = 10
+PRIORITY_NORMAL = 20
+PRIORITY_LOW = 30
+PRIORITY_BACKGROUND = 40
+
+
+class _Job:
+    """A queued unit of work for the TTS thread"""
+    __slots__ = ("priority", "seq", "kind", "text", "func", "future", "superseded")
+
+    def __init__(self, priority: int, seq: int, kind: str, text: str = "", func: Optional[Callable] = None,
+                 future: Optional[Future] = None):
+        self.priority = priority
+        self.seq = seq
+        self.kind = kind
+        self.text = text
+        self.func = func
+        self.future = future or Future()
+        self.superseded = False
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class TTSWorker:
+    def __init__(self, engine_factory: Callable, name: str = "jarvis-tts", cache=None):
+        """Initialize the worker; the engine is created lazily on the worker thread by engine_factory.
+
+        With a TTSAudioCache, cached phrases are played straight from WAV instead of being synthesized.
+        """
+        self._engine_factory = engine_factory
+        self._name = name
+        self.cache = cache
+        self.engine = None
+        self.init_error: Optional[Exception] = None
+
+        self._heap: List[_Job] = []
+        self._pending: Dict[str, _Job] = {}
+        self._render_pending: Set[str] = set()
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._running = False
+        self._busy = False
+        self._busy_kind: Optional[str] = None
+        self.current_text: Optional[str] = None
+        # Set to cut off the utterance that is playing right now
+        self._stop_event = threading.Event()
+        self.interruptions = 0
+        self._cache_playback = True
+
+    def start(self, timeout: float = 15) -> bool:
+        """Start the worker thread and wait for the engine to come up"""
+        if self._thread and self._thread.is_alive():
+            return True
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout)
+        if self.init_error:
+            raise self.init_error
+        return self._ready.is_set()
+
+    def speak_async(self, text: str, priority: int = PRIORITY_NORMAL) -> Future:
+        """Queue text for speech and return a future that resolves when it has been spoken.
+
+        Identical text that is still waiting in the queue is coalesced into the existing request.
+        """
+        with self._cond:
+            existing = self._pending.get(text)
+            if existing is not None and not existing.future.done():
+                if priority < existing.priority:
+                    # Re-queue at the more urgent priority, sharing the caller-visible future
+                    existing.superseded = True
+                    job = _Job(priority, next(self._seq), "speak", text=text, future=existing.future)
+                    self._pending[text] = job
+                    heapq.heappush(self._heap, job)
+                    self._cond.notify_all()
+                return existing.future
+
+            job = _Job(priority, next(self._seq), "speak", text=text)
+            self._pending[text] = job
+            heapq.heappush(self._heap, job)
+            self._cond.notify_all()
+            return job.future
+
+    def call(self, func: Callable, priority: int = PRIORITY_URGENT) -> Future:
+        """Run func(engine) on the worker thread, e.g. to read or change engine properties"""
+        with self._cond:
+            job = _Job(priority, next(self._seq), "call", func=func)
+            heapq.heappush(self._heap, job)
+            self._cond.notify_all()
+            return job.future
+
+    def render_async(self, text: str) -> Optional[Future]:
+        """Pre-render text into the audio cache when the worker is otherwise idle"""
+        if self.cache is None:
+            return None
+        with self._cond:
+            if text in self._render_pending:
+                return None
+            self._render_pending.add(text)
+            job = _Job(PRIORITY_BACKGROUND, next(self._seq), "render", text=text)
+            heapq.heappush(self._heap, job)
+            self._cond.notify_all()
+            return job.future
+
+    def cancel(self, future: Future) -> bool:
+        """Cancel a queued utterance; returns False if it is already playing or finished"""
+        with self._cond:
+            for text, job in list(self._pending.items()):
+                if job.future is future:
+                    del self._pending[text]
+                    break
+            return future.cancel()
+
+    def flush(self) -> int:
+        """Cancel every queued utterance that has not started yet"""
+        with self._cond:
+            cancelled = 0
+            for job in self._pending.values():
+                if job.future.cancel():
+                    cancelled += 1
+            self._pending.clear()
+            return cancelled
+
+    def interrupt(self) -> bool:
+        """Barge-in: stop the utterance being played and drop everything queued behind it.
+
+        Playback checks for the stop request every ~10-20 ms, so speech stops well within 100 ms.
+        Returns True if something was actually playing.
+        """
+        with self._cond:
+            self.flush()
+            if not self.is_speaking:
+                return False
+            self._stop_event.set()
+            self.interruptions += 1
+            return True
+
+    @property
+    def is_speaking(self) -> bool:
+        return self._busy and self.current_text is not None
+
+    @property
+    def queue_depth(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    def wait_until_idle(self, timeout: Optional[float] = None) -> bool:
+        """Block until nothing is queued or playing (background renders don't count)"""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: self._busy_kind in (None, "render") and not self._live_jobs(), timeout
+            )
+
+    def shutdown(self, timeout: float = 5) -> None:
+        """Let queued speech drain (up to timeout) and stop the worker thread"""
+        if self._thread and self._thread.is_alive():
+            self.wait_until_idle(timeout)
+        with self._cond:
+            self._running = False
+            for job in self._heap:
+                job.future.cancel()
+            self._heap.clear()
+            self._pending.clear()
+            self._cond.notify_all()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1)
+
+    def _live_jobs(self) -> bool:
+        return any(
+            job.kind != "render" and not job.superseded and not job.future.done() for job in self._heap
+        )
+
+    def _next_job(self) -> Optional[_Job]:
+        """Pop the next runnable job, skipping cancelled and superseded entries (caller holds the lock)"""
+        while self._heap:
+            job = heapq.heappop(self._heap)
+            if job.superseded:
+                continue
+            if job.kind == "speak" and self._pending.get(job.text) is job:
+                del self._pending[job.text]
+            elif job.kind == "render":
+                self._render_pending.discard(job.text)
+            if job.future.set_running_or_notify_cancel():
+                return job
+        return None
+
+    def _run(self):
+        """Worker loop: create the engine, then play jobs until shut down"""
+        try:
+            self.engine = self._engine_factory()
+        except Exception as e:
+            self.init_error = e
+            self._running = False
+            self._ready.set()
+            return
+        self._ready.set()
+
+        while True:
+            with self._cond:
+                job = None
+                while self._running:
+                    job = self._next_job()
+                    if job:
+                        break
+                    self._cond.wait()
+                if not self._running:
+                    break
+                self._busy = True
+                self._busy_kind = job.kind
+                self.current_text = job.text if job.kind == "speak" else None
+                self._stop_event.clear()
+
+            try:
+                job.future.set_result(self._execute(job))
+            except Exception as e:
+                job.future.set_exception(e)
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._busy_kind = None
+                    self.current_text = None
+                    self._cond.notify_all()
+
+    def _execute(self, job: _Job):
+        """Execute one job on the worker thread"""
+        if job.kind == "call":
+            return job.func(self.engine)
+        if job.kind == "render":
+            return self.cache.render(self.engine, job.text)
+
+        if self.cache is not None and self._cache_playback:
+            path = self.cache.lookup(self.cache.key_for(self.engine, job.text))
+            if path is not None:
+                try:
+                    return self.cache.play(path, self._stop_event) is not False
+                except Exception as e:
+                    # No usable WAV player on this platform (e.g. neither PyAudio nor winsound): synthesize instead
+                    print(f"Cached TTS playback failed, using the engine instead: {e}")
+                    self._cache_playback = False
+
+        completed = self._say_interruptible(job.text)
+
+        if completed and self.cache is not None and self.cache.record_use(job.text):
+            self.render_async(job.text)
+        return completed
+
+    def _say_interruptible(self, text: str) -> bool:
+        """Speak text with pyttsx3's external event loop so it can be stopped mid-utterance.
+
+        Returns False if interrupted. Engines without an external loop fall back to runAndWait.
+        """
+        engine = self.engine
+        engine.say(text)
+        try:
+            engine.startLoop(False)
+        except (AttributeError, NotImplementedError, RuntimeError):
+            engine.runAndWait()
+            return True
+
+        try:
+            while engine.isBusy():
+                if self._stop_event.is_set():
+                    engine.stop()
+                    return False
+                try:
+                    engine.iterate()
+                except StopIteration:
+                    break
+                time.sleep(0.01)
+            return True
+        finally:
+            engine.endLoop()
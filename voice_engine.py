@@ -2,32 +2,104 @@ import pyttsx3
 import speech_recognition as sr
 import threading
 import time
+from concurrent.futures import Future
 from config import Config
 from rich.console import Console
+from tts_worker import TTSWorker, PRIORITY_NORMAL
+from tts_cache import TTSAudioCache
+from wake_word import WakeWordDetector, SAMPLE_RATE as WAKE_WORD_SAMPLE_RATE
+from audio_capture import AudioCapture, MicrophoneSource
+from speech_recognizers import RecognitionError, StreamingTranscriber, create_backend, SAMPLE_RATE as STT_SAMPLE_RATE
+from metrics_exporter import register_callback
 
 console = Console()
 
 class VoiceEngine:
+    # Fixed phrases worth pre-rendering so they play instantly
+    COMMON_PHRASES = [
+        "Yes?",
+        "Entering sleep mode.",
+        "I'm awake and ready to assist, sir.",
+        "I didn't catch that. Please try again.",
+        "Goodbye!",
+        "Goodbye. JARVIS systems shutting down.",
+        "Voice responses enabled.",
+        "System health check completed",
+        "System health check completed.",
+        "Daily weather update ready",
+        "Reminder",
+        "Command executed.",
+    ]
+    
     def __init__(self):
-        # Initialize text-to-speech
-        self.tts_engine = pyttsx3.init()
-        self.setup_tts()
+        # Initialize text-to-speech on a dedicated worker thread that owns the engine
+        self.tts_engine = None
+        self.tts_cache = None
+        cache_settings = getattr(Config, "TTS_CACHE", {})
+        if cache_settings.get("enabled", True):
+            try:
+                self.tts_cache = TTSAudioCache(
+                    Config.CACHE_DIR / "tts",
+                    max_bytes=int(cache_settings.get("max_mb", 64) * 1024 * 1024)
+                )
+            except Exception as e:
+                console.print(f"[yellow]⚠️ TTS audio cache not available: {e}[/yellow]")
+        self.tts_worker = TTSWorker(self._create_tts_engine, cache=self.tts_cache)
+        self.tts_worker.start()
+        self._register_metrics()
         
         # Initialize speech recognition
+        self.audio_capture = None
+        self.speech_backend = None
+        self.transcriber = None
+        self._partial_listeners = []
+        self._pending_command_audio = None
+        # The microphone stays closed until a voice mode starts (see start_voice_mode)
+        self.voice_mode = False
+        self._calibrated = False
+        self.max_utterance_age = getattr(Config, "SPEECH_RECOGNITION", {}).get("max_utterance_age_seconds", 3.0)
         try:
             self.recognizer = sr.Recognizer()
             self.microphone = sr.Microphone()
             self.sr_available = True
             self.selected_mic_index = None  # Default microphone
-            self.calibrate_microphone()
+            self.speech_backend = self._create_speech_backend()
             console.print("[green]✅ Voice recognition initialized[/green]")
         except Exception as e:
             console.print(f"[yellow]⚠️ Voice recognition not available: {e}[/yellow]")
             self.sr_available = False
         
+        # On-device wake word spotting
+        self.wake_word_settings = getattr(Config, "WAKE_WORD_SETTINGS", {})
+        self.wake_word_detector = None
+        if self.wake_word_settings.get("engine", "local") == "local":
+            try:
+                self.wake_word_detector = WakeWordDetector(
+                    Config.DATA_DIR / "wake_word",
+                    threshold=self.wake_word_settings.get("threshold")
+                )
+            except Exception as e:
+                console.print(f"[yellow]⚠️ Local wake word detection not available: {e}[/yellow]")
+        
         # Audio processing
-        self.is_speaking = False
         self.is_listening = False
+    
+    @property
+    def is_speaking(self):
+        """True while the TTS worker is playing an utterance"""
+        return self.tts_worker.is_speaking
+    
+    def _create_tts_engine(self):
+        """Create and configure the pyttsx3 engine (runs on the TTS worker thread)"""
+        try:
+            # SAPI5 needs COM initialized on the thread that owns the engine
+            import pythoncom
+            pythoncom.CoInitialize()
+        except ImportError:
+            pass
+        self.tts_engine = pyttsx3.init()
+        self.setup_tts()
+        return self.tts_engine
         
     def setup_tts(self):
         """Configure text-to-speech engine for natural speech"""
@@ -69,29 +141,79 @@ class VoiceEngine:
         except:
             pass
         
-    def speak(self, text):
-        """Convert text to speech with natural inflection"""
-        if not Config.VOICE_SETTINGS.get("enabled", True) or not text.strip():
-            return
-            
-        console.print(f"[blue]JARVIS:[/blue] {text}")
+    def _register_metrics(self):
+        """Expose TTS queue depth and audio cache hit/miss counts to the metrics exporter (read at scrape time)"""
+        register_callback("jarvis_tts_queue_depth", "Utterances waiting for the TTS worker", "gauge",
+                          lambda: [({}, self.tts_worker.queue_depth)])
+        register_callback("jarvis_tts_interruptions", "Speech cut off by barge-in", "counter",
+                          lambda: [({}, self.tts_worker.interruptions)])
         
-        # Wait for any previous speech to complete
-        while self.is_speaking:
-            time.sleep(0.1)
+        def cache_lookups():
+            if self.tts_cache is None:
+                return []
+            stats = self.tts_cache.get_stats()
+            return [({'cache': 'tts', 'result': 'hit'}, stats['hits']),
+                    ({'cache': 'tts', 'result': 'miss'}, stats['misses'])]
+        register_callback("jarvis_cache_lookups", "Cache lookups by cache and result", "counter", cache_lookups)
+    
+    def speak(self, text, priority=PRIORITY_NORMAL, wait=False):
+        """Queue text for speech and return immediately with a future for its completion"""
+        future = self.speak_async(text, priority)
+        if wait:
+            try:
+                future.result()
+            except Exception:
+                pass
+        return future
+    
+    def speak_async(self, text, priority=PRIORITY_NORMAL):
+        """Queue text on the TTS worker; duplicates already waiting in the queue are coalesced"""
+        if not Config.VOICE_SETTINGS.get("enabled", True) or not text or not text.strip():
+            done = Future()
+            done.set_result(False)
+            return done
             
-        self.is_speaking = True
+        console.print(f"[blue]JARVIS:[/blue] {text}")
         
-        try:
-            # Process text for more natural speech
-            processed_text = self.process_text_for_natural_speech(text)
-            
-            self.tts_engine.say(processed_text)
-            self.tts_engine.runAndWait()
-        except Exception as e:
-            console.print(f"[red]TTS Error: {e}[/red]")
-        finally:
-            self.is_speaking = False
+        # Process text for more natural speech
+        processed_text = self.process_text_for_natural_speech(text)
+        future = self.tts_worker.speak_async(processed_text, priority)
+        future.add_done_callback(self._report_tts_error)
+        return future
+    
+    def _report_tts_error(self, future):
+        """Surface TTS failures without blocking the caller"""
+        if not future.cancelled() and future.exception():
+            console.print(f"[red]TTS Error: {future.exception()}[/red]")
+    
+    def prewarm_phrases(self, phrases=None):
+        """Render recurring phrases into the audio cache in the background"""
+        if self.tts_cache is None:
+            return 0
+        phrases = list(phrases or []) + self.COMMON_PHRASES
+        queued = 0
+        for phrase in dict.fromkeys(phrases):
+            if phrase and phrase.strip():
+                if self.tts_worker.render_async(self.process_text_for_natural_speech(phrase)):
+                    queued += 1
+        return queued
+    
+    def cancel_speech(self, future):
+        """Cancel a queued utterance before it starts playing"""
+        return self.tts_worker.cancel(future)
+    
+    def flush_speech(self):
+        """Drop every utterance that is still waiting in the queue"""
+        return self.tts_worker.flush()
+    
+    def wait_until_done(self, timeout=None):
+        """Block until all queued speech has been played"""
+        return self.tts_worker.wait_until_idle(timeout)
+    
+    def shutdown(self, timeout=5):
+        """Let pending speech finish, then stop the TTS worker and the capture thread"""
+        self.tts_worker.shutdown(timeout)
+        self.stop_audio_capture()
     
     def process_text_for_natural_speech(self, text):
         """Process text to make it sound more natural when spoken"""
@@ -130,14 +252,159 @@ class VoiceEngine:
         
         for phrase in test_phrases:
             self.speak(phrase)
-            time.sleep(2)
             
+    def _create_speech_backend(self):
+        """Load the configured speech-to-text backend, falling back to the cloud one if it can't load"""
+        settings = getattr(Config, "SPEECH_RECOGNITION", {})
+        options = {
+            "google": {"language": settings.get("language", "en-US")},
+            "vosk": {"model_path": settings.get("vosk_model_path") or None},
+            "whisper": {"model_size": settings.get("whisper_model", "base.en")},
+        }
+        name = settings.get("backend", "google")
+        try:
+            return create_backend(name, **options.get(name, {}))
+        except RecognitionError as e:
+            fallback = settings.get("fallback", "google")
+            console.print(f"[yellow]⚠️ Speech backend '{name}' not available ({e}); using '{fallback}'[/yellow]")
+            return create_backend(fallback, **options.get(fallback, {}))
+    
+    def add_partial_listener(self, callback):
+        """Call callback(text) with interim transcripts while the user is still speaking"""
+        self._partial_listeners.append(callback)
+    
+    def _on_partial(self, text):
+        for callback in list(self._partial_listeners):
+            try:
+                callback(text)
+            except Exception:
+                pass
+    
+    def _recognize(self, audio):
+        """Transcribe sr.AudioData with the active backend, raising sr's errors like recognize_google did"""
+        text = None
+        end_position = getattr(audio, "end_position", None)
+        if self.transcriber is not None and end_position is not None:
+            # Streaming backends have usually finished by the time the utterance is endpointed
+            text = self.transcriber.wait_for_final(end_position, timeout=2.0)
+        try:
+            if text is None:
+                pcm = audio.get_raw_data(convert_rate=STT_SAMPLE_RATE, convert_width=2)
+                text = self.speech_backend.transcribe(pcm, STT_SAMPLE_RATE)
+        except RecognitionError as e:
+            raise sr.RequestError(str(e))
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+    
+    def start_audio_capture(self):
+        """Open the microphone once and keep capturing into the ring buffer on a background thread"""
+        self.stop_audio_capture()
+        try:
+            barge_in = getattr(Config, "BARGE_IN", {})
+            if barge_in.get("enabled", True):
+                # Keep listening while we talk, so the user can cut in
+                capture = AudioCapture(
+                    MicrophoneSource(device_index=self.selected_mic_index),
+                    playback=lambda: self.tts_worker.is_speaking,
+                    playback_ratio=barge_in.get("threshold_ratio", 3.0)
+                )
+                capture.add_listener(self._on_capture_event)
+            else:
+                capture = AudioCapture(
+                    MicrophoneSource(device_index=self.selected_mic_index),
+                    # Don't start utterances on our own voice
+                    suppress=lambda: self.tts_worker.is_speaking
+                )
+            settings = getattr(Config, "SPEECH_RECOGNITION", {})
+            if self.speech_backend is not None and self.speech_backend.streaming and settings.get("streaming", True):
+                self.transcriber = StreamingTranscriber(self.speech_backend, on_partial=self._on_partial)
+                self.transcriber.attach(capture)
+            capture.start()
+            self.audio_capture = capture
+            return True
+        except Exception as e:
+            console.print(f"[yellow]⚠️ Continuous capture not available, opening the microphone per request: {e}[/yellow]")
+            self.audio_capture = None
+            return False
+    
+    def start_voice_mode(self):
+        """Open the continuous capture pipeline (and allow barge-in) for a spoken conversation"""
+        self.voice_mode = True
+        if not self.sr_available:
+            return False
+        if self.audio_capture is None or not self.audio_capture.is_running:
+            # The capture pipeline calibrates itself once when the stream opens
+            if not self.start_audio_capture():
+                self.calibrate_microphone()
+                return False
+        else:
+            self.audio_capture.clear()
+        return True
+    
+    def stop_voice_mode(self):
+        """Close the microphone again when the spoken conversation ends"""
+        self.voice_mode = False
+        self._pending_command_audio = None
+        self.stop_audio_capture()
+    
+    def stop_audio_capture(self):
+        if self.audio_capture is not None:
+            if self.transcriber is not None:
+                self.transcriber.detach(self.audio_capture)
+                self.transcriber = None
+            self.audio_capture.stop()
+            self.audio_capture = None
+    
+    def _on_capture_event(self, event, info):
+        # Only a spoken conversation may cut a reply short; text mode and the GUI never do
+        if event == 'speech_start' and info.get('during_playback') and self.voice_mode:
+            self.barge_in()
+    
+    def barge_in(self):
+        """The user started talking over us: stop speaking now and drop queued speech and stale utterances"""
+        interrupted = self.tts_worker.interrupt()
+        if self.audio_capture is not None:
+            # The utterance in progress is not queued yet, so only older audio is dropped
+            self.audio_capture.clear()
+        if interrupted:
+            console.print("[dim]⏹️ Interrupted[/dim]")
+        return interrupted
+    
+    @property
+    def has_pending_command(self):
+        """True when a barge-in utterance is waiting to be recognized as a command"""
+        return self._pending_command_audio is not None
+    
+    def _listen(self, timeout, phrase_time_limit):
+        """Return the next utterance as sr.AudioData, raising sr.WaitTimeoutError if none arrives in time.
+        
+        With the capture pipeline running the utterance is endpointed by its VAD, so phrase_time_limit
+        only applies to the per-request microphone fallback. Utterances that ended more than
+        max_utterance_age seconds ago were not meant for this prompt and are skipped.
+        """
+        capture = self.audio_capture
+        if capture is not None and capture.is_running:
+            utterance = capture.get_utterance(timeout=timeout, max_age=self.max_utterance_age)
+            if utterance is None:
+                raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+            audio = utterance.to_audio_data()
+            audio.end_position = utterance.end_position
+            audio.during_playback = utterance.during_playback
+            return audio
+        
+        if not self._calibrated:
+            self.calibrate_microphone()
+        with self.microphone as source:
+            return self.recognizer.listen(source, timeout=timeout, phrase_time_limit=phrase_time_limit)
+    
     def calibrate_microphone(self):
         """Calibrate microphone for ambient noise"""
         if not self.sr_available:
             return
             
         console.print("[yellow]Calibrating microphone for ambient noise...[/yellow]")
+        self._calibrated = True  # Attempted once; a failure is not retried on every listen
         try:
             with self.microphone as source:
                 self.recognizer.adjust_for_ambient_noise(source, duration=1)
@@ -155,15 +422,15 @@ class VoiceEngine:
         console.print("[cyan]🎤 Listening... (speak now)[/cyan]")
         
         try:
-            with self.microphone as source:
-                # Listen for audio with timeout
-                audio = self.recognizer.listen(source, timeout=timeout, phrase_time_limit=phrase_timeout)
+            audio, self._pending_command_audio = self._pending_command_audio, None
+            if audio is None:
+                audio = self._listen(timeout, phrase_timeout)
             
             console.print("[yellow]🔄 Processing speech...[/yellow]")
             
             # Recognize speech using Google's service
             try:
-                command = self.recognizer.recognize_google(audio).lower()
+                command = self._recognize(audio).lower()
                 console.print(f"[green]🎯 Recognized: '{command}'[/green]")
                 return command
             except sr.UnknownValueError:
@@ -192,21 +459,21 @@ class VoiceEngine:
         console.print("[cyan]🎤 Listening continuously... (speak when ready)[/cyan]")
         
         try:
-            with self.microphone as source:
-                # Adjust for ambient noise first
-                self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
-                
+            if self.audio_capture is None:
+                with self.microphone as source:
+                    # Adjust for ambient noise first
+                    self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
                 # Set energy threshold for better voice detection
                 self.recognizer.energy_threshold = energy_threshold
-                
-                # Listen for audio with longer timeout and shorter phrase timeout
-                audio = self.recognizer.listen(source, timeout=timeout, phrase_time_limit=phrase_timeout)
+            
+            # Listen for audio with longer timeout and shorter phrase timeout
+            audio = self._listen(timeout, phrase_timeout)
             
             console.print("[yellow]🔄 Processing speech...[/yellow]")
             
             # Recognize speech using Google's service
             try:
-                command = self.recognizer.recognize_google(audio).lower()
+                command = self._recognize(audio).lower()
                 console.print(f"[green]🎯 Recognized: '{command}'[/green]")
                 return command
             except sr.UnknownValueError:
@@ -226,23 +493,26 @@ class VoiceEngine:
             self.is_listening = False
     
     def listen_for_wake_word(self, wake_word=None):
-        """Listen continuously for wake word"""
+        """Listen for the wake word, spotting it on-device when templates are enrolled"""
         if not self.sr_available:
             return False
             
         wake_word = wake_word or Config.WAKE_WORD
+        detector = self.wake_word_detector
+        use_local = detector is not None and detector.is_trained
+        if not use_local and detector is not None and not self.wake_word_settings.get("cloud_fallback", True):
+            return False
         
         try:
-            with self.microphone as source:
-                audio = self.recognizer.listen(source, timeout=1, phrase_time_limit=3)
+            audio = self._listen(1, 3)
             
-            try:
-                command = self.recognizer.recognize_google(audio).lower()
-                if wake_word in command:
-                    console.print(f"[green]👋 Wake word '{wake_word}' detected![/green]")
-                    return True
-            except (sr.UnknownValueError, sr.RequestError):
-                pass  # Ignore recognition errors for wake word detection
+            if not self._contains_wake_word(audio, wake_word, detector if use_local else None):
+                return False
+            console.print(f"[green]👋 Wake word '{wake_word}' detected![/green]")
+            if getattr(audio, "during_playback", False):
+                # "Jarvis, stop" spoken over a reply carries its command: recognize this utterance next
+                self._pending_command_audio = audio
+            return True
                 
         except sr.WaitTimeoutError:
             pass  # Normal timeout, continue listening
@@ -251,12 +521,62 @@ class VoiceEngine:
             
         return False
     
+    def _contains_wake_word(self, audio, wake_word, local_detector=None):
+        """Spot the wake word on-device when templates are enrolled, otherwise in a cloud transcript"""
+        if local_detector is not None:
+            # Nothing leaves the machine until the keyword is spotted locally
+            pcm = audio.get_raw_data(convert_rate=WAKE_WORD_SAMPLE_RATE, convert_width=2)
+            return bool(local_detector.detect(pcm))
+        
+        # Cloud fallback: skip clips the energy gate says hold no speech
+        if self.wake_word_detector is not None:
+            pcm = audio.get_raw_data(convert_rate=WAKE_WORD_SAMPLE_RATE, convert_width=2)
+            if not self.wake_word_detector.vad.speech_segments(pcm):
+                return False
+        try:
+            return wake_word in self._recognize(audio).lower()
+        except (sr.UnknownValueError, sr.RequestError):
+            return False  # Ignore recognition errors for wake word detection
+    
+    def train_wake_word(self, samples=3, wake_word=None):
+        """Record the wake word a few times and enroll the recordings as local templates"""
+        if not self.sr_available or self.wake_word_detector is None:
+            console.print("[yellow]Local wake word training not available[/yellow]")
+            return False
+        
+        wake_word = wake_word or Config.WAKE_WORD
+        enrolled = 0
+        for attempt in range(1, samples + 1):
+            console.print(f"[cyan]🎤 Say '{wake_word}' ({attempt}/{samples})...[/cyan]")
+            try:
+                audio = self._listen(5, 2)
+            except sr.WaitTimeoutError:
+                console.print("[yellow]⏰ No speech detected, skipping this sample[/yellow]")
+                continue
+            pcm = audio.get_raw_data(convert_rate=WAKE_WORD_SAMPLE_RATE, convert_width=2)
+            if not self.wake_word_detector.vad.speech_segments(pcm):
+                console.print("[yellow]⚠️ Sample too quiet, skipping[/yellow]")
+                continue
+            self.wake_word_detector.enroll(pcm)
+            enrolled += 1
+        
+        stats = self.wake_word_detector.get_stats()
+        console.print(f"[green]✅ Enrolled {enrolled} sample(s); {stats['templates']} template(s) in total[/green]")
+        return enrolled > 0
+    
+    def reset_wake_word(self):
+        """Forget enrolled wake word templates and fall back to cloud recognition"""
+        if self.wake_word_detector is not None:
+            self.wake_word_detector.clear_templates()
+    
     def list_available_voices(self):
         """List all available voices on the system"""
-        voices = self.tts_engine.getProperty('voices')
+        voices, current_id = self.tts_worker.call(
+            lambda engine: (engine.getProperty('voices'), engine.getProperty('voice'))
+        ).result()
         console.print("[cyan]Available voices:[/cyan]")
         for i, voice in enumerate(voices):
-            current = " (CURRENT)" if voice.id == self.tts_engine.getProperty('voice') else ""
+            current = " (CURRENT)" if voice.id == current_id else ""
             console.print(f"[dim]  {i}: {voice.name}{current}[/dim]")
             console.print(f"[dim]     ID: {voice.id}[/dim]")
             console.print(f"[dim]     Languages: {getattr(voice, 'languages', 'Unknown')}[/dim]")
@@ -264,21 +584,23 @@ class VoiceEngine:
     
     def change_voice(self, voice_index_or_name):
         """Change the TTS voice"""
-        voices = self.tts_engine.getProperty('voices')
+        voices = self.tts_worker.call(lambda engine: engine.getProperty('voices')).result()
         
+        selected_voice = None
         if isinstance(voice_index_or_name, int):
             if 0 <= voice_index_or_name < len(voices):
                 selected_voice = voices[voice_index_or_name]
-                self.tts_engine.setProperty('voice', selected_voice.id)
-                console.print(f"[green]Voice changed to: {selected_voice.name}[/green]")
-                return True
         else:
             # Search by name
             for voice in voices:
                 if voice_index_or_name.lower() in voice.name.lower():
-                    self.tts_engine.setProperty('voice', voice.id)
-                    console.print(f"[green]Voice changed to: {voice.name}[/green]")
-                    return True
+                    selected_voice = voice
+                    break
+        
+        if selected_voice:
+            self.tts_worker.call(lambda engine: engine.setProperty('voice', selected_voice.id)).result()
+            console.print(f"[green]Voice changed to: {selected_voice.name}[/green]")
+            return True
         
         console.print(f"[red]Voice '{voice_index_or_name}' not found[/red]")
         return False
@@ -320,8 +642,9 @@ class VoiceEngine:
                 self.microphone = sr.Microphone(device_index=mic_index)
                 console.print(f"[green]Microphone set to: {mic_list[mic_index]}[/green]")
                 
-                # Recalibrate with new microphone
-                self.calibrate_microphone()
+                # Reopen the capture stream (which recalibrates) on the new device
+                if not (self.voice_mode and self.start_audio_capture()):
+                    self.calibrate_microphone()
                 return True
             else:
                 console.print(f"[red]Invalid microphone index: {mic_index}[/red]")
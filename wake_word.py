@@ -0,0 +1,309 @@
+"""
+Offline Wake-Word Spotting for JARVIS
+Energy-based voice activity gating plus an MFCC + DTW keyword spotter over enrolled templates
+"""
+
+import threading
+import time
+import wave
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+
+def pcm_to_float(pcm: Union[bytes, np.ndarray]) -> np.ndarray:
+    """Convert 16-bit PCM (bytes or int16 array) to float32 samples in [-1, 1]"""
+    if isinstance(pcm, (bytes, bytearray, memoryview)):
+        pcm = np.frombuffer(pcm, dtype=np.int16)
+    if pcm.dtype == np.int16:
+        return pcm.astype(np.float32) / 32768.0
+    return pcm.astype(np.float32)
+
+
+def read_wav(path: Union[str, Path]) -> Tuple[np.ndarray, int]:
+    """Read a mono 16-bit WAV file into an int16 array"""
+    with wave.open(str(path), 'rb') as wav:
+        if wav.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit PCM is supported")
+        data = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+        channels = wav.getnchannels()
+        if channels > 1:
+            data = data.reshape(-1, channels).mean(axis=1).astype(np.int16)
+        return data, wav.getframerate()
+
+
+def write_wav(path: Union[str, Path], pcm: np.ndarray, sample_rate: int = SAMPLE_RATE):
+    """Write int16 samples to a mono 16-bit WAV file"""
+    with wave.open(str(path), 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(np.asarray(pcm, dtype=np.int16).tobytes())
+
+
+def frame_signal(signal: np.ndarray, frame_length: int, hop: int) -> np.ndarray:
+    """Split a signal into overlapping frames (zero-copy view)"""
+    if len(signal) < frame_length:
+        signal = np.pad(signal, (0, frame_length - len(signal)))
+    count = 1 + (len(signal) - frame_length) // hop
+    return np.lib.stride_tricks.as_strided(
+        signal,
+        shape=(count, frame_length),
+        strides=(signal.strides[0] * hop, signal.strides[0]),
+        writeable=False
+    )
+
+
+_FILTERBANKS: Dict[Tuple[int, int, int], np.ndarray] = {}
+_DCT_MATRICES: Dict[Tuple[int, int], np.ndarray] = {}
+
+
+def _mel_filterbank(sample_rate: int, n_fft: int, n_mels: int) -> np.ndarray:
+    key = (sample_rate, n_fft, n_mels)
+    if key not in _FILTERBANKS:
+        def hz_to_mel(hz):
+            return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+        def mel_to_hz(mel):
+            return 700.0 * (10 ** (mel / 2595.0) - 1.0)
+
+        mel_points = np.linspace(hz_to_mel(20.0), hz_to_mel(sample_rate / 2), n_mels + 2)
+        bins = np.floor((n_fft + 1) * mel_to_hz(mel_points) / sample_rate).astype(int)
+        bank = np.zeros((n_mels, n_fft // 2 + 1), dtype=np.float32)
+        for m in range(1, n_mels + 1):
+            left, center, right = bins[m - 1], bins[m], bins[m + 1]
+            if center > left:
+                bank[m - 1, left:center] = (np.arange(left, center) - left) / (center - left)
+            if right > center:
+                bank[m - 1, center:right] = (right - np.arange(center, right)) / (right - center)
+        _FILTERBANKS[key] = bank
+    return _FILTERBANKS[key]
+
+
+def _dct_matrix(n_mfcc: int, n_mels: int) -> np.ndarray:
+    key = (n_mfcc, n_mels)
+    if key not in _DCT_MATRICES:
+        n = np.arange(n_mels)
+        k = np.arange(n_mfcc)[:, None]
+        matrix = np.cos(np.pi * k * (2 * n + 1) / (2 * n_mels)) * np.sqrt(2.0 / n_mels)
+        matrix[0] /= np.sqrt(2.0)
+        _DCT_MATRICES[key] = matrix.astype(np.float32)
+    return _DCT_MATRICES[key]
+
+
+def compute_mfcc(pcm: Union[bytes, np.ndarray], sample_rate: int = SAMPLE_RATE, n_mfcc: int = 13,
+                 n_mels: int = 26, frame_ms: float = 25.0, hop_ms: float = 10.0) -> np.ndarray:
+    """Compute mean-normalized MFCC features, one row per 10 ms frame"""
+    signal = pcm_to_float(pcm)
+    signal = np.append(signal[0:1], signal[1:] - 0.97 * signal[:-1])  # pre-emphasis
+
+    frame_length = int(sample_rate * frame_ms / 1000)
+    hop = int(sample_rate * hop_ms / 1000)
+    n_fft = 1 << (frame_length - 1).bit_length()
+
+    frames = frame_signal(signal, frame_length, hop) * np.hamming(frame_length).astype(np.float32)
+    power = (np.abs(np.fft.rfft(frames, n_fft)) ** 2) / n_fft
+    mel_energy = np.maximum(power @ _mel_filterbank(sample_rate, n_fft, n_mels).T, 1e-10)
+    features = np.log(mel_energy) @ _dct_matrix(n_mfcc, n_mels).T
+    # Cepstral mean normalization removes channel/microphone coloration
+    return (features - features.mean(axis=0)).astype(np.float32)
+
+
+def dtw_distance(a: np.ndarray, b: np.ndarray) -> float:
+    """Length-normalized dynamic time warping distance between two feature sequences.
+
+    Cells on the same anti-diagonal are independent, so each diagonal is updated as one vector op.
+    """
+    n, m = len(a), len(b)
+    if n == 0 or m == 0:
+        return float('inf')
+    cost = np.sqrt(np.maximum(
+        (a * a).sum(axis=1)[:, None] + (b * b).sum(axis=1)[None, :] - 2.0 * (a @ b.T), 0.0
+    ))
+
+    acc = np.full((n + 1, m + 1), np.inf, dtype=np.float64)
+    acc[0, 0] = 0.0
+    for d in range(2, n + m + 1):
+        i = np.arange(max(1, d - m), min(n, d - 1) + 1)
+        j = d - i
+        acc[i, j] = cost[i - 1, j - 1] + np.minimum(np.minimum(acc[i - 1, j], acc[i, j - 1]), acc[i - 1, j - 1])
+    return float(acc[n, m] / (n + m))
+
+
+class EnergyVAD:
+    def __init__(self, sample_rate: int = SAMPLE_RATE, frame_ms: float = 20.0, ratio: float = 3.0,
+                 min_rms: float = 0.005, hangover_frames: int = 10):
+        """Frame-energy voice activity detector with a noise floor estimated from the quietest frames"""
+        self.sample_rate = sample_rate
+        self.frame_length = int(sample_rate * frame_ms / 1000)
+        self.ratio = ratio
+        self.min_rms = min_rms
+        self.hangover_frames = hangover_frames
+
+    def frame_rms(self, signal: np.ndarray) -> np.ndarray:
+        frames = frame_signal(signal, self.frame_length, self.frame_length)
+        return np.sqrt((frames * frames).mean(axis=1))
+
+    def speech_segments(self, pcm: Union[bytes, np.ndarray]) -> List[Tuple[int, int]]:
+        """Return (start, end) sample ranges that contain speech"""
+        signal = pcm_to_float(pcm)
+        rms = self.frame_rms(signal)
+        if len(rms) == 0:
+            return []
+        noise_floor = np.percentile(rms, 10)
+        threshold = max(self.min_rms, noise_floor * self.ratio)
+        voiced = rms > threshold
+
+        segments = []
+        start = None
+        silent = 0
+        for index, is_voiced in enumerate(voiced):
+            if is_voiced:
+                if start is None:
+                    start = index
+                silent = 0
+            elif start is not None:
+                silent += 1
+                if silent > self.hangover_frames:
+                    segments.append((start, index - silent + 1))
+                    start = None
+                    silent = 0
+        if start is not None:
+            segments.append((start, len(voiced) - silent))
+
+        return [(s * self.frame_length, e * self.frame_length) for s, e in segments]
+
+
+class WakeWordDetector:
+    # Accept clips up to this multiple of the largest distance between enrolled templates
+    CALIBRATION_MARGIN = 2.0
+    SINGLE_TEMPLATE_THRESHOLD = 4.0
+
+    def __init__(self, templates_dir: Union[str, Path], threshold: Optional[float] = None,
+                 sample_rate: int = SAMPLE_RATE, min_duration: float = 0.25, max_duration: float = 1.6):
+        """Initialize the spotter from enrolled WAV templates stored in templates_dir"""
+        self.templates_dir = Path(templates_dir)
+        self.templates_dir.mkdir(parents=True, exist_ok=True)
+        self.sample_rate = sample_rate
+        self.min_duration = min_duration
+        self.max_duration = max_duration
+        self.vad = EnergyVAD(sample_rate)
+        self.fixed_threshold = threshold
+        self.threshold = threshold
+
+        self._lock = threading.Lock()
+        self.templates: List[np.ndarray] = []
+        self.stats = {'clips': 0, 'gated': 0, 'compared': 0, 'detections': 0,
+                      'audio_seconds': 0.0, 'cpu_seconds': 0.0}
+        self.load_templates()
+
+    @property
+    def is_trained(self) -> bool:
+        return bool(self.templates)
+
+    def load_templates(self):
+        """Load every enrolled template WAV and recalibrate the threshold"""
+        templates = []
+        for path in sorted(self.templates_dir.glob('*.wav')):
+            try:
+                pcm, rate = read_wav(path)
+                if rate == self.sample_rate:
+                    templates.append(compute_mfcc(self._trim(pcm), rate))
+            except Exception:
+                continue
+        with self._lock:
+            self.templates = templates
+        self._calibrate()
+
+    def enroll(self, pcm: Union[bytes, np.ndarray]) -> Path:
+        """Add a recording of the wake word as a template"""
+        samples = np.frombuffer(pcm, dtype=np.int16) if isinstance(pcm, (bytes, bytearray)) else pcm
+        path = self.templates_dir / f"template_{int(time.time() * 1000)}.wav"
+        write_wav(path, samples, self.sample_rate)
+        with self._lock:
+            self.templates.append(compute_mfcc(self._trim(samples), self.sample_rate))
+        self._calibrate()
+        return path
+
+    def clear_templates(self):
+        for path in self.templates_dir.glob('*.wav'):
+            path.unlink()
+        with self._lock:
+            self.templates = []
+        self.threshold = self.fixed_threshold
+
+    def score(self, pcm: Union[bytes, np.ndarray]) -> float:
+        """Best (lowest) DTW distance of any voiced segment in the clip to the templates"""
+        with self._lock:
+            templates = list(self.templates)
+        if not templates:
+            return float('inf')
+
+        signal = np.frombuffer(pcm, dtype=np.int16) if isinstance(pcm, (bytes, bytearray)) else pcm
+        best = float('inf')
+        for start, end in self.vad.speech_segments(signal):
+            duration = (end - start) / self.sample_rate
+            if not self.min_duration <= duration <= self.max_duration:
+                continue
+            features = compute_mfcc(signal[start:end], self.sample_rate)
+            self.stats['compared'] += 1
+            for template in templates:
+                # Cheap length check before paying for DTW
+                if not 0.5 <= len(features) / len(template) <= 2.0:
+                    continue
+                best = min(best, dtw_distance(features, template))
+        return best
+
+    def detect(self, pcm: Union[bytes, np.ndarray]) -> bool:
+        """True if the clip contains the wake word; silent clips are gated before any feature extraction"""
+        started = time.process_time()
+        signal = np.frombuffer(pcm, dtype=np.int16) if isinstance(pcm, (bytes, bytearray)) else pcm
+        self.stats['clips'] += 1
+        self.stats['audio_seconds'] += len(signal) / self.sample_rate
+        try:
+            if not self.templates or self.threshold is None:
+                return False
+            if not self.vad.speech_segments(signal):
+                self.stats['gated'] += 1
+                return False
+            detected = self.score(signal) <= self.threshold
+            if detected:
+                self.stats['detections'] += 1
+            return detected
+        finally:
+            self.stats['cpu_seconds'] += time.process_time() - started
+
+    def get_stats(self) -> Dict:
+        stats = dict(self.stats)
+        audio = stats['audio_seconds']
+        stats['cpu_per_audio_second'] = stats['cpu_seconds'] / audio if audio else 0.0
+        stats['templates'] = len(self.templates)
+        stats['threshold'] = self.threshold
+        return stats
+
+    def _trim(self, pcm: np.ndarray) -> np.ndarray:
+        """Cut a recording down to its voiced region"""
+        segments = self.vad.speech_segments(pcm)
+        if not segments:
+            return pcm
+        return pcm[segments[0][0]:segments[-1][1]]
+
+    def _calibrate(self):
+        """Derive the acceptance threshold from how far apart the enrolled templates are"""
+        if self.fixed_threshold is not None:
+            self.threshold = self.fixed_threshold
+            return
+        with self._lock:
+            templates = list(self.templates)
+        if len(templates) < 2:
+            # A single template gives no spread estimate; use a conservative default
+            self.threshold = self.SINGLE_TEMPLATE_THRESHOLD if templates else None
+            return
+        distances = [
+            dtw_distance(templates[i], templates[j])
+            for i in range(len(templates)) for j in range(i + 1, len(templates))
+        ]
+        self.threshold = float(max(distances) * self.CALIBRATION_MARGIN)
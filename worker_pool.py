@@ -0,0 +1,271 @@
+"""
+Worker Pool for JARVIS
+Bounded thread pool for scheduled work with per-kind concurrency limits, priorities, timeouts and cancellation
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from event_scheduler import EventScheduler
+
+QUEUED, RUNNING, DONE, FAILED, TIMED_OUT, CANCELLED = 'queued', 'running', 'done', 'failed', 'timed_out', 'cancelled'
+
+_local = threading.local()
+
+
+def current_job() -> Optional['Job']:
+    """The Job being executed on this worker thread (long-running work polls job.cancel_requested)"""
+    return getattr(_local, 'job', None)
+
+
+class Job:
+    __slots__ = ('id', 'kind', 'key', 'func', 'args', 'priority', 'timeout', 'on_done', 'status', 'result',
+                 'error', 'submitted', 'started', 'finished', '_cancel', '_timer', '_worker', '_holds_slot')
+
+    def __init__(self, job_id: int, kind: str, key: Optional[str], func: Callable, args: tuple, priority: int,
+                 timeout: Optional[float], on_done: Optional[Callable]):
+        self.id = job_id
+        self.kind = kind
+        self.key = key
+        self.func = func
+        self.args = args
+        self.priority = priority
+        self.timeout = timeout
+        self.on_done = on_done
+        self.status = QUEUED
+        self.result = None
+        self.error: Optional[str] = None
+        self.submitted = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self._cancel = threading.Event()
+        self._timer = None
+        self._worker = None
+        self._holds_slot = False
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel.is_set()
+
+    @property
+    def done(self) -> bool:
+        return self.status in (DONE, FAILED, TIMED_OUT, CANCELLED)
+
+
+class _Worker:
+    __slots__ = ('thread', 'detached')
+
+    def __init__(self):
+        self.thread: Optional[threading.Thread] = None
+        self.detached = False
+
+
+class WorkerPool:
+    def __init__(self, workers: int = 4, limits: Optional[Dict[str, int]] = None,
+                 timeouts: Optional[Dict[str, float]] = None, timers: Optional[EventScheduler] = None):
+        """workers threads shared by all kinds; limits caps concurrent jobs per kind (unlisted kinds: no cap).
+
+        A job that outlives its timeout is marked timed out and its worker is replaced, so a stuck job never
+        costs the pool capacity; the abandoned thread exits once the call returns.
+        """
+        self.size = workers
+        self.limits = dict(limits or {})
+        self.timeouts = dict(timeouts or {})
+        self._timers = timers
+        self._own_timers = timers is None
+        self._queue: List = []
+        self._seq = itertools.count()
+        self._ids = itertools.count(1)
+        self._running: Dict[str, int] = {}
+        self._jobs: Dict[int, Job] = {}
+        self._workers: List[_Worker] = []
+        self._condition = threading.Condition()
+        self._stopping = False
+
+    # ------------------------------------------------------------------ lifecycle
+
+    def start(self):
+        with self._condition:
+            self._stopping = False
+            if self._own_timers and self._timers is None:
+                self._timers = EventScheduler()
+            while len(self._workers) < self.size:
+                self._spawn()
+        if self._own_timers:
+            self._timers.start()
+
+    def stop(self, wait: bool = True):
+        """Cancel queued jobs, ask running ones to stop, and let the workers exit"""
+        with self._condition:
+            self._stopping = True
+            for _, _, job in self._queue:
+                self._complete(job, CANCELLED)
+            self._queue.clear()
+            for job in self._jobs.values():
+                job._cancel.set()
+            workers = list(self._workers)
+            self._condition.notify_all()
+        if self._own_timers and self._timers is not None:
+            self._timers.stop()
+        if wait:
+            for worker in workers:
+                if worker.thread is not threading.current_thread():
+                    worker.thread.join(timeout=2)
+
+    def _spawn(self):
+        worker = _Worker()
+        worker.thread = threading.Thread(target=self._run, args=(worker,), name="jarvis-worker", daemon=True)
+        self._workers.append(worker)
+        worker.thread.start()
+
+    # ------------------------------------------------------------------ jobs
+
+    def submit(self, kind: str, func: Callable, *args, key: Optional[str] = None, priority: int = 10,
+               timeout: Optional[float] = None, on_done: Optional[Callable[[Job], None]] = None) -> Job:
+        """Queue func(*args); lower priority runs first. on_done(job) runs on the worker after completion."""
+        if timeout is None:
+            timeout = self.timeouts.get(kind)
+        job = Job(next(self._ids), kind, key, func, args, priority, timeout, on_done)
+        with self._condition:
+            if self._stopping:
+                self._complete(job, CANCELLED)
+                return job
+            self._jobs[job.id] = job
+            heapq.heappush(self._queue, (priority, next(self._seq), job))
+            self._condition.notify()
+        return job
+
+    def cancel(self, job_or_key) -> int:
+        """Cancel a Job, or every queued/running job with that key; returns how many were affected.
+
+        Running jobs are cancelled cooperatively: they see cancel_requested, and whatever they return is discarded.
+        """
+        cancelled = []
+        with self._condition:
+            if isinstance(job_or_key, Job):
+                jobs = [job_or_key]
+            else:
+                jobs = [job for job in self._jobs.values() if job.key == job_or_key]
+            for job in jobs:
+                if job.status == QUEUED:
+                    self._queue = [entry for entry in self._queue if entry[2] is not job]
+                    heapq.heapify(self._queue)
+                elif job.status != RUNNING:
+                    continue
+                job._cancel.set()
+                self._complete(job, CANCELLED)
+                cancelled.append(job)
+        for job in cancelled:
+            self._notify(job)
+        return len(cancelled)
+
+    def active(self, kind: Optional[str] = None) -> List[Job]:
+        """Queued and running jobs"""
+        with self._condition:
+            return [job for job in self._jobs.values() if kind is None or job.kind == kind]
+
+    def running_count(self, kind: str) -> int:
+        with self._condition:
+            return self._running.get(kind, 0)
+
+    def _next_job(self) -> Optional[Job]:
+        """Highest-priority queued job whose kind is under its limit (caller holds the lock)"""
+        skipped = []
+        job = None
+        while self._queue:
+            entry = heapq.heappop(self._queue)
+            kind = entry[2].kind
+            if kind in self.limits and self._running.get(kind, 0) >= self.limits[kind]:
+                skipped.append(entry)
+                continue
+            job = entry[2]
+            break
+        for entry in skipped:
+            heapq.heappush(self._queue, entry)
+        return job
+
+    def _run(self, worker: _Worker):
+        while True:
+            with self._condition:
+                job = None
+                while not self._stopping and not worker.detached:
+                    job = self._next_job()
+                    if job is not None:
+                        break
+                    self._condition.wait()
+                if job is None:
+                    if worker in self._workers:
+                        self._workers.remove(worker)
+                    return
+                job.status = RUNNING
+                job.started = time.time()
+                job._worker = worker
+                job._holds_slot = True
+                self._running[job.kind] = self._running.get(job.kind, 0) + 1
+                if job.timeout:
+                    job._timer = self._timers.schedule_in(job.timeout, self._expire, job)
+
+            _local.job = job
+            status, result, error = DONE, None, None
+            try:
+                result = job.func(*job.args)
+            except Exception as e:
+                status, error = FAILED, str(e)
+            finally:
+                _local.job = None
+
+            with self._condition:
+                if job._timer is not None:
+                    self._timers.cancel(job._timer)
+                self._release(job)
+                # Still RUNNING unless it was cancelled or timed out meanwhile (already reported then)
+                finished = job.status == RUNNING
+                if finished:
+                    job.result, job.error = result, error
+                    self._complete(job, status)
+                detached = worker.detached
+            if finished:
+                self._notify(job)
+            if detached:
+                # Replaced after a timeout; the replacement took over this worker's place in the pool
+                return
+
+    def _expire(self, job: Job):
+        """Timeout: report the job as timed out and hand its worker's place to a fresh thread"""
+        with self._condition:
+            if job.status != RUNNING:
+                return
+            job._cancel.set()
+            job.error = f"timed out after {job.timeout:g}s"
+            self._release(job)
+            self._complete(job, TIMED_OUT)
+            worker = job._worker
+            if worker is not None and not worker.detached:
+                worker.detached = True
+                self._workers.remove(worker)
+                if not self._stopping:
+                    self._spawn()
+        self._notify(job)
+
+    def _release(self, job: Job):
+        """Free the job's per-kind slot exactly once (caller holds the lock)"""
+        if job._holds_slot:
+            job._holds_slot = False
+            self._running[job.kind] -= 1
+            self._condition.notify_all()
+
+    def _complete(self, job: Job, status: str):
+        job.status = status
+        job.finished = time.time()
+        self._jobs.pop(job.id, None)
+
+    @staticmethod
+    def _notify(job: Job):
+        if job.on_done:
+            try:
+                job.on_done(job)
+            except Exception as e:
+                print(f"Worker pool callback error: {e}")